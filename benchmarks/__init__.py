@@ -0,0 +1 @@
+"""Benchmarks de performance (hors suite de tests, lancés à la demande)."""
@@ -0,0 +1,92 @@
+"""Petits utilitaires partagés par les scripts de benchmark."""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+def best_of(fn: Callable[[], Any], repeat: int = 5, number: int = 1) -> float:
+    """Return the best wall time (seconds) of `number` calls, over `repeat` runs."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def measure(fn: Callable[[], Any], rounds: int = 5, number: int = 1) -> dict:
+    """Per-call timings (µs) over `rounds` runs of `number` calls.
+
+    Mêmes statistiques que pytest-benchmark: min, médiane, moyenne, écart-type et
+    opérations par seconde (calculées sur la médiane).
+    """
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1e6)
+    median = statistics.median(samples)
+    return {
+        "min_us": round(min(samples), 3),
+        "median_us": round(median, 3),
+        "mean_us": round(statistics.mean(samples), 3),
+        "stddev_us": round(statistics.pstdev(samples), 3),
+        "ops_per_s": round(1e6 / median) if median else None,
+    }
+
+
+def latency_summary(latencies: list[float], elapsed: float) -> dict:
+    """Throughput and latency percentiles (ms) of a load run."""
+    quantiles = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "req_per_s": round(len(latencies) / elapsed),
+        "p50_ms": round(quantiles[49] * 1000, 3),
+        "p95_ms": round(quantiles[94] * 1000, 3),
+        "p99_ms": round(quantiles[98] * 1000, 3),
+        "max_ms": round(max(latencies) * 1000, 3),
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def emit(name: str, params: dict[str, Any], results: list[dict[str, Any]]) -> None:
+    """Print results as a JSON document so runs can be diffed between commits.
+
+    `python -m benchmarks.compare` compare deux de ces documents.
+    """
+    json.dump(
+        {
+            "benchmark": name,
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "params": params,
+            "results": results,
+        },
+        sys.stdout,
+        indent=2,
+        default=str,
+    )
+    sys.stdout.write("\n")
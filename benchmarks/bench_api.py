@@ -0,0 +1,151 @@
+"""Générateur de charge en process: req/s et p50/p95/p99 par endpoint.
+
+Le trafic passe par `httpx.ASGITransport` (pas de réseau): on mesure la pile
+FastAPI + service + repository. Pour chaque endpoint et chaque niveau de
+concurrence, `--concurrency` clients envoient en boucle `--requests` requêtes au
+total. Le store est rempli avec `--rows` todos avant la première mesure.
+
+Les endpoints de lecture sont mesurés seuls: sans écriture entre deux requêtes,
+les pages viennent du cache de réponses (`--list-cache-size 0` pour le couper).
+
+Usage: python -m benchmarks.bench_api --rows 100000 --concurrency 1 50 500
+       python -m benchmarks.bench_api --endpoints list_page create --backend sqlite
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import logging
+import os
+import tempfile
+import time
+from typing import Any
+
+import httpx
+
+from todo_app.api import app, get_service
+from todo_app.cache import ResponseCache
+from todo_app.config import Settings
+from todo_app.repository import build_async_repository
+from todo_app.service import AsyncTodoService
+
+from ._utils import emit, latency_summary
+
+BATCH = 10_000
+
+
+def endpoints(rows: int) -> dict[str, Any]:
+    """Endpoint name -> function returning (method, url, json body) per request."""
+    ids = itertools.cycle(range(1, rows + 1, 7))
+    bulk = [{"title": f"Bulk {i}"} for i in range(100)]
+    return {
+        "health": lambda: ("GET", "/health", None),
+        "list_page": lambda: ("GET", "/todos?limit=20", None),
+        "list_page_deep": lambda: ("GET", f"/todos?limit=20&cursor={rows // 2}", None),
+        "list_completed": lambda: ("GET", "/todos?limit=20&completed=true", None),
+        "search": lambda: ("GET", "/todos/search?q=projet", None),
+        "stats": lambda: ("GET", "/todos/stats", None),
+        "changes_catch_up": lambda: ("GET", "/todos/changes?follow=false", None),
+        "create": lambda: ("POST", "/todos", {"title": "Load test"}),
+        "update": lambda: ("PATCH", f"/todos/{next(ids)}", {"completed": True}),
+        "bulk_create_100": lambda: ("POST", "/todos/bulk", bulk),
+    }
+
+
+async def seed(client: httpx.AsyncClient, rows: int) -> None:
+    words = ["projet", "client", "revue", "appel", "rapport"]
+    for first in range(0, rows, BATCH):
+        body = [
+            {"title": f"Todo {i} {words[i % len(words)]}"}
+            for i in range(first, min(rows, first + BATCH))
+        ]
+        (await client.post("/todos/bulk", json=body)).raise_for_status()
+    done = [{"id": todo_id, "completed": True} for todo_id in range(3, rows + 1, 3)]
+    for first in range(0, len(done), BATCH):
+        response = await client.patch("/todos/bulk", json=done[first : first + BATCH])
+        response.raise_for_status()
+
+
+async def load(
+    client: httpx.AsyncClient, request: Any, concurrency: int, total: int
+) -> tuple[list[float], int, float]:
+    """Send `total` requests from `concurrency` workers; latencies and errors."""
+    latencies: list[float] = []
+    errors = 0
+    sent = itertools.count()
+
+    async def worker() -> None:
+        nonlocal errors
+        while next(sent) < total:
+            method, url, body = request()
+            start = time.perf_counter()
+            response = await client.request(method, url, json=body)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    transport = httpx.ASGITransport(app=app)
+    results = []
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        await seed(client, args.rows)
+        requests = endpoints(args.rows)
+        for name in args.endpoints or requests:
+            for concurrency in args.concurrency:
+                latencies, errors, elapsed = await load(
+                    client, requests[name], concurrency, args.requests
+                )
+                results.append(
+                    {
+                        "endpoint": name,
+                        "concurrency": concurrency,
+                        "errors": errors,
+                        **latency_summary(latencies, elapsed),
+                    }
+                )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--endpoints", nargs="+")
+    parser.add_argument(
+        "--backend", default="memory", choices=["memory", "columnar", "sqlite"]
+    )
+    parser.add_argument("--list-cache-size", type=int, default=256)
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings = Settings(
+            secret_key="bench",
+            storage_backend=args.backend,
+            sqlite_path=os.path.join(tmp, "bench.db"),
+        )
+        service = AsyncTodoService(
+            build_async_repository(settings), ResponseCache(args.list_cache_size)
+        )
+
+        async def override() -> AsyncTodoService:
+            return service
+
+        app.dependency_overrides[get_service] = override
+        results = asyncio.run(run(args))
+        app.dependency_overrides.clear()
+    emit("api", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
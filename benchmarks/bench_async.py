@@ -0,0 +1,113 @@
+"""Latence sous forte concurrence: endpoints `def` (threadpool) vs `async def`.
+
+Les deux applications servent le même store en mémoire; seule la façon
+d'exécuter les handlers change. Le trafic est généré en process via
+`httpx.ASGITransport`.
+
+Usage: python -m benchmarks.bench_async --connections 2000 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+from fastapi import Depends, FastAPI
+
+from todo_app.api import app as async_app
+from todo_app.api import get_service
+from todo_app.models import TodoCreate, TodoInDB, TodoQuery
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService, TodoService
+
+from ._utils import emit
+
+
+def build_sync_app(service: TodoService) -> FastAPI:
+    """The pre-async API shape: plain `def` handlers run in the threadpool."""
+    app = FastAPI()
+
+    def dependency() -> TodoService:
+        return service
+
+    @app.get("/todos", response_model=list[TodoInDB])
+    def list_todos(limit: int = 20, svc: TodoService = Depends(dependency)):
+        return svc.list_todos(TodoQuery(limit=limit))
+
+    @app.post("/todos", response_model=TodoInDB, status_code=201)
+    def create_todo(payload: TodoCreate, svc: TodoService = Depends(dependency)):
+        return svc.create_todo(payload)
+
+    return app
+
+
+async def load(app: FastAPI, connections: int, rounds: int) -> list[float]:
+    """Fire `connections` concurrent requests, `rounds` times; return latencies."""
+    transport = httpx.ASGITransport(app=app)
+    latencies: list[float] = []
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+
+        async def one(i: int) -> None:
+            start = time.perf_counter()
+            if i % 10 == 0:
+                await client.post("/todos", json={"title": f"Todo {i}"})
+            else:
+                await client.get("/todos", params={"limit": 20})
+            latencies.append(time.perf_counter() - start)
+
+        for _ in range(rounds):
+            await asyncio.gather(*(one(i) for i in range(connections)))
+    return latencies
+
+
+def summarize(mode: str, latencies: list[float], elapsed: float) -> dict:
+    quantiles = statistics.quantiles(latencies, n=100)
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "req_per_s": round(len(latencies) / elapsed),
+        "p50_ms": round(quantiles[49] * 1000, 2),
+        "p99_ms": round(quantiles[98] * 1000, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    results = []
+    repo = InMemoryTodoRepository()
+    repo.create_many([TodoCreate(title=f"Seed {i}") for i in range(1000)])
+
+    sync_app = build_sync_app(TodoService(repo))
+    start = time.perf_counter()
+    latencies = asyncio.run(load(sync_app, args.connections, args.rounds))
+    results.append(summarize("sync_threadpool", latencies, time.perf_counter() - start))
+
+    service = AsyncTodoService(AsyncRepositoryAdapter(repo))
+
+    async def override() -> AsyncTodoService:
+        return service
+
+    async_app.dependency_overrides[get_service] = override
+    start = time.perf_counter()
+    latencies = asyncio.run(load(async_app, args.connections, args.rounds))
+    results.append(
+        summarize("async_event_loop", latencies, time.perf_counter() - start)
+    )
+    async_app.dependency_overrides.clear()
+
+    emit("async", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
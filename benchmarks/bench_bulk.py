@@ -0,0 +1,71 @@
+"""Débit de création: POST /todos unitaire vs POST /todos/bulk.
+
+Usage: python -m benchmarks.bench_bulk --items 50000 --batch-size 1000
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+
+from fastapi.testclient import TestClient
+
+from todo_app.api import app, get_service
+from todo_app.repository import InMemoryTodoRepository
+from todo_app.service import TodoService
+
+from ._utils import emit
+
+
+def fresh_client() -> TestClient:
+    service = TodoService(InMemoryTodoRepository())
+    app.dependency_overrides[get_service] = lambda: service
+    return TestClient(app)
+
+
+def run_single(items: int) -> float:
+    client = fresh_client()
+    start = time.perf_counter()
+    for i in range(items):
+        client.post("/todos", json={"title": f"Todo {i}"})
+    return time.perf_counter() - start
+
+
+def run_bulk(items: int, batch_size: int) -> float:
+    client = fresh_client()
+    start = time.perf_counter()
+    for offset in range(0, items, batch_size):
+        batch = [
+            {"title": f"Todo {i}"}
+            for i in range(offset, min(offset + batch_size, items))
+        ]
+        client.post("/todos/bulk", json=batch)
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    single_s = run_single(args.items)
+    bulk_s = run_bulk(args.items, args.batch_size)
+    app.dependency_overrides.clear()
+    emit(
+        "bulk",
+        vars(args),
+        [
+            {
+                "mode": "single",
+                "seconds": single_s,
+                "todos_per_s": args.items / single_s,
+            },
+            {"mode": "bulk", "seconds": bulk_s, "todos_per_s": args.items / bulk_s},
+            {"speedup": round(single_s / bulk_s, 1)},
+        ],
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""Trafic de lecture d'un client qui garde la liste à jour: polling vs flux.
+
+Entre deux synchronisations, `--writes` todos sont modifiés. Le client "polling"
+recharge `GET /todos` en entier (cache de réponses désactivé, comme quand la
+liste change à chaque fois); le client "changes" ne demande que les événements
+depuis son jeton (`GET /todos/changes?follow=false`).
+
+Usage: python -m benchmarks.bench_changes --rows 1000 10000 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import TYPE_CHECKING
+
+import httpx
+
+from todo_app.api import app, get_service
+from todo_app.cache import ResponseCache
+from todo_app.models import TodoCreate, TodoUpdate
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+from ._utils import emit
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+BATCH = 10_000
+
+
+async def run(
+    service: AsyncTodoService, rows: int, syncs: int, writes: int
+) -> list[dict]:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://b") as client:
+        token = (await client.get("/todos/changes", params={"follow": False})).headers[
+            "X-Last-Event-ID"
+        ]
+        stats: dict[str, tuple[list[int], list[float]]] = {
+            "polling": ([], []),
+            "changes": ([], []),
+        }
+        for round_ in range(syncs):
+            for i in range(writes):
+                todo_id = (round_ * writes + i) % rows + 1
+                await service.update_todo(todo_id, TodoUpdate(title=f"Edit {round_}"))
+
+            start = time.perf_counter()
+            response = await client.get("/todos")
+            stats["polling"][0].append(len(response.content))
+            stats["polling"][1].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            response = await client.get(
+                "/todos/changes", params={"since": token, "follow": False}
+            )
+            token = response.headers["X-Last-Event-ID"]
+            stats["changes"][0].append(len(response.content))
+            stats["changes"][1].append(time.perf_counter() - start)
+
+    return [
+        {
+            "client": name,
+            "rows": rows,
+            "kb_per_sync": round(statistics.mean(sizes) / 1024, 1),
+            "ms_per_sync": round(statistics.median(times) * 1000, 2),
+        }
+        for name, (sizes, times) in stats.items()
+    ]
+
+
+def provider(service: AsyncTodoService) -> Callable[[], Awaitable[AsyncTodoService]]:
+    async def override() -> AsyncTodoService:
+        return service
+
+    return override
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10_000, 100_000])
+    parser.add_argument("--syncs", type=int, default=20)
+    parser.add_argument("--writes", type=int, default=10)
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    results = []
+    for rows in args.rows:
+        repo = InMemoryTodoRepository()
+        for first in range(0, rows, BATCH):
+            count = min(BATCH, rows - first)
+            repo.create_many(
+                [TodoCreate(title=f"Todo {first + i}") for i in range(count)]
+            )
+        service = AsyncTodoService(AsyncRepositoryAdapter(repo), ResponseCache(0))
+
+        app.dependency_overrides[get_service] = provider(service)
+        results.extend(asyncio.run(run(service, rows, args.syncs, args.writes)))
+        app.dependency_overrides.clear()
+    emit("changes", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
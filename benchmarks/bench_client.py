@@ -0,0 +1,112 @@
+"""Latence d'un rendu de l'interface selon le client HTTP utilisé.
+
+Un serveur HTTP local (`http.server`, keep-alive) sert une liste figée de todos
+avec son ETag, pour mesurer uniquement le coût côté client:
+
+- `new_connection`: une connexion TCP par requête (les anciens `requests.get`);
+- `pooled`: `httpx.Client` partagé, sans cache;
+- `cached`: `TodoClient` (pool + cache de `--ttl` secondes + revalidation ETag).
+
+Usage: python -m benchmarks.bench_client --rows 1000 --renders 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from todo_app.client import TodoClient
+
+from ._utils import emit
+
+
+def serve(body: bytes) -> tuple[ThreadingHTTPServer, dict[str, int]]:
+    """Start a keep-alive server for GET /todos; count connections and bodies."""
+    stats = {"connections": 0, "bodies": 0}
+    etag = '"bench"'
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            stats["connections"] += 1
+
+        def do_GET(self) -> None:
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            stats["bodies"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: object) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, stats
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--renders", type=int, default=500)
+    parser.add_argument("--interval-ms", type=float, default=20.0)
+    parser.add_argument("--ttl", type=float, default=2.0)
+    args = parser.parse_args()
+
+    todos = [
+        {"id": i, "title": f"Todo {i}", "description": None, "completed": False}
+        for i in range(args.rows)
+    ]
+    server, stats = serve(json.dumps(todos).encode())
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    pooled = httpx.Client(base_url=base_url)
+    cached = TodoClient(base_url, cache_ttl=args.ttl)
+    clients = {
+        "new_connection": lambda: httpx.get(f"{base_url}/todos").json(),
+        "pooled": lambda: pooled.get("/todos").json(),
+        "cached": cached.list_todos,
+    }
+    results = []
+    for name, render in clients.items():
+        stats.update(connections=0, bodies=0)
+        samples = []
+        for _ in range(args.renders):
+            start = time.perf_counter()
+            assert len(render()) == args.rows
+            samples.append((time.perf_counter() - start) * 1000)
+            # un utilisateur qui interagit: un rerun toutes les `interval` ms
+            time.sleep(args.interval_ms / 1000)
+        results.append(
+            {
+                "client": name,
+                "p50_ms": round(statistics.median(samples), 3),
+                "mean_ms": round(statistics.mean(samples), 3),
+                "connections": stats["connections"],
+                "full_downloads": stats["bodies"],
+            }
+        )
+    pooled.close()
+    cached.close()
+    server.shutdown()
+    emit("client", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
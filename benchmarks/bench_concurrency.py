@@ -0,0 +1,134 @@
+"""Débit multi-thread: verrous striés vs un verrou global.
+
+Chaque thread enchaîne un mélange 80% lectures (get + page de 20) / 20% écritures
+(update) sur des todos aléatoires. Avec le GIL le gain est borné; sur un
+interpréteur free-threaded (3.13t) les verrous striés laissent le débit
+monter avec le nombre de threads.
+
+`striped_locked` est l'ancienne mise à jour de `ConcurrentTodoRepository`
+(`model_copy` sous le verrou strié), `striped` la version compare-and-swap.
+Avec `--conditional`, chaque écriture relit le todo puis le met à jour avec sa
+version (`If-Match`); `conflicts` compte les écritures refusées.
+
+Usage: python -m benchmarks.bench_concurrency --rows 100000 --ops 20000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from todo_app.concurrent_repository import ConcurrentTodoRepository
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.repository import InMemoryTodoRepository, VersionConflictError
+
+from ._utils import emit
+
+
+class GlobalLockRepository(InMemoryTodoRepository):
+    """Baseline: the naive fix, one lock around every operation."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def list(self, query=None):
+        with self._lock:
+            return super().list(query)
+
+    def get(self, todo_id):
+        with self._lock:
+            return super().get(todo_id)
+
+    def update(self, todo_id, payload, expected_version=None):
+        with self._lock:
+            return super().update(todo_id, payload, expected_version)
+
+
+class LockedUpdateRepository(ConcurrentTodoRepository):
+    """Striped locks, with the whole read-modify-write under the stripe lock."""
+
+    def update(self, todo_id, payload, expected_version=None):
+        with self._stripe(todo_id):
+            return InMemoryTodoRepository.update(
+                self, todo_id, payload, expected_version
+            )
+
+
+def run(
+    repo: InMemoryTodoRepository,
+    threads: int,
+    ops: int,
+    rows: int,
+    conditional: bool,
+) -> tuple[float, int]:
+    barrier = threading.Barrier(threads + 1)
+    payloads = [TodoUpdate(completed=True), TodoUpdate(completed=False)]
+    page = TodoQuery(completed=False, limit=20)
+    conflicts = [0] * threads
+
+    def worker(seed: int) -> None:
+        rng = random.Random(seed)
+        barrier.wait()
+        for i in range(ops):
+            todo_id = rng.randint(1, rows)
+            if i % 5 == 0:
+                version = repo.get(todo_id).version if conditional else None
+                try:
+                    repo.update(todo_id, payloads[i % 2], version)
+                except VersionConflictError:
+                    conflicts[seed] += 1
+            elif i % 5 == 1:
+                repo.list(TodoQuery(limit=20, after_id=todo_id))
+                repo.list(page)
+            else:
+                repo.get(todo_id)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return threads * ops / (time.perf_counter() - start), sum(conflicts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--ops", type=int, default=20_000, help="ops per thread")
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--conditional", action="store_true")
+    args = parser.parse_args()
+
+    seed = [TodoCreate(title=f"Todo {i}") for i in range(args.rows)]
+    results = []
+    for name, factory in [
+        ("global_lock", GlobalLockRepository),
+        ("striped_locked", LockedUpdateRepository),
+        ("striped", ConcurrentTodoRepository),
+    ]:
+        repo = factory()
+        repo.create_many(seed)
+        for threads in args.threads:
+            ops_per_s, conflicts = run(
+                repo, threads, args.ops, args.rows, args.conditional
+            )
+            results.append(
+                {
+                    "repository": name,
+                    "threads": threads,
+                    "ops_per_s": round(ops_per_s),
+                    "conflicts": conflicts,
+                }
+            )
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    emit("concurrency", {**vars(args), "gil_enabled": gil}, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Sparse fieldsets: ce que coûte une liste selon les champs demandés.
+
+Pour chaque backend, le store est rempli de `--rows` todos (descriptions de
+longueur réaliste) puis, pour chaque taille de page de `--sizes` et chaque
+projection de `--fields` (`all`: le todo complet), on mesure:
+- `list_us`: `repo.list(TodoQuery(limit=..., fields=...))`, la projection étant
+  faite par le repository (colonnes lues, champs copiés);
+- `dump_us`: la sérialisation JSON de la page (`TypeAdapter.dump_json`, celui
+  de `TodoInDB` ou celui des lignes projetées);
+- `bytes`: la taille du corps JSON;
+- `request_us`: la requête `GET /todos?limit=...&fields=...` complète (ASGI en
+  process, cache des listes désactivé).
+`vs_all` rapporte `list_us + dump_us` à celui de la projection `all`.
+
+Usage: python -m benchmarks.bench_fields --rows 10000 --sizes 100 1000 \\
+           --fields all id,title,completed id
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from pydantic import TypeAdapter
+
+from todo_app.api import create_app
+from todo_app.cache import ResponseCache
+from todo_app.columnar_repository import ColumnarTodoRepository
+from todo_app.models import TodoCreate, TodoInDB, TodoQuery, row_adapter
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+from todo_app.sqlite_repository import SqliteTodoRepository
+
+from ._utils import emit, measure
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from todo_app.repository import TodoRepository
+
+_todo_list_adapter = TypeAdapter(list[TodoInDB])
+BATCH = 1000
+
+
+def fill(repo: TodoRepository, rows: int) -> None:
+    for first in range(0, rows, BATCH):
+        repo.create_many(
+            TodoCreate(
+                title=f"Todo {i}",
+                description=f"Note {i}: " + "détails de la tâche " * 8,
+                owner=f"tenant-{i % 16}",
+            )
+            for i in range(first, min(rows, first + BATCH))
+        )
+
+
+async def request_us(app: Any, params: dict[str, Any], rounds: int) -> float:
+    """Median latency (µs) of `rounds` GET /todos, the body parsed as JSON."""
+    samples = []
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            response = await client.get("/todos", params=params)
+            response.json()
+            samples.append(time.perf_counter() - start)
+    return round(statistics.median(samples) * 1e6, 1)
+
+
+def bench_backend(
+    backend: str, repo: TodoRepository, args: argparse.Namespace
+) -> list[dict[str, Any]]:
+    app = create_app()
+    app.state.service = AsyncTodoService(
+        AsyncRepositoryAdapter(repo), list_cache=ResponseCache(0)
+    )
+    results = []
+    for size in args.sizes:
+        baseline = None
+        for spec in args.fields:
+            names = None if spec == "all" else tuple(spec.split(","))
+            query = TodoQuery(limit=size, fields=names)
+            adapter = (
+                _todo_list_adapter
+                if query.fields is None
+                else row_adapter(query.fields)
+            )
+            page = repo.list(query)
+            assert len(page) == size
+            number = max(1, 2000 // size)
+            list_us = measure(lambda q=query: repo.list(q), args.rounds, number)
+            dump_us = measure(
+                lambda a=adapter, p=page: a.dump_json(p), args.rounds, number
+            )
+            total = list_us["median_us"] + dump_us["median_us"]
+            baseline = baseline or total
+            params = (
+                {"limit": size} if names is None else {"limit": size, "fields": spec}
+            )
+            results.append(
+                {
+                    "backend": backend,
+                    "rows": args.rows,
+                    "items": size,
+                    "fields": spec,
+                    "list_us": list_us["median_us"],
+                    "dump_us": dump_us["median_us"],
+                    "bytes": len(adapter.dump_json(page)),
+                    "request_us": asyncio.run(request_us(app, params, args.rounds)),
+                    "vs_all": round(total / baseline, 2),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument(
+        "--fields", nargs="+", default=["all", "id,title,completed", "id"]
+    )
+    parser.add_argument(
+        "--backends", nargs="+", default=["memory", "columnar", "sqlite"]
+    )
+    parser.add_argument("--rounds", type=int, default=7)
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        factories: dict[str, Callable[[], TodoRepository]] = {
+            "memory": InMemoryTodoRepository,
+            "columnar": ColumnarTodoRepository,
+            "sqlite": lambda: SqliteTodoRepository(os.path.join(tmp, "bench.db")),
+        }
+        for backend in args.backends:
+            with ExitStack() as stack:
+                repo = factories[backend]()
+                if isinstance(repo, SqliteTodoRepository):
+                    stack.callback(repo.close)
+                fill(repo, args.rows)
+                results += bench_backend(backend, repo, args)
+    emit("fields", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Requêtes indexées vs scan linéaire sur InMemoryTodoRepository.
+
+Usage: python -m benchmarks.bench_indexes --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+from datetime import UTC, datetime, timedelta
+
+from todo_app.models import TodoInDB, TodoQuery
+from todo_app.repository import InMemoryTodoRepository
+
+from ._utils import best_of, emit
+
+START = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def populate(rows: int) -> InMemoryTodoRepository:
+    """One todo per second, one in ten completed."""
+    repo = InMemoryTodoRepository()
+    for todo_id in range(1, rows + 1):
+        repo._insert(
+            TodoInDB.model_construct(
+                id=todo_id,
+                title=f"Todo {todo_id}",
+                description=None,
+                completed=todo_id % 10 == 0,
+                created_at=START + timedelta(seconds=todo_id),
+            )
+        )
+    return repo
+
+
+def scan(repo: InMemoryTodoRepository, query: TodoQuery) -> list[TodoInDB]:
+    """Baseline: what a store without secondary indexes has to do."""
+    after = query.after_id or 0
+    results = [t for t in repo._data.values() if t.id > after and query.matches(t)]
+    return results if query.limit is None else results[: query.limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    repo = populate(args.rows)
+    end = START + timedelta(seconds=args.rows)
+    queries = {
+        "open_first_page": TodoQuery(completed=False, limit=100),
+        "completed_all": TodoQuery(completed=True),
+        "created_last_hour": TodoQuery(created_after=end - timedelta(hours=1)),
+        "completed_last_hour": TodoQuery(
+            completed=True, created_after=end - timedelta(hours=1)
+        ),
+        "deep_cursor_page": TodoQuery(after_id=args.rows - 500, limit=100),
+    }
+
+    results = []
+    for name, query in queries.items():
+        indexed = repo.list(query)
+        assert [t.id for t in indexed] == [t.id for t in scan(repo, query)]
+        indexed_s = best_of(lambda q=query: repo.list(q), args.repeat)
+        scan_s = best_of(lambda q=query: scan(repo, q), args.repeat)
+        results.append(
+            {
+                "query": name,
+                "rows_returned": len(indexed),
+                "indexed_ms": round(indexed_s * 1000, 3),
+                "scan_ms": round(scan_s * 1000, 3),
+                "speedup": round(scan_s / indexed_s, 1),
+            }
+        )
+    emit("indexes", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
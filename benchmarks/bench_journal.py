@@ -0,0 +1,94 @@
+"""Coût du journal d'opérations: latence d'écriture et temps de reprise.
+
+Usage: python -m benchmarks.bench_journal --ops 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from todo_app.durable_repository import DurableTodoRepository
+from todo_app.models import TodoCreate, TodoUpdate
+from todo_app.repository import InMemoryTodoRepository
+
+from ._utils import emit
+
+
+def write_latencies(repo: InMemoryTodoRepository, ops: int) -> dict[str, float]:
+    """Per-call latency of a create/update/delete mix (80/15/5)."""
+    samples = []
+    payload = TodoCreate(title="Todo", description="Lorem ipsum")
+    done = TodoUpdate(completed=True)
+    for i in range(ops):
+        start = time.perf_counter()
+        if i % 20 < 16:
+            repo.create(payload)
+        elif i % 20 < 19:
+            repo.update(i // 2 + 1, done)
+        else:
+            repo.delete(i // 2 + 1)
+        samples.append(time.perf_counter() - start)
+    quantiles = statistics.quantiles(samples, n=100)
+    return {
+        "p50_us": round(quantiles[49] * 1e6, 2),
+        "p99_us": round(quantiles[98] * 1e6, 2),
+        "max_us": round(max(samples) * 1e6, 2),
+    }
+
+
+def recovery_seconds(directory: Path) -> tuple[float, int]:
+    start = time.perf_counter()
+    repo = DurableTodoRepository(directory)
+    elapsed = time.perf_counter() - start
+    count = len(repo._data)
+    repo.close()
+    return elapsed, count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=10_000_000)
+    parser.add_argument("--flush-ms", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = [
+        {"backend": "memory", **write_latencies(InMemoryTodoRepository(), args.ops)}
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        repo = DurableTodoRepository(
+            directory,
+            flush_interval=args.flush_ms / 1000,
+            snapshot_every=args.ops + 1,  # reprise depuis le journal seul
+        )
+        results.append({"backend": "durable", **write_latencies(repo, args.ops)})
+        repo.close()
+        log_bytes = sum(path.stat().st_size for path in directory.iterdir())
+
+        log_s, todos = recovery_seconds(directory)
+        results.append(
+            {
+                "recovery": "log_replay",
+                "ops": args.ops,
+                "todos": todos,
+                "log_mb": round(log_bytes / 2**20, 1),
+                "seconds": round(log_s, 2),
+            }
+        )
+
+        repo = DurableTodoRepository(directory)
+        repo.snapshot(wait=True)
+        repo.close()
+        snapshot_s, todos = recovery_seconds(directory)
+        results.append(
+            {"recovery": "snapshot", "todos": todos, "seconds": round(snapshot_s, 2)}
+        )
+    emit("journal", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""Débit de l'API selon la configuration des logs.
+
+Chaque requête passe par `AsyncTodoService`, qui logge à chaque opération. Les
+logs sont écrits dans un fichier (un write + flush par message, comme sur
+stdout): synchrone sur le thread de la requête, ou via la file du mode
+asynchrone. `--sink-delay-us` simule une sortie lente ou contendue (pipe plein,
+collecteur de logs en retard) en ajoutant une attente à chaque write.
+
+Usage: python -m benchmarks.bench_logging --connections 500 --rounds 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import TextIO
+
+from todo_app.api import app, get_service
+from todo_app.cache import ResponseCache
+from todo_app.config import Settings
+from todo_app.logger import configure_logging, shutdown_logging
+from todo_app.models import TodoCreate
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+from ._utils import emit
+from .bench_async import load, summarize
+
+MODES = {
+    "off": {"log_level": "WARNING", "log_async": False},
+    "sync_text": {"log_async": False},
+    "async_text": {"log_async": True},
+    "async_json": {"log_async": True, "log_format": "json"},
+    "async_json_sampled": {
+        "log_async": True,
+        "log_format": "json",
+        "log_sampling": {"INFO": 0.1},
+    },
+}
+
+
+class SlowStream:
+    """File-like wrapper whose writes block for `delay` seconds."""
+
+    def __init__(self, stream: TextIO, delay: float) -> None:
+        self.stream = stream
+        self.delay = delay
+
+    def write(self, text: str) -> int:
+        time.sleep(self.delay)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--sink-delay-us", type=float, default=100.0)
+    args = parser.parse_args()
+
+    repo = InMemoryTodoRepository()
+    repo.create_many([TodoCreate(title=f"Seed {i}") for i in range(1000)])
+    # cache désactivé: chaque GET atteint le service (et logge)
+    service = AsyncTodoService(AsyncRepositoryAdapter(repo), ResponseCache(0))
+
+    async def override() -> AsyncTodoService:
+        return service
+
+    app.dependency_overrides[get_service] = override
+    results = []
+    with tempfile.TemporaryFile("w") as log_file:
+        sink = SlowStream(log_file, args.sink_delay_us / 1e6)
+        for mode, options in MODES.items():
+            configure_logging(Settings(secret_key="bench", **options), sink)
+            start = time.perf_counter()
+            latencies = asyncio.run(load(app, args.connections, args.rounds))
+            elapsed = time.perf_counter() - start
+            shutdown_logging()
+            results.append(summarize(mode, latencies, elapsed))
+    app.dependency_overrides.clear()
+    emit("logging", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
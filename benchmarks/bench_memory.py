@@ -0,0 +1,71 @@
+"""Mémoire occupée par N todos: InMemoryTodoRepository vs ColumnarTodoRepository.
+
+Usage: python -m benchmarks.bench_memory --rows 5000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+
+from todo_app.columnar_repository import ColumnarTodoRepository
+from todo_app.models import TodoCreate
+from todo_app.repository import InMemoryTodoRepository
+
+from ._utils import emit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from todo_app.repository import TodoRepository
+
+BATCH = 10_000
+
+
+def measure(factory: Callable[[], TodoRepository], rows: int) -> dict[str, float]:
+    """Fill a repository by batches and return the memory it retains."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    repo = factory()
+    for first in range(0, rows, BATCH):
+        count = min(BATCH, rows - first)
+        repo.create_many(
+            [
+                TodoCreate(title=f"Todo {first + i}", description="Lorem ipsum")
+                for i in range(count)
+            ]
+        )
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "retained_mb": round(current / 2**20, 1),
+        "peak_mb": round(peak / 2**20, 1),
+        "bytes_per_todo": round(current / rows, 1),
+        "fill_s": round(elapsed, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    args = parser.parse_args()
+
+    results = []
+    for name, factory in {
+        "memory": InMemoryTodoRepository,
+        "columnar": ColumnarTodoRepository,
+    }.items():
+        results.append({"backend": name, **measure(factory, args.rows)})
+    baseline, columnar = results
+    columnar["reduction"] = round(baseline["retained_mb"] / columnar["retained_mb"], 1)
+    emit("memory", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""Coût des métriques (METRICS_ENABLED) par rapport au temps de requête.
+
+Deux mesures complémentaires:
+
+- bout en bout: même pile que `bench_api` (`httpx.ASGITransport`, store en
+  mémoire), les modes `off` et `on` alternent sur `--rounds` tours pour que la
+  dérive de la machine touche les deux; le surcoût est la médiane des écarts
+  entre les deux modes d'un même tour. Sur une machine chargée, ce bruit peut
+  dépasser l'effet mesuré;
+- par composant: coût ajouté par le middleware et par un appel chronométré
+  (boucles serrées, peu bruitées), multiplié par le nombre d'appels chronométrés
+  d'une requête de l'endpoint et rapporté à son p50 sans métriques
+  (`estimated_percent`).
+
+L'objectif est un surcoût inférieur à 2% du temps de requête.
+
+Usage: python -m benchmarks.bench_metrics --rows 10000 --requests 500 --rounds 11
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from todo_app.api import app, get_service
+from todo_app.cache import ResponseCache
+from todo_app.metrics import AppMetrics, MetricsMiddleware, timed
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+from ._utils import emit, latency_summary
+from .bench_api import endpoints, load, seed
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+CALLS = 200_000
+
+
+async def per_call_us(fn: Callable[[], Awaitable[Any]]) -> float:
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(CALLS):
+            await fn()
+        best = min(best, (time.perf_counter() - start) / CALLS * 1e6)
+    return best
+
+
+async def component_costs() -> dict[str, float]:
+    """Microseconds added by the middleware and by one timed call."""
+    metrics = AppMetrics()
+
+    class Route:
+        path = "/todos"
+
+    async def endpoint(scope: dict, _receive: Any, send: Any) -> None:
+        scope["route"] = Route
+        await send({"type": "http.response.start", "status": 200})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def receive() -> dict:
+        return {}
+
+    async def send(message: dict) -> None:
+        pass
+
+    middleware = MetricsMiddleware(endpoint, metrics)
+
+    def request() -> Awaitable[None]:
+        return middleware({"type": "http", "method": "GET"}, receive, send)
+
+    async def operation() -> int:
+        return 1
+
+    costs = {}
+    metrics.enabled = False
+    disabled = await per_call_us(request)
+    metrics.enabled = True
+    costs["middleware_us"] = await per_call_us(request) - disabled
+    wrapped = timed(metrics.service_duration, "operation")(operation)
+    costs["timed_call_us"] = await per_call_us(wrapped) - await per_call_us(operation)
+    return costs
+
+
+def timed_calls(metrics: AppMetrics) -> int:
+    return sum(
+        series.count
+        for histogram in (metrics.service_duration, metrics.repository_duration)
+        for series in histogram._series.values()
+    )
+
+
+async def run(args: argparse.Namespace) -> list[dict]:
+    costs = await component_costs()
+    repo = InMemoryTodoRepository()
+    services = {
+        "off": AsyncTodoService(AsyncRepositoryAdapter(repo), ResponseCache(0)),
+        "on": AsyncTodoService(AsyncRepositoryAdapter(repo), ResponseCache(0)),
+    }
+    app.state.metrics.instrument_service(services["on"])
+    current = services["off"]
+
+    async def override() -> AsyncTodoService:
+        return current
+
+    app.dependency_overrides[get_service] = override
+    requests = endpoints(args.rows)
+    samples: dict[tuple[str, str], list[dict]] = {}
+    calls: dict[str, float] = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        await seed(client, args.rows)
+        for _ in range(args.rounds):
+            for mode in ("off", "on"):
+                current = services[mode]
+                app.state.metrics.enabled = mode == "on"
+                for name in args.endpoints:
+                    before = timed_calls(app.state.metrics)
+                    latencies, _, elapsed = await load(
+                        client, requests[name], args.concurrency, args.requests
+                    )
+                    samples.setdefault((name, mode), []).append(
+                        latency_summary(latencies, elapsed)
+                    )
+                    if mode == "on":
+                        done = timed_calls(app.state.metrics) - before
+                        calls[name] = done / len(latencies)
+    app.dependency_overrides.clear()
+
+    results: list[dict[str, Any]] = [
+        {"component": name, "cost_us": round(value, 3)} for name, value in costs.items()
+    ]
+    for name in args.endpoints:
+        off, on = samples[name, "off"], samples[name, "on"]
+        # surcoût de chaque tour (paires off/on consécutives), puis la médiane
+        ratios = [
+            a["req_per_s"] / b["req_per_s"] - 1 for a, b in zip(off, on, strict=True)
+        ]
+        p50_off = statistics.median(r["p50_ms"] for r in off)
+        added_us = costs["middleware_us"] + calls[name] * costs["timed_call_us"]
+        for mode, runs in (("off", off), ("on", on)):
+            results.append(
+                {
+                    "endpoint": name,
+                    "metrics": mode,
+                    "req_per_s": round(statistics.median(r["req_per_s"] for r in runs)),
+                    "p50_ms": round(statistics.median(r["p50_ms"] for r in runs), 3),
+                }
+            )
+        results.append(
+            {
+                "endpoint": name,
+                "metrics": "overhead",
+                "timed_calls_per_request": round(calls[name], 2),
+                "measured_percent": round(statistics.median(ratios) * 100, 2),
+                "estimated_percent": round(added_us / (p50_off * 1000) * 100, 2),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=11)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--endpoints", nargs="+", default=["health", "list_page", "update"]
+    )
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+    emit("metrics", vars(args), asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
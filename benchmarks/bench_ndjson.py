@@ -0,0 +1,159 @@
+"""Pic mémoire de l'export/import NDJSON vs GET /todos et POST /todos/bulk.
+
+L'application est appelée directement en ASGI: le corps des requêtes est envoyé
+par morceaux de 64 Kio et celui des réponses est jeté au fur et à mesure, pour
+ne mesurer (tracemalloc) que ce que le serveur garde en mémoire. Les imports
+partent d'un store vide; `transient_mb` est le pic moins ce que le store retient
+à la fin (les todos créés). Il doit rester stable pour les endpoints en
+streaming quand le nombre de todos augmente.
+
+Usage: python -m benchmarks.bench_ndjson --rows 10000 100000 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from typing import TYPE_CHECKING
+
+from todo_app.api import MAX_BULK_ITEMS, app, get_service
+from todo_app.cache import ResponseCache
+from todo_app.models import TodoCreate
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+from ._utils import emit
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator
+
+CHUNK = 64 * 1024
+BATCH = 10_000
+
+
+async def call(method: str, path: str, body: Callable[[], Iterator[bytes]]) -> int:
+    """Run one request through the ASGI app; return the response size in bytes."""
+    chunks = body()
+    size = 0
+    body_sent = False
+    done = asyncio.Event()
+
+    async def receive() -> dict:
+        nonlocal body_sent
+        chunk = next(chunks, None)
+        if chunk is not None:
+            return {"type": "http.request", "body": chunk, "more_body": True}
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # plus rien à lire: le client ne se déconnecte qu'après la réponse
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: dict) -> None:
+        nonlocal size
+        if message["type"] == "http.response.body":
+            size += len(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": b"",
+        "headers": [],
+        "client": ("bench", 0),
+        "server": ("bench", 80),
+        "scheme": "http",
+        "root_path": "",
+    }
+    await app(scope, receive, send)
+    return size
+
+
+def ndjson_body(rows: int) -> Iterator[bytes]:
+    """NDJSON upload produced lazily, in CHUNK-sized pieces."""
+    pending = []
+    for i in range(rows):
+        pending.append(json.dumps({"title": f"Import {i}"}).encode() + b"\n")
+        if len(pending) == 1000:
+            yield from split(b"".join(pending))
+            pending = []
+    yield from split(b"".join(pending))
+
+
+def split(data: bytes) -> Iterator[bytes]:
+    for start in range(0, len(data), CHUNK):
+        yield data[start : start + CHUNK]
+
+
+def measure(
+    seed: int, method: str, path: str, body: Callable[[], Iterator[bytes]]
+) -> dict[str, float]:
+    """Peak memory of one request against a store holding `seed` todos."""
+    repo = InMemoryTodoRepository()
+    for first in range(0, seed, BATCH):
+        count = min(BATCH, seed - first)
+        repo.create_many([TodoCreate(title=f"Todo {first + i}") for i in range(count)])
+    # cache désactivé: la réponse n'est pas retenue après la requête
+    service = AsyncTodoService(AsyncRepositoryAdapter(repo), ResponseCache(0))
+
+    async def override() -> AsyncTodoService:
+        return service
+
+    app.dependency_overrides[get_service] = override
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = asyncio.run(call(method, path, body))
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    app.dependency_overrides.clear()
+    return {
+        "peak_mb": round(peak / 2**20, 1),
+        "transient_mb": round((peak - current) / 2**20, 1),
+        "response_bytes": size,
+        "seconds": round(elapsed, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    args = parser.parse_args()
+
+    results = []
+    for rows in args.rows:
+        cases = {
+            "get_todos": ("GET", "/todos", lambda: iter(())),
+            "export_ndjson": ("GET", "/todos/export", lambda: iter(())),
+            "import_ndjson": ("POST", "/todos/import", lambda r=rows: ndjson_body(r)),
+        }
+        # bulk_create est plafonné à MAX_BULK_ITEMS par requête; son corps est
+        # construit hors de la mesure
+        if rows <= MAX_BULK_ITEMS:
+            payload = json.dumps([{"title": f"Import {i}"} for i in range(rows)])
+            cases["bulk_create"] = (
+                "POST",
+                "/todos/bulk",
+                lambda p=payload.encode(): split(p),
+            )
+        for name, (method, path, body) in cases.items():
+            seed = rows if method == "GET" else 0
+            stats = measure(seed, method, path, body)
+            results.append({"case": name, "rows": rows, **stats})
+    emit("ndjson", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Coût du profilage des requêtes (PROFILING_*) selon son mode.
+
+Même pile que `bench_api` (`httpx.ASGITransport`, store en mémoire, cache des
+listes désactivé). Les modes alternent sur `--rounds` tours pour que la dérive
+de la machine les touche tous; chaque mode est rapporté au mode `off` du même
+tour (`vs_off`, médiane des tours):
+- `off`: profilage désactivé (la configuration par défaut), service non
+  instrumenté;
+- `token`: PROFILING_TOKEN configuré, requêtes sans l'en-tête: ce que coûte le
+  profilage à la demande tant que personne ne le demande;
+- `enabled`: PROFILING_ENABLED, cProfile et répartition par couche sur chaque
+  requête, seuil jamais atteint (rien n'est gardé);
+- `capture`: chaque requête porte `X-Profile-Token` et son profil est gardé
+  (construction des lignes cProfile comprise).
+
+Usage: python -m benchmarks.bench_profiling --rows 10000 --requests 300 --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import statistics
+from typing import Any
+
+import httpx
+
+from todo_app.api import create_app
+from todo_app.cache import ResponseCache
+from todo_app.profiling import TOKEN_HEADER
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+from ._utils import emit, latency_summary
+from .bench_api import endpoints, load, seed
+
+TOKEN = "bench"
+# mode -> (PROFILING_ENABLED, PROFILING_TOKEN, en-tête envoyé)
+MODES = {
+    "off": (False, None, False),
+    "token": (False, TOKEN, False),
+    "enabled": (True, None, False),
+    "capture": (False, TOKEN, True),
+}
+
+
+async def run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    app = create_app()
+    profiler = app.state.profiler
+    repo = InMemoryTodoRepository()
+    plain = AsyncTodoService(AsyncRepositoryAdapter(repo), ResponseCache(0))
+    profiled = AsyncTodoService(AsyncRepositoryAdapter(repo), ResponseCache(0))
+    profiler.instrument_service(profiled)
+    requests = endpoints(args.rows)
+    samples: dict[tuple[str, str], list[dict]] = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        app.state.service = plain
+        await seed(client, args.rows)
+        for _ in range(args.rounds):
+            for mode, (enabled, token, header) in MODES.items():
+                app.state.service = plain if mode == "off" else profiled
+                profiler.configure(enabled, 1e6, token, 50)
+                client.headers.pop(TOKEN_HEADER, None)
+                if header:
+                    client.headers[TOKEN_HEADER] = TOKEN
+                for name in args.endpoints:
+                    latencies, errors, elapsed = await load(
+                        client, requests[name], 1, args.requests
+                    )
+                    assert not errors
+                    samples.setdefault((name, mode), []).append(
+                        latency_summary(latencies, elapsed)
+                    )
+
+    results = []
+    for name in args.endpoints:
+        off = samples[name, "off"]
+        for mode in MODES:
+            runs = samples[name, mode]
+            ratios = [a["p50_ms"] / b["p50_ms"] for a, b in zip(runs, off, strict=True)]
+            results.append(
+                {
+                    "endpoint": name,
+                    "mode": mode,
+                    "req_per_s": round(statistics.median(r["req_per_s"] for r in runs)),
+                    "p50_ms": round(statistics.median(r["p50_ms"] for r in runs), 3),
+                    "vs_off": round(statistics.median(ratios), 2),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument(
+        "--endpoints", nargs="+", default=["health", "list_page", "update"]
+    )
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+    emit("profiling", vars(args), asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
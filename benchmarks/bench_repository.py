@@ -0,0 +1,203 @@
+"""Micro-benchmarks de chaque méthode des repositories, à 1k, 100k et 1M todos.
+
+Pour chaque backend et chaque taille, le store est rempli puis chaque opération
+est chronométrée (`_utils.measure`: min, médiane, moyenne, écart-type, ops/s).
+Les lectures passent en premier, les suppressions en dernier, pour que toutes
+les opérations voient un store de la taille annoncée.
+
+Avec `--check`, le code de sortie vaut 1 si une opération qui doit coûter la
+taille de la page (et non celle du store) dépasse son plafond `BUDGETS_US`.
+
+Usage: python -m benchmarks.bench_repository --rows 1000 100000 1000000
+       python -m benchmarks.bench_repository --backends memory --rows 1000 > a.json
+       python -m benchmarks.bench_repository --rows 1000000 --check > /dev/null
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import logging
+import os
+import sys
+import tempfile
+import time
+from contextlib import ExitStack
+from typing import TYPE_CHECKING, Any
+
+from todo_app.columnar_repository import ColumnarTodoRepository
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.repository import InMemoryTodoRepository
+from todo_app.sqlite_repository import SqliteTodoRepository
+
+from ._utils import emit, measure
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from todo_app.repository import TodoRepository
+
+BATCH = 10_000
+WORDS = ["projet", "client", "revue", "appel", "rapport", "réunion", "budget"]
+RARE_EVERY = 1000
+# plafonds de la médiane par appel (µs), valables à toutes les tailles: larges
+# (environ 10 fois la mesure à 1M todos) pour ne signaler qu'un retour à un coût
+# proportionnel au store, pas le bruit d'une machine
+_PAGE_BUDGETS = {
+    "list_page": 2_000,
+    "list_completed_page": 2_000,
+    "update": 1_000,
+    "delete": 1_000,
+}
+BUDGETS_US: dict[str, dict[str, int]] = {
+    "memory": {
+        **_PAGE_BUDGETS,
+        "list_created_window": 2_000,
+        "search_two_words": 2_000,
+        "update_many_100": 20_000,
+    },
+    "columnar": {
+        **_PAGE_BUDGETS,
+        "list_created_window": 2_000,
+        "search_two_words": 5_000,
+        "update_many_100": 50_000,
+    },
+    # fenêtre de dates par l'index (created_at, id), triée par id: coût de la
+    # fenêtre, sans plafond; préfixes FTS5 de plus de 4 lettres: coût des
+    # correspondances
+    "sqlite": {**_PAGE_BUDGETS, "search_two_words": 50_000, "update_many_100": 50_000},
+}
+
+
+def payload(i: int) -> TodoCreate:
+    title = f"Todo {i} {WORDS[i % len(WORDS)]}"
+    if i % RARE_EVERY == 0:
+        title += " zephyr"
+    return TodoCreate(title=title, description=f"Note {i}" if i % 2 else None)
+
+
+def fill(repo: TodoRepository, rows: int) -> None:
+    for first in range(0, rows, BATCH):
+        repo.create_many([payload(i) for i in range(first, min(rows, first + BATCH))])
+    # un tiers des todos terminés, en lots
+    done = range(3, rows + 1, 3)
+    for first in range(0, len(done), BATCH):
+        chunk = done[first : first + BATCH]
+        repo.update_many([(todo_id, TodoUpdate(completed=True)) for todo_id in chunk])
+
+
+def operations(repo: TodoRepository, rows: int) -> dict[str, tuple[Callable, int]]:
+    """Operation name -> (callable, calls per round), reads before writes."""
+    middle = rows // 2
+    ids = itertools.cycle(range(1, rows + 1, 7))
+    updates = itertools.cycle(range(2, rows + 1, 11))
+    # suppressions depuis la fin: des ids toujours présents et distincts
+    tail = itertools.count(rows, -1)
+    created_at = repo.get(middle).created_at
+    page = TodoQuery(limit=20)
+    deep = TodoQuery(limit=20, after_id=middle)
+    completed = TodoQuery(limit=20, completed=True, after_id=middle)
+    window = TodoQuery(limit=20, created_after=created_at)
+    batch = [payload(i) for i in range(100)]
+    flip = itertools.cycle([True, False])
+
+    return {
+        "get": (lambda: repo.get(next(ids)), 200),
+        "get_missing": (lambda: repo.get(rows * 10), 200),
+        "list_page": (lambda: repo.list(page), 50),
+        "list_page_deep": (lambda: repo.list(deep), 50),
+        "list_completed_page": (lambda: repo.list(completed), 50),
+        "list_created_window": (lambda: repo.list(window), 50),
+        "list_all": (lambda: repo.list(), 1),
+        "search_rare": (lambda: repo.search("zephyr", page), 20),
+        "search_common": (lambda: repo.search("projet", page), 20),
+        "search_two_words": (lambda: repo.search("projet todo", page), 20),
+        "revision": (repo.revision, 1000),
+        "stats": (repo.stats, 200),
+        "create": (lambda: repo.create(batch[0]), 100),
+        "create_many_100": (lambda: repo.create_many(batch), 2),
+        "update": (
+            lambda: repo.update(next(updates), TodoUpdate(completed=next(flip))),
+            100,
+        ),
+        "update_many_100": (
+            lambda: repo.update_many(
+                [(next(updates), TodoUpdate(title="Renamed")) for _ in range(100)]
+            ),
+            2,
+        ),
+        "delete": (lambda: repo.delete(next(tail)), 20),
+        "delete_many_100": (
+            lambda: repo.delete_many([next(tail) for _ in range(100)]),
+            1,
+        ),
+    }
+
+
+def over_budget(results: list[dict[str, Any]]) -> list[str]:
+    """One line per result whose median exceeds its `BUDGETS_US` entry."""
+    failures = []
+    for r in results:
+        budget = BUDGETS_US[r["backend"]].get(r["op"])
+        if budget is not None and r["median_us"] > budget:
+            failures.append(
+                f"{r['backend']} {r['op']} at {r['rows']} rows: "
+                f"{r['median_us']:.0f} us > {budget} us"
+            )
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--backends", nargs="+", default=["memory", "columnar", "sqlite"]
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--check", action="store_true", help="enforce BUDGETS_US")
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    results: list[dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        factories: dict[str, Callable[[int], TodoRepository]] = {
+            "memory": lambda rows: InMemoryTodoRepository(),
+            "columnar": lambda rows: ColumnarTodoRepository(),
+            "sqlite": lambda rows: SqliteTodoRepository(
+                os.path.join(tmp, f"bench-{rows}.db")
+            ),
+        }
+        for rows in args.rows:
+            for backend in args.backends:
+                with ExitStack() as stack:
+                    repo = factories[backend](rows)
+                    if isinstance(repo, SqliteTodoRepository):
+                        stack.callback(repo.close)
+                    start = time.perf_counter()
+                    fill(repo, rows)
+                    fill_s = time.perf_counter() - start
+                    for name, (fn, number) in operations(repo, rows).items():
+                        stats = measure(fn, rounds=args.rounds, number=number)
+                        results.append(
+                            {"backend": backend, "rows": rows, "op": name, **stats}
+                        )
+                    results.append(
+                        {
+                            "backend": backend,
+                            "rows": rows,
+                            "op": "fill",
+                            "seconds": round(fill_s, 2),
+                        }
+                    )
+    emit("repository", vars(args), results)
+    if args.check:
+        failures = over_budget(results)
+        for line in failures:
+            print(f"OVER BUDGET {line}", file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
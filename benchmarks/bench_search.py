@@ -0,0 +1,118 @@
+"""Latence de la recherche plein texte: index inversé et FTS5 vs filtrage client.
+
+Les titres sont tirés d'un vocabulaire de mots fréquents et rares (loi de
+Zipf approximative), pour que les requêtes couvrent des listes d'ids longues
+et courtes.
+
+Usage: python -m benchmarks.bench_search --rows 1000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from todo_app.models import TodoCreate, TodoQuery
+from todo_app.repository import InMemoryTodoRepository
+from todo_app.search import tokenize
+from todo_app.sqlite_repository import SqliteTodoRepository
+
+from ._utils import best_of, emit
+
+BATCH = 10_000
+QUERIES = {
+    "rare_word": "zephyr",
+    "common_word_page": "projet",
+    "two_words": "projet client",
+    "prefix": "cli",
+    "rare_and_common": "zephyr projet",
+    "no_match": "inexistant",
+}
+
+
+def make_payloads(rows: int, seed: int = 42) -> list[TodoCreate]:
+    rng = random.Random(seed)
+    common = ["projet", "client", "revue", "appel", "rapport", "réunion"]
+    vocabulary = [f"mot{i}" for i in range(20_000)]
+    payloads = []
+    for i in range(rows):
+        words = rng.sample(common, 2) + rng.choices(vocabulary, k=3)
+        if i % 10_000 == 0:
+            words.append("zephyr")
+        payloads.append(TodoCreate(title=" ".join(words), description=f"Note {i}"))
+    return payloads
+
+
+def client_side_filter(repo: InMemoryTodoRepository, text: str, limit: int) -> list:
+    """Baseline: fetch every todo and keep those containing all the words."""
+    words = tokenize(text)
+    results = []
+    for todo in repo.list():
+        haystack = tokenize(f"{todo.title} {todo.description or ''}")
+        if all(any(term.startswith(word) for term in haystack) for word in words):
+            results.append(todo)
+            if len(results) >= limit:
+                break
+    return results
+
+
+def latency_ms(fn, repeat: int) -> dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        "p50_ms": round(statistics.median(samples), 3),
+        "max_ms": round(max(samples), 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.rows)
+    memory = InMemoryTodoRepository()
+    start = time.perf_counter()
+    for first in range(0, args.rows, BATCH):
+        memory.create_many(payloads[first : first + BATCH])
+    memory_fill_s = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sqlite = SqliteTodoRepository(os.path.join(tmp, "bench.db"))
+        with sqlite.batch():
+            for first in range(0, args.rows, BATCH):
+                sqlite.create_many(payloads[first : first + BATCH])
+
+        results = []
+        query = TodoQuery(limit=args.limit)
+        for name, text in QUERIES.items():
+            found = memory.search(text, query)
+            assert [t.id for t in sqlite.search(text, query)] == [t.id for t in found]
+            row = {"query": name, "q": text, "results": len(found)}
+            for backend, repo in {"memory": memory, "sqlite": sqlite}.items():
+                stats = latency_ms(
+                    lambda r=repo, t=text: r.search(t, query), args.repeat
+                )
+                row.update({f"{backend}_{key}": value for key, value in stats.items()})
+            scan_s = best_of(
+                lambda t=text: client_side_filter(memory, t, args.limit), repeat=1
+            )
+            row["client_filter_ms"] = round(scan_s * 1000, 1)
+            results.append(row)
+        sqlite.close()
+
+    params = {**vars(args), "memory_fill_s": round(memory_fill_s, 1)}
+    emit("search", params, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Sérialisation des réponses: `response_model` vs `TypeAdapter.dump_json`.
+
+- listes: une application minimale sert la même liste de `--sizes` todos par
+  trois routes. `validated_dict` renvoie les objets à FastAPI avec
+  `response_model`, sérialisés en dict puis `json.dumps` (le chemin de FastAPI
+  avant sa sérialisation directe, dont la version 0.116 de `uv.lock`);
+  `validated` laisse FastAPI choisir (récent: `dump_json` après validation);
+  `direct` renvoie les bytes de `TypeAdapter(list[TodoInDB]).dump_json` (le
+  chemin de `GET /todos`). Médiane de `--rounds` requêtes;
+- un todo: `POST /todos` et `PATCH /todos/{id}` de l'API, avec et sans
+  `FAST_RESPONSES`, tours alternés comme dans `bench_metrics`.
+
+Usage: python -m benchmarks.bench_serialization --sizes 100 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import itertools
+import logging
+import statistics
+import time
+from datetime import UTC, datetime
+
+import httpx
+from fastapi import FastAPI, Response
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from todo_app import api
+from todo_app.models import TodoInDB
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+from ._utils import emit, latency_summary
+from .bench_api import load
+
+_list_adapter = TypeAdapter(list[TodoInDB])
+
+
+def list_app(todos: list[TodoInDB]) -> FastAPI:
+    bench = FastAPI()
+
+    @bench.get(
+        "/validated_dict", response_model=list[TodoInDB], response_class=JSONResponse
+    )
+    async def validated_dict():
+        return todos
+
+    @bench.get("/validated", response_model=list[TodoInDB])
+    async def validated():
+        return todos
+
+    @bench.get("/direct", response_model=list[TodoInDB])
+    async def direct():
+        return Response(_list_adapter.dump_json(todos), media_type="application/json")
+
+    return bench
+
+
+async def bench_lists(args: argparse.Namespace) -> list[dict]:
+    results = []
+    now = datetime.now(UTC)
+    for size in args.sizes:
+        todos = [
+            TodoInDB(
+                id=i,
+                title=f"Todo {i}",
+                description=f"Note {i}" if i % 2 else None,
+                completed=i % 3 == 0,
+                created_at=now,
+            )
+            for i in range(1, size + 1)
+        ]
+        transport = httpx.ASGITransport(app=list_app(todos))
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://bench"
+        ) as client:
+            timings: dict[str, list[float]] = {
+                "validated_dict": [],
+                "validated": [],
+                "direct": [],
+            }
+            bodies = {}
+            for _ in range(args.rounds):
+                for mode, samples in timings.items():
+                    start = time.perf_counter()
+                    response = await client.get(f"/{mode}")
+                    samples.append(time.perf_counter() - start)
+                    bodies[mode] = response.json()
+            assert bodies["validated_dict"] == bodies["validated"] == bodies["direct"]
+        medians = {mode: statistics.median(s) for mode, s in timings.items()}
+        for mode, median in medians.items():
+            results.append(
+                {"items": size, "mode": mode, "median_ms": round(median * 1000, 3)}
+            )
+        for baseline in ("validated_dict", "validated"):
+            results.append(
+                {
+                    "items": size,
+                    "mode": f"direct_vs_{baseline}",
+                    "speedup": round(medians[baseline] / medians["direct"], 2),
+                }
+            )
+    return results
+
+
+async def bench_single(args: argparse.Namespace) -> list[dict]:
+    service = AsyncTodoService(AsyncRepositoryAdapter(InMemoryTodoRepository()))
+
+    async def override() -> AsyncTodoService:
+        return service
+
+    api.app.dependency_overrides[api.get_service] = override
+    ids = itertools.count(1)
+    requests = {
+        "create": lambda: ("POST", "/todos", {"title": "Todo", "description": "x"}),
+        "update": lambda: (
+            "PATCH",
+            f"/todos/{next(ids) % 100 + 1}",
+            {"completed": True},
+        ),
+    }
+    samples: dict[tuple[str, bool], list[dict]] = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=api.app), base_url="http://bench"
+    ) as client:
+        for _ in range(100):
+            await client.post("/todos", json={"title": "Seed"})
+        for _ in range(args.rounds):
+            for fast in (False, True):
+                api.app.state.fast_responses = fast
+                for name, request in requests.items():
+                    latencies, _, elapsed = await load(client, request, 1, 500)
+                    samples.setdefault((name, fast), []).append(
+                        latency_summary(latencies, elapsed)
+                    )
+    api.app.state.fast_responses = False
+    api.app.dependency_overrides.clear()
+
+    results = []
+    for (name, fast), runs in samples.items():
+        results.append(
+            {
+                "endpoint": name,
+                "fast_responses": fast,
+                "req_per_s": round(statistics.median(r["req_per_s"] for r in runs)),
+                "p50_ms": round(statistics.median(r["p50_ms"] for r in runs), 3),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000])
+    parser.add_argument("--rounds", type=int, default=11)
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    async def run() -> list[dict]:
+        return await bench_lists(args) + await bench_single(args)
+
+    emit("serialization", vars(args), asyncio.run(run()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Partitionnement par propriétaire: débit par tenant et coût des listes.
+
+- débit: `--threads` threads, chacun au service de ses propres tenants (parmi
+  `--tenants`), enchaînent 60% pages de leurs todos (`TodoQuery.owner`), 20%
+  lectures par id et 20% mises à jour, sur `ShardedTodoRepository` avec
+  `--shards` partitions. `shards=1` est la référence: un seul store, un seul
+  verrou. Avec le GIL, le débit ne peut pas monter avec les partitions (une
+  seule opération Python à la fois); `gil_enabled` figure dans le résultat, et
+  un interpréteur free-threaded (3.13t) laisse les partitions travailler
+  ensemble;
+- listes: coût d'une page d'un tenant (une partition) et d'une page de tous
+  les todos (toutes les partitions, en parallèle ou une à une), selon le
+  nombre de partitions. Avec le GIL, le pool de threads coûte plus qu'il ne
+  rapporte: c'est pourquoi `parallel` n'est actif par défaut que sans GIL.
+
+Usage: python -m benchmarks.bench_sharding --rows 100000 --shards 1 4 16
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import threading
+import time
+from functools import partial
+
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.sharded_repository import ShardedTodoRepository
+
+from ._utils import emit, measure
+
+BATCH = 10_000
+
+
+def owner(index: int) -> str:
+    return f"tenant-{index}"
+
+
+def fill(repo: ShardedTodoRepository, rows: int, tenants: int) -> dict[str, list]:
+    """Create `rows` todos round-robin over the tenants; their ids by tenant."""
+    ids: dict[str, list[int]] = {owner(t): [] for t in range(tenants)}
+    for first in range(0, rows, BATCH):
+        todos = repo.create_many(
+            TodoCreate(title=f"Todo {i}", owner=owner(i % tenants))
+            for i in range(first, min(rows, first + BATCH))
+        )
+        for todo in todos:
+            ids[todo.owner].append(todo.id)
+    return ids
+
+
+def throughput(
+    repo: ShardedTodoRepository, ids: dict[str, list], threads: int, ops: int
+) -> float:
+    """Operations per second of `threads` threads serving disjoint tenants."""
+    barrier = threading.Barrier(threads + 1)
+    tenants = list(ids)
+    payloads = [TodoUpdate(completed=True), TodoUpdate(completed=False)]
+
+    def worker(index: int) -> None:
+        rng = random.Random(index)
+        mine = tenants[index::threads]
+        pages = [TodoQuery(owner=name, limit=20) for name in mine]
+        barrier.wait()
+        for i in range(ops):
+            tenant = rng.randrange(len(mine))
+            todo_id = rng.choice(ids[mine[tenant]])
+            if i % 5 < 3:
+                repo.list(pages[tenant])
+            elif i % 5 == 3:
+                repo.get(todo_id)
+            else:
+                repo.update(todo_id, payloads[i % 2])
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return threads * ops / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--tenants", type=int, default=64)
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=10_000, help="ops per thread")
+    args = parser.parse_args()
+
+    results = []
+    baseline = None
+    for shards in args.shards:
+        repo = ShardedTodoRepository(shards, parallel=True)
+        serial = ShardedTodoRepository(shards, parallel=False)
+        ids = fill(repo, args.rows, args.tenants)
+        fill(serial, args.rows, args.tenants)
+        ops_per_s = throughput(repo, ids, args.threads, args.ops)
+        baseline = baseline or ops_per_s
+        results.append(
+            {
+                "case": "tenant_mix",
+                "shards": shards,
+                "threads": args.threads,
+                "ops_per_s": round(ops_per_s),
+                "vs_one_shard": round(ops_per_s / baseline, 2),
+            }
+        )
+        page = TodoQuery(limit=20)
+        tenant_page = TodoQuery(owner=owner(0), limit=20)
+        for case, call in [
+            ("list_tenant_page", partial(repo.list, tenant_page)),
+            ("list_all_page_parallel", partial(repo.list, page)),
+            ("list_all_page_serial", partial(serial.list, page)),
+        ]:
+            results.append(
+                {"case": case, "shards": shards, **measure(call, number=200)}
+            )
+        repo.close()
+        serial.close()
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    emit("sharding", {**vars(args), "gil_enabled": gil}, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""GET /todos/stats: un coût constant, de 1k à 10M todos.
+
+Pour chaque backend et chaque taille de `--rows`, le store est rempli (un tiers
+des todos terminés) puis on mesure:
+- `stats`: `repo.stats()`, lu dans les compteurs tenus à jour à chaque écriture;
+- `api_stats`: la requête `GET /todos/stats` complète (ASGI, en process);
+- `client_count`: ce que font les tableaux de bord sans l'endpoint, `GET /todos`
+  puis comptage côté client. En O(n): mesuré jusqu'à `--scan-max` todos.
+`vs_smallest` compare chaque latence à celle de la plus petite taille.
+
+Le coût de `stats` suit le nombre de jours distincts de l'histogramme (tous les
+todos du remplissage sont créés le même jour): `histogram` le mesure seul, pour
+chaque nombre de jours de `--days`.
+
+Usage: python -m benchmarks.bench_stats --rows 1000 1000000 10000000 \\
+           --backends columnar sqlite
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import tempfile
+import time
+from collections import Counter
+from contextlib import ExitStack
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from todo_app.api import create_app
+from todo_app.cache import ResponseCache
+from todo_app.columnar_repository import ColumnarTodoRepository
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+from todo_app.sqlite_repository import SqliteTodoRepository
+from todo_app.stats import StatsCounter
+
+from ._utils import emit, measure
+from .bench_repository import fill
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from todo_app.repository import TodoRepository
+
+
+def client_count(todos: list[dict[str, Any]]) -> dict[str, Any]:
+    """Stats computed by a dashboard from the full list (the previous way)."""
+    completed = sum(todo["completed"] for todo in todos)
+    days = Counter(todo["created_at"][:10] for todo in todos)
+    return {"total": len(todos), "completed": completed, "per_day": days}
+
+
+async def request_ms(client: httpx.AsyncClient, url: str, rounds: int) -> float:
+    """Median latency (ms) of `rounds` GET requests, the body parsed as JSON."""
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        response = await client.get(url)
+        body = response.json()
+        if url == "/todos":
+            client_count(body)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+async def bench_api(
+    repo: TodoRepository, rows: int, args: argparse.Namespace
+) -> dict[str, float]:
+    app = create_app()
+    # pas de cache: GET /todos relit le store à chaque fois, comme après une écriture
+    app.state.service = AsyncTodoService(
+        AsyncRepositoryAdapter(repo), list_cache=ResponseCache(0)
+    )
+    timings = {}
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        timings["api_stats"] = await request_ms(client, "/todos/stats", args.rounds)
+        if rows <= args.scan_max:
+            timings["client_count"] = await request_ms(client, "/todos", 3)
+    return timings
+
+
+def bench_histogram(days: int, rounds: int) -> dict[str, Any]:
+    counter = StatsCounter()
+    start = datetime(2020, 1, 1, tzinfo=UTC)
+    for day in range(days):
+        counter.add(start + timedelta(days=day), day % 3 == 0)
+    return {"op": "histogram", "days": days, **measure(counter.snapshot, rounds, 20)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--rows", type=int, nargs="+", default=[1000, 100_000, 1_000_000]
+    )
+    parser.add_argument(
+        "--backends", nargs="+", default=["memory", "columnar", "sqlite"]
+    )
+    parser.add_argument("--rounds", type=int, default=21)
+    parser.add_argument("--scan-max", type=int, default=100_000)
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 365, 3650])
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    results: list[dict[str, Any]] = []
+    smallest: dict[tuple[str, str], float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        factories: dict[str, Callable[[int], TodoRepository]] = {
+            "memory": lambda rows: InMemoryTodoRepository(),
+            "columnar": lambda rows: ColumnarTodoRepository(),
+            "sqlite": lambda rows: SqliteTodoRepository(
+                os.path.join(tmp, f"bench-{rows}.db")
+            ),
+        }
+        for rows in sorted(args.rows):
+            for backend in args.backends:
+                with ExitStack() as stack:
+                    repo = factories[backend](rows)
+                    if isinstance(repo, SqliteTodoRepository):
+                        stack.callback(repo.close)
+                    fill(repo, rows)
+                    assert repo.stats().total == rows
+                    timings = {
+                        "stats": measure(repo.stats, args.rounds, 20)["median_us"]
+                        / 1000,
+                        **asyncio.run(bench_api(repo, rows, args)),
+                    }
+                for op, median_ms in timings.items():
+                    baseline = smallest.setdefault((backend, op), median_ms)
+                    results.append(
+                        {
+                            "backend": backend,
+                            "rows": rows,
+                            "op": op,
+                            "median_ms": round(median_ms, 4),
+                            "vs_smallest": round(median_ms / baseline, 2),
+                        }
+                    )
+    results.extend(bench_histogram(days, args.rounds) for days in args.days)
+    emit("stats", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
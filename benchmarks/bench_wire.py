@@ -0,0 +1,231 @@
+"""Format et compression des réponses: octets transférés et CPU par requête.
+
+- codecs: pour des listes de `--sizes` todos, chaque format (`json`,
+  `msgpack`) avec chaque codage (`identity`, gzip et zstd aux niveaux
+  `--gzip-levels` / `--zstd-levels`): taille du corps, temps CPU du serveur
+  (sérialisation + compression) et du client (décompression + décodage:
+  `json.loads`, comme `httpx.Response.json`, ou `msgpack.unpackb`);
+- requêtes: `GET /todos` de l'API (cache des listes désactivé: chaque requête
+  sérialise et compresse) par un client httpx dans le même processus, avec les
+  niveaux par défaut. `wire_bytes` compte les octets reçus avant décodage,
+  `cpu_ms` le temps CPU du processus (serveur et client) par requête;
+- corps de requête: validation d'un lot de `--bulk` `TodoCreate` en JSON
+  (`validate_json`) ou en MessagePack (`unpackb` + `validate_python`).
+
+`msgpack` et `zstandard` sont nécessaires (extra `wire`).
+
+Usage: python -m benchmarks.bench_wire --sizes 100 1000 10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import time
+import zlib
+from datetime import UTC, datetime
+from functools import partial
+from typing import TYPE_CHECKING
+
+import httpx
+import msgpack
+import zstandard
+from pydantic import TypeAdapter
+
+from todo_app import api
+from todo_app.cache import ResponseCache
+from todo_app.encoding import MSGPACK_MEDIA_TYPE, pack, unpack
+from todo_app.models import TodoCreate, TodoInDB
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+from ._utils import emit, measure
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+_list_adapter = TypeAdapter(list[TodoInDB])
+_create_adapter = TypeAdapter(list[TodoCreate])
+
+ACCEPT = {"json": "application/json", "msgpack": MSGPACK_MEDIA_TYPE}
+
+
+def make_todos(size: int) -> list[TodoInDB]:
+    now = datetime.now(UTC)
+    return [
+        TodoInDB(
+            id=i,
+            title=f"Todo {i}",
+            description=f"Note {i}" if i % 2 else None,
+            completed=i % 3 == 0,
+            created_at=now,
+            owner=f"tenant-{i % 16}",
+        )
+        for i in range(1, size + 1)
+    ]
+
+
+def codecs(args: argparse.Namespace) -> list[tuple[str, Callable, Callable]]:
+    """(name, compress, decompress) for identity and every configured level."""
+    table = [("identity", bytes, bytes)]
+    for level in args.gzip_levels:
+        table.append(
+            (
+                f"gzip-{level}",
+                partial(zlib.compress, level=level, wbits=31),
+                partial(zlib.decompress, wbits=31),
+            )
+        )
+    for level in args.zstd_levels:
+        table.append(
+            (
+                f"zstd-{level}",
+                zstandard.ZstdCompressor(level=level).compress,
+                zstandard.ZstdDecompressor().decompress,
+            )
+        )
+    return table
+
+
+def cpu_us(fn: Callable[[], object], number: int) -> float:
+    """CPU time (µs) per call, best of 3 runs of `number` calls."""
+    best = float("inf")
+    for _ in range(3):
+        start = time.process_time()
+        for _ in range(number):
+            fn()
+        best = min(best, (time.process_time() - start) / number)
+    return round(best * 1e6, 1)
+
+
+def bench_codecs(args: argparse.Namespace) -> list[dict]:
+    results = []
+    for size in args.sizes:
+        todos = make_todos(size)
+        number = max(1, 20_000 // size)
+        encoders = {
+            "json": partial(_list_adapter.dump_json, todos),
+            "msgpack": partial(pack, _list_adapter, todos),
+        }
+        decoders = {"json": json.loads, "msgpack": unpack}
+        for fmt, encode in encoders.items():
+            body = encode()
+            for name, compress, decompress in codecs(args):
+                wire = compress(body)
+                assert decompress(wire) == body
+                results.append(
+                    {
+                        "case": "codec",
+                        "items": size,
+                        "format": fmt,
+                        "encoding": name,
+                        "bytes": len(wire),
+                        "ratio": round(len(body) / len(wire), 2),
+                        "server_cpu_us": cpu_us(
+                            lambda e=encode, c=compress: c(e()), number
+                        ),
+                        "client_cpu_us": cpu_us(
+                            lambda w=wire, d=decompress, f=decoders[fmt]: f(d(w)),
+                            number,
+                        ),
+                    }
+                )
+    return results
+
+
+def provide(service: AsyncTodoService) -> Callable:
+    async def override() -> AsyncTodoService:
+        return service
+
+    return override
+
+
+async def bench_requests(args: argparse.Namespace) -> list[dict]:
+    results = []
+    app = api.create_app()
+    for size in args.sizes:
+        repo = InMemoryTodoRepository()
+        repo.create_many(
+            TodoCreate(title=t.title, description=t.description, owner=t.owner)
+            for t in make_todos(size)
+        )
+        # cache désactivé: chaque requête paie la sérialisation et la compression
+        service = AsyncTodoService(
+            AsyncRepositoryAdapter(repo), list_cache=ResponseCache(0)
+        )
+        app.dependency_overrides[api.get_service] = provide(service)
+        number = max(5, 2_000 // size)
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            for fmt in ACCEPT:
+                for encoding in ("identity", "gzip", "zstd"):
+                    headers = {"Accept": ACCEPT[fmt], "Accept-Encoding": encoding}
+                    decode = json.loads if fmt == "json" else unpack
+                    response = await client.get("/todos", headers=headers)
+                    assert len(decode(response.content)) == size
+                    cpu = wall = 0.0
+                    for _ in range(number):
+                        cpu_start, wall_start = time.process_time(), time.perf_counter()
+                        response = await client.get("/todos", headers=headers)
+                        decode(response.content)
+                        cpu += time.process_time() - cpu_start
+                        wall += time.perf_counter() - wall_start
+                    results.append(
+                        {
+                            "case": "request",
+                            "items": size,
+                            "format": fmt,
+                            "encoding": encoding,
+                            "wire_bytes": response.num_bytes_downloaded,
+                            "cpu_ms": round(cpu / number * 1000, 3),
+                            "wall_ms": round(wall / number * 1000, 3),
+                        }
+                    )
+    app.dependency_overrides.clear()
+    return results
+
+
+def bench_request_bodies(args: argparse.Namespace) -> list[dict]:
+    payloads = [
+        {"title": f"Todo {i}", "description": f"Note {i}", "owner": "tenant"}
+        for i in range(args.bulk)
+    ]
+    bodies = {
+        "json": (json.dumps(payloads).encode(), _create_adapter.validate_json),
+        "msgpack": (
+            msgpack.packb(payloads),
+            lambda body: _create_adapter.validate_python(unpack(body)),
+        ),
+    }
+    return [
+        {
+            "case": "bulk_body",
+            "items": args.bulk,
+            "format": fmt,
+            "bytes": len(body),
+            **measure(partial(validate, body), number=20),
+        }
+        for fmt, (body, validate) in bodies.items()
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10_000])
+    parser.add_argument("--gzip-levels", type=int, nargs="+", default=[1, 6, 9])
+    parser.add_argument("--zstd-levels", type=int, nargs="+", default=[1, 3, 9])
+    parser.add_argument("--bulk", type=int, default=1000)
+    args = parser.parse_args()
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    results = bench_codecs(args)
+    results += asyncio.run(bench_requests(args))
+    results += bench_request_bodies(args)
+    emit("wire", vars(args), results)
+
+
+if __name__ == "__main__":
+    main()
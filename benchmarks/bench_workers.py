@@ -0,0 +1,229 @@
+"""Passage à l'échelle multi-processus: débit agrégé selon le nombre de workers.
+
+Chaque worker est un processus (comme `uvicorn --workers N`) qui fait tourner
+l'application complète et la sollicite en process (`httpx.ASGITransport`) avec
+`--concurrency` clients, pendant `--duration` secondes, en alternant les
+endpoints de `--endpoints`. Les workers démarrent ensemble; on additionne leurs
+requêtes.
+
+Backends:
+- `remote`: un processus store partagé (`python -m todo_app.store_server`);
+- `sqlite`: un fichier WAL partagé;
+- `memory`: un store par worker, non partagé (données divergentes): la borne
+  haute, sans aucune coordination.
+
+Le passage à l'échelle ne peut pas dépasser le nombre de cœurs (`cpus` dans le
+résultat). Avec `remote`, le store exécute les opérations une à une: on mesure
+le temps CPU du store et celui des workers (Linux, `/proc`). Le store étant
+séquentiel, le gain maximal avec assez de cœurs est `max_speedup` = CPU total /
+CPU du store, quel que soit le nombre de cœurs de la machine de mesure.
+
+Usage: python -m benchmarks.bench_workers --workers 1 2 4 --backends remote sqlite
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import itertools
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from todo_app.api import app, app_service
+from todo_app.remote_repository import RemoteTodoRepository
+from todo_app.sqlite_repository import SqliteTodoRepository
+
+from ._utils import emit
+from .bench_api import endpoints
+from .bench_repository import fill
+
+
+def cpu_seconds(pid: int) -> float | None:
+    """User + system CPU time of process `pid` (Linux only)."""
+    try:
+        fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    except OSError:
+        return None
+    # champs 14 et 15 de /proc/<pid>/stat (utime, stime), après "(comm)"
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def worker(
+    env: dict[str, str],
+    names: list[str],
+    rows: int,
+    concurrency: int,
+    duration: float,
+    start: Any,
+    results: Any,
+) -> None:
+    """One API process: report readiness, wait for `start`, then count requests.
+
+    Envoie sur `results` le nombre de requêtes et le temps CPU de la mesure. La
+    configuration est lue au premier appel de `app_service` (pas de lifespan
+    avec `ASGITransport`), après `env`.
+    """
+    os.environ.update(env)
+    logging.getLogger("todo_app").setLevel(logging.WARNING)
+
+    async def run() -> tuple[int, float]:
+        service = app_service(app)
+        if env["STORAGE_BACKEND"] == "memory":
+            fill(service.repo.repo, rows)
+        available = endpoints(rows)
+        mix = itertools.cycle([available[name] for name in names])
+        done = 0
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as client:
+            method, url, body = next(mix)()
+            (await client.request(method, url, json=body)).raise_for_status()
+            results.put("ready")
+            await asyncio.get_running_loop().run_in_executor(None, start.wait)
+            deadline = time.perf_counter() + duration
+            cpu = time.process_time()
+
+            async def client_loop() -> None:
+                nonlocal done
+                while time.perf_counter() < deadline:
+                    method, url, body = next(mix)()
+                    await client.request(method, url, json=body)
+                    done += 1
+
+            await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+            cpu = time.process_time() - cpu
+        return done, cpu
+
+    results.put(asyncio.run(run()))
+
+
+@contextlib.contextmanager
+def store_process(socket_path: str, env: dict[str, str]) -> Any:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "todo_app.store_server", "--socket", socket_path],
+        env={**os.environ, **env},
+    )
+    try:
+        for _ in range(100):
+            if os.path.exists(socket_path):
+                break
+            time.sleep(0.05)
+        yield process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure(
+    args: argparse.Namespace, env: dict[str, str], workers: int, store: int | None
+) -> dict[str, Any]:
+    """Aggregate throughput of `workers` API processes (and the store CPU time)."""
+    context = multiprocessing.get_context("spawn")
+    start, results = context.Event(), context.Queue()
+    processes = [
+        context.Process(
+            target=worker,
+            args=(
+                env,
+                args.endpoints,
+                args.rows,
+                args.concurrency,
+                args.duration,
+                start,
+                results,
+            ),
+        )
+        for _ in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for _ in processes:
+        assert results.get(timeout=600) == "ready"
+    store_cpu = cpu_seconds(store) if store else None
+    start.set()
+    counts = [results.get(timeout=600 + args.duration) for _ in processes]
+    for process in processes:
+        process.join()
+    result: dict[str, Any] = {
+        "req_per_s": round(sum(done for done, _ in counts) / args.duration),
+    }
+    if store_cpu is not None:
+        # le store ne travaille que pendant la mesure (les workers sont prêts)
+        store_cpu = cpu_seconds(store) - store_cpu
+        total_cpu = store_cpu + sum(cpu for _, cpu in counts)
+        result["store_cpu_s"] = round(store_cpu, 2)
+        result["workers_cpu_s"] = round(total_cpu - store_cpu, 2)
+        result["max_speedup"] = round(total_cpu / store_cpu, 1) if store_cpu else None
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--backends",
+        nargs="+",
+        default=["remote", "sqlite"],
+        choices=["remote", "sqlite", "memory"],
+    )
+    parser.add_argument("--endpoints", nargs="+", default=["list_page", "update"])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench") as tmp:
+        for backend in args.backends:
+            env = {
+                "SECRET_KEY": "bench",
+                "STORAGE_BACKEND": backend,
+                "STORE_SOCKET": str(Path(tmp) / f"{backend}.sock"),
+                "SQLITE_PATH": str(Path(tmp) / f"{backend}.db"),
+                "LOG_LEVEL": "WARNING",
+            }
+            with contextlib.ExitStack() as stack:
+                store = None
+                if backend == "remote":
+                    store = stack.enter_context(
+                        store_process(env["STORE_SOCKET"], env)
+                    ).pid
+                    repo: Any = RemoteTodoRepository(env["STORE_SOCKET"], timeout=None)
+                elif backend == "sqlite":
+                    repo = SqliteTodoRepository(env["SQLITE_PATH"])
+                else:
+                    repo = None
+                if repo is not None:
+                    fill(repo, args.rows)
+                    stack.callback(repo.close)
+                baseline = None
+                for workers in args.workers:
+                    result = measure(args, env, workers, store)
+                    baseline = baseline or result["req_per_s"]
+                    results.append(
+                        {
+                            "backend": backend,
+                            "workers": workers,
+                            **result,
+                            "speedup": round(result["req_per_s"] / baseline, 2),
+                        }
+                    )
+    emit(
+        "workers",
+        {**vars(args), "cpus": os.cpu_count()},
+        results,
+    )
+
+
+if __name__ == "__main__":
+    main()
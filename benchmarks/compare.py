@@ -0,0 +1,114 @@
+"""Compare deux résultats JSON d'un même benchmark (par ex. avant/après un commit).
+
+Les résultats sont appariés sur leurs champs descriptifs (backend, rows, op,
+endpoint, concurrency...). Pour chaque métrique comparée, l'écart relatif est
+affiché; au-delà de `--threshold` dans le mauvais sens, la ligne est marquée
+REGRESSION et le code de sortie vaut 1.
+
+Usage:
+    python -m benchmarks.bench_repository --rows 1000 > before.json
+    git switch my-branch
+    python -m benchmarks.bench_repository --rows 1000 > after.json
+    python -m benchmarks.compare before.json after.json --threshold 0.15
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any
+
+# métriques comparées par défaut, quand elles sont présentes
+DEFAULT_METRICS = ("median_us", "p50_ms", "p99_ms", "req_per_s", "peak_mb")
+# suffixes des champs numériques qui sont des mesures (et non des paramètres)
+MEASURE_SUFFIXES = (
+    "_us",
+    "_ms",
+    "_s",
+    "_mb",
+    "seconds",
+    "_kb",
+    "_bytes",
+    "_percent",
+    "_per_request",
+    "speedup",
+)
+
+
+def is_measure(key: str, value: Any) -> bool:
+    return isinstance(value, int | float) and key.endswith(MEASURE_SUFFIXES)
+
+
+def higher_is_better(metric: str) -> bool:
+    return metric.endswith("per_s")
+
+
+def identity(result: dict[str, Any]) -> tuple:
+    return tuple(
+        sorted(
+            (k, v) for k, v in result.items() if not is_measure(k, v) and k != "errors"
+        )
+    )
+
+
+def compare(
+    before: dict[str, Any],
+    after: dict[str, Any],
+    metrics: tuple[str, ...],
+    threshold: float,
+) -> tuple[list[str], int]:
+    """Report lines and the number of regressions."""
+    previous = {identity(result): result for result in before["results"]}
+    lines, regressions = [], 0
+    for result in after["results"]:
+        key = identity(result)
+        old = previous.get(key)
+        label = " ".join(f"{k}={v}" for k, v in key)
+        if old is None:
+            lines.append(f"{label}: new")
+            continue
+        for metric in metrics:
+            if metric not in result or metric not in old or not old[metric]:
+                continue
+            change = result[metric] / old[metric] - 1
+            worse = -change if higher_is_better(metric) else change
+            flag = ""
+            if worse > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif worse < -threshold:
+                flag = "  improved"
+            lines.append(
+                f"{label} {metric}: {old[metric]} -> {result[metric]} "
+                f"({change:+.1%}){flag}"
+            )
+    return lines, regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("before")
+    parser.add_argument("after")
+    parser.add_argument("--threshold", type=float, default=0.10)
+    parser.add_argument("--metrics", nargs="+", default=list(DEFAULT_METRICS))
+    args = parser.parse_args()
+
+    with open(args.before) as f:
+        before = json.load(f)
+    with open(args.after) as f:
+        after = json.load(f)
+    if before["benchmark"] != after["benchmark"]:
+        parser.error(f"{before['benchmark']} vs {after['benchmark']}: not comparable")
+
+    print(f"{before['benchmark']}: {before.get('commit')} -> {after.get('commit')}")
+    lines, regressions = compare(before, after, tuple(args.metrics), args.threshold)
+    print("\n".join(lines))
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,29 @@
 """Tests for API layer - business functionality only."""
 
+import asyncio
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 
-from todo_app.api import app, get_service
-from todo_app.repository import InMemoryTodoRepository
-from todo_app.service import TodoService
+from todo_app import api
+from todo_app.api import app, create_app, get_service
+from todo_app.config import Settings, get_settings
+from todo_app.encoding import unpack
+from todo_app.events import ChangeFeed
+from todo_app.models import TodoInDB
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+
+def pack_body(body):
+    """Encode a request body in MessagePack."""
+    return pytest.importorskip("msgpack").packb(body)
 
 
 class TestTodoAPI:
@@ -14,7 +33,7 @@ class TestTodoAPI:
         """Set up test client for each test."""
         # Create a fresh repository and service for each test
         self.repo = InMemoryTodoRepository()
-        self.service = TodoService(self.repo)
+        self.service = AsyncTodoService(AsyncRepositoryAdapter(self.repo))
 
         # Override the dependency
         app.dependency_overrides[get_service] = lambda: self.service
@@ -102,6 +121,25 @@ class TestTodoAPI:
         assert response.status_code == 404
         assert "Todo not found" in response.json()["detail"]
 
+    def test_update_todo_null_fields(self):
+        """Test that null title/completed are rejected and leave the indexes intact."""
+        self.client.post("/todos", json={"title": "Todo"})
+        self.client.get("/todos", params={"completed": False})
+
+        for body in ({"completed": None}, {"title": None}):
+            response = self.client.patch("/todos/1", json=body)
+            assert response.status_code == 422
+            assert response.json()["detail"][0]["loc"][-1] in body
+        bulk = self.client.patch("/todos/bulk", json=[{"id": 1, "completed": None}])
+        assert bulk.status_code == 422
+
+        cleared = self.client.patch("/todos/1", json={"description": None})
+        assert cleared.status_code == 200
+        assert self.repo.get(1).version == 2
+        listed = self.client.get("/todos", params={"completed": False}).json()
+        assert [todo["id"] for todo in listed] == [1]
+        assert self.client.get("/todos", params={"completed": True}).json() == []
+
     def test_delete_todo_success(self):
         """Test deleting a todo successfully."""
         # Create a todo first
@@ -124,6 +162,55 @@ class TestTodoAPI:
         assert response.status_code == 404
         assert "Todo not found" in response.json()["detail"]
 
+    def test_update_todo_if_match(self):
+        """Test optimistic concurrency: ETag from a write, If-Match on PATCH."""
+        created = self.client.post("/todos", json={"title": "Todo"})
+        assert created.headers["ETag"] == '"1"'
+        assert created.json()["version"] == 1
+
+        first = self.client.patch(
+            "/todos/1", json={"title": "Mine"}, headers={"If-Match": '"1"'}
+        )
+        assert first.status_code == 200
+        assert first.headers["ETag"] == '"2"'
+
+        # un second éditeur parti de la version 1 n'écrase pas la modification
+        stale = self.client.patch(
+            "/todos/1", json={"title": "Theirs"}, headers={"If-Match": '"1"'}
+        )
+        assert stale.status_code == 412
+        assert stale.headers["ETag"] == '"2"'
+        assert self.repo.get(1).title == "Mine"
+
+        for header in ("*", None):
+            headers = {} if header is None else {"If-Match": header}
+            response = self.client.patch("/todos/1", json={}, headers=headers)
+            assert response.status_code == 200
+        for header in ('W/"4"', '"4", "5"', "4"):
+            response = self.client.patch(
+                "/todos/1", json={}, headers={"If-Match": header}
+            )
+            assert response.status_code == 412
+        missing = self.client.patch("/todos/9", json={}, headers={"If-Match": '"1"'})
+        assert missing.status_code == 404
+
+    def test_delete_todo_if_match(self):
+        """Test that a conditional DELETE is refused once the todo changed."""
+        self.client.post("/todos", json={"title": "Todo"})
+        self.client.patch("/todos/1", json={"completed": True})
+
+        stale = self.client.delete("/todos/1", headers={"If-Match": '"1"'})
+        assert stale.status_code == 412
+        assert stale.headers["ETag"] == '"2"'
+        assert (
+            self.client.delete("/todos/1", headers={"If-Match": '"2"'}).status_code
+            == 204
+        )
+        assert (
+            self.client.delete("/todos/1", headers={"If-Match": '"2"'}).status_code
+            == 404
+        )
+
     def test_multiple_todos_operations(self):
         """Test multiple todos operations."""
         # Create multiple todos
@@ -157,3 +244,716 @@ class TestTodoAPI:
         assert len(final_todos) == 1
         assert final_todos[0]["title"] == "Todo 1"
         assert final_todos[0]["completed"] is True
+
+    def test_list_todos_pagination(self):
+        """Test paginating todos with limit and cursor."""
+        for i in range(3):
+            self.client.post("/todos", json={"title": f"Todo {i}"})
+
+        response = self.client.get("/todos", params={"limit": 2})
+        assert response.status_code == 200
+        assert [t["title"] for t in response.json()] == ["Todo 0", "Todo 1"]
+        cursor = response.headers["X-Next-Cursor"]
+
+        response = self.client.get("/todos", params={"limit": 2, "cursor": cursor})
+        assert [t["title"] for t in response.json()] == ["Todo 2"]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_list_todos_filters(self):
+        """Test filtering todos by status and creation date."""
+        first = self.client.post("/todos", json={"title": "Todo 1"}).json()
+        self.client.post("/todos", json={"title": "Todo 2"})
+        self.client.patch(f"/todos/{first['id']}", json={"completed": True})
+
+        response = self.client.get("/todos", params={"completed": "false"})
+        assert [t["title"] for t in response.json()] == ["Todo 2"]
+
+        response = self.client.get(
+            "/todos", params={"created_before": first["created_at"]}
+        )
+        assert response.json() == []
+
+    def test_owner_header_scopes_todos(self):
+        """Test that X-Owner sets the owner on create and filters reads."""
+        alice, bob = {"X-Owner": "alice"}, {"X-Owner": "bob"}
+        created = self.client.post(
+            "/todos", json={"title": "Réunion", "owner": "bob"}, headers=alice
+        ).json()
+        assert created["owner"] == "alice"
+        self.client.post("/todos/bulk", json=[{"title": "Réunion B"}], headers=bob)
+        self.client.post("/todos/import", content=b'{"title": "Pain"}\n', headers=bob)
+        self.client.post("/todos", json={"title": "Sans propriétaire"})
+
+        assert [t["id"] for t in self.client.get("/todos", headers=bob).json()] == [
+            2,
+            3,
+        ]
+        assert len(self.client.get("/todos").json()) == 4
+        results = self.client.get("/todos/search", params={"q": "reu"}, headers=alice)
+        assert [t["id"] for t in results.json()] == [1]
+        export = self.client.get("/todos/export", headers=alice).text.splitlines()
+        assert [json.loads(line)["id"] for line in export] == [1]
+        assert self.client.get("/todos/stats", headers=alice).json()["total"] == 4
+        assert self.client.get("/todos", headers={"X-Owner": ""}).status_code == 422
+
+    def test_owner_header_scopes_writes(self):
+        """Test that another owner's todo answers 404 to PATCH and DELETE."""
+        alice, bob = {"X-Owner": "alice"}, {"X-Owner": "bob"}
+        self.client.post("/todos", json={"title": "A"}, headers=alice)
+        self.client.post("/todos", json={"title": "B"}, headers=bob)
+
+        response = self.client.patch("/todos/1", json={"title": "x"}, headers=bob)
+        assert response.status_code == 404
+        assert self.client.delete("/todos/1", headers=bob).status_code == 404
+        response = self.client.patch(
+            "/todos/bulk", json=[{"id": 1, "completed": True}, {"id": 2}], headers=bob
+        )
+        assert [r["status"] for r in response.json()] == [404, 200]
+        response = self.client.request("DELETE", "/todos/bulk", json=[1], headers=bob)
+        assert [r["status"] for r in response.json()] == [404]
+        assert self.repo.get(1).title == "A"
+        assert self.client.patch("/todos/1", json={}, headers=alice).status_code == 200
+        assert self.client.delete("/todos/1", headers=alice).status_code == 204
+
+    def test_list_todos_invalid_limit(self):
+        """Test validation error for an out-of-range limit."""
+        response = self.client.get("/todos", params={"limit": 0})
+        assert response.status_code == 422
+
+    def test_bulk_create(self):
+        """Test creating several todos in one request."""
+        payload = [{"title": "Todo 1"}, {"title": "Todo 2", "description": "D"}]
+        response = self.client.post("/todos/bulk", json=payload)
+
+        assert response.status_code == 201
+        results = response.json()
+        assert [r["status"] for r in results] == [201, 201]
+        assert [r["todo"]["id"] for r in results] == [1, 2]
+        assert len(self.client.get("/todos").json()) == 2
+
+    def test_bulk_create_validation_error(self):
+        """Test that one invalid item rejects the whole batch."""
+        payload = [{"title": "Todo 1"}, {"title": ""}]
+        response = self.client.post("/todos/bulk", json=payload)
+
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", 1, "title"]
+        assert self.client.get("/todos").json() == []
+
+    def test_bulk_create_rejects_empty_and_invalid_json(self):
+        """Test validation of the batch envelope."""
+        assert self.client.post("/todos/bulk", json=[]).status_code == 422
+        response = self.client.post("/todos/bulk", content=b"not json")
+        assert response.status_code == 422
+
+    def test_bulk_update(self):
+        """Test updating several todos with per-item results."""
+        self.client.post("/todos/bulk", json=[{"title": "A"}, {"title": "B"}])
+
+        payload = [{"id": 1, "completed": True}, {"id": 999, "title": "X"}]
+        response = self.client.patch("/todos/bulk", json=payload)
+
+        assert response.status_code == 200
+        first, missing = response.json()
+        assert first["status"] == 200
+        assert first["todo"]["completed"] is True
+        assert first["todo"]["title"] == "A"
+        assert missing == {
+            "index": 1,
+            "status": 404,
+            "todo": None,
+            "detail": "Todo not found",
+        }
+
+    def test_bulk_delete(self):
+        """Test deleting several todos with per-item results."""
+        self.client.post("/todos/bulk", json=[{"title": "A"}, {"title": "B"}])
+
+        response = self.client.request("DELETE", "/todos/bulk", json=[2, 3])
+
+        assert response.status_code == 200
+        assert [r["status"] for r in response.json()] == [204, 404]
+        assert [t["id"] for t in self.client.get("/todos").json()] == [1]
+
+    def test_bulk_routes_documented(self):
+        """Test that bulk request bodies appear in the OpenAPI schema."""
+        schema = self.client.get("/openapi.json").json()
+        body = schema["paths"]["/todos/bulk"]["post"]["requestBody"]
+        assert body["content"]["application/json"]["schema"]["type"] == "array"
+
+    def test_fast_responses(self, monkeypatch):
+        """Test that fast mode returns the same bodies and the same schema."""
+        validated = [
+            self.client.post("/todos", json={"title": "Todo", "description": "D"}),
+            self.client.patch("/todos/1", json={"completed": True}),
+        ]
+        schema = self.client.get("/openapi.json").json()
+        self.repo = InMemoryTodoRepository()
+        self.service = AsyncTodoService(AsyncRepositoryAdapter(self.repo))
+        monkeypatch.setattr(app.state, "fast_responses", True)
+
+        fast = [
+            self.client.post("/todos", json={"title": "Todo", "description": "D"}),
+            self.client.patch("/todos/1", json={"completed": True}),
+        ]
+
+        for before, after in zip(validated, fast, strict=True):
+            assert after.status_code == before.status_code
+            assert after.headers["content-type"] == "application/json"
+            assert after.headers["ETag"] == before.headers["ETag"]
+            assert {**after.json(), "created_at": None} == {
+                **before.json(),
+                "created_at": None,
+            }
+        assert self.client.patch("/todos/9", json={"title": "x"}).status_code == 404
+        assert self.client.get("/openapi.json").json() == schema
+
+    def test_list_todos_etag_not_modified(self):
+        """Test that an unchanged list answers 304 to If-None-Match."""
+        self.client.post("/todos", json={"title": "Todo 1"})
+        first = self.client.get("/todos")
+        etag = first.headers["ETag"]
+
+        response = self.client.get("/todos", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == etag
+
+    def test_list_todos_cache_invalidated_on_write(self):
+        """Test that writes invalidate the cached list and its ETag."""
+        self.client.post("/todos", json={"title": "Todo 1"})
+        etag = self.client.get("/todos").headers["ETag"]
+        assert len(self.service.list_cache) == 1
+
+        todo_id = self.client.post("/todos", json={"title": "Todo 2"}).json()["id"]
+        assert len(self.service.list_cache) == 0
+        response = self.client.get("/todos", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert len(response.json()) == 2
+
+        self.client.patch(f"/todos/{todo_id}", json={"completed": True})
+        assert self.client.get("/todos").json()[1]["completed"] is True
+        self.client.delete(f"/todos/{todo_id}")
+        assert len(self.client.get("/todos").json()) == 1
+
+    def test_list_todos_cache_keeps_pagination_headers(self):
+        """Test that cached pages keep their X-Next-Cursor header."""
+        self.client.post("/todos/bulk", json=[{"title": "A"}, {"title": "B"}])
+
+        first = self.client.get("/todos", params={"limit": 1})
+        cached = self.client.get("/todos", params={"limit": 1})
+        assert self.service.list_cache.hits == 1
+        assert cached.headers["X-Next-Cursor"] == first.headers["X-Next-Cursor"]
+        assert cached.json() == first.json()
+
+    def test_search_todos(self):
+        """Test GET /todos/search with prefixes, filters and pagination."""
+        self.client.post(
+            "/todos/bulk",
+            json=[
+                {"title": "Planifier la réunion"},
+                {"title": "Acheter du pain", "description": "Après la réunion"},
+                {"title": "Réunion d'équipe"},
+            ],
+        )
+        self.client.patch("/todos/3", json={"completed": True})
+
+        response = self.client.get("/todos/search", params={"q": "reu", "limit": 2})
+        assert response.status_code == 200
+        assert [t["id"] for t in response.json()] == [1, 2]
+        assert response.headers["X-Next-Cursor"] == "2"
+
+        response = self.client.get(
+            "/todos/search", params={"q": "reunion", "completed": True}
+        )
+        assert [t["id"] for t in response.json()] == [3]
+        assert self.client.get("/todos/search", params={"q": "zzz"}).json() == []
+
+    def test_todo_stats(self):
+        """Test GET /todos/stats, and that it never lists the todos."""
+        self.client.post("/todos/bulk", json=[{"title": f"T{i}"} for i in range(3)])
+        self.client.patch("/todos/1", json={"completed": True})
+        self.client.delete("/todos/3")
+        self.repo.list = self.repo.search = None
+
+        response = self.client.get("/todos/stats")
+        assert response.status_code == 200
+        body = response.json()
+        assert (body["total"], body["completed"], body["open"]) == (2, 1, 1)
+        assert list(body["created_per_day"].values()) == [2]
+        assert "/todos/stats" in self.client.get("/openapi.json").json()["paths"]
+
+    def test_search_todos_etag_and_validation(self):
+        """Test the search ETag and the validation of `q`."""
+        self.client.post("/todos", json={"title": "Réunion"})
+        etag = self.client.get("/todos/search", params={"q": "reu"}).headers["ETag"]
+        response = self.client.get(
+            "/todos/search", params={"q": "reu"}, headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 304
+
+        assert self.client.get("/todos/search").status_code == 422
+        assert self.client.get("/todos/search", params={"q": ""}).status_code == 422
+        too_long = "x" * 201
+        assert (
+            self.client.get("/todos/search", params={"q": too_long}).status_code == 422
+        )
+
+    def test_list_todos_fields(self):
+        """Test sparse fieldsets on the list and search, with the cursor."""
+        self.client.post(
+            "/todos/bulk",
+            json=[{"title": f"Todo {i}", "owner": "alice"} for i in range(3)],
+        )
+
+        response = self.client.get(
+            "/todos", params={"fields": "completed, title", "limit": 2}
+        )
+        assert response.json() == [
+            {"id": 1, "title": "Todo 0", "completed": False},
+            {"id": 2, "title": "Todo 1", "completed": False},
+        ]
+        assert response.headers["X-Next-Cursor"] == "2"
+        full = self.client.get("/todos", params={"limit": 2})
+        assert full.headers["ETag"] != response.headers["ETag"]
+
+        response = self.client.get(
+            "/todos/search", params={"q": "todo", "fields": "owner", "cursor": 2}
+        )
+        assert response.json() == [{"id": 3, "owner": "alice"}]
+        every = ",".join(TodoInDB.model_fields)
+        assert self.client.get("/todos", params={"fields": every}).json() == (
+            self.client.get("/todos").json()
+        )
+
+    def test_list_todos_unknown_field(self):
+        """Test 422 for a field that todos do not have."""
+        response = self.client.get("/todos", params={"fields": "title,secret"})
+        assert response.status_code == 422
+        error = response.json()["detail"][0]
+        assert error["loc"] == ["query", "fields"]
+        assert "Unknown fields: secret" in error["msg"]
+
+    def test_get_todo(self):
+        """Test reading one todo: ETag, fields, owner scope and 404."""
+        self.client.post("/todos", json={"title": "Todo", "owner": "alice"})
+
+        response = self.client.get("/todos/1")
+        assert response.json()["title"] == "Todo"
+        assert response.headers["ETag"] == '"1"'
+        response = self.client.get("/todos/1", params={"fields": "title"})
+        assert response.json() == {"id": 1, "title": "Todo"}
+        assert response.headers["ETag"] == '"1"'
+        assert self.client.get("/todos/2").status_code == 404
+        response = self.client.get("/todos/1", headers={"X-Owner": "bob"})
+        assert response.status_code == 404
+        assert self.client.get("/todos/stats").status_code == 200
+
+    def test_export_todos_ndjson(self, monkeypatch):
+        """Test that the export streams every todo, page after page."""
+        monkeypatch.setattr(api, "EXPORT_BATCH", 2)
+        self.client.post("/todos/bulk", json=[{"title": f"Todo {i}"} for i in range(5)])
+        self.client.patch("/todos/2", json={"completed": True})
+
+        response = self.client.get("/todos/export")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = response.text.splitlines()
+        assert [json.loads(line)["id"] for line in lines] == [1, 2, 3, 4, 5]
+
+        response = self.client.get("/todos/export", params={"completed": True})
+        assert [json.loads(line)["id"] for line in response.text.splitlines()] == [2]
+
+        monkeypatch.setattr(api, "EXPORT_BATCH", 5)
+        assert len(self.client.get("/todos/export").text.splitlines()) == 5
+
+    def test_import_todos_ndjson(self, monkeypatch):
+        """Test an import in batches, with lines split across chunks."""
+        monkeypatch.setattr(api, "IMPORT_BATCH", 2)
+        body = b"".join(
+            json.dumps({"title": f"Todo {i}"}).encode() + b"\n" for i in range(5)
+        )
+
+        def chunks():
+            for start in range(0, len(body), 7):
+                yield body[start : start + 7]
+
+        response = self.client.post("/todos/import", content=chunks())
+        assert response.status_code == 200
+        assert response.json() == {"created": 5, "failed": 0, "errors": []}
+        assert [t.title for t in self.repo.list()] == [f"Todo {i}" for i in range(5)]
+
+    def test_import_todos_invalid_lines(self):
+        """Test that invalid lines are reported and the others imported."""
+        body = '{"title": "A"}\n\nnot json\n{"title": ""}\n{"title": "B"}'
+        response = self.client.post("/todos/import", content=body)
+
+        result = response.json()
+        assert result["created"] == 2
+        assert result["failed"] == 2
+        assert [error["line"] for error in result["errors"]] == [3, 4]
+        assert result["errors"][1]["detail"].startswith("title:")
+
+    def test_import_todos_line_too_long(self, monkeypatch):
+        """Test that an oversized line aborts the import with 413."""
+        monkeypatch.setattr(api, "MAX_IMPORT_LINE", 10)
+        response = self.client.post("/todos/import", content='{"title": "Trop long"}')
+        assert response.status_code == 413
+
+    def sse_events(self, response):
+        """Parse a Server-Sent Events body into (id, event, data) tuples."""
+        events = []
+        for block in response.text.split("\n\n"):
+            fields = dict(line.split(": ", 1) for line in block.splitlines())
+            if fields:
+                events.append(
+                    (fields["id"], fields["event"], json.loads(fields["data"]))
+                )
+        return events
+
+    def test_changes_catch_up(self):
+        """Test replaying the changes after a resume token, without following."""
+        self.client.post("/todos/bulk", json=[{"title": "A"}, {"title": "B"}])
+        self.client.patch("/todos/1", json={"completed": True})
+        self.client.delete("/todos/2")
+
+        response = self.client.get("/todos/changes", params={"follow": False})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        assert response.headers["X-Last-Event-ID"] == "4"
+        assert response.text == ""
+
+        response = self.client.get(
+            "/todos/changes", params={"since": 1, "follow": False}
+        )
+        events = self.sse_events(response)
+        assert [(i, e) for i, e, _ in events] == [
+            ("2", "created"),
+            ("3", "updated"),
+            ("4", "deleted"),
+        ]
+        assert events[1][2]["todo"]["completed"] is True
+        assert events[2][2] == {"seq": 4, "type": "deleted", "id": 2, "todo": None}
+
+        # Last-Event-ID (reconnexion d'un navigateur) prime sur `since`
+        response = self.client.get(
+            "/todos/changes",
+            params={"since": 0, "follow": False},
+            headers={"Last-Event-ID": "3"},
+        )
+        assert [i for i, _, _ in self.sse_events(response)] == ["4"]
+
+    def test_changes_stale_token(self):
+        """Test that an unknown or expired resume token answers 410."""
+        self.service.changes = ChangeFeed(capacity=1)
+        self.client.post("/todos/bulk", json=[{"title": "A"}, {"title": "B"}])
+
+        assert self.client.get("/todos/changes?since=0").status_code == 410
+        assert self.client.get("/todos/changes?since=5").status_code == 410
+        assert self.client.get("/todos/changes?since=-1").status_code == 422
+
+    def test_changes_stream_follows(self):
+        """Test the live SSE stream: keepalive, new events, then reset when late."""
+
+        async def scenario():
+            feed = ChangeFeed(capacity=1)
+            stream = api._sse_stream(feed, 0, [], follow=True)
+            assert await anext(stream) == b": keepalive\n\n"
+
+            pending = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0)
+            feed.publish("deleted", 1)
+            assert (await pending).startswith(b"id: 1\nevent: deleted\n")
+
+            # deux événements d'avance avec un tampon de 1: l'abonné a décroché
+            pending = asyncio.ensure_future(anext(stream))
+            feed.publish("deleted", 2)
+            feed.publish("deleted", 3)
+            assert await pending == b"event: reset\ndata: {}\n\n"
+
+        asyncio.run(scenario())
+
+    def test_changes_websocket(self):
+        """Test the WebSocket feed: backlog first, then live events."""
+        self.client.post("/todos", json={"title": "A"})
+        # un seul client (une seule boucle) pour l'abonné et l'écriture; son
+        # lifespan règle l'application depuis ses settings
+        other = create_app(Settings(secret_key="test", log_async=False))
+        other.dependency_overrides[get_service] = lambda: self.service
+        client = TestClient(other)
+        with client, client.websocket_connect("/todos/changes/ws?since=0") as websocket:
+            assert websocket.receive_json()["type"] == "created"
+            client.patch("/todos/1", json={"completed": True})
+            event = websocket.receive_json()
+            assert event["seq"] == 2
+            assert event["todo"]["completed"] is True
+
+    def test_changes_websocket_stale_token(self):
+        """Test that the WebSocket closes with 4410 on an expired token."""
+        url = "/todos/changes/ws?since=3"
+        with (
+            self.client.websocket_connect(url) as websocket,
+            pytest.raises(WebSocketDisconnect) as exc_info,
+        ):
+            websocket.receive_json()
+        assert exc_info.value.code == api.WS_STALE_TOKEN
+
+
+class TestWireFormats:
+    """Test MessagePack bodies and response compression."""
+
+    def setup_method(self):
+        """Set up an application with a small compression threshold."""
+        pytest.importorskip("msgpack")
+        pytest.importorskip("zstandard")
+        self.repo = InMemoryTodoRepository()
+        self.service = AsyncTodoService(AsyncRepositoryAdapter(self.repo))
+        self.app = create_app()
+        self.app.state.compression.min_size = 200
+        self.app.dependency_overrides[get_service] = lambda: self.service
+        self.client = TestClient(self.app)
+
+    def post_msgpack(self, path, body, **kwargs):
+        """Send `body` as MessagePack and ask for MessagePack back."""
+        return self.client.request(
+            kwargs.pop("method", "POST"),
+            path,
+            content=pack_body(body),
+            headers={
+                "Content-Type": "application/msgpack",
+                "Accept": "application/msgpack",
+            },
+            **kwargs,
+        )
+
+    def test_msgpack_round_trip(self):
+        """Test create, update, bulk and stats in MessagePack."""
+        response = self.post_msgpack("/todos", {"title": "Todo"})
+        assert response.status_code == 201
+        assert response.headers["content-type"] == "application/msgpack"
+        todo = unpack(response.content)
+        assert todo["title"] == "Todo"
+        assert todo["created_at"] == self.repo.get(1).created_at
+        assert response.headers["ETag"] == '"1"'
+
+        response = self.post_msgpack("/todos/1", {"completed": True}, method="PATCH")
+        assert unpack(response.content)["completed"] is True
+
+        response = self.post_msgpack("/todos/bulk", [{"title": "A"}, {"title": "B"}])
+        assert [r["status"] for r in unpack(response.content)] == [201, 201]
+
+        response = self.client.get(
+            "/todos/stats", headers={"Accept": "application/msgpack"}
+        )
+        assert unpack(response.content)["total"] == 3
+        assert self.client.get("/todos/stats").json()["total"] == 3
+
+    def test_msgpack_list(self):
+        """Test that each format has its own cached body and ETag."""
+        self.client.post("/todos", json={"title": "Todo"})
+        as_json = self.client.get("/todos")
+        as_msgpack = self.client.get(
+            "/todos", headers={"Accept": "application/msgpack"}
+        )
+
+        assert as_msgpack.headers["content-type"] == "application/msgpack"
+        assert unpack(as_msgpack.content)[0]["id"] == as_json.json()[0]["id"]
+        assert as_msgpack.headers["ETag"] != as_json.headers["ETag"]
+        assert as_json.headers["Vary"] == "Accept, Accept-Encoding"
+        assert len(self.service.list_cache) == 2
+
+    def test_msgpack_fields(self):
+        """Test projected rows in MessagePack, for a list and a todo."""
+        self.client.post("/todos", json={"title": "Todo"})
+        headers = {"Accept": "application/msgpack"}
+        params = {"fields": "created_at"}
+
+        rows = unpack(self.client.get("/todos", params=params, headers=headers).content)
+        assert rows == [{"id": 1, "created_at": self.repo.get(1).created_at}]
+        response = self.client.get("/todos/1", params=params, headers=headers)
+        assert unpack(response.content) == rows[0]
+
+    def test_msgpack_invalid_body(self, monkeypatch):
+        """Test 422 for invalid MessagePack, 415 when msgpack is missing."""
+        response = self.client.post(
+            "/todos", content=b"\xc1", headers={"Content-Type": "application/msgpack"}
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["type"] == "msgpack_invalid"
+
+        response = self.post_msgpack("/todos", {"title": ""})
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["loc"] == ["body", "title"]
+
+        monkeypatch.setattr(api, "msgpack_module", lambda: None)
+        assert self.post_msgpack("/todos", {"title": "T"}).status_code == 415
+
+    def test_compressed_list_is_cached(self):
+        """Test that a large list is compressed once, with an unchanged ETag."""
+        self.client.post(
+            "/todos/bulk", json=[{"title": f"Todo {i}"} for i in range(20)]
+        )
+        plain = self.client.get("/todos", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in plain.headers
+
+        for encoding in ["gzip", "zstd", "gzip"]:
+            response = self.client.get("/todos", headers={"Accept-Encoding": encoding})
+            assert response.headers["content-encoding"] == encoding
+            assert response.headers["ETag"] == plain.headers["ETag"]
+            assert response.json() == plain.json()
+        assert self.service.list_cache.hits == 1
+
+        response = self.client.get(
+            "/todos",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": plain.headers["ETag"]},
+        )
+        assert response.status_code == 304
+        assert "content-encoding" not in response.headers
+
+    def test_small_responses_not_compressed(self):
+        """Test that bodies under the threshold are sent as is."""
+        self.client.post("/todos", json={"title": "Todo"})
+
+        response = self.client.get("/todos", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+        response = self.client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in response.headers
+
+    def test_middleware_compresses_other_responses(self, monkeypatch):
+        """Test the middleware on a bulk response and a streamed export."""
+        monkeypatch.setattr(api, "EXPORT_BATCH", 5)
+        payload = [{"title": f"Todo {i}"} for i in range(20)]
+
+        response = self.client.post(
+            "/todos/bulk", json=payload, headers={"Accept-Encoding": "zstd"}
+        )
+        assert response.headers["content-encoding"] == "zstd"
+        assert response.headers["Vary"] == "Accept-Encoding"
+        assert len(response.json()) == 20
+
+        response = self.client.get("/todos/export", headers={"Accept-Encoding": "gzip"})
+        assert response.headers["content-encoding"] == "gzip"
+        assert "content-length" not in response.headers
+        assert len(response.text.splitlines()) == 20
+
+    def test_compression_settings(self):
+        """Test that the settings configure (or disable) compression."""
+        settings = Settings(
+            secret_key="test",
+            compression_encodings=[],
+            compression_min_size=10,
+            gzip_level=9,
+            log_async=False,
+        )
+        other = create_app(settings)
+        with TestClient(other) as client:
+            client.post("/todos/bulk", json=[{"title": f"T{i}"} for i in range(20)])
+            response = client.get("/todos", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert other.state.compression.min_size == 10
+        assert other.state.compression.levels["gzip"] == 9
+
+
+class TestCreateApp:
+    """Test the application factory and its lifespan."""
+
+    def test_app_uses_its_settings(self, tmp_path):
+        """Test that each application builds its own service from its settings."""
+        settings = Settings(
+            secret_key="test",
+            storage_backend="sqlite",
+            sqlite_path=str(tmp_path / "todos.db"),
+            fast_responses=True,
+            log_async=False,
+        )
+        other = create_app(settings)
+        assert other.state.service is None
+
+        with TestClient(other) as client:
+            assert client.post("/todos", json={"title": "Todo"}).status_code == 201
+            repo = other.state.service.repo.repo
+            assert other.state.fast_responses is True
+            assert client.get("/todos").json()[0]["title"] == "Todo"
+        # lifespan: service libéré et connexions fermées à l'arrêt
+        assert other.state.service is None
+        assert repo._connections == []
+        assert app.state.fast_responses is False
+
+    def test_lifespan_without_service(self, monkeypatch):
+        """Test that an application that served nothing shuts down cleanly."""
+        monkeypatch.setenv("SECRET_KEY", "test")
+        monkeypatch.setenv("LOG_ASYNC", "false")
+        # get_settings garde la configuration lue par un test précédent
+        get_settings.cache_clear()
+        other = create_app()
+        with TestClient(other) as client:
+            assert client.get("/health").status_code == 200
+        assert other.state.settings.secret_key == "test"
+        assert other.state.service is None
+
+
+def import_times(statement: str, cwd: Path) -> dict[str, int]:
+    """Self import time (µs) of each module loaded by `statement`.
+
+    Sans SECRET_KEY ni fichier .env: l'import ne doit pas lire la configuration.
+    """
+    env = {key: value for key, value in os.environ.items() if key != "SECRET_KEY"}
+    env["PYTHONPATH"] = str(Path(__file__).resolve().parents[1])
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=cwd,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        fields = line.removeprefix("import time:").split("|")
+        if len(fields) == 3 and fields[0].strip().isdigit():
+            times[fields[2].strip()] = int(fields[0])
+    return times
+
+
+class TestImportTime:
+    """Test that importing the API stays cheap (cold starts, test collection)."""
+
+    def test_import_is_lazy(self, tmp_path):
+        """Test that import builds no application and reads no configuration."""
+        statement = (
+            "import sys, todo_app.api as api; assert 'app' not in vars(api); "
+            "print(','.join(name for name in ('todo_app.config', "
+            "'pydantic_settings', 'sqlite3', 'concurrent.futures.thread') "
+            "if name in sys.modules))"
+        )
+        env = {key: value for key, value in os.environ.items() if key != "SECRET_KEY"}
+        env["PYTHONPATH"] = str(Path(__file__).resolve().parents[1])
+        result = subprocess.run(
+            [sys.executable, "-c", statement],
+            capture_output=True,
+            text=True,
+            env=env,
+            cwd=tmp_path,
+            check=True,
+        )
+        assert result.stdout.strip() == ""
+
+    def test_import_time_budget(self, tmp_path):
+        """Test the import time added on top of FastAPI (IMPORT_TIME_BUDGET_MS)."""
+        budget_ms = float(os.environ.get("IMPORT_TIME_BUDGET_MS", 100))
+        added_ms = []
+        # meilleur de trois mesures: une machine chargée ne fait pas échouer
+        for _ in range(3):
+            baseline = import_times("import fastapi", tmp_path)
+            times = import_times("import todo_app.api", tmp_path)
+            added = {name: us for name, us in times.items() if name not in baseline}
+            added_ms.append(sum(added.values()) / 1000)
+            if added_ms[-1] <= budget_ms:
+                return
+        slowest = sorted(added, key=added.get, reverse=True)[:5]
+        pytest.fail(
+            f"import todo_app.api adds {min(added_ms):.0f} ms > {budget_ms:.0f} ms"
+            f" (slowest: {', '.join(slowest)})"
+        )
@@ -0,0 +1,70 @@
+"""Tests for the serialized response cache."""
+
+from todo_app.cache import CachedResponse, ResponseCache
+
+
+class TestCachedResponse:
+    """Test ETag generation and matching."""
+
+    def test_etag_depends_on_content(self):
+        """Test that the ETag is stable for a body and changes with it."""
+        first = CachedResponse.build(b"[]")
+        assert first.etag == CachedResponse.build(b"[]").etag
+        assert first.etag != CachedResponse.build(b"[1]").etag
+        assert first.etag.startswith('"')
+
+    def test_matches_if_none_match(self):
+        """Test If-None-Match parsing (lists, weak tags, wildcard)."""
+        entry = CachedResponse.build(b"[]")
+        assert entry.matches(entry.etag)
+        assert entry.matches(f'"other", W/{entry.etag}')
+        assert entry.matches("*")
+        assert not entry.matches('"other"')
+        assert not entry.matches(None)
+
+    def test_compressed_keeps_etag(self):
+        """Test that a compressed variant keeps the ETag of the plain body."""
+        entry = CachedResponse.build(b"[]", {"X-Next-Cursor": "2"})
+        compressed = entry.compressed(b"gz", "gzip")
+
+        assert (compressed.body, compressed.encoding) == (b"gz", "gzip")
+        assert compressed.etag == entry.etag
+        assert compressed.headers == entry.headers
+        assert entry.encoding is None
+
+
+class TestResponseCache:
+    """Test the bounded LRU cache."""
+
+    def test_get_put_and_stats(self):
+        """Test hits and misses."""
+        cache = ResponseCache(max_entries=2)
+        entry = CachedResponse.build(b"[]")
+
+        assert cache.get("a") is None
+        cache.put("a", entry)
+        assert cache.get("a") is entry
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted first."""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", CachedResponse.build(b"a"))
+        cache.put("b", CachedResponse.build(b"b"))
+        cache.get("a")
+        cache.put("c", CachedResponse.build(b"c"))
+
+        assert len(cache) == 2
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+
+    def test_disabled_and_clear(self):
+        """Test max_entries=0 and clear()."""
+        disabled = ResponseCache(max_entries=0)
+        disabled.put("a", CachedResponse.build(b"a"))
+        assert len(disabled) == 0
+
+        cache = ResponseCache()
+        cache.put("a", CachedResponse.build(b"a"))
+        cache.clear()
+        assert len(cache) == 0
@@ -0,0 +1,215 @@
+"""Tests for the HTTP client - list cache, ETag revalidation and retries."""
+
+import json
+
+import httpx
+import pytest
+
+from todo_app.client import TodoClient, sync_todos
+
+TODOS = [{"id": 1, "title": "A", "completed": False}]
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTodoClient:
+    """Test TodoClient against a scripted transport."""
+
+    def setup_method(self):
+        """Set up a client whose requests are answered by `self.handle`."""
+        self.requests = []
+        self.responses = []
+        self.clock = FakeClock()
+        self.client = TodoClient(
+            "http://api",
+            cache_ttl=2.0,
+            backoff=0,
+            transport=httpx.MockTransport(self.handle),
+            clock=self.clock,
+        )
+
+    def teardown_method(self):
+        """Close the client."""
+        self.client.close()
+
+    def handle(self, request):
+        self.requests.append(request)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    def test_list_cache_and_etag_revalidation(self):
+        """Test the TTL cache, then a 304 revalidation with If-None-Match."""
+        self.responses = [
+            httpx.Response(200, json=TODOS, headers={"ETag": '"v1"'}),
+            httpx.Response(304, headers={"ETag": '"v1"'}),
+        ]
+        assert self.client.list_todos() == TODOS
+        self.clock.now = 1.0
+        assert self.client.list_todos() == TODOS
+        assert len(self.requests) == 1
+
+        self.clock.now = 2.5
+        assert self.client.list_todos() == TODOS
+        assert self.requests[1].headers["If-None-Match"] == '"v1"'
+        # la revalidation relance le TTL
+        self.clock.now = 4.0
+        assert self.client.list_todos() == TODOS
+        assert len(self.requests) == 2
+
+    def test_fresh_list_is_revalidated(self):
+        """Test that fresh=True skips the TTL but still uses the ETag."""
+        self.responses = [
+            httpx.Response(200, json=TODOS, headers={"ETag": '"v1"'}),
+            httpx.Response(304, headers={"ETag": '"v1"'}),
+        ]
+        self.client.list_todos()
+        assert self.client.list_todos(fresh=True) == TODOS
+        assert self.requests[1].headers["If-None-Match"] == '"v1"'
+
+    def test_resync_sees_writes_after_the_cache_fill(self):
+        """Test that a full resync does not use a list older than its token."""
+        created = {"id": 2, "title": "B", "completed": False}
+        updated = {**created, "completed": True}
+        feed = 'data: {"seq": 6, "type": "updated", "id": 2, "todo": %s}\n\n'
+        self.responses = [
+            # liste mise en cache par une autre session, avant l'écriture de B
+            httpx.Response(200, json=TODOS, headers={"ETag": '"v1"'}),
+            httpx.Response(200, text="", headers={"X-Last-Event-ID": "5"}),
+            httpx.Response(200, json=[*TODOS, created], headers={"ETag": '"v2"'}),
+            httpx.Response(
+                200,
+                text=feed % json.dumps(updated),
+                headers={"X-Last-Event-ID": "6"},
+            ),
+        ]
+        self.client.list_todos()
+        self.clock.now = 1.0
+        state = {}
+
+        assert sync_todos(self.client, state) == [*TODOS, created]
+        assert state["seq"] == 5
+        assert self.requests[2].headers["If-None-Match"] == '"v1"'
+        self.clock.now = 3.0
+        assert sync_todos(self.client, state) == [*TODOS, updated]
+        assert self.requests[3].url.params["since"] == "5"
+
+    def test_rerun_within_ttl_skips_the_feed(self):
+        """Test that sync_todos polls the feed at most once per cache_ttl."""
+        created = {"id": 2, "title": "B", "completed": False}
+        feed = 'data: {"seq": 6, "type": "created", "id": 2, "todo": %s}\n\n'
+        self.responses = [
+            httpx.Response(200, text="", headers={"X-Last-Event-ID": "5"}),
+            httpx.Response(200, json=TODOS, headers={"ETag": '"v1"'}),
+            httpx.Response(200, text="", headers={"X-Last-Event-ID": "5"}),
+            httpx.Response(201, json=created),
+            httpx.Response(
+                200, text=feed % json.dumps(created), headers={"X-Last-Event-ID": "6"}
+            ),
+        ]
+        state = {}
+        assert sync_todos(self.client, state) == TODOS
+        self.clock.now = 1.0
+        assert sync_todos(self.client, state) == TODOS
+        assert len(self.requests) == 2
+
+        self.clock.now = 2.5
+        assert sync_todos(self.client, state) == TODOS
+        assert self.requests[2].url.params["since"] == "5"
+        # une écriture de ce client est visible dès le rerun suivant
+        self.client.create_todo("B")
+        assert sync_todos(self.client, state) == [*TODOS, created]
+        assert len(self.requests) == 5
+
+    def test_create_invalidates_list(self):
+        """Test that a creation forces the next list to be downloaded again."""
+        created = {"id": 2, "title": "B", "completed": False}
+        self.responses = [
+            httpx.Response(200, json=TODOS, headers={"ETag": '"v1"'}),
+            httpx.Response(201, json=created),
+            httpx.Response(200, json=[*TODOS, created], headers={"ETag": '"v2"'}),
+        ]
+        self.client.list_todos()
+        assert self.client.create_todo("B") == created
+        assert self.client.list_todos() == [*TODOS, created]
+        assert "If-None-Match" not in self.requests[2].headers
+
+    def test_reads_are_retried(self):
+        """Test retries on network errors and on 503."""
+        self.responses = [
+            httpx.ConnectError("refused"),
+            httpx.Response(503),
+            httpx.Response(200, json=TODOS),
+        ]
+        assert self.client.list_todos() == TODOS
+        assert len(self.requests) == 3
+
+    def test_retries_exhausted(self):
+        """Test that the last failure is surfaced once retries are spent."""
+        self.responses = [httpx.Response(503)] * 3
+        with pytest.raises(httpx.HTTPStatusError):
+            self.client.list_todos()
+
+        self.responses = [httpx.ConnectError("refused")] * 3
+        with pytest.raises(httpx.ConnectError):
+            self.client.list_todos()
+
+    def test_create_is_not_retried(self):
+        """Test that a failed POST is not replayed."""
+        self.responses = [httpx.Response(503), httpx.Response(201, json={})]
+        with pytest.raises(httpx.HTTPStatusError):
+            self.client.create_todo("A")
+        assert len(self.requests) == 1
+
+    def test_changes(self):
+        """Test reading the change feed and an expired resume token."""
+        body = 'id: 4\nevent: deleted\ndata: {"seq": 4, "type": "deleted", "id": 2}\n\n'
+        self.responses = [
+            httpx.Response(200, text=body, headers={"X-Last-Event-ID": "4"}),
+            httpx.Response(410),
+        ]
+        seq, events = self.client.changes(3)
+        assert seq == 4
+        assert [event["id"] for event in events] == [2]
+        assert self.requests[0].url.params["since"] == "3"
+        assert self.requests[0].url.params["follow"] == "false"
+
+        assert self.client.changes(1) == (0, None)
+
+    def test_msgpack(self):
+        """Test MessagePack requests and responses, with a JSON fallback."""
+        msgpack = pytest.importorskip("msgpack")
+        client = TodoClient(
+            "http://api", transport=httpx.MockTransport(self.handle), msgpack=True
+        )
+        created = {"id": 2, "title": "B", "completed": False}
+        self.responses = [
+            httpx.Response(
+                200,
+                content=msgpack.packb(TODOS),
+                headers={"Content-Type": "application/msgpack"},
+            ),
+            httpx.Response(201, json=created),
+        ]
+
+        assert client.list_todos() == TODOS
+        assert self.requests[0].headers["Accept"] == "application/msgpack"
+        assert client.create_todo("B") == created
+        assert msgpack.unpackb(self.requests[1].content)["title"] == "B"
+        assert self.requests[1].headers["Content-Type"] == "application/msgpack"
+        client.close()
+
+    def test_msgpack_not_installed(self, monkeypatch):
+        """Test that the MessagePack option requires the package."""
+        monkeypatch.setattr("todo_app.client.msgpack_module", lambda: None)
+        with pytest.raises(ValueError, match="requires the msgpack package"):
+            TodoClient("http://api", msgpack=True)
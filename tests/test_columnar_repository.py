@@ -0,0 +1,282 @@
+"""Tests for the columnar repository - compact storage and compaction."""
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from todo_app.columnar_repository import ColumnarTodoRepository
+from todo_app.config import Settings
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.repository import (
+    VersionConflictError,
+    build_async_repository,
+    build_repository,
+)
+
+
+class TestColumnarTodoRepository:
+    """Test ColumnarTodoRepository functionality."""
+
+    def setup_method(self):
+        """Set up an empty repository for each test."""
+        self.repo = ColumnarTodoRepository()
+
+    def test_create_and_get(self):
+        """Test creating then reading back a todo."""
+        todo = self.repo.create(TodoCreate(title="Café", description="Déca"))
+
+        assert todo.id == 1
+        assert self.repo.get(1) == todo
+        assert self.repo.get(999) is None
+        assert len(self.repo) == 1
+
+    def test_description_none_and_empty(self):
+        """Test that a missing and an empty description stay distinct."""
+        self.repo.create(TodoCreate(title="A"))
+        self.repo.create(TodoCreate(title="B", description=""))
+
+        assert self.repo.get(1).description is None
+        assert self.repo.get(2).description == ""
+
+    def test_update_text_and_status(self):
+        """Test partial updates, including clearing the description."""
+        self.repo.create(TodoCreate(title="Original", description="Desc"))
+
+        updated = self.repo.update(1, TodoUpdate(completed=True))
+        assert updated.completed is True
+        assert updated.title == "Original"
+
+        updated = self.repo.update(1, TodoUpdate(title="Renamed", description=None))
+        assert updated.title == "Renamed"
+        assert updated.description is None
+        assert updated.completed is True
+        assert self.repo.get(1) == updated
+        assert self.repo.update(999, TodoUpdate(title="x")) is None
+
+    def test_delete(self):
+        """Test deleting todos, ids are not reused."""
+        self.repo.create(TodoCreate(title="Todo 1"))
+
+        assert self.repo.delete(1) is True
+        assert self.repo.delete(1) is False
+        assert self.repo.get(1) is None
+        assert self.repo.list() == []
+        assert self.repo.create(TodoCreate(title="Todo 2")).id == 2
+
+    def test_list_query(self):
+        """Test filters and keyset pagination."""
+        for i in range(6):
+            self.repo.create(TodoCreate(title=f"Todo {i}"))
+        self.repo.update(2, TodoUpdate(completed=True))
+        self.repo.update(4, TodoUpdate(completed=True))
+        self.repo.delete(3)
+
+        assert [t.id for t in self.repo.list()] == [1, 2, 4, 5, 6]
+        assert [t.id for t in self.repo.list(TodoQuery(limit=2, after_id=2))] == [4, 5]
+        assert [t.id for t in self.repo.list(TodoQuery(completed=True))] == [2, 4]
+        assert [t.id for t in self.repo.list(TodoQuery(completed=False))] == [1, 5, 6]
+
+    def test_list_owner(self):
+        """Test that owners are interned and filtered, even after compaction."""
+        for i in range(6):
+            owner = ("alice", "bob", None)[i % 3]
+            self.repo.create(TodoCreate(title=f"Todo {i}", owner=owner))
+        self.repo.update(4, TodoUpdate(completed=True))
+
+        alice = TodoQuery(owner="alice")
+        assert [t.id for t in self.repo.list(alice)] == [1, 4]
+        assert self.repo.get(3).owner is None
+        assert self.repo._owners == [None, "alice", "bob"]
+        done = TodoQuery(owner="alice", completed=True)
+        assert [t.id for t in self.repo.list(done)] == [4]
+        assert self.repo.list(TodoQuery(owner="carol")) == []
+
+        for todo_id in (1, 2, 3, 5):
+            self.repo.delete(todo_id)
+        assert len(self.repo._ids) == 2
+        assert [(t.id, t.owner) for t in self.repo.list()] == [
+            (4, "alice"),
+            (6, None),
+        ]
+
+    def test_list_created_window(self):
+        """Test date filters with sorted and unsorted creation dates."""
+        self.repo.create(TodoCreate(title="Todo"))
+        now = datetime.now(UTC)
+        later = TodoQuery(created_after=now + timedelta(days=1))
+        earlier = TodoQuery(created_before=now + timedelta(days=1))
+
+        assert self.repo.list(later) == []
+        assert len(self.repo.list(earlier)) == 1
+
+        # horloge qui recule: la bisection sur les dates n'est plus possible
+        self.repo._created[0] += 10**12
+        self.repo.create(TodoCreate(title="Todo"))
+        assert self.repo._created_sorted is False
+        assert [t.id for t in self.repo.list(later)] == [1]
+        assert [t.id for t in self.repo.list(earlier)] == [2]
+
+    def test_bulk_operations(self):
+        """Test create_many/update_many/delete_many."""
+        todos = self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        assert [t.id for t in todos] == [1, 2]
+        assert self.repo.list() == todos
+
+        updated = self.repo.update_many(
+            [(1, TodoUpdate(completed=True)), (3, TodoUpdate(title="X"))]
+        )
+        assert updated[0].completed is True
+        assert updated[1] is None
+        assert self.repo.delete_many([2, 3]) == [True, False]
+
+    def test_bulk_owner(self):
+        """Test that bulk writes with an owner skip the todos of other owners."""
+        self.repo.create_many(
+            [TodoCreate(title="A", owner="alice"), TodoCreate(title="B")]
+        )
+
+        updated = self.repo.update_many(
+            [(1, TodoUpdate(completed=True)), (2, TodoUpdate(completed=True))],
+            owner="alice",
+        )
+        assert [t and t.id for t in updated] == [1, None]
+        assert self.repo.get(2).completed is False
+        assert self.repo.delete_many([1, 2], owner="carol") == [False, False]
+        assert self.repo.delete_many([2, 1, 9], owner="alice") == [False, True, False]
+        assert [t.id for t in self.repo.list()] == [2]
+
+    def test_revision(self):
+        """Test that every write bumps the revision."""
+        self.repo.create(TodoCreate(title="Todo"))
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.delete(1)
+
+        assert self.repo.revision() == 3
+
+    def test_versions(self):
+        """Test the version column, conditional writes and compaction."""
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        assert self.repo.update(2, TodoUpdate(title="B2"), 1).version == 2
+
+        with pytest.raises(VersionConflictError):
+            self.repo.update(2, TodoUpdate(title="Stale"), 1)
+        with pytest.raises(VersionConflictError):
+            self.repo.delete(2, 1)
+        self.repo.delete(1)
+        self.repo._compact()
+        assert self.repo.get(2).version == 2
+        assert self.repo.get(2).title == "B2"
+
+    def test_count(self):
+        """Test counting stored todos."""
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        self.repo.delete(1)
+        assert self.repo.count() == 1
+
+    def test_stats(self):
+        """Test that stats follow status changes, deletes and compaction."""
+        self.repo.create_many([TodoCreate(title=f"Todo {i}") for i in range(4)])
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.update(2, TodoUpdate(completed=True))
+        self.repo.update(2, TodoUpdate(completed=False))
+        self.repo.update(3, TodoUpdate(completed=True))
+        self.repo.delete(3)
+        self.repo.delete(4)
+        self.repo._compact()
+
+        stats = self.repo.stats()
+        assert (stats.total, stats.completed, stats.open) == (2, 1, 1)
+        assert stats.created_per_day == {datetime.now(UTC).date(): 2}
+
+    def test_compaction_reclaims_space(self):
+        """Test that deletes and text rewrites are compacted away."""
+        self.repo.create_many(
+            [TodoCreate(title=f"Todo {i}", description="x" * i) for i in range(10)]
+        )
+        for todo_id in range(1, 10, 2):
+            self.repo.delete(todo_id)
+        for _ in range(20):
+            self.repo.update(2, TodoUpdate(title="Renamed"))
+
+        assert self.repo._dead_rows * 2 <= len(self.repo._ids)
+        assert self.repo._dead_bytes * 2 <= len(self.repo._slab)
+        assert [t.id for t in self.repo.list()] == [2, 4, 6, 8, 10]
+        assert self.repo.get(2).title == "Renamed"
+        assert self.repo.get(10).description == "x" * 9
+        assert self.repo.get(3) is None
+
+    def test_search(self):
+        """Test full-text search on the columnar store."""
+        self.repo.create(TodoCreate(title="Planifier la réunion"))
+        self.repo.create(TodoCreate(title="Acheter du pain", description="Réunion"))
+
+        assert [t.id for t in self.repo.search("reunion")] == [1, 2]
+        self.repo.update(2, TodoUpdate(description=None, completed=True))
+        self.repo.update(1, TodoUpdate(completed=True))
+        assert [t.id for t in self.repo.search("reunion")] == [1]
+        assert [t.id for t in self.repo.search("pain", TodoQuery(limit=1))] == [2]
+        assert self.repo.search("pla", TodoQuery(completed=False)) == []
+
+        self.repo.delete(1)
+        assert self.repo.search("reunion") == []
+
+    def test_list_fields(self):
+        """Test that a projection only reads the requested columns."""
+        self.repo.create(TodoCreate(title="Café", description="Déca", owner="alice"))
+        self.repo.create(TodoCreate(title="Thé"))
+        self.repo.update(2, TodoUpdate(completed=True))
+        full = self.repo.list()
+
+        for name in ("title", "description", "completed", "created_at", "owner"):
+            fields = ("id", name, "version")
+            rows = self.repo.list(TodoQuery(fields=fields))
+            assert rows == [{f: getattr(t, f) for f in fields} for t in full]
+        query = TodoQuery(completed=True, fields=("title",))
+        assert self.repo.search("the", query) == [{"id": 2, "title": "Thé"}]
+
+    def test_search_fields_skip_materialize(self, monkeypatch):
+        """Test that a projected search filters on columns, never building todos."""
+        todos = [
+            self.repo.create(TodoCreate(title=f"Réunion {i}", owner=owner))
+            for i, owner in enumerate(("alice", "bob", "alice"))
+        ]
+        self.repo.update(3, TodoUpdate(completed=True))
+
+        def fail(row):
+            raise AssertionError("materialized")
+
+        monkeypatch.setattr(self.repo, "_materialize", fail)
+        fields = ("id", "title")
+        assert self.repo.search("reunion", TodoQuery(fields=fields, owner="alice")) == [
+            {"id": 1, "title": "Réunion 0"},
+            {"id": 3, "title": "Réunion 2"},
+        ]
+        window = TodoQuery(
+            fields=fields, created_after=todos[1].created_at, completed=False
+        )
+        assert self.repo.search("reunion", window) == [{"id": 2, "title": "Réunion 1"}]
+        early = TodoQuery(fields=fields, created_before=todos[0].created_at)
+        assert self.repo.search("reunion", early) == []
+        assert self.repo.search("reunion", TodoQuery(owner="carol")) == []
+
+    def test_delete_everything_then_create(self):
+        """Test that a fully compacted store keeps allocating new ids."""
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        self.repo.delete_many([1, 2])
+
+        assert len(self.repo) == 0
+        assert self.repo.create(TodoCreate(title="C")).id == 3
+
+
+class TestColumnarBackend:
+    """Test selecting the columnar backend from settings."""
+
+    def test_build_repository(self):
+        """Test that STORAGE_BACKEND=columnar builds the compact store."""
+        settings = Settings(secret_key="test", storage_backend="columnar")
+        assert isinstance(build_repository(settings), ColumnarTodoRepository)
+
+    def test_async_runs_inline(self):
+        """Test that the in-memory columnar store needs no executor."""
+        settings = Settings(secret_key="test", storage_backend="columnar")
+        assert build_async_repository(settings).executor is None
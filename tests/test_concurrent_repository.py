@@ -0,0 +1,196 @@
+"""Tests for the thread-safe repository - multithreaded stress tests."""
+
+import sys
+import threading
+
+import pytest
+
+from todo_app.concurrent_repository import ConcurrentTodoRepository
+from todo_app.config import Settings
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.repository import VersionConflictError, build_repository
+
+
+def run_threads(target, count):
+    """Start `count` threads on target(index) and wait for all of them."""
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+class TestConcurrentTodoRepository:
+    """Test ConcurrentTodoRepository under contention."""
+
+    @pytest.fixture(autouse=True)
+    def _fast_switching(self):
+        """Force frequent thread switches to surface races."""
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        yield
+        sys.setswitchinterval(interval)
+
+    def setup_method(self):
+        """Set up a repository with few stripes to increase contention."""
+        self.repo = ConcurrentTodoRepository(stripes=4)
+
+    def assert_indexes_consistent(self):
+        data = self.repo._data
+        assert self.repo._ids == sorted(data)
+        for status in (False, True):
+            expected = sorted(i for i, t in data.items() if t.completed is status)
+            assert self.repo._status_index[status] == expected
+        assert self.repo._created_index == sorted(
+            (t.created_at, t.id) for t in data.values()
+        )
+        stats = self.repo.stats()
+        assert stats.total == len(data)
+        assert stats.completed == sum(t.completed for t in data.values())
+        assert sum(stats.created_per_day.values()) == len(data)
+
+    def test_concurrent_updates_bump_every_version(self):
+        """Test that the compare-and-swap loses no concurrent update."""
+        self.repo.create(TodoCreate(title="Todo"))
+
+        def worker(index):
+            for i in range(200):
+                self.repo.update(1, TodoUpdate(completed=(index + i) % 2 == 0))
+
+        run_threads(worker, 8)
+        assert self.repo.get(1).version == 1 + 8 * 200
+        assert self.repo.revision() == 1 + 8 * 200
+        self.assert_indexes_consistent()
+
+    def test_conditional_increments(self):
+        """Test read-then-conditional-update retries: no increment is lost."""
+        self.repo.create(TodoCreate(title="0"))
+
+        def worker(_):
+            for _ in range(100):
+                while True:
+                    todo = self.repo.get(1)
+                    try:
+                        self.repo.update(
+                            1, TodoUpdate(title=str(int(todo.title) + 1)), todo.version
+                        )
+                        break
+                    except VersionConflictError:
+                        continue
+
+        run_threads(worker, 8)
+        todo = self.repo.get(1)
+        assert todo.title == "800"
+        assert todo.version == 801
+
+    def test_crud(self):
+        """Test the repository behaves like the in-memory one."""
+        todo = self.repo.create(TodoCreate(title="Todo"))
+        assert self.repo.get(todo.id) == todo
+        assert self.repo.update(todo.id, TodoUpdate(completed=True)).completed
+        assert self.repo.list(TodoQuery(completed=True))[0].id == todo.id
+        assert self.repo.list(TodoQuery(fields=("title",))) == [
+            {"id": todo.id, "title": "Todo"}
+        ]
+        assert self.repo.delete(todo.id) is True
+        assert self.repo.list() == []
+
+    def test_concurrent_creates_allocate_unique_ids(self):
+        """Test atomic id allocation across threads."""
+        threads, per_thread = 8, 250
+
+        def worker(_):
+            for i in range(per_thread):
+                self.repo.create(TodoCreate(title=f"Todo {i}"))
+
+        run_threads(worker, threads)
+
+        total = threads * per_thread
+        assert sorted(self.repo._data) == list(range(1, total + 1))
+        assert self.repo._next_id == total + 1
+        self.assert_indexes_consistent()
+        # dates non décroissantes avec l'id malgré les entrelacements
+        assert self.repo._created_sorted
+
+    def test_no_lost_updates(self):
+        """Test that concurrent partial updates of one todo never overwrite each other.
+
+        Chaque champ n'a qu'un seul écrivain: sa valeur finale doit être la
+        dernière écrite par ce thread, quel que soit l'entrelacement.
+        """
+        todo = self.repo.create(TodoCreate(title="start"))
+        rounds = 2000
+
+        def worker(index):
+            for i in range(rounds):
+                if index == 0:
+                    payload = TodoUpdate(title=f"title {i}")
+                elif index == 1:
+                    payload = TodoUpdate(description=f"description {i}")
+                else:
+                    payload = TodoUpdate(completed=i % 2 == 0)
+                self.repo.update(todo.id, payload)
+
+        run_threads(worker, 3)
+
+        final = self.repo.get(todo.id)
+        assert final.title == f"title {rounds - 1}"
+        assert final.description == f"description {rounds - 1}"
+        assert final.completed is ((rounds - 1) % 2 == 0)
+        self.assert_indexes_consistent()
+
+    def test_mixed_workload_keeps_indexes_consistent(self):
+        """Test creates, updates, deletes and reads running together."""
+        self.repo.create_many([TodoCreate(title=f"Seed {i}") for i in range(200)])
+        errors = []
+
+        def worker(index):
+            try:
+                for i in range(200):
+                    todo_id = (index * 200 + i) % 200 + 1
+                    if i % 4 == 0:
+                        self.repo.create(TodoCreate(title="new"))
+                    elif i % 4 == 1:
+                        self.repo.update(todo_id, TodoUpdate(completed=True))
+                    elif i % 4 == 2 and index % 2:
+                        self.repo.delete(todo_id)
+                    else:
+                        page = self.repo.list(TodoQuery(completed=True, limit=20))
+                        assert all(t.completed for t in page)
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        run_threads(worker, 8)
+
+        assert errors == []
+        self.assert_indexes_consistent()
+
+    def test_selected_by_settings(self):
+        """Test the concurrent backend selected by configuration."""
+        settings = Settings(
+            secret_key="test", storage_backend="concurrent", memory_lock_stripes=8
+        )
+        repo = build_repository(settings)
+        assert isinstance(repo, ConcurrentTodoRepository)
+        assert len(repo._stripes) == 8
+
+    def test_search_during_writes(self):
+        """Test that searches see a consistent index while others write."""
+        self.repo.create_many([TodoCreate(title=f"Réunion {i}") for i in range(50)])
+        errors = []
+
+        def worker(index):
+            try:
+                for i in range(50):
+                    if index % 2:
+                        self.repo.delete(index * 50 + i)
+                        self.repo.create(TodoCreate(title="Réunion"))
+                    else:
+                        for todo in self.repo.search("reu", TodoQuery(limit=10)):
+                            assert "Réunion" in todo.title
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        run_threads(worker, 4)
+        assert errors == []
+        assert len(self.repo.search("reunion")) == len(self.repo.list())
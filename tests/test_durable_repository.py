@@ -0,0 +1,249 @@
+"""Tests for the write-ahead log and the durable in-memory repository."""
+
+import os
+import threading
+
+import pytest
+
+from todo_app.config import Settings
+from todo_app.durable_repository import DurableTodoRepository
+from todo_app.journal import (
+    SNAPSHOT_NAME,
+    OperationLog,
+    encode,
+    list_segments,
+    read_frames,
+    segment_path,
+)
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.repository import build_async_repository, build_repository
+
+
+class TestOperationLog:
+    """Test OperationLog framing, group commit and rotation."""
+
+    @pytest.fixture(autouse=True)
+    def _log(self, tmp_path):
+        """Set up a log with a long flush interval: only sync() flushes."""
+        self.log = OperationLog(tmp_path, 1, flush_interval=60)
+        yield
+        self.log.close()
+
+    def test_sync_writes_buffered_records(self):
+        """Test that records reach the file once sync() returns."""
+        path = segment_path(self.log.directory, 1)
+        self.log.append(b"first")
+        self.log.append(b"second")
+        assert list(read_frames(path)) == []
+
+        self.log.sync()
+        assert list(read_frames(path)) == [b"first", b"second"]
+
+    def test_torn_tail_is_ignored(self):
+        """Test that reading stops at a truncated or corrupt frame."""
+        path = segment_path(self.log.directory, 1)
+        self.log.append(b"complete")
+        self.log.sync()
+        with path.open("ab") as file:
+            file.write(encode(b"truncated")[:-3])
+
+        assert list(read_frames(path)) == [b"complete"]
+
+    def test_rotate(self):
+        """Test that rotation flushes and switches to a new segment."""
+        self.log.append(b"old")
+        assert self.log.rotate() == 2
+        self.log.append(b"new")
+        self.log.sync()
+
+        assert list_segments(self.log.directory) == [1, 2]
+        assert list(read_frames(segment_path(self.log.directory, 1))) == [b"old"]
+        assert list(read_frames(segment_path(self.log.directory, 2))) == [b"new"]
+
+    def test_append_after_close(self):
+        """Test that a closed log refuses new records."""
+        self.log.close()
+        with pytest.raises(RuntimeError):
+            self.log.append(b"late")
+
+
+class TestDurableTodoRepository:
+    """Test DurableTodoRepository recovery."""
+
+    @pytest.fixture(autouse=True)
+    def _repo(self, tmp_path):
+        """Set up a repository on an empty directory for each test."""
+        self.path = tmp_path
+        self.repo = DurableTodoRepository(tmp_path, flush_interval=0.001)
+        yield
+        self.repo.close()
+
+    def reopen(self):
+        """Simulate a restart: close the repository and recover a new one."""
+        self.repo.close()
+        self.repo = DurableTodoRepository(self.path, flush_interval=0.001)
+        return self.repo
+
+    def test_recovers_from_log(self):
+        """Test that creates, updates and deletes are replayed."""
+        self.repo.create_many([TodoCreate(title=f"Todo {i}") for i in range(3)])
+        self.repo.update(1, TodoUpdate(completed=True, description="Done"))
+        self.repo.delete(2)
+        before = self.repo.list()
+
+        recovered = self.reopen()
+        assert recovered.list() == before
+        assert [t.id for t in recovered.list(TodoQuery(completed=True))] == [1]
+        assert recovered.create(TodoCreate(title="Next")).id == 4
+
+    def test_versions_survive_recovery(self):
+        """Test that versions are journaled, and old records default to 1."""
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        self.repo.update(1, TodoUpdate(title="A2"))
+        self.repo.update(1, TodoUpdate(completed=True), expected_version=2)
+        self.repo.close()
+        # trame écrite avant l'ajout de `version`: (id, title, description,
+        # completed, created_at en microsecondes)
+        with segment_path(self.path, 99).open("wb") as file:
+            file.write(encode(b'P[2,"Legacy",null,false,0]'))
+
+        recovered = self.reopen()
+        assert recovered.get(1).version == 3
+        assert recovered.get(2).title == "Legacy"
+        assert recovered.get(2).version == 1
+
+    def test_owner_survives_recovery(self):
+        """Test that owners are journaled, and 6-element records have none."""
+        self.repo.create(TodoCreate(title="A", owner="alice"))
+        self.repo.close()
+        with segment_path(self.path, 99).open("wb") as file:
+            file.write(encode(b'P[2,"Legacy",null,false,0,3]'))
+
+        recovered = self.reopen()
+        assert recovered.get(1).owner == "alice"
+        assert [t.id for t in recovered.list(TodoQuery(owner="alice"))] == [1]
+        assert (recovered.get(2).version, recovered.get(2).owner) == (3, None)
+
+    def test_invalid_frames_are_skipped(self, caplog):
+        """Test that an intact but invalid frame is reported, not fatal."""
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        self.repo.close()
+        with segment_path(self.path, 99).open("wb") as file:
+            file.write(encode(b"P[1,null,null,false,0,2,null]"))
+            file.write(encode(b"D\x01"))
+            file.write(encode(b'P[2,"B2",null,true,0,2,null]'))
+
+        recovered = self.reopen()
+        assert recovered.skipped_frames == 2
+        assert "Skipping invalid frame 0 of wal-00000099.log" in caplog.text
+        assert recovered.get(1).title == "A"
+        assert (recovered.get(2).title, recovered.get(2).completed) == ("B2", True)
+
+    def test_stats_survive_recovery(self):
+        """Test that replaying the snapshot and the log rebuilds the counters."""
+        self.repo.create_many([TodoCreate(title=f"Todo {i}") for i in range(3)])
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.snapshot(wait=True)
+        self.repo.update(2, TodoUpdate(completed=True))
+        self.repo.delete(1)
+        before = self.repo.stats()
+
+        recovered = self.reopen()
+        assert recovered.stats() == before
+        assert (before.total, before.completed) == (2, 1)
+
+    def test_next_id_survives_deleting_the_last_todo(self):
+        """Test that ids are not reused after a restart."""
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        self.repo.delete(2)
+        self.repo.snapshot(wait=True)
+
+        assert self.reopen().create(TodoCreate(title="C")).id == 3
+
+    def test_snapshot_then_tail(self):
+        """Test recovery from a snapshot plus the writes made after it."""
+        self.repo.create_many([TodoCreate(title=f"Todo {i}") for i in range(5)])
+        self.repo.snapshot(wait=True)
+        self.repo.update(3, TodoUpdate(title="After snapshot"))
+        self.repo.delete(5)
+        before = self.repo.list()
+
+        # les segments couverts par le snapshot ont été supprimés
+        assert (self.path / SNAPSHOT_NAME).exists()
+        assert list_segments(self.path) == [2]
+        assert self.reopen().list() == before
+
+    def test_replay_is_idempotent(self):
+        """Test that a log segment replayed over its own snapshot is harmless."""
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.sync()
+        log = segment_path(self.path, 1).read_bytes()
+        self.repo.snapshot(wait=True)
+        before = self.repo.list()
+
+        # crash simulé entre l'écriture du snapshot et la suppression du segment
+        segment_path(self.path, 1).write_bytes(log)
+        assert self.reopen().list() == before
+
+    def test_automatic_snapshots(self):
+        """Test that a snapshot is taken every `snapshot_every` writes."""
+        self.repo.close()
+        self.repo = DurableTodoRepository(self.path, snapshot_every=3)
+        for i in range(7):
+            self.repo.create(TodoCreate(title=f"Todo {i}"))
+        self.repo.snapshot(wait=True)
+
+        assert (self.path / SNAPSHOT_NAME).exists()
+        assert len(self.reopen().list()) == 7
+
+    def test_snapshot_does_no_io_on_the_writer(self, monkeypatch):
+        """Test that the write triggering a snapshot leaves rotation to threads."""
+        self.repo.close()
+        self.repo = DurableTodoRepository(self.path, snapshot_every=3)
+        callers = []
+        fsync = os.fsync
+
+        def recording_fsync(fd):
+            callers.append(threading.current_thread())
+            fsync(fd)
+
+        monkeypatch.setattr(os, "fsync", recording_fsync)
+        for i in range(3):
+            self.repo.create(TodoCreate(title=f"Todo {i}"))
+        assert self.repo._log.segment == 3
+        self.repo.snapshot(wait=True)
+
+        assert callers
+        assert threading.current_thread() not in callers
+        assert list_segments(self.path) == [3]
+        assert len(self.reopen().list()) == 3
+
+    def test_writes_are_durable_without_close(self):
+        """Test that sync() alone makes writes recoverable (crash, no close)."""
+        self.repo.create(TodoCreate(title="Synced"))
+        self.repo.sync()
+
+        crashed = DurableTodoRepository(self.path)
+        assert [t.title for t in crashed.list()] == ["Synced"]
+        crashed.close()
+
+
+class TestDurableBackend:
+    """Test selecting the durable backend from settings."""
+
+    def test_build_repository(self, tmp_path):
+        """Test that STORAGE_BACKEND=durable uses JOURNAL_DIR and runs inline."""
+        settings = Settings(
+            secret_key="test",
+            storage_backend="durable",
+            journal_dir=str(tmp_path / "journal"),
+        )
+        repo = build_repository(settings)
+        assert isinstance(repo, DurableTodoRepository)
+        assert repo.directory == tmp_path / "journal"
+        repo.close()
+
+        adapter = build_async_repository(settings)
+        assert adapter.executor is None
+        adapter.repo.close()
@@ -0,0 +1,136 @@
+"""Tests for content negotiation and compression helpers."""
+
+import gzip
+import zlib
+from datetime import UTC, date, datetime
+
+import pytest
+from pydantic import TypeAdapter
+
+from todo_app import encoding
+from todo_app.encoding import (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    CompressionOptions,
+    negotiate_media_type,
+    pack,
+    parse_quality,
+    unpack,
+)
+from todo_app.models import TodoInDB, TodoStats
+
+msgpack = pytest.importorskip("msgpack")
+zstandard = pytest.importorskip("zstandard")
+
+BODY = b'{"title": "Todo"}\n' * 200
+
+
+@pytest.fixture
+def without(monkeypatch):
+    """Pretend that an optional package is not installed."""
+
+    def hide(name):
+        monkeypatch.setattr(encoding, f"{name}_module", lambda: None)
+
+    return hide
+
+
+class TestNegotiation:
+    """Test Accept / Accept-Encoding parsing and media type selection."""
+
+    def test_parse_quality(self):
+        """Test weights, defaults, duplicates and invalid values."""
+        weights = parse_quality("GZIP;q=0.5, zstd, br;q=x, , gzip;q=0.8")
+        assert weights == {"gzip": 0.8, "zstd": 1.0, "br": 0.0}
+
+    def test_json_is_the_default(self):
+        """Test that MessagePack must be asked for explicitly."""
+        assert negotiate_media_type(None) == JSON_MEDIA_TYPE
+        assert negotiate_media_type("*/*") == JSON_MEDIA_TYPE
+        assert negotiate_media_type("text/html") == JSON_MEDIA_TYPE
+        assert negotiate_media_type(f"{MSGPACK_MEDIA_TYPE}, */*") == MSGPACK_MEDIA_TYPE
+        assert (
+            negotiate_media_type(f"{JSON_MEDIA_TYPE};q=0.9, {MSGPACK_MEDIA_TYPE}")
+            == MSGPACK_MEDIA_TYPE
+        )
+        assert (
+            negotiate_media_type(f"{JSON_MEDIA_TYPE}, {MSGPACK_MEDIA_TYPE}")
+            == JSON_MEDIA_TYPE
+        )
+
+    def test_msgpack_not_installed(self, without):
+        """Test that JSON is served when msgpack is missing."""
+        without("msgpack")
+        assert negotiate_media_type(MSGPACK_MEDIA_TYPE) == JSON_MEDIA_TYPE
+
+    def test_choose_encoding(self):
+        """Test q-values, the wildcard and the server preference order."""
+        options = CompressionOptions()
+
+        assert options.choose(None) is None
+        assert options.choose("gzip, zstd") == "zstd"
+        assert options.choose("gzip, zstd;q=0.5") == "gzip"
+        assert options.choose("*") == "zstd"
+        assert options.choose("*, zstd;q=0") == "gzip"
+        assert options.choose("br, identity") is None
+        assert CompressionOptions(encodings=()).choose("gzip") is None
+
+    def test_zstd_not_installed(self, without):
+        """Test that zstd is never chosen without zstandard."""
+        without("zstd")
+        options = CompressionOptions()
+        assert options.available() == ("gzip",)
+        assert options.choose("zstd") is None
+        assert options.choose("zstd, gzip") == "gzip"
+
+
+class TestCodecs:
+    """Test MessagePack serialization and compression round trips."""
+
+    def test_pack_todo(self):
+        """Test that datetimes travel as MessagePack timestamps."""
+        todo = TodoInDB(id=1, title="Todo", created_at=datetime.now(UTC))
+
+        data = unpack(pack(TypeAdapter(TodoInDB), todo))
+        assert data["created_at"] == todo.created_at
+        assert TodoInDB.model_validate(data) == todo
+
+    def test_pack_stats_dates(self):
+        """Test that date keys are packed as ISO strings."""
+        stats = TodoStats(
+            total=1, completed=0, open=1, created_per_day={date(2024, 1, 2): 1}
+        )
+
+        data = unpack(pack(TypeAdapter(TodoStats), stats))
+        assert data["created_per_day"] == {"2024-01-02": 1}
+
+    def test_pack_unsupported_type(self):
+        """Test that values without a MessagePack form are rejected."""
+        with pytest.raises(TypeError, match="Cannot serialize"):
+            pack(TypeAdapter(object), object())
+
+    @pytest.mark.parametrize("name", ["gzip", "zstd"])
+    def test_compress(self, name):
+        """Test one-shot compression at the configured level."""
+        options = CompressionOptions(levels={"gzip": 1, "zstd": 1})
+
+        compressed = options.compress(BODY, name)
+        assert len(compressed) < len(BODY)
+        if name == "gzip":
+            assert gzip.decompress(compressed) == BODY
+        else:
+            reader = zstandard.ZstdDecompressor().decompressobj()
+            assert reader.decompress(compressed) == BODY
+
+    @pytest.mark.parametrize("name", ["gzip", "zstd"])
+    def test_stream_compressor(self, name):
+        """Test that each streamed chunk is decodable as soon as it is sent."""
+        compressor = CompressionOptions().compressor(name)
+        if name == "gzip":
+            reader = zlib.decompressobj(31)
+        else:
+            reader = zstandard.ZstdDecompressor().decompressobj()
+
+        for chunk in (b"first line\n", b"second line\n"):
+            assert reader.decompress(compressor.compress(chunk)) == chunk
+        assert reader.decompress(compressor.finish()) == b""
@@ -0,0 +1,60 @@
+"""Tests for the change feed - numbering, resume tokens and subscribers."""
+
+import asyncio
+
+import pytest
+
+from todo_app.events import ChangeFeed, StaleResumeToken
+
+
+class TestChangeFeed:
+    """Test ChangeFeed functionality."""
+
+    def setup_method(self):
+        """Set up a small feed for each test."""
+        self.feed = ChangeFeed(capacity=3)
+
+    def test_publish_and_since(self):
+        """Test that events are numbered and replayed after a token."""
+        assert self.feed.last_seq == 0
+        assert self.feed.since(0) == []
+
+        event = self.feed.publish("deleted", 7)
+        self.feed.publish("deleted", 8)
+
+        assert event.seq == 1
+        assert event.todo is None
+        assert [e.id for e in self.feed.since(0)] == [7, 8]
+        assert [e.id for e in self.feed.since(1)] == [8]
+        assert self.feed.since(2) == []
+
+    def test_stale_tokens(self):
+        """Test tokens that fell out of the buffer or come from the future."""
+        for todo_id in range(5):
+            self.feed.publish("deleted", todo_id)
+
+        assert [e.seq for e in self.feed.since(2)] == [3, 4, 5]
+        with pytest.raises(StaleResumeToken):
+            self.feed.since(1)
+        # jeton d'un serveur précédent, plus avancé que celui-ci
+        with pytest.raises(StaleResumeToken):
+            self.feed.since(6)
+
+    @pytest.mark.asyncio
+    async def test_wait_wakes_up_subscribers(self):
+        """Test that waiting subscribers receive the next events."""
+        subscribers = [asyncio.create_task(self.feed.wait(0)) for _ in range(3)]
+        await asyncio.sleep(0)
+        self.feed.publish("deleted", 1)
+
+        for events in await asyncio.gather(*subscribers):
+            assert [e.id for e in events] == [1]
+        assert self.feed._waiters == set()
+
+    @pytest.mark.asyncio
+    async def test_wait_timeout_and_backlog(self):
+        """Test that wait returns at once with a backlog, and [] on timeout."""
+        assert await self.feed.wait(0, timeout=0.01) == []
+        self.feed.publish("deleted", 1)
+        assert [e.id for e in await self.feed.wait(0, timeout=10)] == [1]
+        assert self.feed._waiters == set()
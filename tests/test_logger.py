@@ -0,0 +1,126 @@
+"""Tests for the logging configuration - queue mode, JSON and sampling."""
+
+import io
+import json
+import logging
+import logging.handlers
+import sys
+
+import pytest
+from pydantic import ValidationError
+
+from todo_app.config import Settings
+from todo_app.logger import (
+    JsonFormatter,
+    SamplingFilter,
+    configure_logging,
+    shutdown_logging,
+)
+
+
+def make_record(level=logging.INFO, msg="Creating todo: %s", args=("Test",)):
+    """Build a log record as a logger call would."""
+    return logging.LogRecord("todo_app", level, __file__, 1, msg, args, None)
+
+
+class TestJsonFormatter:
+    """Test JsonFormatter output."""
+
+    def test_one_json_object_per_record(self):
+        """Test that the message is interpolated into a JSON document."""
+        entry = json.loads(JsonFormatter().format(make_record()))
+
+        assert entry["level"] == "INFO"
+        assert entry["logger"] == "todo_app"
+        assert entry["message"] == "Creating todo: Test"
+        assert entry["ts"].endswith("+00:00")
+
+    def test_exception(self):
+        """Test that the traceback is kept in its own field."""
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            record = logging.LogRecord(
+                "todo_app", logging.ERROR, __file__, 1, "Failed", (), sys.exc_info()
+            )
+        entry = json.loads(JsonFormatter().format(record))
+        assert "ValueError: boom" in entry["exc_info"]
+
+
+class TestSamplingFilter:
+    """Test SamplingFilter behavior."""
+
+    def test_keeps_one_in_n(self):
+        """Test that a 0.1 rate keeps exactly one record in ten."""
+        sampler = SamplingFilter({"info": 0.1})
+        kept = [sampler.filter(make_record()) for _ in range(100)]
+        assert sum(kept) == 10
+
+    def test_rate_is_kept_exactly(self):
+        """Test rates that are not one in n, and a full rate."""
+        for rate, expected in [(0.75, 75), (0.3, 30), (2 / 3, 67), (1, 100)]:
+            sampler = SamplingFilter({"INFO": rate})
+            kept = [sampler.filter(make_record()) for _ in range(100)]
+            assert kept[0]
+            assert sum(kept) == expected
+
+    def test_other_levels_untouched(self):
+        """Test that unconfigured levels always pass."""
+        sampler = SamplingFilter({"DEBUG": 0.5})
+        assert all(sampler.filter(make_record(logging.WARNING)) for _ in range(5))
+        assert sum(sampler.filter(make_record(logging.DEBUG)) for _ in range(6)) == 3
+
+    def test_invalid_rates(self):
+        """Test that rates outside (0, 1] are refused, in the filter and settings."""
+        for rate in (0, -0.5, 1.5, 10):
+            with pytest.raises(ValueError, match=r"\(0, 1\]"):
+                SamplingFilter({"INFO": rate})
+            with pytest.raises(ValidationError, match=r"\(0, 1\]"):
+                Settings(secret_key="test", log_sampling={"INFO": rate})
+
+
+class TestConfigureLogging:
+    """Test configure_logging handler setup."""
+
+    @pytest.fixture(autouse=True)
+    def _restore(self):
+        """Restore the todo_app logger handlers after each test."""
+        app_logger = logging.getLogger("todo_app")
+        handlers, level = list(app_logger.handlers), app_logger.level
+        yield
+        configure_logging(Settings(secret_key="test", log_async=False))
+        app_logger.handlers[:] = handlers
+        app_logger.setLevel(level)
+
+    def test_async_mode_writes_from_listener(self):
+        """Test that records go through a queue and reach the stream."""
+        stream = io.StringIO()
+        configure_logging(Settings(secret_key="test", log_format="json"), stream)
+        app_logger = logging.getLogger("todo_app")
+        assert isinstance(app_logger.handlers[0], logging.handlers.QueueHandler)
+
+        app_logger.info("Creating todo: %s", "Test")
+        shutdown_logging()
+
+        assert json.loads(stream.getvalue())["message"] == "Creating todo: Test"
+
+    def test_sync_mode_with_sampling(self):
+        """Test the synchronous text handler with sampled INFO records."""
+        stream = io.StringIO()
+        settings = Settings(
+            secret_key="test",
+            log_async=False,
+            log_level="debug",
+            log_sampling={"INFO": 0.5},
+        )
+        assert configure_logging(settings, stream) is None
+
+        app_logger = logging.getLogger("todo_app")
+        for i in range(4):
+            app_logger.info("Listing todos %d", i)
+        app_logger.warning("Todo %s not found", 1)
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 3
+        assert "WARNING - Todo 1 not found" in lines[-1]
+        assert app_logger.level == logging.DEBUG
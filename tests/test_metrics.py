@@ -0,0 +1,209 @@
+"""Tests for metrics - registry, instrumentation and the /metrics endpoint."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from todo_app.api import create_app
+from todo_app.config import Settings, get_settings
+from todo_app.metrics import (
+    AppMetrics,
+    Counter,
+    Gauge,
+    Histogram,
+    _Metric,
+    instrument,
+)
+from todo_app.models import TodoCreate
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+
+class TestMetricFamilies:
+    """Test counters, gauges and histograms rendering."""
+
+    def test_counter(self):
+        """Test that a counter sums increments per label combination."""
+        counter = Counter("hits_total", "Hits.", ("route",))
+        counter.labels("/a").inc()
+        counter.labels("/a").inc(2)
+        counter.labels('/b"').inc()
+
+        assert counter.labels("/a").value == 3
+        assert counter.render().splitlines() == [
+            "# HELP hits_total Hits.",
+            "# TYPE hits_total counter",
+            'hits_total{route="/a"} 3',
+            'hits_total{route="/b\\""} 1',
+        ]
+
+    def test_labels_are_checked(self):
+        """Test that the number of label values must match the label names."""
+        with pytest.raises(ValueError, match="expects labels"):
+            Counter("hits_total", "Hits.", ("route",)).labels("/a", "GET")
+        with pytest.raises(ValueError, match="expects labels"):
+            Gauge("size", "Size.").labels("extra")
+
+    def test_metric_families_define_their_series(self):
+        """Test that a metric family without a series type cannot be built."""
+
+        class Untyped(_Metric):
+            kind = "untyped"
+
+        with pytest.raises(TypeError, match="_new_series"):
+            Untyped("nothing", "Nothing.")
+
+    def test_gauge(self):
+        """Test that a gauge keeps the last value set."""
+        gauge = Gauge("size", "Size.")
+        gauge.labels().set(4)
+        gauge.labels().set(2)
+        assert gauge.labels().value == 2
+        assert gauge.render().splitlines()[-1] == "size 2"
+
+    def test_histogram_is_cumulative(self):
+        """Test bucket counts, sum and count of a histogram."""
+        histogram = Histogram("latency", "Latency.", ("op",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.labels("get").observe(value)
+
+        assert histogram.labels("get").count == 4
+        assert histogram.render().splitlines()[2:] == [
+            'latency_bucket{op="get",le="0.1"} 2',
+            'latency_bucket{op="get",le="1.0"} 3',
+            'latency_bucket{op="get",le="+Inf"} 4',
+            'latency_sum{op="get"} 3.65',
+            'latency_count{op="get"} 4',
+        ]
+
+
+class TestInstrument:
+    """Test timing of service and repository methods."""
+
+    def test_instrument_service(self):
+        """Test that service and repository calls are timed per method."""
+        metrics = AppMetrics(enabled=True)
+        service = AsyncTodoService(AsyncRepositoryAdapter(InMemoryTodoRepository()))
+        metrics.instrument_service(service)
+        metrics.instrument_service(service)
+
+        async def scenario():
+            await service.create_todo(TodoCreate(title="Todo"))
+            await service.list_todos()
+
+        asyncio.run(scenario())
+
+        assert metrics.service_duration.labels("create_todo").count == 1
+        assert metrics.service_duration.labels("list_todos").count == 1
+        assert metrics.repository_duration.labels("create").count == 1
+        assert metrics.repository_duration.labels("list").count == 1
+        # la classe n'est pas modifiée
+        assert "create_todo" not in vars(AsyncTodoService(service.repo))
+
+    def test_failures_are_timed(self):
+        """Test that a call raising an exception is still recorded."""
+        histogram = Histogram("latency", "Latency.", ("op",))
+        service = AsyncTodoService(AsyncRepositoryAdapter(InMemoryTodoRepository()))
+        instrument(service, histogram)
+
+        with pytest.raises(ValueError, match="not found"):
+            asyncio.run(service.delete_todo(42))
+        assert histogram.labels("delete_todo").count == 1
+
+
+class TestMetricsEndpoint:
+    """Test the middleware and GET /metrics."""
+
+    @pytest.fixture(autouse=True)
+    def metrics(self):
+        """Build an application with metrics enabled and an instrumented service."""
+        self.app = create_app()
+        metrics = self.app.state.metrics
+        metrics.enabled = True
+        self.service = AsyncTodoService(
+            AsyncRepositoryAdapter(InMemoryTodoRepository())
+        )
+        metrics.instrument_service(self.service)
+        # service déjà construit: la configuration n'est pas lue
+        self.app.state.service = self.service
+        return metrics
+
+    def test_requests_are_counted_by_route(self, metrics):
+        """Test request counts and durations labelled with the route template."""
+        client = TestClient(self.app)
+        client.post("/todos", json={"title": "Todo"})
+        client.patch("/todos/1", json={"completed": True})
+        client.patch("/todos/99", json={"completed": True})
+        client.get("/nowhere")
+
+        assert metrics.requests.labels("POST", "/todos", "201").value == 1
+        assert metrics.requests.labels("PATCH", "/todos/{todo_id}", "200").value == 1
+        assert metrics.requests.labels("PATCH", "/todos/{todo_id}", "404").value == 1
+        assert metrics.requests.labels("GET", "<unmatched>", "404").value == 1
+        assert metrics.request_duration.labels("PATCH", "/todos/{todo_id}").count == 2
+
+    def test_metrics_endpoint(self):
+        """Test the Prometheus text exposition."""
+        client = TestClient(self.app)
+        client.post("/todos/bulk", json=[{"title": "A"}, {"title": "B"}])
+        client.get("/todos")
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        body = response.text
+        assert "# TYPE todo_http_requests_total counter" in body
+        assert (
+            'todo_http_requests_total{method="GET",route="/todos",status="200"} 1'
+            in body
+        )
+        assert 'todo_service_duration_seconds_count{method="create_todos"} 1' in body
+        assert 'todo_repository_duration_seconds_count{operation="list"} 1' in body
+        assert "todo_store_todos 2" in body
+        assert "todo_change_feed_last_seq 2" in body
+        assert "todo_list_cache_entries 1" in body
+
+    def test_metrics_disabled(self, metrics):
+        """Test that nothing is recorded or exposed when metrics are disabled."""
+        metrics.enabled = False
+        client = TestClient(self.app)
+        client.get("/health")
+
+        assert client.get("/metrics").status_code == 404
+        assert metrics.requests.labels("GET", "/health", "200").value == 0
+
+
+class TestMetricsSettings:
+    """Test that METRICS_ENABLED applies from the first request."""
+
+    def test_first_requests_are_counted(self):
+        """Test that probes and the request building the service are counted."""
+        app = create_app(
+            Settings(secret_key="test", metrics_enabled=True, log_async=False)
+        )
+        client = TestClient(app)
+        for _ in range(3):
+            client.get("/health")
+        client.get("/todos")
+        client.get("/todos")
+
+        metrics = app.state.metrics
+        assert metrics.requests.labels("GET", "/health", "200").value == 3
+        assert metrics.requests.labels("GET", "/todos", "200").value == 2
+
+    def test_settings_read_at_startup(self, monkeypatch):
+        """Test that without settings, the environment is read by the lifespan."""
+        monkeypatch.setenv("SECRET_KEY", "test")
+        monkeypatch.setenv("METRICS_ENABLED", "true")
+        monkeypatch.setenv("LOG_ASYNC", "false")
+        # get_settings garde la configuration lue par un test précédent
+        get_settings.cache_clear()
+        app = create_app()
+        assert not app.state.metrics.enabled
+
+        with TestClient(app) as client:
+            client.get("/health")
+        assert app.state.metrics.enabled
+        assert app.state.metrics.requests.labels("GET", "/health", "200").value == 1
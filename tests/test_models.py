@@ -5,7 +5,14 @@ from datetime import UTC, datetime
 import pytest
 from pydantic import ValidationError
 
-from todo_app.models import TodoCreate, TodoInDB, TodoUpdate
+from todo_app.models import (
+    TodoCreate,
+    TodoInDB,
+    TodoQuery,
+    TodoUpdate,
+    projector,
+    row_adapter,
+)
 
 
 class TestTodoCreate:
@@ -85,3 +92,60 @@ class TestTodoUpdate:
         with pytest.raises(ValidationError) as exc_info:
             TodoUpdate(title="")
         assert "String should have at least 1 character" in str(exc_info.value)
+
+    def test_todo_update_rejects_null(self):
+        """Test that title and completed may be omitted but not null."""
+        for field in ("title", "completed"):
+            with pytest.raises(ValidationError, match="not null"):
+                TodoUpdate.model_validate({field: None})
+        update = TodoUpdate.model_validate({"description": None})
+        assert update.model_dump(exclude_unset=True) == {"description": None}
+
+
+class TestTodoQuery:
+    """Test TodoQuery model."""
+
+    def test_naive_dates_are_utc(self):
+        """Test that naive datetimes are interpreted as UTC."""
+        query = TodoQuery(created_after=datetime(2024, 1, 1))
+        assert query.created_after == datetime(2024, 1, 1, tzinfo=UTC)
+
+    def test_limit_must_be_positive(self):
+        """Test validation error for a zero limit."""
+        with pytest.raises(ValidationError):
+            TodoQuery(limit=0)
+
+    def test_fields(self):
+        """Test that fields are checked, completed with `id` and ordered."""
+        assert TodoQuery().fields is None
+        assert TodoQuery(fields=("completed", "title")).fields == (
+            "id",
+            "title",
+            "completed",
+        )
+        assert TodoQuery(fields=()).fields == ("id",)
+        assert TodoQuery(fields=tuple(TodoInDB.model_fields)).fields is None
+        with pytest.raises(ValidationError, match="Unknown fields: nope"):
+            TodoQuery(fields=("title", "nope"))
+
+    def test_projection(self):
+        """Test that a projected row serializes like the full todo."""
+        todo = TodoInDB(id=1, title="Test", created_at=datetime(2024, 1, 2, tzinfo=UTC))
+        fields = ("id", "created_at")
+
+        row = projector(fields)(todo)
+        assert row == {"id": 1, "created_at": todo.created_at}
+        assert projector(("id",))(todo) == {"id": 1}
+        assert row_adapter(fields).dump_json([row]) == (
+            b'[{"id":1,"created_at":"2024-01-02T00:00:00Z"}]'
+        )
+        assert row_adapter(fields, many=False).validate_python(row) == row
+
+    def test_matches(self):
+        """Test filter matching on a todo."""
+        now = datetime.now(UTC)
+        todo = TodoInDB(id=1, title="Test", completed=True, created_at=now)
+        assert TodoQuery().matches(todo)
+        assert TodoQuery(completed=True, created_after=now).matches(todo)
+        assert not TodoQuery(completed=False).matches(todo)
+        assert not TodoQuery(created_before=now).matches(todo)
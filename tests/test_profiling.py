@@ -0,0 +1,232 @@
+"""Tests for request profiling - layer timings, capture and /debug/profiles."""
+
+import asyncio
+from datetime import UTC, datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from todo_app.api import create_app
+from todo_app.config import Settings
+from todo_app.metrics import AppMetrics
+from todo_app.models import TodoCreate
+from todo_app.profiling import (
+    ID_HEADER,
+    TOKEN_HEADER,
+    Profiler,
+    ProfilingMiddleware,
+    _current,
+    _Timings,
+)
+from todo_app.repository import AsyncRepositoryAdapter, InMemoryTodoRepository
+from todo_app.service import AsyncTodoService
+
+
+def make_service():
+    return AsyncTodoService(AsyncRepositoryAdapter(InMemoryTodoRepository()))
+
+
+class TestLayerTimings:
+    """Test the per-request breakdown across service and repository."""
+
+    def test_breakdown(self):
+        """Test self times, nested calls counted once and the API remainder."""
+        timings = _Timings()
+        timings.depth["service"] = 1
+        timings.add("repository", "repository.get", 0.002)
+        timings.add("repository", "repository.update", 0.003)
+        timings.depth["service"] = 0
+        timings.add("service", "service.update_todo", 0.006)
+        timings.add("repository", "repository.revision", 0.001)
+
+        assert timings.breakdown(0.010) == {
+            "api": 3.0,
+            "service": 1.0,
+            "repository": 6.0,
+        }
+        assert timings.calls["repository.get"] == [1, 0.002]
+
+    def test_instrument_service(self):
+        """Test that calls are timed only inside a profiled request."""
+        profiler = Profiler(enabled=True)
+        service = make_service()
+        AppMetrics(enabled=True).instrument_service(service)
+        profiler.instrument_service(service)
+        profiler.instrument_service(service)
+        timings = _Timings()
+
+        async def scenario():
+            await service.create_todo(TodoCreate(title="Todo"))
+            reset = _current.set(timings)
+            try:
+                await service.list_todos()
+            finally:
+                _current.reset(reset)
+
+        asyncio.run(scenario())
+
+        assert set(timings.calls) == {"service.list_todos", "repository.list"}
+        assert timings.calls["service.list_todos"][0] == 1
+        assert timings.layers["service"] >= timings.layers["repository"] > 0
+
+
+class TestProfiler:
+    """Test the profiler settings, token check and ring buffer."""
+
+    def test_inactive_by_default(self):
+        """Test that nothing may be profiled without configuration."""
+        profiler = Profiler()
+        assert not profiler.active
+        assert not profiler.authorized("anything")
+        profiler.configure(False, 100, "secret", 10)
+        assert profiler.active
+        assert profiler.authorized("secret")
+        assert not profiler.authorized("wrong")
+        assert not profiler.authorized(None)
+
+    def test_one_cprofile_at_a_time(self):
+        """Test that a second profiler is not started while one runs."""
+        profiler = Profiler(enabled=True)
+        first = profiler.start()
+        try:
+            assert first is not None
+            assert profiler.start() is None
+        finally:
+            profiler.stop(first)
+        second = profiler.start()
+        profiler.stop(second)
+        assert second is not None
+
+    def test_ring_buffer(self):
+        """Test that only the last profiles are kept."""
+        profiler = Profiler(enabled=True, buffer_size=2)
+        scope = {"method": "GET", "path": "/todos"}
+        now = datetime.now(UTC)
+        for _ in range(3):
+            profiler.capture(
+                profiler.next_id(), scope, 200, now, 0.5, "slow", _Timings(), None
+            )
+
+        assert [p.id for p in profiler.profiles] == [2, 3]
+        assert profiler.get(1) is None
+        assert profiler.get(3).layers["api"] == 500.0
+
+
+class TestProfilingMiddleware:
+    """Test request capture and the /debug/profiles endpoints."""
+
+    def build(self, **settings):
+        """Application with the given PROFILING_* settings and a fresh store."""
+        app = create_app(Settings(secret_key="test", log_async=False, **settings))
+        return app, TestClient(app)
+
+    def test_disabled(self):
+        """Test that nothing is profiled, instrumented or exposed by default."""
+        app, client = self.build()
+        client.get("/todos", headers={TOKEN_HEADER: "x"})
+
+        assert not app.state.profiler.profiles
+        assert "list_todos" not in vars(app.state.service)
+        assert client.get("/debug/profiles").status_code == 404
+
+    def test_slow_requests_are_captured(self):
+        """Test threshold capture with the layer breakdown and cProfile rows."""
+        _, client = self.build(
+            profiling_enabled=True, profiling_threshold_ms=0, profiling_token="secret"
+        )
+        client.post("/todos", json={"title": "Todo"})
+        response = client.get("/todos")
+        assert ID_HEADER not in response.headers
+
+        client.headers[TOKEN_HEADER] = "secret"
+        summaries = client.get("/debug/profiles").json()
+        assert [(p["method"], p["path"]) for p in summaries] == [
+            ("GET", "/todos"),
+            ("POST", "/todos"),
+        ]
+        assert summaries[0]["trigger"] == "slow"
+        assert set(summaries[0]["layers"]) == {"api", "service", "repository"}
+        detail = client.get(f"/debug/profiles/{summaries[0]['id']}").json()
+        assert detail["profiled"] is True
+        assert detail["calls"]["service.list_todos"]["calls"] == 1
+        assert "repository.list" in detail["calls"]
+        assert detail["functions"]
+        assert client.get("/debug/profiles/999").status_code == 404
+
+    def test_fast_requests_are_not_kept(self):
+        """Test that requests under the threshold are dropped."""
+        _, client = self.build(
+            profiling_enabled=True, profiling_threshold_ms=1e6, profiling_token="s"
+        )
+        client.get("/todos")
+        assert client.get("/debug/profiles", headers={TOKEN_HEADER: "s"}).json() == []
+
+    def test_token_required_to_read_profiles(self):
+        """Test that profiles captured without a configured token stay hidden."""
+        app, client = self.build(profiling_enabled=True, profiling_threshold_ms=0)
+        client.get("/todos")
+
+        assert app.state.profiler.profiles
+        response = client.get("/debug/profiles", headers={TOKEN_HEADER: ""})
+        assert response.status_code == 403
+        assert client.get("/debug/profiles/1").status_code == 403
+        # lire la configuration du profilage ne construit pas le service
+        fresh = create_app(Settings(secret_key="test", profiling_enabled=True))
+        assert TestClient(fresh).get("/debug/profiles").status_code == 403
+        assert fresh.state.service is None
+
+    def test_token_header(self):
+        """Test on-demand profiling and the protected endpoints."""
+        app, client = self.build(profiling_token="secret", profiling_buffer_size=5)
+        client.get("/todos")
+        client.get("/todos", headers={TOKEN_HEADER: "wrong"})
+        response = client.get("/todos/stats", headers={TOKEN_HEADER: "secret"})
+        profile_id = response.headers[ID_HEADER]
+
+        assert client.get("/debug/profiles").status_code == 403
+        headers = {TOKEN_HEADER: "secret"}
+        summaries = client.get("/debug/profiles", headers=headers).json()
+        assert [(p["id"], p["trigger"]) for p in summaries] == [
+            (int(profile_id), "header")
+        ]
+        assert client.get(f"/debug/profiles/{profile_id}").status_code == 403
+        detail = client.get(f"/debug/profiles/{profile_id}", headers=headers)
+        assert detail.json()["calls"]["service.get_stats"]["calls"] == 1
+        assert app.state.profiler.profiles.maxlen == 5
+
+    @pytest.mark.asyncio
+    async def test_errors_and_concurrent_requests(self):
+        """Test a failing request, and a request overlapping a profiled one."""
+        profiler = Profiler(enabled=True, threshold_ms=0)
+        release = asyncio.Event()
+
+        async def app(scope, receive, send):
+            if scope["path"] == "/fail":
+                raise RuntimeError("boom")
+            if scope["path"] == "/slow":
+                await release.wait()
+            await send({"type": "http.response.start", "status": 204, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+
+        async def send(message):
+            pass
+
+        middleware = ProfilingMiddleware(app, profiler)
+
+        def call(path):
+            scope = {"type": "http", "method": "GET", "path": path, "headers": []}
+            return middleware(scope, None, send)
+
+        with pytest.raises(RuntimeError, match="boom"):
+            await call("/fail")
+        slow = asyncio.create_task(call("/slow"))
+        await asyncio.sleep(0)
+        await call("/fast")
+        release.set()
+        await slow
+
+        captured = {p.path: p for p in profiler.profiles}
+        assert captured["/fail"].status == 500
+        assert captured["/slow"].profiled is True
+        assert captured["/fast"].profiled is False
+        assert captured["/fast"].functions == []
@@ -0,0 +1,215 @@
+"""Tests for the remote repository - protocol, store process and sharing."""
+
+import asyncio
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+from todo_app.config import Settings
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.remote_repository import RemoteTodoRepository, StoreError
+from todo_app.repository import (
+    InMemoryTodoRepository,
+    VersionConflictError,
+    build_async_repository,
+)
+from todo_app.store_server import execute, serve
+
+
+class StoreThread:
+    """Store server running on its own event loop in a background thread."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.repo = InMemoryTodoRepository()
+        self.loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self.loop)
+            self.server = self.loop.run_until_complete(serve(self.repo, path))
+            ready.set()
+            self.loop.run_forever()
+
+        self.thread = threading.Thread(target=run, daemon=True)
+        self.thread.start()
+        ready.wait(5)
+
+    def stop(self) -> None:
+        async def close():
+            # comme l'arrêt du processus: le serveur et ses connexions
+            self.server.close()
+            handlers = asyncio.all_tasks() - {asyncio.current_task()}
+            for task in handlers:
+                task.cancel()
+            await asyncio.gather(*handlers, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(close(), self.loop).result(5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+        self.loop.close()
+
+
+class TestRemoteTodoRepository:
+    """Test RemoteTodoRepository against a store server."""
+
+    @pytest.fixture(autouse=True)
+    def _store(self):
+        """Start a store on a short socket path (Unix sockets limit its length)."""
+        directory = tempfile.mkdtemp(prefix="store")
+        self.path = str(Path(directory) / "s.sock")
+        self.store = StoreThread(self.path)
+        self.repo = RemoteTodoRepository(self.path)
+        yield
+        self.repo.close()
+        self.store.stop()
+        shutil.rmtree(directory)
+
+    def test_crud_round_trip(self):
+        """Test that every operation reaches the store and returns its result."""
+        todo = self.repo.create(TodoCreate(title="Remote", description="Desc"))
+
+        assert todo.id == 1
+        assert self.repo.get(1) == todo
+        assert self.repo.get(2) is None
+        assert self.repo.list() == [todo]
+        assert self.repo.search("rem") == [todo]
+
+        updated = self.repo.update(1, TodoUpdate(completed=True))
+        assert updated.completed is True
+        assert updated.description == "Desc"
+        assert self.repo.update(9, TodoUpdate(title="x")) is None
+        assert self.repo.revision() == 2
+        assert self.repo.count() == 1
+        assert self.repo.stats() == self.store.repo.stats()
+        assert self.repo.stats().completed == 1
+        assert self.repo.delete(1) is True
+        assert self.repo.delete(1) is False
+
+    def test_batches_and_queries(self):
+        """Test bulk operations and query filters over the wire."""
+        created = self.repo.create_many(TodoCreate(title=f"Todo {i}") for i in range(5))
+        assert [t.id for t in created] == [1, 2, 3, 4, 5]
+
+        updated = self.repo.update_many(
+            [(2, TodoUpdate(completed=True)), (9, TodoUpdate(completed=True))]
+        )
+        assert updated[0].completed is True
+        assert updated[1] is None
+        assert self.repo.delete_many(iter([4, 9])) == [True, False]
+
+        page = self.repo.list(TodoQuery(limit=2, after_id=1, completed=False))
+        assert [t.id for t in page] == [3, 5]
+
+        owned = self.repo.create(TodoCreate(title="Owned", owner="alice"))
+        assert owned.owner == "alice"
+        assert self.repo.list(TodoQuery(owner="alice")) == [owned]
+
+    def test_bulk_owner(self):
+        """Test that the owner of a bulk write reaches the store."""
+        self.repo.create_many(
+            [TodoCreate(title="A", owner="alice"), TodoCreate(title="B")]
+        )
+
+        changes = [(1, TodoUpdate(title="x")), (2, TodoUpdate(title="y"))]
+        updated = self.repo.update_many(changes, "alice")
+        assert [t and t.id for t in updated] == [1, None]
+        assert self.repo.delete_many([1, 2], "bob") == [False, False]
+        assert self.repo.delete_many([1, 2]) == [True, True]
+
+    def test_list_fields(self):
+        """Test that only the requested fields travel from the store."""
+        todo = self.repo.create(TodoCreate(title="Remote", description="Desc"))
+
+        query = TodoQuery(fields=("title", "created_at"))
+        expected = {"id": 1, "title": "Remote", "created_at": todo.created_at}
+        assert self.repo.list(query) == [expected]
+        assert self.repo.search("rem", query) == [expected]
+
+    def test_unset_fields_are_preserved(self):
+        """Test that a partial update only changes the fields it sets."""
+        self.repo.create(TodoCreate(title="Title", description="Keep me"))
+        updated = self.repo.update(1, TodoUpdate(description=None))
+
+        assert updated.title == "Title"
+        assert updated.description is None
+
+    def test_version_conflicts(self):
+        """Test that conditional writes are checked by the store."""
+        self.repo.create(TodoCreate(title="Todo"))
+        assert self.repo.update(1, TodoUpdate(title="Renamed"), 1).version == 2
+
+        with pytest.raises(VersionConflictError, match="at version 2") as exc:
+            self.repo.update(1, TodoUpdate(title="Stale"), 1)
+        assert (exc.value.todo_id, exc.value.version) == (1, 2)
+        with pytest.raises(VersionConflictError):
+            self.repo.delete(1, 1)
+        assert self.repo.delete(1, 2) is True
+
+    def test_store_is_shared(self):
+        """Test that two clients (two workers) see the same data."""
+        other = RemoteTodoRepository(self.path)
+        self.repo.create(TodoCreate(title="From worker 1"))
+
+        assert other.get(1).title == "From worker 1"
+        assert other.revision() == self.repo.revision()
+        other.close()
+
+    def test_connection_per_thread(self):
+        """Test concurrent calls from several threads."""
+        ids = []
+
+        def worker():
+            ids.extend(self.repo.create(TodoCreate(title="T")).id for _ in range(20))
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(ids) == list(range(1, 81))
+        assert len(self.repo._sockets) == 4
+
+    def test_reconnects_after_store_restart(self):
+        """Test that a dropped connection fails the call, then reconnects."""
+        self.repo.create(TodoCreate(title="Lost"))
+        self.store.stop()
+        self.store = StoreThread(self.path)
+
+        with pytest.raises(ConnectionError):
+            self.repo.count()
+        assert self.repo.count() == 0
+
+    def test_store_errors(self):
+        """Test that failures are answered with an error frame, not a crash."""
+        self.store.repo.count = lambda: 1 / 0
+
+        with pytest.raises(StoreError, match="count: ZeroDivisionError"):
+            self.repo.count()
+        # code d'opération inconnu, arguments invalides
+        assert execute(self.store.repo, bytes([200])).startswith(b"\x01")
+        assert execute(self.store.repo, b'\x00["x"]').startswith(b"\x01")
+        assert self.repo.revision() == 0
+
+
+class TestRemoteBackend:
+    """Test selecting the remote backend from settings."""
+
+    def test_build_remote_repository(self):
+        """Test that the remote backend is blocking and uses the store socket."""
+        settings = Settings(
+            secret_key="test",
+            storage_backend="remote",
+            store_socket="/tmp/todo-test.sock",
+            repository_workers=2,
+        )
+        repo = build_async_repository(settings)
+
+        assert isinstance(repo.repo, RemoteTodoRepository)
+        assert repo.repo.path == "/tmp/todo-test.sock"
+        assert repo.executor is not None
+        repo.executor.shutdown()
@@ -1,9 +1,11 @@
 """Tests for repository layer - data operations only."""
 
-from datetime import datetime
+from datetime import UTC, date, datetime, timedelta
 
-from todo_app.models import TodoCreate, TodoUpdate
-from todo_app.repository import InMemoryTodoRepository
+import pytest
+
+from todo_app.models import TodoCreate, TodoInDB, TodoQuery, TodoStats, TodoUpdate
+from todo_app.repository import InMemoryTodoRepository, VersionConflictError
 
 
 class TestInMemoryTodoRepository:
@@ -123,3 +125,275 @@ class TestInMemoryTodoRepository:
         """Test deleting a non-existent todo."""
         result = self.repo.delete(999)
         assert result is False
+
+    def test_list_with_limit_and_cursor(self):
+        """Test keyset pagination over todos."""
+        for i in range(5):
+            self.repo.create(TodoCreate(title=f"Todo {i}"))
+
+        first_page = self.repo.list(TodoQuery(limit=2))
+        assert [t.id for t in first_page] == [1, 2]
+
+        second_page = self.repo.list(TodoQuery(limit=2, after_id=first_page[-1].id))
+        assert [t.id for t in second_page] == [3, 4]
+
+        last_page = self.repo.list(TodoQuery(limit=2, after_id=4))
+        assert [t.id for t in last_page] == [5]
+
+    def test_list_cursor_skips_deleted_todos(self):
+        """Test that a cursor pointing to a deleted todo still works."""
+        for i in range(4):
+            self.repo.create(TodoCreate(title=f"Todo {i}"))
+        self.repo.delete(2)
+
+        todos = self.repo.list(TodoQuery(after_id=2))
+        assert [t.id for t in todos] == [3, 4]
+        assert [t.id for t in self.repo.list()] == [1, 3, 4]
+
+    def test_list_filter_completed(self):
+        """Test filtering todos by completion status."""
+        for i in range(4):
+            self.repo.create(TodoCreate(title=f"Todo {i}"))
+        self.repo.update(2, TodoUpdate(completed=True))
+        self.repo.update(4, TodoUpdate(completed=True))
+
+        done = self.repo.list(TodoQuery(completed=True))
+        assert [t.id for t in done] == [2, 4]
+
+        open_todos = self.repo.list(TodoQuery(completed=False, limit=1))
+        assert [t.id for t in open_todos] == [1]
+
+    def test_list_filter_created_range(self):
+        """Test filtering todos by creation date window."""
+        todo = self.repo.create(TodoCreate(title="Todo"))
+        created = todo.created_at
+
+        assert self.repo.list(TodoQuery(created_after=created)) == [todo]
+        assert self.repo.list(TodoQuery(created_before=created)) == []
+        assert self.repo.list(
+            TodoQuery(created_before=created + timedelta(seconds=1))
+        ) == [todo]
+        assert (
+            self.repo.list(TodoQuery(created_after=datetime.now(UTC) + timedelta(1)))
+            == []
+        )
+
+    def test_list_filter_owner(self):
+        """Test filtering by owner, alone and with the other filters."""
+        for i in range(6):
+            owner = ("alice", "bob", None)[i % 3]
+            self.repo.create(TodoCreate(title=f"Todo {i}", owner=owner))
+        self.repo.update(4, TodoUpdate(completed=True))
+
+        alice = TodoQuery(owner="alice")
+        assert [t.id for t in self.repo.list(alice)] == [1, 4]
+        assert self.repo.get(4).owner == "alice"
+        assert [t.id for t in self.repo.list(TodoQuery(owner="bob", limit=1))] == [2]
+        done = TodoQuery(owner="alice", completed=True)
+        assert [t.id for t in self.repo.list(done)] == [4]
+        assert self.repo.list(TodoQuery(owner="carol")) == []
+        since = TodoQuery(owner="bob", created_after=datetime(2000, 1, 1, tzinfo=UTC))
+        assert [t.id for t in self.repo.list(since)] == [2, 5]
+
+        self.repo.delete(1)
+        self.repo.delete(4)
+        assert "alice" not in self.repo._owner_index
+        assert self.repo._owner_index == {"bob": [2, 5]}
+
+    def test_list_fields(self):
+        """Test that lists and searches return only the requested fields."""
+        for i in range(4):
+            self.repo.create(TodoCreate(title=f"Todo {i}", description="Note"))
+        self.repo.update(3, TodoUpdate(completed=True))
+
+        query = TodoQuery(completed=False, limit=2, fields=("title",))
+        assert self.repo.list(query) == [
+            {"id": 1, "title": "Todo 0"},
+            {"id": 2, "title": "Todo 1"},
+        ]
+        found = self.repo.search("note", TodoQuery(fields=("completed",)))
+        assert [t["completed"] for t in found] == [False, False, True, False]
+
+    def test_id_step(self):
+        """Test that ids are allocated from first_id by id_step."""
+        repo = InMemoryTodoRepository(first_id=7, id_step=4)
+        todos = repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+
+        assert [t.id for t in todos] == [7, 11]
+        repo.delete(11)
+        assert repo.create(TodoCreate(title="C")).id == 15
+
+    def test_indexes_follow_updates_and_deletes(self):
+        """Test that secondary indexes stay current on writes."""
+        for i in range(3):
+            self.repo.create(TodoCreate(title=f"Todo {i}"))
+        self.repo.update(2, TodoUpdate(completed=True))
+        assert self.repo._status_index == {False: [1, 3], True: [2]}
+
+        self.repo.update(2, TodoUpdate(title="Still done"))
+        self.repo.update(3, TodoUpdate(completed=True))
+        self.repo.delete(2)
+        assert self.repo._ids == [1, 3]
+        assert self.repo._status_index == {False: [1], True: [3]}
+        assert [todo_id for _, todo_id in self.repo._created_index] == [1, 3]
+
+    def test_created_range_uses_index_order(self):
+        """Test created_at range queries when dates do not follow id order."""
+        base = datetime(2024, 1, 1, tzinfo=UTC)
+        for todo_id, days in [(1, 3), (2, 1), (3, 2), (4, 10)]:
+            self.repo._insert(
+                TodoInDB(id=todo_id, title="t", created_at=base + timedelta(days))
+            )
+
+        query = TodoQuery(
+            created_after=base + timedelta(days=1),
+            created_before=base + timedelta(days=4),
+        )
+        assert [t.id for t in self.repo.list(query)] == [1, 2, 3]
+        paged = query.model_copy(update={"limit": 1, "after_id": 1})
+        assert [t.id for t in self.repo.list(paged)] == [2]
+        assert not self.repo._created_sorted
+        assert self.repo.create(TodoCreate(title="next")).id == 5
+
+    def test_created_range_in_id_order(self):
+        """Test created_at ranges bisected to id bounds when dates follow ids."""
+        base = datetime(2024, 1, 1, tzinfo=UTC)
+        # deux todos par jour, ids 1 à 10, insérés dans le désordre
+        for todo_id in [2, 1, 4, 3, 6, 5, 8, 7, 10, 9]:
+            created_at = base + timedelta(days=(todo_id - 1) // 2)
+            self.repo._insert(TodoInDB(id=todo_id, title="t", created_at=created_at))
+        self.repo.update(4, TodoUpdate(completed=True))
+        assert self.repo._created_sorted
+
+        query = TodoQuery(
+            created_after=base + timedelta(days=1),
+            created_before=base + timedelta(days=4),
+        )
+        assert [t.id for t in self.repo.list(query)] == [3, 4, 5, 6, 7, 8]
+        paged = query.model_copy(update={"limit": 2, "after_id": 3})
+        assert [t.id for t in self.repo.list(paged)] == [4, 5]
+        done = query.model_copy(update={"completed": False})
+        assert [t.id for t in self.repo.list(done)] == [3, 5, 6, 7, 8]
+        late = TodoQuery(created_after=base + timedelta(days=9))
+        assert self.repo.list(late) == []
+
+        # une date antérieure à un id plus petit désactive la bisection ...
+        self.repo._insert(TodoInDB(id=11, title="t", created_at=base))
+        assert not self.repo._created_sorted
+        assert [t.id for t in self.repo.list(query)] == [3, 4, 5, 6, 7, 8]
+        # ... jusqu'à ce que le store soit vidé
+        self.repo.delete_many(range(1, 12))
+        self.repo.create(TodoCreate(title="next"))
+        assert self.repo._created_sorted
+
+    def test_bulk_operations(self):
+        """Test create_many/update_many/delete_many."""
+        todos = self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        assert [t.id for t in todos] == [1, 2]
+        assert todos[0].created_at == todos[1].created_at
+
+        updated = self.repo.update_many(
+            [(1, TodoUpdate(completed=True)), (3, TodoUpdate(title="X"))]
+        )
+        assert updated[0].completed is True
+        assert updated[1] is None
+        assert self.repo._status_index[True] == [1]
+
+        assert self.repo.delete_many([2, 2]) == [True, False]
+        assert [t.id for t in self.repo.list()] == [1]
+
+    def test_bulk_owner(self):
+        """Test that bulk writes with an owner skip the todos of other owners."""
+        self.repo.create_many(
+            [TodoCreate(title="A", owner="alice"), TodoCreate(title="B")]
+        )
+
+        updated = self.repo.update_many(
+            [(1, TodoUpdate(completed=True)), (2, TodoUpdate(completed=True))],
+            owner="alice",
+        )
+        assert [t and t.id for t in updated] == [1, None]
+        assert self.repo.get(2).completed is False
+        assert self.repo.delete_many([2, 1, 9], owner="alice") == [False, True, False]
+        assert [t.id for t in self.repo.list()] == [2]
+
+    def test_revision_changes_on_every_write(self):
+        """Test the write counter used to key cached responses."""
+        assert self.repo.revision() == 0
+        self.repo.create(TodoCreate(title="Todo"))
+        self.repo.update(1, TodoUpdate(title="Renamed"))
+        self.repo.delete(1)
+        assert self.repo.revision() == 3
+        self.repo.update(1, TodoUpdate(title="Missing"))
+        assert self.repo.revision() == 3
+
+    def test_versions(self):
+        """Test that every update bumps the version of the todo."""
+        assert self.repo.create(TodoCreate(title="Todo")).version == 1
+        assert self.repo.update(1, TodoUpdate(title="Renamed")).version == 2
+        assert self.repo.update(1, TodoUpdate(completed=True), 2).version == 3
+        assert self.repo.get(1).version == 3
+
+    def test_conditional_writes_conflict(self):
+        """Test that a stale expected version is refused without any change."""
+        self.repo.create(TodoCreate(title="Todo"))
+        self.repo.update(1, TodoUpdate(title="Renamed"))
+
+        with pytest.raises(VersionConflictError, match="at version 2") as exc:
+            self.repo.update(1, TodoUpdate(title="Stale"), expected_version=1)
+        assert exc.value.version == 2
+        with pytest.raises(VersionConflictError):
+            self.repo.delete(1, expected_version=1)
+        assert self.repo.get(1).title == "Renamed"
+        assert self.repo.revision() == 2
+        assert self.repo.update(9, TodoUpdate(title="x"), 1) is None
+        assert self.repo.delete(9, 1) is False
+        assert self.repo.delete(1, expected_version=2) is True
+
+    def test_count(self):
+        """Test counting stored todos."""
+        assert self.repo.count() == 0
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        self.repo.delete(1)
+        assert self.repo.count() == 1
+
+    def test_stats(self):
+        """Test that stats follow creates, completed flips and deletes."""
+        base = datetime(2024, 1, 1, 23, tzinfo=UTC)
+        for todo_id, hours in [(1, 0), (2, 0), (3, 2)]:
+            self.repo._insert(
+                TodoInDB(
+                    id=todo_id, title="t", created_at=base + timedelta(hours=hours)
+                )
+            )
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.update(2, TodoUpdate(title="Renamed"))
+
+        stats = self.repo.stats()
+        assert (stats.total, stats.completed, stats.open) == (3, 1, 2)
+        assert stats.created_per_day == {date(2024, 1, 1): 2, date(2024, 1, 2): 1}
+
+        self.repo.delete(1)
+        self.repo.delete(3)
+        assert self.repo.stats() == TodoStats(
+            total=1, completed=0, open=1, created_per_day={date(2024, 1, 1): 1}
+        )
+
+    def test_search(self):
+        """Test full-text search, kept in sync with updates and deletes."""
+        self.repo.create(TodoCreate(title="Planifier la réunion"))
+        self.repo.create(TodoCreate(title="Acheter du pain", description="Réunion"))
+        self.repo.create(TodoCreate(title="Réunion d'équipe"))
+
+        assert [t.id for t in self.repo.search("reunion")] == [1, 2, 3]
+        assert [t.id for t in self.repo.search("reu", TodoQuery(limit=2))] == [1, 2]
+        assert [t.id for t in self.repo.search("reu", TodoQuery(after_id=2))] == [3]
+
+        self.repo.update(1, TodoUpdate(title="Planifier", completed=True))
+        self.repo.delete(3)
+        assert [t.id for t in self.repo.search("reunion")] == [2]
+        assert [t.id for t in self.repo.search("plan", TodoQuery(completed=True))] == [
+            1
+        ]
+        assert self.repo.search("plan", TodoQuery(completed=False)) == []
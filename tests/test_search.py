@@ -0,0 +1,100 @@
+"""Tests for the inverted index - normalization, prefixes and updates."""
+
+from todo_app.search import InvertedIndex, normalize, tokenize
+from todo_app.sortedlist import LOAD, SortedList
+
+
+class TestTokenize:
+    """Test text normalization."""
+
+    def test_normalize(self):
+        """Test that case and accents are ignored."""
+        assert normalize("Réunion ÉTÉ Straße") == "reunion ete strasse"
+
+    def test_tokenize(self):
+        """Test word splitting on punctuation, None and empty text."""
+        assert tokenize("Acheter: pain, lait (2x)!") == [
+            "acheter",
+            "pain",
+            "lait",
+            "2x",
+        ]
+        assert tokenize(None) == []
+        assert tokenize("") == []
+
+
+class TestInvertedIndex:
+    """Test InvertedIndex functionality."""
+
+    def setup_method(self):
+        """Set up an index with a few documents."""
+        self.index = InvertedIndex()
+        self.index.add(1, "Planifier la réunion", "Salle B")
+        self.index.add(2, "Réunion d'équipe", None)
+        self.index.add(3, "Acheter du pain", "Boulangerie")
+
+    def search(self, text, after_id=None):
+        return list(self.index.search(text, after_id))
+
+    def test_exact_and_prefix(self):
+        """Test exact words, prefixes and accent-insensitive queries."""
+        assert self.search("reunion") == [1, 2]
+        assert self.search("RÉU") == [1, 2]
+        assert self.search("boul") == [3]
+        assert self.search("inconnu") == []
+        assert self.search("   ") == []
+
+    def test_all_words_must_match(self):
+        """Test that words are combined with AND, across title and description."""
+        assert self.search("reu pla") == [1]
+        assert self.search("reunion salle") == [1]
+        assert self.search("reunion pain") == []
+
+    def test_after_id(self):
+        """Test resuming after a cursor."""
+        assert self.search("reunion", after_id=1) == [2]
+        assert self.search("reunion", after_id=2) == []
+
+    def test_remove_and_replace(self):
+        """Test incremental updates; unused terms leave the vocabulary."""
+        self.index.replace(2, ("Réunion d'équipe", None), ("Déjeuner", None))
+        assert self.search("reunion") == [1]
+        assert self.search("dej") == [2]
+        assert "equipe" not in self.index._vocabulary
+
+        self.index.remove(3, "Acheter du pain", "Boulangerie")
+        assert self.search("pain") == []
+        assert "boulangerie" not in self.index._postings
+
+    def test_out_of_order_ids(self):
+        """Test that re-indexing an old id keeps posting lists sorted."""
+        self.index.add(4, "Pain")
+        self.index.replace(1, ("Planifier la réunion", "Salle B"), ("Pain", None))
+        assert self.search("pain") == [1, 3, 4]
+
+    def test_large_posting_lists(self):
+        """Test a very common term stored in blocks, as driver and as filter."""
+        count = 3 * LOAD
+        for doc_id in range(count, 10, -1):
+            self.index.add(doc_id, f"Todo {doc_id}", "commun" if doc_id % 2 else None)
+        assert isinstance(self.index._postings["todo"], SortedList)
+
+        self.index.replace(
+            count, (f"Todo {count}", None), (f"Todo {count} renamed", None)
+        )
+        self.index.remove(21, "Todo 21", "commun")
+        assert self.search("todo", after_id=18)[:3] == [19, 20, 22]
+        assert self.search("todo commun")[:3] == [11, 13, 15]
+        assert self.search("renamed todo") == [count]
+        assert self.search("1500 tod") == [1500]
+        assert len(self.search("todo")) == count - 11
+
+    def test_broad_prefix(self):
+        """Test a prefix that expands to many terms, used as a filter."""
+        for doc_id in range(10, 30):
+            self.index.add(doc_id, f"tache{doc_id} urgente")
+        self.index.add(40, "urgente")
+
+        assert self.search("urg tache") == list(range(10, 30))
+        assert self.search("tache1 urg") == list(range(10, 20))
+        assert len(self.index) > 20
@@ -1,13 +1,18 @@
 """Tests for service layer - business logic only."""
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC
 from unittest.mock import Mock
 
 import pytest
 
-from todo_app.models import TodoCreate, TodoInDB, TodoUpdate
-from todo_app.repository import InMemoryTodoRepository
-from todo_app.service import TodoService
+from todo_app.models import TodoCreate, TodoInDB, TodoQuery, TodoUpdate
+from todo_app.repository import (
+    AsyncRepositoryAdapter,
+    InMemoryTodoRepository,
+    VersionConflictError,
+)
+from todo_app.service import AsyncTodoService, TodoService
 
 
 class TestTodoService:
@@ -80,6 +85,71 @@ class TestTodoService:
         with pytest.raises(ValueError, match="Todo not found"):
             self.service.delete_todo(999)
 
+    def test_bulk_operations(self):
+        """Test bulk create/update/delete through the service."""
+        todos = self.service.create_todos(
+            [TodoCreate(title="Todo 1"), TodoCreate(title="Todo 2")]
+        )
+        assert [t.id for t in todos] == [1, 2]
+
+        updated = self.service.update_todos(
+            [(1, TodoUpdate(completed=True)), (99, TodoUpdate(completed=True))]
+        )
+        assert updated[0].completed is True
+        assert updated[1] is None
+
+        assert self.service.delete_todos([2, 99]) == [True, False]
+
+    def test_owner_scoped_writes(self):
+        """Test that another owner's todo is reported as not found."""
+        self.service.create_todos(
+            [TodoCreate(title="A", owner="alice"), TodoCreate(title="B")]
+        )
+
+        with pytest.raises(ValueError, match="Todo not found"):
+            self.service.update_todo(1, TodoUpdate(title="x"), owner="bob")
+        with pytest.raises(ValueError, match="Todo not found"):
+            self.service.delete_todo(2, owner="alice")
+        assert self.service.update_todo(1, TodoUpdate(title="x"), owner="alice")
+        updated = self.service.update_todos(
+            [(2, TodoUpdate(completed=True)), (1, TodoUpdate(completed=True))],
+            owner="alice",
+        )
+        assert [t and t.id for t in updated] == [None, 1]
+        assert self.repo.get(2).completed is False
+        assert self.service.delete_todos([1, 2, 9], owner="alice") == [
+            True,
+            False,
+            False,
+        ]
+        assert [t.id for t in self.service.list_todos()] == [2]
+
+    def test_search_todos(self):
+        """Test full-text search through the service."""
+        self.service.create_todos(
+            [TodoCreate(title="Réunion"), TodoCreate(title="Pain")]
+        )
+        assert [t.title for t in self.service.search_todos("pain")] == ["Pain"]
+
+    def test_get_todo(self):
+        """Test reading one todo, scoped to its owner."""
+        todo = self.service.create_todo(TodoCreate(title="Todo", owner="alice"))
+
+        assert self.service.get_todo(1) == todo
+        assert self.service.get_todo(1, owner="alice") == todo
+        for todo_id, owner in ((1, "bob"), (9, None)):
+            with pytest.raises(ValueError, match="Todo not found"):
+                self.service.get_todo(todo_id, owner)
+
+    def test_get_stats(self):
+        """Test the aggregate counters through the service."""
+        self.service.create_todo(TodoCreate(title="A"))
+        self.service.delete_todo(1)
+        self.service.create_todo(TodoCreate(title="B"))
+
+        stats = self.service.get_stats()
+        assert (stats.total, stats.completed, stats.open) == (1, 0, 1)
+
     def test_service_with_mock_repository(self):
         """Test service with mocked repository."""
         mock_repo = Mock()
@@ -110,7 +180,7 @@ class TestTodoService:
 
         result = service.update_todo(1, update_payload)
         assert result == mock_todo
-        mock_repo.update.assert_called_once_with(1, update_payload)
+        mock_repo.update.assert_called_once_with(1, update_payload, None)
 
         # Test update_todo not found
         mock_repo.update.return_value = None
@@ -121,10 +191,155 @@ class TestTodoService:
         # Test delete_todo success
         mock_repo.delete.return_value = True
         service.delete_todo(1)
-        mock_repo.delete.assert_called_once_with(1)
+        mock_repo.delete.assert_called_once_with(1, None)
 
         # Test delete_todo not found
         mock_repo.delete.return_value = False
 
         with pytest.raises(ValueError, match="Todo not found"):
             service.delete_todo(1)
+
+
+class TestAsyncTodoService:
+    """Test AsyncTodoService business logic."""
+
+    def setup_method(self):
+        """Set up an async service over the in-memory repository."""
+        self.repo = InMemoryTodoRepository()
+        self.service = AsyncTodoService(AsyncRepositoryAdapter(self.repo))
+
+    @pytest.mark.asyncio
+    async def test_crud(self):
+        """Test create/list/update/delete through the async service."""
+        todo = await self.service.create_todo(TodoCreate(title="Todo 1"))
+        assert todo.id == 1
+        assert await self.service.list_todos() == [todo]
+
+        updated = await self.service.update_todo(1, TodoUpdate(completed=True))
+        assert updated.completed is True
+
+        await self.service.delete_todo(1)
+        assert await self.service.list_todos() == []
+
+    @pytest.mark.asyncio
+    async def test_not_found(self):
+        """Test that missing todos raise ValueError."""
+        with pytest.raises(ValueError, match="Todo not found"):
+            await self.service.update_todo(999, TodoUpdate(title="Updated"))
+        with pytest.raises(ValueError, match="Todo not found"):
+            await self.service.delete_todo(999)
+        with pytest.raises(ValueError, match="Todo not found"):
+            await self.service.get_todo(999)
+
+    @pytest.mark.asyncio
+    async def test_version_conflict_publishes_nothing(self):
+        """Test that a refused conditional write is neither applied nor published."""
+        await self.service.create_todo(TodoCreate(title="Todo"))
+        seq = self.service.changes.last_seq
+
+        with pytest.raises(VersionConflictError):
+            await self.service.update_todo(1, TodoUpdate(title="Stale"), 2)
+        with pytest.raises(VersionConflictError):
+            await self.service.delete_todo(1, 2)
+        assert self.service.changes.last_seq == seq
+        updated = await self.service.update_todo(1, TodoUpdate(title="New"), 1)
+        assert updated.version == 2
+
+    @pytest.mark.asyncio
+    async def test_bulk_operations(self):
+        """Test bulk operations through the async service."""
+        todos = await self.service.create_todos([TodoCreate(title="A")] * 3)
+        assert [t.id for t in todos] == [1, 2, 3]
+        updated = await self.service.update_todos([(1, TodoUpdate(title="B"))])
+        assert updated[0].title == "B"
+        assert await self.service.delete_todos([1, 9]) == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_owner_scoped_writes(self):
+        """Test owner scoping: refused items are neither applied nor published."""
+        await self.service.create_todos(
+            [TodoCreate(title="A", owner="alice"), TodoCreate(title="B", owner="bob")]
+        )
+        seq = self.service.changes.last_seq
+
+        with pytest.raises(ValueError, match="Todo not found"):
+            await self.service.update_todo(2, TodoUpdate(title="x"), owner="alice")
+        with pytest.raises(ValueError, match="Todo not found"):
+            await self.service.delete_todo(1, owner="bob")
+        changes = [(1, TodoUpdate(completed=True)), (2, TodoUpdate(completed=True))]
+        updated = await self.service.update_todos(changes, owner="bob")
+        assert [t and t.id for t in updated] == [None, 2]
+        assert await self.service.delete_todos([2, 1], owner="bob") == [True, False]
+        events = self.service.changes.since(seq)
+        assert [(e.type, e.id) for e in events] == [("updated", 2), ("deleted", 2)]
+        await self.service.delete_todo(1, owner="alice")
+        assert self.repo.count() == 0
+
+    @pytest.mark.asyncio
+    async def test_owner_scoped_bulk_reads_nothing(self, monkeypatch):
+        """Test that owner-scoped bulk writes leave the check to the repository."""
+        await self.service.create_todos(
+            [TodoCreate(title="A", owner="alice"), TodoCreate(title="B", owner="bob")]
+        )
+
+        def fail(todo_id):
+            raise AssertionError("get called")
+
+        monkeypatch.setattr(self.repo, "get", fail)
+        changes = [(1, TodoUpdate(completed=True)), (2, TodoUpdate(completed=True))]
+        updated = await self.service.update_todos(changes, owner="bob")
+        assert [t and t.id for t in updated] == [None, 2]
+        assert await self.service.delete_todos([1, 2], owner="alice") == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_writes_publish_changes(self):
+        """Test that every successful write is published on the change feed."""
+        todo = await self.service.create_todo(TodoCreate(title="A"))
+        await self.service.create_todos([TodoCreate(title="B"), TodoCreate(title="C")])
+        await self.service.update_todo(1, TodoUpdate(completed=True))
+        await self.service.update_todos([(2, TodoUpdate(title="X")), (9, TodoUpdate())])
+        await self.service.delete_todo(1)
+        await self.service.delete_todos([3, 9])
+
+        events = self.service.changes.since(0)
+        assert [(e.type, e.id) for e in events] == [
+            ("created", 1),
+            ("created", 2),
+            ("created", 3),
+            ("updated", 1),
+            ("updated", 2),
+            ("deleted", 1),
+            ("deleted", 3),
+        ]
+        assert events[0].todo == todo
+        assert events[3].todo.completed is True
+        assert events[-1].todo is None
+
+    @pytest.mark.asyncio
+    async def test_search_todos(self):
+        """Test full-text search through the async service."""
+        await self.service.create_todos(
+            [TodoCreate(title="Réunion"), TodoCreate(title="Pain")]
+        )
+        results = await self.service.search_todos("reu", TodoQuery(limit=5))
+        assert [t.title for t in results] == ["Réunion"]
+
+    @pytest.mark.asyncio
+    async def test_get_stats(self):
+        """Test that stats are read from the repository counters."""
+        await self.service.create_todos([TodoCreate(title="A"), TodoCreate(title="B")])
+        await self.service.update_todo(2, TodoUpdate(completed=True))
+
+        stats = await self.service.get_stats()
+        assert (stats.total, stats.completed, stats.open) == (2, 1, 1)
+
+    @pytest.mark.asyncio
+    async def test_blocking_backend_runs_in_executor(self):
+        """Test that an adapter with an executor calls the repository off-loop."""
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            adapter = AsyncRepositoryAdapter(self.repo, executor)
+            service = AsyncTodoService(adapter)
+
+            todo = await service.create_todo(TodoCreate(title="Threaded"))
+            assert await adapter.get(todo.id) == todo
+            assert await service.list_todos() == [todo]
@@ -0,0 +1,190 @@
+"""Tests for the sharded repository - partitioning, fan-out and isolation."""
+
+import sys
+import threading
+
+import pytest
+
+from todo_app.config import Settings
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.repository import (
+    VersionConflictError,
+    build_async_repository,
+    build_repository,
+)
+from todo_app.sharded_repository import ShardedTodoRepository
+
+OWNERS = ["alice", "bob", "carol", "dave", "erin", "frank"]
+
+
+class TestShardedTodoRepository:
+    """Test ShardedTodoRepository functionality."""
+
+    @pytest.fixture(autouse=True, params=[True, False], ids=["parallel", "serial"])
+    def _repo(self, request):
+        """Set up a repository, with and without the fan-out thread pool."""
+        self.repo = ShardedTodoRepository(shards=4, parallel=request.param)
+        yield
+        self.repo.close()
+
+    def test_ids_encode_their_shard(self):
+        """Test that each owner's todos live in one shard, found from the id."""
+        for owner in OWNERS:
+            todo = self.repo.create(TodoCreate(title="Todo", owner=owner))
+            shard = self.repo.shard_for_owner(owner)
+            assert self.repo.shard_for_id(todo.id) == shard
+            assert self.repo._shards[shard].get(todo.id) == todo
+            assert self.repo.get(todo.id) == todo
+        assert self.repo.get(0) is None
+        assert self.repo.shard_for_owner(None) == self.repo.shard_for_owner("")
+
+    def test_owner_queries_touch_one_shard(self):
+        """Test that an owner's list only reads (and locks) its own shard."""
+        self.repo.create_many(TodoCreate(title="Todo", owner=o) for o in OWNERS)
+        shard = self.repo.shard_for_owner("alice")
+        others = [lock for i, lock in enumerate(self.repo._locks) if i != shard]
+        for lock in others:
+            lock.acquire()
+        try:
+            todos = self.repo.list(TodoQuery(owner="alice"))
+        finally:
+            for lock in others:
+                lock.release()
+
+        assert [t.owner for t in todos] == ["alice"]
+
+    def test_fan_out_merges_by_id(self):
+        """Test cross-shard lists: ordered by id, filtered, paginated."""
+        for i in range(24):
+            self.repo.create(TodoCreate(title=f"Todo {i}", owner=OWNERS[i % 6]))
+        ids = sorted(t.id for t in self.repo.list())
+
+        assert [t.id for t in self.repo.list()] == ids
+        assert len(ids) == 24
+        page = self.repo.list(TodoQuery(limit=5, after_id=ids[3]))
+        assert [t.id for t in page] == ids[4:9]
+        self.repo.update(ids[0], TodoUpdate(completed=True))
+        assert [t.id for t in self.repo.list(TodoQuery(completed=True))] == ids[:1]
+        assert [t.id for t in self.repo.search("todo", TodoQuery(limit=3))] == ids[:3]
+
+        rows = self.repo.list(TodoQuery(limit=5, fields=("owner",)))
+        assert [row["id"] for row in rows] == ids[:5]
+        assert rows[0] == {"id": ids[0], "owner": self.repo.get(ids[0]).owner}
+
+    def test_writes_route_to_the_shard(self):
+        """Test update/delete by id, including conditional writes."""
+        todo = self.repo.create(TodoCreate(title="Todo", owner="bob"))
+
+        assert self.repo.update(todo.id, TodoUpdate(completed=True)).version == 2
+        with pytest.raises(VersionConflictError):
+            self.repo.delete(todo.id, 1)
+        assert self.repo.update(todo.id + 1, TodoUpdate(title="x")) is None
+        assert self.repo.delete(todo.id, 2) is True
+        assert self.repo.delete(todo.id) is False
+
+    def test_bulk_operations_keep_input_order(self):
+        """Test that bulk results follow the request order across shards."""
+        payloads = [
+            TodoCreate(title=f"Todo {i}", owner=OWNERS[i % 6]) for i in range(12)
+        ]
+        todos = self.repo.create_many(payloads)
+        assert [t.title for t in todos] == [p.title for p in payloads]
+        assert [t.owner for t in todos] == [p.owner for p in payloads]
+
+        ids = [todos[5].id, 999, todos[0].id]
+        updated = self.repo.update_many([(i, TodoUpdate(completed=True)) for i in ids])
+        assert [t and t.id for t in updated] == [todos[5].id, None, todos[0].id]
+        assert self.repo.delete_many(ids) == [True, False, True]
+        assert self.repo.count() == 10
+
+    def test_bulk_owner(self):
+        """Test that each shard skips the todos of other owners in a bulk write."""
+        todos = self.repo.create_many(TodoCreate(title="T", owner=o) for o in OWNERS)
+        ids = [todo.id for todo in todos]
+
+        updated = self.repo.update_many(
+            [(i, TodoUpdate(completed=True)) for i in ids], owner="bob"
+        )
+        assert [t and t.id for t in updated] == [None, ids[1], None, None, None, None]
+        assert self.repo.stats().completed == 1
+        deleted = self.repo.delete_many([*ids, 999], owner="carol")
+        assert deleted == [False, False, True, False, False, False, False]
+        assert self.repo.count() == 5
+
+    def test_aggregates(self):
+        """Test revision, count and stats summed over the shards."""
+        todos = self.repo.create_many(TodoCreate(title="T", owner=o) for o in OWNERS)
+        self.repo.update(todos[1].id, TodoUpdate(completed=True))
+        self.repo.delete(todos[2].id)
+
+        assert self.repo.revision() == 8
+        assert self.repo.count() == 5
+        stats = self.repo.stats()
+        assert (stats.total, stats.completed, stats.open) == (5, 1, 4)
+        assert sum(stats.created_per_day.values()) == 5
+
+    def test_concurrent_tenants(self):
+        """Test owners writing from several threads at once."""
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        errors = []
+
+        def worker(owner):
+            try:
+                for i in range(100):
+                    todo = self.repo.create(TodoCreate(title=f"{i}", owner=owner))
+                    self.repo.update(todo.id, TodoUpdate(completed=i % 2 == 0))
+                    self.repo.list(TodoQuery(limit=10))
+            except Exception as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker, args=(o,)) for o in OWNERS]
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        assert errors == []
+        assert self.repo.count() == 600
+        assert len({t.id for t in self.repo.list()}) == 600
+        for owner in OWNERS:
+            assert len(self.repo.list(TodoQuery(owner=owner))) == 100
+        assert self.repo.stats().completed == 300
+
+    def test_invalid_shard_count(self):
+        """Test that at least one shard is required."""
+        with pytest.raises(ValueError, match="shards must be"):
+            ShardedTodoRepository(shards=0)
+
+    def test_parallel_by_default_without_gil(self, monkeypatch):
+        """Test that the fan-out pool is only the default without a GIL."""
+        monkeypatch.setattr(sys, "_is_gil_enabled", lambda: True, raising=False)
+        assert ShardedTodoRepository(shards=2)._executor is None
+        monkeypatch.setattr(sys, "_is_gil_enabled", lambda: False, raising=False)
+        repo = ShardedTodoRepository(shards=2)
+        assert repo._executor is not None
+        repo.close()
+
+
+class TestShardedBackend:
+    """Test selecting the sharded backend from settings."""
+
+    def test_build_repository(self):
+        """Test the shard count from settings."""
+        settings = Settings(secret_key="test", storage_backend="sharded", shard_count=3)
+        repo = build_repository(settings)
+
+        assert isinstance(repo, ShardedTodoRepository)
+        assert repo.shard_count == 3
+        repo.close()
+
+    def test_async_runs_inline(self):
+        """Test that the sharded backend gets no dedicated executor."""
+        repo = build_async_repository(
+            Settings(secret_key="test", storage_backend="sharded")
+        )
+        assert repo.executor is None
+        repo.repo.close()
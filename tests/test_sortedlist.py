@@ -0,0 +1,56 @@
+"""Tests for the blocked sorted list used by the in-memory indexes."""
+
+import random
+
+import pytest
+
+from todo_app.sortedlist import SortedList
+
+
+class TestSortedList:
+    """Test SortedList against a plain sorted list."""
+
+    def test_matches_a_sorted_list(self):
+        """Test random adds and discards with blocks small enough to split."""
+        rng = random.Random(7)
+        values = SortedList(rng.sample(range(1000), 50), load=4)
+        expected = sorted(values)
+        for _ in range(2000):
+            value = rng.randrange(1000)
+            if value in values:
+                values.discard(value)
+                expected.remove(value)
+            else:
+                values.add(value)
+                expected.append(value)
+                expected.sort()
+            assert len(values) == len(expected)
+        assert values == expected
+        assert all(len(block) <= 8 for block in values._blocks)
+        assert values._maxes == [block[-1] for block in values._blocks]
+
+    def test_lookups(self):
+        """Test indexing, bisect_left, before and irange bounds."""
+        values = SortedList(range(0, 100, 2), load=3)
+        assert (values[0], values[10], values[-1]) == (0, 20, 98)
+        with pytest.raises(IndexError):
+            values[50]
+        assert values.bisect_left(11) == 6
+        assert values.bisect_left(1000) == 50
+        assert (values.before(11), values.before(10), values.before(0)) == (10, 8, None)
+        assert values.before(1000) == 98
+        assert list(values.irange(11, 20)) == [12, 14, 16, 18]
+        assert list(values.irange(95)) == [96, 98]
+        assert list(values.irange(hi=5)) == [0, 2, 4]
+        assert list(values.irange(100)) == []
+
+    def test_discard_missing(self):
+        """Test that discarding an absent value is a no-op."""
+        values = SortedList([1, 3])
+        values.discard(2)
+        values.discard(4)
+        values.discard(1)
+        values.discard(3)
+        assert values == []
+        assert not values._blocks
+        assert 1 not in values
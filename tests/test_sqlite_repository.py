@@ -0,0 +1,445 @@
+"""Tests for the SQLite repository - data operations and durability."""
+
+import sqlite3
+import threading
+from datetime import UTC, date, datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from todo_app.api import create_app
+from todo_app.config import Settings
+from todo_app.models import TodoCreate, TodoQuery, TodoUpdate
+from todo_app.repository import (
+    AsyncRepositoryAdapter,
+    InMemoryTodoRepository,
+    VersionConflictError,
+    build_async_repository,
+    build_repository,
+)
+from todo_app.sqlite_repository import SqliteTodoRepository
+
+
+class TestSqliteTodoRepository:
+    """Test SqliteTodoRepository functionality."""
+
+    @pytest.fixture(autouse=True)
+    def _repo(self, tmp_path):
+        """Set up a repository on a fresh database file for each test."""
+        self.path = str(tmp_path / "todos.db")
+        self.repo = SqliteTodoRepository(self.path)
+        yield
+        self.repo.close()
+
+    def test_wal_mode(self):
+        """Test that the database runs in WAL journal mode."""
+        conn = self.repo._connection()
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+    def test_create_and_get(self):
+        """Test creating then reading back a todo."""
+        todo = self.repo.create(TodoCreate(title="Test", description="Desc"))
+
+        assert todo.id == 1
+        assert self.repo.get(1) == todo
+        assert self.repo.get(999) is None
+
+    def test_created_at_round_trip(self):
+        """Test that created_at keeps microsecond precision and UTC."""
+        todo = self.repo.create(TodoCreate(title="Test"))
+        stored = self.repo.get(todo.id)
+
+        assert stored.created_at == todo.created_at
+        assert stored.created_at.tzinfo is not None
+
+    def test_update(self):
+        """Test partial update of a todo."""
+        self.repo.create(TodoCreate(title="Original", description="Desc"))
+
+        updated = self.repo.update(1, TodoUpdate(completed=True))
+        assert updated.completed is True
+        assert updated.title == "Original"
+        assert updated.description == "Desc"
+        # une mise à jour vide reste une écriture: nouvelle version
+        assert self.repo.update(1, TodoUpdate()) == updated.model_copy(
+            update={"version": 3}
+        )
+        assert self.repo.update(999, TodoUpdate(title="x")) is None
+
+    def test_conditional_writes(self):
+        """Test the compare-and-swap done by the UPDATE/DELETE conditions."""
+        self.repo.create(TodoCreate(title="Todo"))
+        assert self.repo.update(1, TodoUpdate(title="Renamed"), 1).version == 2
+
+        with pytest.raises(VersionConflictError, match="at version 2"):
+            self.repo.update(1, TodoUpdate(title="Stale"), 1)
+        with pytest.raises(VersionConflictError, match="at version 2"):
+            self.repo.delete(1, 1)
+        assert self.repo.get(1).title == "Renamed"
+        assert self.repo.revision() == 2
+        assert self.repo.update(9, TodoUpdate(title="x"), 1) is None
+        assert self.repo.delete(9, 1) is False
+        assert self.repo.delete(1, 2) is True
+
+    def test_version_column_added_to_existing_database(self):
+        """Test that a database created before `version` is migrated."""
+        self.repo.close()
+        conn = sqlite3.connect(self.path)
+        conn.executescript(
+            "DROP TABLE todos; CREATE TABLE todos (id INTEGER PRIMARY KEY"
+            " AUTOINCREMENT, title TEXT NOT NULL, description TEXT,"
+            " completed INTEGER NOT NULL DEFAULT 0, created_at INTEGER NOT NULL);"
+            "INSERT INTO todos (title, created_at) VALUES ('Ancien', 0);"
+        )
+        conn.close()
+
+        self.repo = SqliteTodoRepository(self.path)
+        assert self.repo.get(1).version == 1
+        assert self.repo.update(1, TodoUpdate(completed=True), 1).version == 2
+
+    def test_owner(self):
+        """Test storing owners and filtering on them."""
+        self.repo.create_many(
+            [TodoCreate(title="A", owner="alice"), TodoCreate(title="B")]
+        )
+        self.repo.create(TodoCreate(title="C", owner="alice"))
+        self.repo.update(3, TodoUpdate(completed=True))
+
+        assert self.repo.get(1).owner == "alice"
+        assert self.repo.get(2).owner is None
+        assert [t.id for t in self.repo.list(TodoQuery(owner="alice"))] == [1, 3]
+        done = TodoQuery(owner="alice", completed=True)
+        assert [t.id for t in self.repo.list(done)] == [3]
+        assert [t.id for t in self.repo.search("c", TodoQuery(owner="alice"))] == [3]
+
+    def test_owner_column_added_to_existing_database(self):
+        """Test that a database created before `owner` is migrated."""
+        self.repo.close()
+        conn = sqlite3.connect(self.path)
+        conn.executescript(
+            "DROP TABLE todos; CREATE TABLE todos (id INTEGER PRIMARY KEY"
+            " AUTOINCREMENT, title TEXT NOT NULL, description TEXT,"
+            " completed INTEGER NOT NULL DEFAULT 0, created_at INTEGER NOT NULL,"
+            " version INTEGER NOT NULL DEFAULT 1);"
+            "INSERT INTO todos (title, created_at) VALUES ('Ancien', 0);"
+        )
+        conn.close()
+
+        self.repo = SqliteTodoRepository(self.path)
+        assert self.repo.get(1).owner is None
+        assert self.repo.create(TodoCreate(title="New", owner="bob")).owner == "bob"
+        assert [t.id for t in self.repo.list(TodoQuery(owner="bob"))] == [2]
+
+    def test_concurrent_migration(self):
+        """Test workers opening a pre-upgrade database at once migrate it once."""
+        self.repo.close()
+        conn = sqlite3.connect(self.path)
+        conn.executescript(
+            "DROP TABLE todos_fts; DROP TABLE todo_days; DROP TABLE todos;"
+            "CREATE TABLE todos (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " title TEXT NOT NULL, description TEXT,"
+            " completed INTEGER NOT NULL DEFAULT 0, created_at INTEGER NOT NULL);"
+            "INSERT INTO todos (title, created_at) VALUES ('Ancien', 0);"
+        )
+        conn.close()
+        barrier = threading.Barrier(8)
+        repos, errors = [], []
+
+        def worker():
+            barrier.wait()
+            try:
+                repos.append(SqliteTodoRepository(self.path))
+            except sqlite3.Error as exc:  # pragma: no cover - reported below
+                errors.append(exc)
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for repo in repos:
+            repo.close()
+
+        assert errors == []
+        self.repo = SqliteTodoRepository(self.path)
+        assert self.repo.get(1).version == 1
+        assert self.repo.stats().total == 1
+        assert [t.id for t in self.repo.search("ancien")] == [1]
+
+    def test_delete(self):
+        """Test deleting todos."""
+        self.repo.create(TodoCreate(title="Test"))
+
+        assert self.repo.delete(1) is True
+        assert self.repo.delete(1) is False
+        assert self.repo.list() == []
+
+    def test_ids_are_not_reused(self):
+        """Test that ids keep increasing after deletes."""
+        self.repo.create(TodoCreate(title="Todo 1"))
+        self.repo.delete(1)
+        assert self.repo.create(TodoCreate(title="Todo 2")).id == 2
+
+    def test_list_query(self):
+        """Test filters and keyset pagination in SQL."""
+        for i in range(5):
+            self.repo.create(TodoCreate(title=f"Todo {i}"))
+        self.repo.update(2, TodoUpdate(completed=True))
+        self.repo.update(4, TodoUpdate(completed=True))
+
+        assert [t.id for t in self.repo.list(TodoQuery(limit=2, after_id=2))] == [3, 4]
+        assert [t.id for t in self.repo.list(TodoQuery(completed=True))] == [2, 4]
+        now = datetime.now(UTC)
+        assert self.repo.list(TodoQuery(created_after=now + timedelta(1))) == []
+        assert len(self.repo.list(TodoQuery(created_before=now + timedelta(1)))) == 5
+
+    def test_list_fields(self):
+        """Test that only the requested columns are selected and converted."""
+        self.repo.create(TodoCreate(title="Todo", owner="alice"))
+        self.repo.update(1, TodoUpdate(completed=True))
+        todo = self.repo.get(1)
+
+        fields = ("id", "completed", "created_at", "owner")
+        rows = self.repo.list(TodoQuery(fields=fields))
+        assert rows == [{name: getattr(todo, name) for name in fields}]
+        assert rows[0]["completed"] is True
+        assert self.repo.search("todo", TodoQuery(fields=("title",))) == [
+            {"id": 1, "title": "Todo"}
+        ]
+
+    def test_search(self):
+        """Test FTS5 search: prefixes, accents, filters and updates."""
+        self.repo.create(TodoCreate(title="Planifier la réunion"))
+        self.repo.create(TodoCreate(title="Acheter du pain", description="Réunion"))
+        self.repo.create(TodoCreate(title="Réunion d'équipe"))
+
+        assert [t.id for t in self.repo.search("REU")] == [1, 2, 3]
+        assert [t.id for t in self.repo.search("reunion pla")] == [1]
+        assert [t.id for t in self.repo.search("reu", TodoQuery(limit=1))] == [1]
+        assert [t.id for t in self.repo.search("reu", TodoQuery(after_id=2))] == [3]
+        assert self.repo.search("!!") == []
+
+        self.repo.update(1, TodoUpdate(title="Planifier"))
+        self.repo.update(2, TodoUpdate(completed=True))
+        self.repo.delete(3)
+        assert [t.id for t in self.repo.search("reunion")] == [2]
+        assert self.repo.search("reunion", TodoQuery(completed=False)) == []
+
+    def test_search_index_built_for_existing_database(self):
+        """Test that a database created before FTS5 gets its todos indexed."""
+        self.repo.create(TodoCreate(title="Ancien todo"))
+        conn = self.repo._connection()
+        conn.executescript(
+            "DROP TRIGGER todos_fts_insert; DROP TRIGGER todos_fts_update;"
+            "DROP TRIGGER todos_fts_delete; DROP TABLE todos_fts;"
+        )
+        self.repo.close()
+
+        self.repo = SqliteTodoRepository(self.path)
+        assert [t.title for t in self.repo.search("ancien")] == ["Ancien todo"]
+
+    def test_search_index_rebuilt_with_new_prefixes(self):
+        """Test that an index built with other prefix sizes is recreated."""
+        self.repo.create(TodoCreate(title="Todo existant"))
+        conn = self.repo._connection()
+        conn.executescript(
+            "DROP TABLE todos_fts;"
+            "CREATE VIRTUAL TABLE todos_fts USING fts5(title, description,"
+            " content='todos', content_rowid='id', prefix='2 3');"
+        )
+        self.repo.close()
+
+        self.repo = SqliteTodoRepository(self.path)
+        sql = self.repo._connection().execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'todos_fts'"
+        )
+        assert "prefix='2 3 4'" in sql.fetchone()[0]
+        assert [t.title for t in self.repo.search("todo exis")] == ["Todo existant"]
+
+    def test_data_survives_reopen(self):
+        """Test durability: a new repository on the same file sees the data."""
+        todo = self.repo.create(TodoCreate(title="Persistent"))
+        self.repo.close()
+
+        reopened = SqliteTodoRepository(self.path)
+        assert reopened.get(todo.id) == todo
+        reopened.close()
+
+    def test_batch_commits_once_and_rolls_back(self):
+        """Test that batch() groups writes and rolls back on error."""
+        with self.repo.batch():
+            self.repo.create(TodoCreate(title="Todo 1"))
+            self.repo.create(TodoCreate(title="Todo 2"))
+        assert len(self.repo.list()) == 2
+
+        def failing_batch():
+            with self.repo.batch():
+                self.repo.create(TodoCreate(title="Todo 3"))
+                raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            failing_batch()
+        assert len(self.repo.list()) == 2
+
+    def test_bulk_operations(self):
+        """Test create_many/update_many/delete_many in one transaction each."""
+        todos = self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        assert [t.id for t in todos] == [1, 2]
+        assert self.repo.list() == todos
+
+        updated = self.repo.update_many(
+            [(1, TodoUpdate(completed=True)), (3, TodoUpdate(title="X"))]
+        )
+        assert updated[0].completed is True
+        assert updated[1] is None
+
+        assert self.repo.delete_many([2, 3]) == [True, False]
+        assert [t.id for t in self.repo.list()] == [1]
+
+    def test_bulk_owner(self):
+        """Test that bulk writes with an owner skip the todos of other owners."""
+        self.repo.create_many(
+            [TodoCreate(title="A", owner="alice"), TodoCreate(title="B")]
+        )
+
+        updated = self.repo.update_many(
+            [(1, TodoUpdate(completed=True)), (2, TodoUpdate(completed=True))],
+            owner="alice",
+        )
+        assert [t and t.id for t in updated] == [1, None]
+        assert self.repo.get(2).completed is False
+        assert self.repo.delete_many([2, 1, 9], owner="alice") == [False, True, False]
+        assert [t.id for t in self.repo.list()] == [2]
+
+    def test_revision_is_shared(self):
+        """Test that a write through one repository bumps the shared revision."""
+        other = SqliteTodoRepository(self.path)
+        before = other.revision()
+
+        self.repo.create(TodoCreate(title="Todo"))
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.delete(1)
+
+        assert other.revision() == before + 3
+        other.close()
+
+    def test_count(self):
+        """Test counting stored todos."""
+        self.repo.create_many([TodoCreate(title="A"), TodoCreate(title="B")])
+        self.repo.delete(1)
+        assert self.repo.count() == 1
+
+    def test_stats(self):
+        """Test the counters maintained by triggers, shared between workers."""
+        other = SqliteTodoRepository(self.path)
+        self.repo.create_many([TodoCreate(title=f"Todo {i}") for i in range(4)])
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.update(1, TodoUpdate(completed=True))
+        self.repo.update(2, TodoUpdate(completed=True))
+        self.repo.update(2, TodoUpdate(title="Same status"))
+        self.repo.delete_many([2, 3])
+
+        stats = other.stats()
+        assert (stats.total, stats.completed, stats.open) == (2, 1, 1)
+        assert stats.created_per_day == {datetime.now(UTC).date(): 2}
+        with self.repo.batch():
+            self.repo.delete(1)
+            assert self.repo.stats().total == 1
+        other.close()
+
+    def test_stats_built_for_existing_database(self):
+        """Test that a database created before the counters gets them computed."""
+        self.repo.close()
+        conn = sqlite3.connect(self.path)
+        conn.executescript(
+            "DROP TABLE todo_days; DROP TRIGGER todos_stats_insert;"
+            "DROP TRIGGER todos_stats_update; DROP TRIGGER todos_stats_delete;"
+            "DELETE FROM todo_meta WHERE key IN ('total', 'completed');"
+            "INSERT INTO todos (title, completed, created_at)"
+            " VALUES ('A', 1, 0), ('B', 0, 0), ('C', 0, 86400000000);"
+        )
+        conn.close()
+
+        self.repo = SqliteTodoRepository(self.path)
+        stats = self.repo.stats()
+        assert (stats.total, stats.completed) == (3, 1)
+        assert stats.created_per_day == {date(1970, 1, 1): 2, date(1970, 1, 2): 1}
+        assert self.repo.count() == 3
+
+    def test_one_connection_per_thread(self):
+        """Test that each thread gets its own pooled connection."""
+        results = []
+
+        def worker():
+            results.append(self.repo.create(TodoCreate(title="From thread")).id)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(results) == [1, 2, 3, 4]
+        assert len(self.repo._connections) == 5
+
+
+class TestBuildRepository:
+    """Test backend selection from settings."""
+
+    def test_memory_backend(self):
+        """Test the default in-memory backend."""
+        settings = Settings(secret_key="test")
+        assert isinstance(build_repository(settings), InMemoryTodoRepository)
+
+    def test_sqlite_backend(self, tmp_path):
+        """Test the SQLite backend selected by configuration."""
+        settings = Settings(
+            secret_key="test",
+            storage_backend="sqlite",
+            sqlite_path=str(tmp_path / "todos.db"),
+        )
+        repo = build_repository(settings)
+        assert isinstance(repo, SqliteTodoRepository)
+        repo.close()
+
+    def test_async_backends(self, tmp_path):
+        """Test that only blocking backends get a dedicated executor."""
+        memory = build_async_repository(Settings(secret_key="test"))
+        assert isinstance(memory, AsyncRepositoryAdapter)
+        assert memory.executor is None
+
+        sqlite = build_async_repository(
+            Settings(
+                secret_key="test",
+                storage_backend="sqlite",
+                sqlite_path=str(tmp_path / "todos.db"),
+                repository_workers=2,
+            )
+        )
+        assert sqlite.executor is not None
+        sqlite.executor.shutdown()
+        sqlite.repo.close()
+
+
+class TestSqliteBackendAPI:
+    """Test the API served by the SQLite backend."""
+
+    def test_null_update_is_rejected(self, tmp_path):
+        """Test that a null title/completed is a 422, not a NOT NULL error."""
+        settings = Settings(
+            secret_key="test",
+            storage_backend="sqlite",
+            sqlite_path=str(tmp_path / "todos.db"),
+            log_async=False,
+        )
+        with TestClient(create_app(settings)) as client:
+            client.post("/todos", json={"title": "Todo"})
+            for body in ({"title": None}, {"completed": None}):
+                assert client.patch("/todos/1", json=body).status_code == 422
+            bulk = [{"id": 1, "title": None}]
+            assert client.patch("/todos/bulk", json=bulk).status_code == 422
+
+            response = client.patch("/todos/1", json={"description": None})
+            assert response.status_code == 200
+            assert response.json()["title"] == "Todo"
+            assert response.json()["version"] == 2
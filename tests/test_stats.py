@@ -0,0 +1,53 @@
+"""Tests for the incrementally maintained todo statistics."""
+
+from datetime import UTC, date, datetime, timedelta, timezone
+
+from todo_app.stats import StatsCounter, build_stats
+
+
+class TestStatsCounter:
+    """Test the counters kept by the in-memory repositories."""
+
+    def test_add_remove_and_flip(self):
+        """Test totals and the per-day histogram, whose empty days disappear."""
+        counter = StatsCounter()
+        first = datetime(2024, 1, 1, 12, tzinfo=UTC)
+        counter.add(first, False)
+        counter.add(first, True)
+        counter.add(first + timedelta(days=1), False)
+        counter.set_completed(False, True)
+        counter.remove(first + timedelta(days=1), True)
+
+        stats = counter.snapshot()
+        assert (stats.total, stats.completed, stats.open) == (2, 1, 1)
+        assert stats.created_per_day == {date(2024, 1, 1): 2}
+
+    def test_days_are_utc(self):
+        """Test that created_at is bucketed by its UTC day."""
+        counter = StatsCounter()
+        paris = timezone(timedelta(hours=2))
+        counter.add(datetime(2024, 1, 2, 1, tzinfo=paris), False)
+
+        assert counter.snapshot().created_per_day == {date(2024, 1, 1): 1}
+
+    def test_copy_is_independent(self):
+        """Test that a copy does not follow later writes."""
+        counter = StatsCounter()
+        counter.add(datetime(2024, 1, 1, tzinfo=UTC), False)
+        copy = counter.copy()
+        counter.add(datetime(2024, 1, 1, tzinfo=UTC), True)
+
+        assert copy.snapshot() == build_stats(1, 0, {date(2024, 1, 1): 1})
+        assert counter.snapshot().total == 2
+
+    def test_days_are_sorted(self):
+        """Test that days are chronological, even when added out of order."""
+        counter = StatsCounter()
+        for day in (3, 1, 3, 2):
+            counter.add(datetime(2024, 1, day, tzinfo=UTC), False)
+        counter.remove(datetime(2024, 1, 3, tzinfo=UTC), False)
+
+        stats = counter.snapshot()
+        assert list(stats.created_per_day) == [date(2024, 1, d) for d in (1, 2, 3)]
+        assert counter._in_order is False
+        assert build_stats(3, 1, {}).open == 2
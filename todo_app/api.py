@@ -1,63 +1,962 @@
 """ASGI API pour la todo-list.
 
 On garde des endpoints simples et documentés automatiquement par OpenAPI.
+
+L'application est construite par `create_app(settings)`; `app` (pour
+`uvicorn todo_app.api:app`) n'est créée qu'au premier accès. L'import du module
+ne lit pas la configuration et ne construit ni repository ni service.
 """
 
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Hashable
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import TYPE_CHECKING, Annotated, Any
+
+from fastapi import (
+    Depends,
+    FastAPI,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+)
+from fastapi.exceptions import RequestValidationError
+from fastapi.requests import HTTPConnection
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import Field, TypeAdapter, ValidationError
+
+from .cache import CachedResponse, ResponseCache
+from .encoding import (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    CompressionMiddleware,
+    CompressionOptions,
+    msgpack_module,
+    negotiate_media_type,
+    pack,
+    unpack,
+)
+from .events import ChangeFeed, StaleResumeToken
+from .logger import configure_logging, logger
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .metrics import AppMetrics, MetricsMiddleware
+from .models import (
+    MAX_OWNER_LENGTH,
+    BulkItemResult,
+    ChangeEvent,
+    ImportLineError,
+    ImportResult,
+    ProfileSummary,
+    RequestProfile,
+    TodoBulkUpdate,
+    TodoCreate,
+    TodoInDB,
+    TodoPage,
+    TodoQuery,
+    TodoStats,
+    TodoUpdate,
+    projector,
+    row_adapter,
+)
+from .profiling import Profiler, ProfilingMiddleware
+from .repository import VersionConflictError, build_async_repository
+from .service import AsyncTodoService
+
+if TYPE_CHECKING:
+    from .config import Settings
+
+# Taille de page maximale acceptée pour GET /todos
+MAX_PAGE_SIZE = 1000
+# Nombre maximal d'éléments par requête bulk
+MAX_BULK_ITEMS = 10_000
+# GET /todos/search: longueur maximale de `q`, taille de page par défaut
+MAX_SEARCH_LENGTH = 200
+DEFAULT_SEARCH_LIMIT = 20
+# Export/import NDJSON: todos par page lue ou par lot créé, taille maximale d'une
+# ligne, nombre d'erreurs détaillées dans le bilan d'import
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+EXPORT_BATCH = 1000
+IMPORT_BATCH = 1000
+MAX_IMPORT_LINE = 64 * 1024
+MAX_IMPORT_ERRORS = 100
+# GET /todos/changes: délai (secondes) entre deux messages de maintien de connexion
+FEED_HEARTBEAT = 15.0
+# code de fermeture WebSocket quand le jeton de reprise a expiré
+WS_STALE_TOKEN = 4410
+
+# Un seul passage de validation (parsing JSON compris) pour tout le lot
+_bulk_create_adapter = TypeAdapter(
+    Annotated[list[TodoCreate], Field(min_length=1, max_length=MAX_BULK_ITEMS)]
+)
+_bulk_update_adapter = TypeAdapter(
+    Annotated[list[TodoBulkUpdate], Field(min_length=1, max_length=MAX_BULK_ITEMS)]
+)
+_bulk_delete_adapter = TypeAdapter(
+    Annotated[list[int], Field(min_length=1, max_length=MAX_BULK_ITEMS)]
+)
+_bulk_result_adapter = TypeAdapter(list[BulkItemResult])
+_todo_list_adapter = TypeAdapter(list[TodoInDB])
+_todo_adapter = TypeAdapter(TodoInDB)
+_create_adapter = TypeAdapter(TodoCreate)
+_update_adapter = TypeAdapter(TodoUpdate)
+_stats_adapter = TypeAdapter(TodoStats)
+# corps MessagePack acceptés (`application/x-msgpack`: ancien nom courant)
+_MSGPACK_BODY_TYPES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack")
+
+# En-tête X-Owner: limite la requête aux todos d'un propriétaire (utilisateur,
+# liste partagée). Avec le backend `sharded`, elle ne touche qu'une partition.
+OwnerHeader = Annotated[
+    str | None,
+    Header(
+        min_length=1,
+        max_length=MAX_OWNER_LENGTH,
+        description="Propriétaire: seuls ses todos sont lus ou modifiés",
+    ),
+]
+
+
+def _fields(
+    fields: str | None = Query(
+        None,
+        description="Champs à renvoyer, séparés par des virgules (`id` toujours "
+        "inclus), ex. `id,title,completed`; tous par défaut",
+    ),
+) -> tuple[str, ...] | None:
+    """Dependency parsing `fields=` into the projection of `TodoQuery.fields`."""
+    if fields is None:
+        return None
+    names = tuple(name.strip() for name in fields.split(",") if name.strip())
+    try:
+        return TodoQuery(fields=names).fields
+    except ValidationError as exc:
+        error = exc.errors(include_url=False)[0]
+        raise RequestValidationError(
+            [
+                {
+                    "type": error["type"],
+                    "loc": ("query", "fields"),
+                    "msg": error["msg"],
+                    "input": fields,
+                }
+            ]
+        ) from None
+
+
+FieldsQuery = Annotated[tuple[str, ...] | None, Depends(_fields)]
+
+
+def _with_owner(payloads: list[TodoCreate], owner: str | None) -> list[TodoCreate]:
+    """Payloads created on behalf of `owner` (the header wins over the body)."""
+    if owner is None:
+        return payloads
+    return [payload.model_copy(update={"owner": owner}) for payload in payloads]
+
+
+class _Routes:
+    """Route declarations, registered on each application by `create_app`.
+
+    Contrairement à `APIRouter`, déclarer une route ne fait qu'enregistrer ses
+    arguments: FastAPI analyse l'endpoint (signature, modèles de réponse) à la
+    création de l'application, pas à l'import du module.
+    """
+
+    def __init__(self) -> None:
+        self._routes: list[tuple[str, Callable[..., Any], dict[str, Any]]] = []
+
+    def _add(self, path: str, **kwargs: Any) -> Callable[[Callable], Callable]:
+        def decorator(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+            self._routes.append((path, endpoint, kwargs))
+            return endpoint
+
+        return decorator
+
+    def get(self, path: str, **kwargs: Any) -> Callable[[Callable], Callable]:
+        return self._add(path, methods=["GET"], **kwargs)
+
+    def post(self, path: str, **kwargs: Any) -> Callable[[Callable], Callable]:
+        return self._add(path, methods=["POST"], **kwargs)
+
+    def patch(self, path: str, **kwargs: Any) -> Callable[[Callable], Callable]:
+        return self._add(path, methods=["PATCH"], **kwargs)
+
+    def delete(self, path: str, **kwargs: Any) -> Callable[[Callable], Callable]:
+        return self._add(path, methods=["DELETE"], **kwargs)
+
+    def websocket(self, path: str) -> Callable[[Callable], Callable]:
+        return self._add(path, websocket=True)
+
+    def register(self, app: FastAPI) -> None:
+        for path, endpoint, kwargs in self._routes:
+            if kwargs.get("websocket"):
+                app.add_api_websocket_route(path, endpoint)
+            else:
+                app.add_api_route(path, endpoint, **kwargs)
+
+
+routes = _Routes()
+
+
+def app_settings(app: FastAPI) -> "Settings":
+    """Return the settings of `app`, applied to its middlewares on first use.
+
+    Appelée par `create_app(settings)`, sinon au démarrage du serveur
+    (lifespan): la configuration est lue de l'environnement (`get_settings`) à
+    ce moment-là, pas à l'import. Un serveur qui ne lance pas le lifespan la lit
+    à la première requête qui en a besoin.
+    """
+    state = app.state
+    if not state.configured:
+        if state.settings is None:
+            from .config import get_settings
+
+            state.settings = get_settings()
+        settings = state.settings
+        configure_logging(settings)
+        state.metrics.enabled = settings.metrics_enabled
+        state.fast_responses = settings.fast_responses
+        _configure_compression(state.compression, settings)
+        state.profiler.configure(
+            settings.profiling_enabled,
+            settings.profiling_threshold_ms,
+            settings.profiling_token,
+            settings.profiling_buffer_size,
+        )
+        state.configured = True
+    return state.settings
+
+
+def app_service(app: FastAPI) -> AsyncTodoService:
+    """Return the service of `app`, built on first use from its settings."""
+    state = app.state
+    if state.service is None:
+        settings = app_settings(app)
+        service = AsyncTodoService(
+            build_async_repository(settings),
+            list_cache=ResponseCache(settings.list_cache_size),
+            changes=ChangeFeed(settings.change_feed_size),
+        )
+        # les métriques d'abord: elles n'instrumentent pas une méthode déjà
+        # remplacée sur l'instance
+        if state.metrics.enabled:
+            state.metrics.instrument_service(service)
+        if state.profiler.active:
+            state.profiler.instrument_service(service)
+        state.service = service
+    return state.service
+
+
+def _configure_compression(options: CompressionOptions, settings: "Settings") -> None:
+    options.encodings = tuple(settings.compression_encodings)
+    options.min_size = settings.compression_min_size
+    options.levels = {"gzip": settings.gzip_level, "zstd": settings.zstd_level}
+    if "zstd" in options.encodings and "zstd" not in options.available():
+        logger.warning("zstd compression requires the zstandard package, disabled")
+
+
+async def get_service(connection: HTTPConnection) -> AsyncTodoService:
+    """Dependency to get the service instance of the application.
+
+    Built on first use from the configured storage backend (STORAGE_BACKEND).
+    Déclarée `async` pour que FastAPI ne la résolve pas dans le threadpool.
+    """
+    return app_service(connection.app)
+
+
+@routes.get(
+    "/todos",
+    response_model=list[TodoInDB],
+    responses={304: {"description": "Liste inchangée depuis l'ETag fourni"}},
+)
+async def list_todos(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: int | None = Query(
+        None,
+        ge=0,
+        description="Valeur de l'en-tête X-Next-Cursor de la page précédente",
+    ),
+    completed: bool | None = None,
+    created_after: datetime | None = None,
+    created_before: datetime | None = None,
+    fields: FieldsQuery = None,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Liste les todos (par id croissant), avec filtres et pagination par curseur.
+
+    Sans `limit` tous les todos correspondants sont renvoyés. Avec `limit`, l'en-tête
+    `X-Next-Cursor` est présent tant qu'il reste des résultats. La réponse porte un
+    `ETag`: avec `If-None-Match`, une liste inchangée renvoie `304` sans corps.
+    Avec `X-Owner`, seuls les todos de ce propriétaire sont listés.
+
+    `Accept: application/msgpack` renvoie la liste en MessagePack; un corps d'au
+    moins `COMPRESSION_MIN_SIZE` octets est compressé selon `Accept-Encoding`
+    (zstd, gzip). Les deux variantes sont mises en cache déjà encodées.
+
+    `fields=id,title` ne renvoie que ces champs: la projection est faite par le
+    repository, les autres champs ne sont ni lus, ni copiés, ni sérialisés.
+    """
+    # on demande un élément de plus pour savoir s'il existe une page suivante
+    query = TodoQuery(
+        limit=None if limit is None else limit + 1,
+        after_id=cursor,
+        completed=completed,
+        created_after=created_after,
+        created_before=created_before,
+        owner=x_owner,
+        fields=fields,
+    )
+    return await _list_response(
+        request,
+        service,
+        ("list", query),
+        limit,
+        lambda: service.list_todos(query),
+        query.fields,
+    )
+
+
+async def _list_response(
+    request: Request,
+    service: AsyncTodoService,
+    key: Hashable,
+    limit: int | None,
+    fetch: Callable[[], Awaitable[TodoPage]],
+    fields: tuple[str, ...] | None = None,
+) -> Response:
+    """Serve a page of todos from the response cache, with ETag and cursor.
+
+    `fetch` doit demander `limit + 1` éléments pour détecter la page suivante;
+    avec `fields`, il renvoie des dicts restreints à ces champs.
+    Le corps est mis en cache dans le format et le codage négociés: un hit ne
+    sérialise ni ne compresse rien. L'ETag est celui du corps non compressé.
+    """
+    media_type = negotiate_media_type(request.headers.get("accept"))
+    compression: CompressionOptions = request.app.state.compression
+    encoding = compression.choose(request.headers.get("accept-encoding"))
+    # la révision est lue avant les données: une entrée n'est jamais plus
+    # ancienne que la révision de sa clé
+    key = (await service.revision(), key, media_type, encoding)
+    entry = service.list_cache.get(key)
+    if entry is None:
+        todos = await fetch()
+        headers = {}
+        if limit is not None and len(todos) > limit:
+            todos = todos[:limit]
+            last = todos[-1]
+            headers["X-Next-Cursor"] = str(last.id if fields is None else last["id"])
+        adapter = _todo_list_adapter if fields is None else row_adapter(fields)
+        if media_type == MSGPACK_MEDIA_TYPE:
+            body = pack(adapter, todos)
+        else:
+            body = adapter.dump_json(todos)
+        entry = CachedResponse.build(body, headers)
+        if encoding is not None and len(body) >= compression.min_size:
+            entry = entry.compressed(compression.compress(body, encoding), encoding)
+        service.list_cache.put(key, entry)
+    headers = {**entry.headers, "ETag": entry.etag, "Vary": "Accept, Accept-Encoding"}
+    if entry.matches(request.headers.get("if-none-match")):
+        return Response(status_code=304, headers=headers)
+    if entry.encoding is not None:
+        headers["Content-Encoding"] = entry.encoding
+    return Response(entry.body, media_type=media_type, headers=headers)
+
+
+@routes.get(
+    "/todos/search",
+    response_model=list[TodoInDB],
+    responses={304: {"description": "Résultats inchangés depuis l'ETag fourni"}},
+)
+async def search_todos(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=MAX_SEARCH_LENGTH),
+    limit: int | None = Query(DEFAULT_SEARCH_LIMIT, ge=1, le=MAX_PAGE_SIZE),
+    cursor: int | None = Query(None, ge=0),
+    completed: bool | None = None,
+    fields: FieldsQuery = None,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Recherche plein texte dans `title` et `description` (par id croissant).
+
+    Chaque mot de `q` doit préfixer un mot du todo, sans tenir compte de la casse
+    ni des accents: `q=réu pla` trouve "Planifier la réunion". Pagination, en-tête
+    `X-Next-Cursor`, `ETag`, `fields` et `X-Owner` comme pour `GET /todos`.
+    """
+    query = TodoQuery(
+        limit=None if limit is None else limit + 1,
+        after_id=cursor,
+        completed=completed,
+        owner=x_owner,
+        fields=fields,
+    )
+    return await _list_response(
+        request,
+        service,
+        ("search", q, query),
+        limit,
+        lambda: service.search_todos(q, query),
+        query.fields,
+    )
+
+
+@routes.get("/todos/stats", response_model=TodoStats)
+async def todo_stats(
+    request: Request, service: AsyncTodoService = Depends(get_service)
+):
+    """Nombre de todos, terminés, ouverts et créations par jour (UTC).
+
+    Les compteurs sont tenus à jour à chaque écriture par le repository: le
+    coût de la requête ne dépend pas du nombre de todos, seulement du nombre de
+    jours distincts. À préférer à un comptage côté client sur `GET /todos`.
+    Les statistiques portent sur tous les todos, quel que soit `X-Owner`.
+    """
+    stats = await service.get_stats()
+    if negotiate_media_type(request.headers.get("accept")) == MSGPACK_MEDIA_TYPE:
+        return _msgpack_response(_stats_adapter, stats, headers={"Vary": "Accept"})
+    return stats
+
+
+def _todo_etag(version: int) -> str:
+    """ETag of a todo: its version, which changes on every update."""
+    return f'"{version}"'
+
+
+def _if_match_version(if_match: str | None) -> int | None:
+    """Version required by an `If-Match` header (None: absent or `*`).
+
+    Seul l'ETag fort d'un todo (`"3"`) peut correspondre: toute autre valeur
+    (ETag faible, liste, valeur invalide) fait échouer la condition (412).
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    tag = if_match.strip()
+    if len(tag) > 2 and tag[0] == tag[-1] == '"' and tag[1:-1].isdigit():
+        return int(tag[1:-1])
+    raise HTTPException(status_code=412, detail="If-Match matches no todo version")
+
+
+def _version_conflict(exc: VersionConflictError) -> HTTPException:
+    # l'ETag courant permet au client de relire le todo puis de réessayer
+    return HTTPException(
+        status_code=412,
+        detail="Todo has been modified",
+        headers={"ETag": _todo_etag(exc.version)},
+    )
+
+
+_PRECONDITION_FAILED = {
+    412: {"description": "`If-Match` ne correspond plus à la version du todo"}
+}
+
+
+def _todo_response(
+    todo: TodoInDB, request: Request, response: Response, status_code: int = 200
+) -> TodoInDB | Response:
+    """Return `todo` for `response_model`, or its JSON bytes in fast mode.
+
+    FastAPI revalide un objet renvoyé contre `response_model` puis l'encode;
+    une `Response` est envoyée telle quelle. Le schéma OpenAPI, qui vient du
+    décorateur, est le même dans les deux cas. La version du todo est envoyée
+    dans l'en-tête `ETag`. Un client qui accepte MessagePack le reçoit dans ce
+    format, quel que soit le mode.
+    """
+    etag = _todo_etag(todo.version)
+    if negotiate_media_type(request.headers.get("accept")) == MSGPACK_MEDIA_TYPE:
+        return _msgpack_response(
+            _todo_adapter, todo, status_code, headers={"ETag": etag}
+        )
+    if not request.app.state.fast_responses:
+        response.headers["ETag"] = etag
+        return todo
+    return Response(
+        _todo_adapter.dump_json(todo),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+        headers={"ETag": etag},
+    )
+
+
+def _msgpack_response(
+    adapter: TypeAdapter,
+    value: Any,
+    status_code: int = 200,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    return Response(
+        pack(adapter, value),
+        status_code=status_code,
+        media_type=MSGPACK_MEDIA_TYPE,
+        headers=headers,
+    )
 
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import JSONResponse
 
-from .models import TodoCreate, TodoInDB, TodoUpdate
-from .repository import InMemoryTodoRepository
-from .service import TodoService
+def _request_body(schema: dict[str, Any]) -> dict[str, Any]:
+    """OpenAPI requestBody of the endpoints that read the raw body themselves."""
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {
+                JSON_MEDIA_TYPE: {"schema": schema},
+                MSGPACK_MEDIA_TYPE: {"schema": schema},
+            },
+        }
+    }
 
-app = FastAPI(title="Todo List API", version="0.1.0")
 
-# Global repository instance (for production)
-_repo = InMemoryTodoRepository()
-_service = TodoService(_repo)
+def _json_array_body(item_schema: dict[str, Any]) -> dict[str, Any]:
+    """OpenAPI requestBody for the bulk endpoints (JSON or MessagePack array)."""
+    return _request_body(
+        {"type": "array", "items": item_schema, "maxItems": MAX_BULK_ITEMS}
+    )
+
+
+async def _validate_body(request: Request, adapter: TypeAdapter) -> Any:
+    """Validate the raw body, JSON or MessagePack according to `Content-Type`.
+
+    Les erreurs ont la forme de celles de FastAPI (`422`, `loc` commençant par
+    `body`). Un corps MessagePack sans le paquet `msgpack` donne `415`.
+    """
+    body = await request.body()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    try:
+        if content_type.lower() not in _MSGPACK_BODY_TYPES:
+            return adapter.validate_json(body)
+        if msgpack_module() is None:
+            raise HTTPException(
+                status_code=415, detail="MessagePack bodies are not supported"
+            )
+        try:
+            data = unpack(body)
+        except Exception:
+            # msgpack lève plusieurs types d'erreurs (ExtraData, ValueError...)
+            raise RequestValidationError(
+                [
+                    {
+                        "type": "msgpack_invalid",
+                        "loc": ("body",),
+                        "msg": "Invalid MessagePack",
+                        "input": None,
+                    }
+                ]
+            ) from None
+        return adapter.validate_python(data)
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False)
+        raise RequestValidationError(
+            [{**error, "loc": ("body", *error["loc"])} for error in errors]
+        )
+
+
+def _bulk_response(
+    request: Request, results: list[BulkItemResult], status_code: int
+) -> Response:
+    # les résultats sont déjà valides: sérialisation directe, sans re-validation
+    if negotiate_media_type(request.headers.get("accept")) == MSGPACK_MEDIA_TYPE:
+        return _msgpack_response(_bulk_result_adapter, results, status_code)
+    return Response(
+        _bulk_result_adapter.dump_json(results),
+        status_code=status_code,
+        media_type=JSON_MEDIA_TYPE,
+    )
+
+
+@routes.post(
+    "/todos",
+    response_model=TodoInDB,
+    status_code=201,
+    openapi_extra=_request_body(TodoCreate.model_json_schema()),
+)
+async def create_todo(
+    request: Request,
+    response: Response,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Créer un todo (pour le propriétaire `X-Owner` s'il est fourni).
 
+    Le corps est un `TodoCreate` en JSON ou en MessagePack (`Content-Type`).
+    """
+    payload = await _validate_body(request, _create_adapter)
+    (payload,) = _with_owner([payload], x_owner)
+    return _todo_response(await service.create_todo(payload), request, response, 201)
 
-def get_service() -> TodoService:
-    """Dependency to get the service instance."""
-    return _service
 
+@routes.post(
+    "/todos/bulk",
+    response_model=list[BulkItemResult],
+    status_code=201,
+    openapi_extra=_json_array_body(TodoCreate.model_json_schema()),
+)
+async def bulk_create_todos(
+    request: Request,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Créer plusieurs todos en une requête"""
+    payloads = await _validate_body(request, _bulk_create_adapter)
+    todos = await service.create_todos(_with_owner(payloads, x_owner))
+    results = [
+        BulkItemResult(index=index, status=201, todo=todo)
+        for index, todo in enumerate(todos)
+    ]
+    return _bulk_response(request, results, 201)
 
-@app.get("/todos", response_model=list[TodoInDB])
-def list_todos(service: TodoService = Depends(get_service)):
-    """Liste tous les todos"""
-    return service.list_todos()
 
+@routes.patch(
+    "/todos/bulk",
+    response_model=list[BulkItemResult],
+    openapi_extra=_json_array_body(TodoBulkUpdate.model_json_schema()),
+)
+async def bulk_update_todos(
+    request: Request,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Mettre à jour plusieurs todos; les ids inconnus donnent un statut 404"""
+    items = await _validate_body(request, _bulk_update_adapter)
+    changes = [
+        (item.id, TodoUpdate(**item.model_dump(exclude={"id"}, exclude_unset=True)))
+        for item in items
+    ]
+    updated = await service.update_todos(changes, x_owner)
+    results = [
+        (
+            BulkItemResult(index=index, status=404, detail="Todo not found")
+            if todo is None
+            else BulkItemResult(index=index, status=200, todo=todo)
+        )
+        for index, todo in enumerate(updated)
+    ]
+    return _bulk_response(request, results, 200)
 
-@app.post("/todos", response_model=TodoInDB, status_code=201)
-def create_todo(payload: TodoCreate, service: TodoService = Depends(get_service)):
-    """Créer un todo"""
-    return service.create_todo(payload)
+
+@routes.delete(
+    "/todos/bulk",
+    response_model=list[BulkItemResult],
+    openapi_extra=_json_array_body({"type": "integer"}),
+)
+async def bulk_delete_todos(
+    request: Request,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Supprimer plusieurs todos (corps: liste d'ids)"""
+    todo_ids = await _validate_body(request, _bulk_delete_adapter)
+    deleted = await service.delete_todos(todo_ids, x_owner)
+    results = [
+        (
+            BulkItemResult(index=index, status=204)
+            if found
+            else BulkItemResult(index=index, status=404, detail="Todo not found")
+        )
+        for index, found in enumerate(deleted)
+    ]
+    return _bulk_response(request, results, 200)
 
 
-@app.patch("/todos/{todo_id}", response_model=TodoInDB)
-def update_todo(
-    todo_id: int, payload: TodoUpdate, service: TodoService = Depends(get_service)
+@routes.get(
+    "/todos/export",
+    response_class=StreamingResponse,
+    responses={200: {"content": {NDJSON_MEDIA_TYPE: {}}}},
+)
+async def export_todos(
+    completed: bool | None = None,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
 ):
-    """Mettre à jour un todo"""
+    """Exporter les todos en NDJSON (un objet JSON par ligne, par id croissant).
+
+    La réponse est produite page par page (`EXPORT_BATCH` todos) en suivant le
+    curseur: la mémoire utilisée ne dépend pas du nombre de todos. Les todos
+    créés pendant l'export y figurent si leur id n'a pas encore été atteint.
+    """
+    return StreamingResponse(
+        _export_lines(service, completed, x_owner), media_type=NDJSON_MEDIA_TYPE
+    )
+
+
+async def _export_lines(
+    service: AsyncTodoService, completed: bool | None, owner: str | None
+) -> AsyncIterator[bytes]:
+    cursor = None
+    while True:
+        page = await service.list_todos(
+            TodoQuery(
+                limit=EXPORT_BATCH, after_id=cursor, completed=completed, owner=owner
+            )
+        )
+        if page:
+            yield b"".join(_todo_adapter.dump_json(todo) + b"\n" for todo in page)
+        if len(page) < EXPORT_BATCH:
+            return
+        cursor = page[-1].id
+
+
+@routes.get(
+    "/todos/changes",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        410: {"description": "Jeton de reprise expiré: recharger GET /todos"},
+    },
+)
+async def todo_changes(
+    request: Request,
+    since: int | None = Query(
+        None, ge=0, description="Numéro du dernier événement reçu (jeton de reprise)"
+    ),
+    follow: bool = True,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Flux Server-Sent Events des créations, mises à jour et suppressions.
+
+    Chaque événement porte son numéro (`id:`), son type (`event:`) et un
+    `ChangeEvent` en JSON (`data:`). Avec `since` (ou l'en-tête `Last-Event-ID`
+    envoyé par les navigateurs à la reconnexion), les événements manqués sont
+    envoyés d'abord; sans, le flux commence aux prochaines écritures. L'en-tête
+    `X-Last-Event-ID` donne le numéro courant.
+
+    Avec `follow=false`, la réponse se termine après les événements manqués:
+    utile pour synchroniser une copie locale sans garder de connexion ouverte.
+    Un abonné qui prend trop de retard reçoit un événement `reset` et doit,
+    comme après un `410`, recharger la liste complète.
+    """
+    last_event_id = request.headers.get("last-event-id", "")
+    if last_event_id.isdigit():
+        since = int(last_event_id)
+    feed = service.changes
+    after = feed.last_seq if since is None else since
     try:
-        return service.update_todo(todo_id, payload)
+        backlog = feed.since(after)
+    except StaleResumeToken:
+        raise HTTPException(
+            status_code=410, detail="Resume token expired, reload GET /todos"
+        )
+    return StreamingResponse(
+        _sse_stream(feed, after, backlog, follow),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Last-Event-ID": str(feed.last_seq)},
+    )
+
+
+async def _sse_stream(
+    feed: ChangeFeed, after: int, events: list[ChangeEvent], follow: bool
+) -> AsyncIterator[bytes]:
+    while True:
+        if events:
+            yield b"".join(map(_sse_message, events))
+            after = events[-1].seq
+        elif follow:
+            # commentaire SSE: garde la connexion ouverte à travers les proxies
+            yield b": keepalive\n\n"
+        if not follow:
+            return
+        try:
+            events = await feed.wait(after, FEED_HEARTBEAT)
+        except StaleResumeToken:
+            yield b"event: reset\ndata: {}\n\n"
+            return
+
+
+def _sse_message(event: ChangeEvent) -> bytes:
+    return b"id: %d\nevent: %s\ndata: %s\n\n" % (
+        event.seq,
+        event.type.encode(),
+        event.model_dump_json().encode(),
+    )
+
+
+@routes.websocket("/todos/changes/ws")
+async def todo_changes_ws(
+    websocket: WebSocket,
+    since: int | None = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Variante WebSocket de GET /todos/changes: un `ChangeEvent` JSON par message.
+
+    Le client n'envoie rien. Si le jeton de reprise a expiré (ou si l'abonné prend
+    trop de retard), la connexion est fermée avec le code 4410.
+    """
+    feed = service.changes
+    after = feed.last_seq if since is None else since
+    await websocket.accept()
+    disconnected = asyncio.ensure_future(_until_disconnect(websocket))
+    try:
+        while True:
+            waiting = asyncio.ensure_future(feed.wait(after, FEED_HEARTBEAT))
+            await asyncio.wait(
+                {waiting, disconnected}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if disconnected.done():
+                waiting.cancel()
+                return
+            for event in waiting.result():
+                await websocket.send_text(event.model_dump_json())
+                after = event.seq
+    except StaleResumeToken:
+        await websocket.close(code=WS_STALE_TOKEN, reason="Resume token expired")
+    finally:
+        disconnected.cancel()
+
+
+async def _until_disconnect(websocket: WebSocket) -> None:
+    while (await websocket.receive())["type"] != "websocket.disconnect":
+        pass
+
+
+@routes.post(
+    "/todos/import",
+    response_model=ImportResult,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {NDJSON_MEDIA_TYPE: {"schema": TodoCreate.model_json_schema()}},
+        }
+    },
+)
+async def import_todos(
+    request: Request,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Importer des todos depuis un corps NDJSON (un `TodoCreate` par ligne).
+
+    Le corps est lu au fil de l'eau et les todos sont créés par lots de
+    `IMPORT_BATCH`: la mémoire utilisée ne dépend pas de la taille du fichier.
+    Les lignes invalides sont ignorées et comptées dans `failed`; les lignes vides
+    sont sautées. Une ligne de plus de `MAX_IMPORT_LINE` octets interrompt
+    l'import (`413`), les lots précédents restant créés.
+    """
+    result = ImportResult()
+    batch: list[TodoCreate] = []
+    async for number, line in _ndjson_lines(request):
+        try:
+            batch.append(TodoCreate.model_validate_json(line))
+        except ValidationError as exc:
+            result.failed += 1
+            if len(result.errors) < MAX_IMPORT_ERRORS:
+                result.errors.append(
+                    ImportLineError(line=number, detail=_first_error(exc))
+                )
+            continue
+        if len(batch) >= IMPORT_BATCH:
+            result.created += len(
+                await service.create_todos(_with_owner(batch, x_owner))
+            )
+            batch = []
+    if batch:
+        result.created += len(await service.create_todos(_with_owner(batch, x_owner)))
+    return result
+
+
+async def _ndjson_lines(request: Request) -> AsyncIterator[tuple[int, bytes]]:
+    """Non-blank lines of the body with their 1-based number, read chunk by chunk."""
+    buffer = b""
+    number = 0
+    async for chunk in request.stream():
+        lines = (buffer + chunk).split(b"\n")
+        # la dernière ligne peut être coupée en deux chunks
+        buffer = lines.pop()
+        if max(len(line) for line in (buffer, *lines)) > MAX_IMPORT_LINE:
+            raise HTTPException(status_code=413, detail="NDJSON line too long")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+def _first_error(exc: ValidationError) -> str:
+    error = exc.errors(include_url=False)[0]
+    location = ".".join(str(part) for part in error["loc"])
+    return f"{location}: {error['msg']}" if location else error["msg"]
+
+
+@routes.get("/todos/{todo_id}", response_model=TodoInDB)
+async def get_todo(
+    todo_id: int,
+    request: Request,
+    response: Response,
+    fields: FieldsQuery = None,
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Lire un todo, avec sa version dans l'en-tête `ETag`.
+
+    `fields` et `X-Owner` comme pour `GET /todos` (un todo d'un autre
+    propriétaire donne `404`).
+    """
+    try:
+        todo = await service.get_todo(todo_id, x_owner)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
+    if fields is None:
+        return _todo_response(todo, request, response)
+    # un seul todo: la projection se fait ici, après une lecture par clé
+    adapter = row_adapter(fields, many=False)
+    row = projector(fields)(todo)
+    headers = {"ETag": _todo_etag(todo.version)}
+    if negotiate_media_type(request.headers.get("accept")) == MSGPACK_MEDIA_TYPE:
+        return _msgpack_response(adapter, row, headers=headers)
+    return Response(adapter.dump_json(row), media_type=JSON_MEDIA_TYPE, headers=headers)
+
 
+@routes.patch(
+    "/todos/{todo_id}",
+    response_model=TodoInDB,
+    responses=_PRECONDITION_FAILED,
+    openapi_extra=_request_body(TodoUpdate.model_json_schema()),
+)
+async def update_todo(
+    todo_id: int,
+    request: Request,
+    response: Response,
+    if_match: str | None = Header(None),
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Mettre à jour un todo.
 
-@app.delete("/todos/{todo_id}", status_code=204)
-def delete_todo(todo_id: int, service: TodoService = Depends(get_service)):
-    """Supprimer un todo"""
+    Avec `If-Match` (l'`ETag` reçu à la création ou à la dernière mise à jour),
+    la modification n'est appliquée que si le todo n'a pas changé entre-temps;
+    sinon `412`, avec l'`ETag` courant. Avec `X-Owner`, le todo d'un autre
+    propriétaire donne `404`. Corps JSON ou MessagePack, comme POST /todos.
+    """
+    payload = await _validate_body(request, _update_adapter)
+    expected_version = _if_match_version(if_match)
+    try:
+        todo = await service.update_todo(todo_id, payload, expected_version, x_owner)
+    except VersionConflictError as exc:
+        raise _version_conflict(exc)
+    except ValueError as exc:
+        raise HTTPException(status_code=404, detail=str(exc))
+    return _todo_response(todo, request, response)
+
+
+@routes.delete("/todos/{todo_id}", status_code=204, responses=_PRECONDITION_FAILED)
+async def delete_todo(
+    todo_id: int,
+    if_match: str | None = Header(None),
+    x_owner: OwnerHeader = None,
+    service: AsyncTodoService = Depends(get_service),
+):
+    """Supprimer un todo (avec `If-Match` et `X-Owner` comme PATCH)"""
+    expected_version = _if_match_version(if_match)
     try:
-        service.delete_todo(todo_id)
+        await service.delete_todo(todo_id, expected_version, x_owner)
+    except VersionConflictError as exc:
+        raise _version_conflict(exc)
     except ValueError as exc:
         raise HTTPException(status_code=404, detail=str(exc))
 
 
-@app.get("/health")
-def health_check():
+@routes.get("/health")
+async def health_check():
     """Health check endpoint for load balancers and monitoring"""
     return JSONResponse(
         status_code=200,
@@ -70,8 +969,8 @@ def health_check():
     )
 
 
-@app.get("/health/ready")
-def readiness_check():
+@routes.get("/health/ready")
+async def readiness_check():
     """Readiness check endpoint for Kubernetes"""
     # In a real application, you would check:
     # - Database connectivity
@@ -83,4 +982,130 @@ def readiness_check():
     )
 
 
-# point d'entrée pour lancer localement: uvicorn todo_app.api:app
+@routes.get(
+    "/metrics",
+    response_class=Response,
+    responses={404: {"description": "Métriques désactivées (METRICS_ENABLED)"}},
+)
+async def get_metrics(
+    request: Request, service: AsyncTodoService = Depends(get_service)
+):
+    """Métriques au format texte de Prometheus (requêtes, service, repository)."""
+    metrics = request.app.state.metrics
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Metrics are disabled")
+    await metrics.collect(service)
+    return Response(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+def _debug_profiler(request: Request, token: str | None) -> Profiler:
+    # réglages seulement: lire les profils ne construit pas le service
+    app_settings(request.app)
+    profiler: Profiler = request.app.state.profiler
+    if not profiler.active:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    # chemins et piles d'appels: jamais lisibles sans le jeton, même avec
+    # PROFILING_ENABLED seul
+    if profiler.token is None:
+        raise HTTPException(
+            status_code=403, detail="Set PROFILING_TOKEN to read profiles"
+        )
+    if not profiler.authorized(token):
+        raise HTTPException(status_code=403, detail="Invalid profiling token")
+    return profiler
+
+
+_DEBUG_RESPONSES = {
+    403: {
+        "description": "En-tête `X-Profile-Token` absent ou invalide, ou aucun PROFILING_TOKEN"
+    },
+    404: {"description": "Profilage désactivé (PROFILING_*) ou profil absent"},
+}
+ProfileTokenHeader = Annotated[
+    str | None, Header(description="Valeur de PROFILING_TOKEN")
+]
+
+
+@routes.get(
+    "/debug/profiles",
+    response_model=list[ProfileSummary],
+    responses=_DEBUG_RESPONSES,
+)
+async def list_profiles(
+    request: Request,
+    x_profile_token: ProfileTokenHeader = None,
+):
+    """Requêtes profilées gardées, de la plus récente à la plus ancienne.
+
+    Requêtes plus lentes que `PROFILING_THRESHOLD_MS` (avec `PROFILING_ENABLED`)
+    ou envoyées avec l'en-tête `X-Profile-Token`, dont la réponse porte alors
+    l'en-tête `X-Profile-Id`. Cet en-tête est toujours exigé ici: sans
+    `PROFILING_TOKEN`, les profils ne sont pas lisibles.
+    """
+    return list(reversed(_debug_profiler(request, x_profile_token).profiles))
+
+
+@routes.get(
+    "/debug/profiles/{profile_id}",
+    response_model=RequestProfile,
+    responses=_DEBUG_RESPONSES,
+)
+async def get_profile(
+    profile_id: int,
+    request: Request,
+    x_profile_token: ProfileTokenHeader = None,
+):
+    """Détail d'un profil: temps par couche et par méthode, fonctions cProfile."""
+    captured = _debug_profiler(request, x_profile_token).get(profile_id)
+    if captured is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return captured
+
+
+@asynccontextmanager
+async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # middlewares réglés avant la première requête (sondes /health comprises)
+    app_settings(app)
+    yield
+    # à l'arrêt: connexions, journal et threads du repository, s'il a servi
+    service, app.state.service = app.state.service, None
+    if service is not None:
+        await service.repo.close()
+
+
+def create_app(settings: "Settings | None" = None) -> FastAPI:
+    """Build an application; its service is built on first use (`get_service`).
+
+    Les middlewares (métriques, compression, profilage) sont réglés ici depuis
+    `settings`; sans `settings`, la configuration est lue de l'environnement au
+    démarrage du serveur. Chaque application a son propre service, ses
+    métriques et ses options; le repository est fermé à l'arrêt du serveur
+    (lifespan).
+    """
+    app = FastAPI(title="Todo List API", version="0.1.0", lifespan=_lifespan)
+    app.state.settings = settings
+    app.state.configured = False
+    app.state.service = None
+    # réglés selon METRICS_ENABLED, FAST_RESPONSES, COMPRESSION_* et
+    # PROFILING_* par app_settings (les défauts sont les mêmes)
+    app.state.metrics = AppMetrics()
+    app.state.fast_responses = False
+    app.state.compression = CompressionOptions()
+    app.state.profiler = Profiler()
+    # les métriques incluent la compression dans la durée des requêtes, et le
+    # profilage (ajouté en dernier: middleware externe) les deux
+    app.add_middleware(CompressionMiddleware, options=app.state.compression)
+    app.add_middleware(MetricsMiddleware, metrics=app.state.metrics)
+    app.add_middleware(ProfilingMiddleware, profiler=app.state.profiler)
+    routes.register(app)
+    if settings is not None:
+        app_settings(app)
+    return app
+
+
+def __getattr__(name: str) -> FastAPI:
+    # point d'entrée: uvicorn todo_app.api:app, créée au premier accès
+    if name == "app":
+        app = globals()["app"] = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
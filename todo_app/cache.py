@@ -0,0 +1,87 @@
+"""Cache de réponses déjà sérialisées (bytes JSON ou MessagePack, compressés ou
+non), borné avec éviction LRU.
+
+Les clés incluent la révision du repository: une écriture, même faite par un
+autre worker sur une base partagée, rend les anciennes entrées inatteignables.
+Le service vide aussi le cache à chaque écriture pour libérer la mémoire.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    """A serialized body, its ETag and the extra headers to send with it.
+
+    `encoding` est le `Content-Encoding` du corps (None: non compressé).
+    """
+
+    body: bytes
+    etag: str
+    headers: dict[str, str] = field(default_factory=dict)
+    encoding: str | None = None
+
+    @classmethod
+    def build(
+        cls, body: bytes, headers: dict[str, str] | None = None
+    ) -> CachedResponse:
+        # ETag fort dérivé du contenu: identique d'un worker à l'autre
+        digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+        return cls(body=body, etag=f'"{digest}"', headers=headers or {})
+
+    def compressed(self, body: bytes, encoding: str) -> CachedResponse:
+        """The same response with a compressed body (and the same ETag)."""
+        return replace(self, body=body, encoding=encoding)
+
+    def matches(self, if_none_match: str | None) -> bool:
+        """Return True if the `If-None-Match` header covers this response."""
+        if not if_none_match:
+            return False
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or self.etag in tags
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of `CachedResponse` objects.
+
+    `max_entries=0` désactive le cache (toutes les lectures sont des misses).
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Any, CachedResponse] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Any) -> CachedResponse | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Any, entry: CachedResponse) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
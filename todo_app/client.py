@@ -0,0 +1,215 @@
+"""Client HTTP de l'API, partagé par toutes les sessions de l'interface Streamlit.
+
+Un seul `httpx.Client` (pool de connexions keep-alive) sert toutes les requêtes:
+un rerun ne rouvre plus de connexion TCP. La liste des todos est servie depuis
+un cache pendant `cache_ttl` secondes, puis revalidée avec son ETag (`304` sans
+corps si rien n'a changé); `sync_todos` n'interroge le flux de modifications
+qu'au plus une fois par `cache_ttl` secondes. Les lectures sont retentées sur les erreurs réseau
+et les statuts 502/503/504, avec une attente exponentielle.
+
+Les réponses compressées (gzip, et zstd si `zstandard` est installé) sont
+décodées par httpx. Avec `msgpack=True`, la liste et les créations passent en
+MessagePack: moins d'octets et un décodage plus rapide que JSON, mais
+`created_at` y est un `datetime` et non une chaîne ISO 8601.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import httpx
+
+from .encoding import JSON_MEDIA_TYPE, MSGPACK_MEDIA_TYPE, msgpack_module, unpack
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, MutableMapping
+
+# statuts de passerelle / surcharge: la requête n'a pas été traitée
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+
+@dataclass(frozen=True)
+class _CachedList:
+    todos: list[dict[str, Any]]
+    etag: str | None
+    fetched_at: float
+
+
+class TodoClient:
+    """Thread-safe client for the todo API, with a revalidated list cache."""
+
+    def __init__(
+        self,
+        base_url: str,
+        *,
+        timeout: float = 5.0,
+        retries: int = 2,
+        cache_ttl: float = 2.0,
+        backoff: float = 0.1,
+        transport: httpx.BaseTransport | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        msgpack: bool = False,
+    ) -> None:
+        if msgpack and msgpack_module() is None:
+            raise ValueError("msgpack=True requires the msgpack package")
+        self.msgpack = msgpack
+        self.retries = retries
+        self.cache_ttl = cache_ttl
+        self.backoff = backoff
+        self._clock = clock
+        self._http = httpx.Client(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 2.0)),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            transport=transport,
+        )
+        self._lock = threading.Lock()
+        self._list: _CachedList | None = None
+        self._writes = 0  # écritures faites par ce client (voir sync_todos)
+
+    def close(self) -> None:
+        self._http.close()
+
+    def __enter__(self) -> TodoClient:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def list_todos(self, *, fresh: bool = False) -> list[dict[str, Any]]:
+        """All todos, from the cache while it is fresh, revalidated otherwise.
+
+        Avec `fresh=True`, la liste est toujours revalidée auprès de l'API
+        (`304` si elle n'a pas changé): elle reflète au moins les écritures
+        faites avant l'appel.
+        """
+        with self._lock:
+            cached = self._list
+        now = self._clock()
+        if (
+            not fresh
+            and cached is not None
+            and now - cached.fetched_at < self.cache_ttl
+        ):
+            return list(cached.todos)
+        headers = self._accept()
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+        response = self._get("/todos", headers=headers)
+        etag = response.headers.get("ETag")
+        if response.status_code == 304 and cached is not None:
+            todos, etag = cached.todos, etag or cached.etag
+        else:
+            response.raise_for_status()
+            todos = self._decode(response)
+        with self._lock:
+            self._list = _CachedList(todos, etag, now)
+        return list(todos)
+
+    def create_todo(self, title: str, description: str | None = None) -> dict:
+        payload = {"title": title, "description": description}
+        # pas de nouvelle tentative: un POST rejoué pourrait créer un doublon
+        if self.msgpack:
+            response = self._http.post(
+                "/todos",
+                content=msgpack_module().packb(payload),
+                headers={"Content-Type": MSGPACK_MEDIA_TYPE, **self._accept()},
+            )
+        else:
+            response = self._http.post("/todos", json=payload)
+        response.raise_for_status()
+        self.invalidate()
+        return self._decode(response)
+
+    def changes(self, since: int | None) -> tuple[int, list[dict[str, Any]] | None]:
+        """Events after `since` (GET /todos/changes sans suivre) and the new token.
+
+        Renvoie `None` à la place des événements si le jeton a expiré (`410`).
+        """
+        params: dict[str, Any] = {"follow": "false"}
+        if since is not None:
+            params["since"] = since
+        response = self._get("/todos/changes", params=params)
+        if response.status_code == 410:
+            return 0, None
+        response.raise_for_status()
+        events = [
+            json.loads(line.removeprefix("data: "))
+            for line in response.text.splitlines()
+            if line.startswith("data: ")
+        ]
+        return int(response.headers["X-Last-Event-ID"]), events
+
+    def invalidate(self) -> None:
+        """Drop the cached list (the next `list_todos` downloads it again)."""
+        with self._lock:
+            self._list = None
+            self._writes += 1
+
+    def _accept(self) -> dict[str, str]:
+        return {"Accept": MSGPACK_MEDIA_TYPE if self.msgpack else JSON_MEDIA_TYPE}
+
+    def _decode(self, response: httpx.Response) -> Any:
+        # le serveur peut répondre en JSON (sans msgpack installé, par exemple)
+        if response.headers.get("content-type", "").startswith(MSGPACK_MEDIA_TYPE):
+            return unpack(response.content)
+        return response.json()
+
+    def _get(self, path: str, **kwargs: Any) -> httpx.Response:
+        attempt = 0
+        while True:
+            try:
+                response = self._http.get(path, **kwargs)
+            except httpx.TransportError:
+                if attempt >= self.retries:
+                    raise
+            else:
+                if (
+                    attempt >= self.retries
+                    or response.status_code not in RETRY_STATUSES
+                ):
+                    return response
+            time.sleep(self.backoff * 2**attempt)
+            attempt += 1
+
+
+def sync_todos(client: TodoClient, state: MutableMapping[str, Any]) -> list[dict]:
+    """Keep a local copy of the list in `state`, refreshed from the change feed.
+
+    Seul le premier affichage (ou un jeton expiré) recharge la liste complète;
+    ensuite un appel ne télécharge que les modifications, et seulement si la
+    copie a plus de `cache_ttl` secondes ou si le client a écrit depuis: un
+    rerun rapproché ne fait aucune requête. `state` est la session Streamlit
+    (ou tout mapping).
+    """
+    now = client._clock()
+    with client._lock:
+        writes = client._writes
+    if (
+        "todos" in state
+        and now - state["synced_at"] < client.cache_ttl
+        and state["writes"] == writes
+    ):
+        return sorted(state["todos"].values(), key=lambda t: t["id"])
+    events = None
+    if "todos" in state:
+        seq, events = client.changes(state["seq"])
+    if events is None:
+        # jeton lu avant la liste, revalidée (et non prise dans le cache, qui
+        # peut précéder le jeton): les événements rejoués ensuite sont
+        # idempotents
+        seq, _ = client.changes(None)
+        state["todos"] = {t["id"]: t for t in client.list_todos(fresh=True)}
+        events = []
+    for event in events:
+        if event["type"] == "deleted":
+            state["todos"].pop(event["id"], None)
+        else:
+            state["todos"][event["id"]] = event["todo"]
+    state["seq"] = seq
+    state["synced_at"], state["writes"] = now, writes
+    return sorted(state["todos"].values(), key=lambda t: t["id"])
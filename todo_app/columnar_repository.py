@@ -0,0 +1,396 @@
+"""Moteur de stockage en mémoire compact, organisé en colonnes.
+
+Au lieu d'un objet `TodoInDB` par ligne (un `__dict__`, le suivi des champs
+pydantic, un `datetime` séparé...), chaque champ est rangé dans une colonne
+`array`/`bytearray` et les textes sont concaténés en UTF-8 dans un seul slab.
+Les `TodoInDB` ne sont construits qu'au moment de les renvoyer.
+
+Comme `InMemoryTodoRepository`, ce repository n'est pas thread-safe.
+"""
+
+from __future__ import annotations
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import UTC, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from .models import TodoCreate, TodoInDB, TodoQuery, TodoStats, TodoUpdate
+from .repository import check_version
+from .search import InvertedIndex
+from .stats import StatsCounter
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+    from .models import TodoPage, TodoRow
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+
+# valeurs de la colonne `_status`: une ligne supprimée reste en place (tombstone)
+_DELETED, _OPEN, _DONE = 0, 1, 2
+_STATUS = {False: _OPEN, True: _DONE}
+_NONE = -1  # longueur d'une description absente
+_NO_OWNER = 0  # code de propriétaire d'un todo sans propriétaire
+
+# recherche en C (module re) de la prochaine ligne vivante / ouverte / terminée
+_NEXT_ALIVE = re.compile(rb"[\x01\x02]")
+_NEXT_WITH_STATUS = {False: re.compile(rb"\x01"), True: re.compile(rb"\x02")}
+
+
+def _to_micros(value: datetime) -> int:
+    return (value - _EPOCH) // _MICROSECOND
+
+
+class ColumnarTodoRepository:
+    """Memory-compact in-memory repository (same interface as the others).
+
+    Une ligne coûte une quarantaine d'octets plus ses textes: id, statut, version,
+    date de création en microsecondes et, pour titre et description, un offset et
+    une longueur dans le slab. Le propriétaire est un code de 4 octets (chaque
+    nom distinct n'est stocké qu'une fois). Les lignes sont triées par id (ids croissants), ce qui
+    permet de retrouver un id par bisection sans dictionnaire.
+
+    Les suppressions et les textes remplacés laissent des trous, récupérés par un
+    compactage quand ils dépassent la moitié du stockage. L'index de recherche
+    ajoute 8 octets par mot distinct de chaque todo.
+    """
+
+    def __init__(self) -> None:
+        self._next_id = 1
+        self._revision = 0
+        self._ids = array("q")
+        self._status = bytearray()
+        self._versions = array("I")
+        self._created = array("q")
+        self._title_off = array("q")
+        self._title_len = array("i")
+        self._desc_off = array("q")
+        self._desc_len = array("i")
+        self._owner = array("I")
+        self._slab = bytearray()
+        # propriétaires internés: code -> nom (le code 0 est "sans propriétaire")
+        self._owners: list[str | None] = [None]
+        self._owner_codes: dict[str, int] = {}
+        # created_at croissant avec l'id: permet la bisection sur les dates
+        self._created_sorted = True
+        self._dead_rows = 0
+        self._dead_bytes = 0
+        # listes d'ids en `array`: l'index reste compact lui aussi
+        self._search_index = InvertedIndex()
+        self._stats = StatsCounter()
+
+    def __len__(self) -> int:
+        return len(self._ids) - self._dead_rows
+
+    def list(self, query: TodoQuery | None = None) -> TodoPage:
+        query = query or TodoQuery()
+        start = 0 if query.after_id is None else bisect_right(self._ids, query.after_id)
+        stop = len(self._ids)
+        check_dates = (
+            query.created_after is not None or query.created_before is not None
+        )
+        if check_dates and self._created_sorted:
+            # dates triées: la fenêtre devient un intervalle de lignes
+            if query.created_after is not None:
+                lo = bisect_left(self._created, _to_micros(query.created_after))
+                start = max(start, lo)
+            if query.created_before is not None:
+                stop = bisect_left(self._created, _to_micros(query.created_before))
+            check_dates = False
+        after = None if query.created_after is None else _to_micros(query.created_after)
+        before = (
+            None if query.created_before is None else _to_micros(query.created_before)
+        )
+        pattern = (
+            _NEXT_ALIVE
+            if query.completed is None
+            else _NEXT_WITH_STATUS[query.completed]
+        )
+        owner = None
+        if query.owner is not None:
+            owner = self._owner_codes.get(query.owner)
+            if owner is None:
+                return []
+
+        # projection: seules les colonnes demandées sont lues et décodées
+        read = (
+            self._materialize if query.fields is None else self._projector(query.fields)
+        )
+        results: list = []
+        row = start
+        while query.limit is None or len(results) < query.limit:
+            match = pattern.search(self._status, row, stop)
+            if match is None:
+                break
+            row = match.start()
+            created = self._created[row]
+            if (owner is None or self._owner[row] == owner) and (
+                not check_dates
+                or (
+                    (after is None or created >= after)
+                    and (before is None or created < before)
+                )
+            ):
+                results.append(read(row))
+            row += 1
+        return results
+
+    def create(self, payload: TodoCreate) -> TodoInDB:
+        return self.create_many([payload])[0]
+
+    def get(self, todo_id: int) -> TodoInDB | None:
+        row = self._row(todo_id)
+        return None if row is None else self._materialize(row)
+
+    def update(
+        self, todo_id: int, payload: TodoUpdate, expected_version: int | None = None
+    ) -> TodoInDB | None:
+        row = self._row(todo_id)
+        if row is None:
+            return None
+        check_version(todo_id, self._versions[row], expected_version)
+        changes = payload.model_dump(exclude_unset=True)
+        if "title" in changes or "description" in changes:
+            title, description = old = self._texts(row)
+            new = (
+                changes.get("title", title),
+                changes.get("description", description),
+            )
+            self._search_index.replace(todo_id, old, new)
+        if "title" in changes:
+            self._dead_bytes += self._title_len[row]
+            self._title_off[row], self._title_len[row] = self._append_text(
+                changes["title"]
+            )
+        if "description" in changes:
+            self._dead_bytes += max(self._desc_len[row], 0)
+            self._desc_off[row], self._desc_len[row] = self._append_text(
+                changes["description"]
+            )
+        if changes.get("completed") is not None:
+            self._stats.set_completed(self._status[row] == _DONE, changes["completed"])
+            self._status[row] = _DONE if changes["completed"] else _OPEN
+        self._versions[row] += 1
+        self._revision += 1
+        todo = self._materialize(row)
+        self._maybe_compact()
+        return todo
+
+    def delete(self, todo_id: int, expected_version: int | None = None) -> bool:
+        row = self._row(todo_id)
+        if row is None:
+            return False
+        check_version(todo_id, self._versions[row], expected_version)
+        self._search_index.remove(todo_id, *self._texts(row))
+        self._stats.remove(
+            _EPOCH + timedelta(microseconds=self._created[row]),
+            self._status[row] == _DONE,
+        )
+        self._status[row] = _DELETED
+        self._dead_rows += 1
+        self._dead_bytes += self._title_len[row] + max(self._desc_len[row], 0)
+        self._revision += 1
+        self._maybe_compact()
+        return True
+
+    def create_many(self, payloads: Iterable[TodoCreate]) -> list[TodoInDB]:
+        created_at = datetime.now(UTC)
+        micros = _to_micros(created_at)
+        if self._created and micros < self._created[-1]:
+            self._created_sorted = False
+        todos: list[TodoInDB] = []
+        for payload in payloads:
+            todo_id = self._next_id
+            self._next_id += 1
+            title_off, title_len = self._append_text(payload.title)
+            desc_off, desc_len = self._append_text(payload.description)
+            self._ids.append(todo_id)
+            self._status.append(_OPEN)
+            self._versions.append(1)
+            self._created.append(micros)
+            self._title_off.append(title_off)
+            self._title_len.append(title_len)
+            self._desc_off.append(desc_off)
+            self._desc_len.append(desc_len)
+            self._owner.append(self._owner_code(payload.owner))
+            self._search_index.add(todo_id, payload.title, payload.description)
+            self._stats.add(created_at, False)
+            self._revision += 1
+            todos.append(
+                TodoInDB.model_construct(
+                    id=todo_id,
+                    title=payload.title,
+                    description=payload.description,
+                    completed=False,
+                    created_at=created_at,
+                    owner=payload.owner,
+                )
+            )
+        return todos
+
+    def update_many(
+        self, changes: Iterable[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]:
+        return [
+            self.update(todo_id, payload) if self._owns(todo_id, owner) else None
+            for todo_id, payload in changes
+        ]
+
+    def delete_many(
+        self, todo_ids: Iterable[int], owner: str | None = None
+    ) -> list[bool]:
+        return [
+            self._owns(todo_id, owner) and self.delete(todo_id) for todo_id in todo_ids
+        ]
+
+    def search(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        query = query or TodoQuery()
+        owner = None
+        if query.owner is not None:
+            owner = self._owner_codes.get(query.owner)
+            if owner is None:
+                return []
+        after = None if query.created_after is None else _to_micros(query.created_after)
+        before = (
+            None if query.created_before is None else _to_micros(query.created_before)
+        )
+        status = None if query.completed is None else _STATUS[query.completed]
+        # filtres vérifiés sur les colonnes, comme dans list(): seules les
+        # lignes retenues sont lues, et seulement les champs demandés
+        read = (
+            self._materialize if query.fields is None else self._projector(query.fields)
+        )
+        results: list = []
+        for todo_id in self._search_index.search(text, query.after_id):
+            row = self._row(todo_id)
+            if row is None or (status is not None and self._status[row] != status):
+                continue
+            created = self._created[row]
+            if (
+                (owner is not None and self._owner[row] != owner)
+                or (after is not None and created < after)
+                or (before is not None and created >= before)
+            ):
+                continue
+            results.append(read(row))
+            if query.limit is not None and len(results) >= query.limit:
+                break
+        return results
+
+    def revision(self) -> int:
+        return self._revision
+
+    def count(self) -> int:
+        return len(self)
+
+    def stats(self) -> TodoStats:
+        return self._stats.snapshot()
+
+    def _row(self, todo_id: int) -> int | None:
+        row = bisect_left(self._ids, todo_id)
+        if (
+            row < len(self._ids)
+            and self._ids[row] == todo_id
+            and self._status[row] != _DELETED
+        ):
+            return row
+        return None
+
+    def _owns(self, todo_id: int, owner: str | None) -> bool:
+        """Whether `owner` may write `todo_id` (anyone if None)."""
+        if owner is None:
+            return True
+        row = self._row(todo_id)
+        # un propriétaire jamais vu n'a pas de code: il ne possède rien
+        code = self._owner_codes.get(owner)
+        return row is not None and code is not None and self._owner[row] == code
+
+    def _owner_code(self, owner: str | None) -> int:
+        if owner is None:
+            return _NO_OWNER
+        code = self._owner_codes.get(owner)
+        if code is None:
+            code = self._owner_codes[owner] = len(self._owners)
+            self._owners.append(owner)
+        return code
+
+    def _append_text(self, text: str | None) -> tuple[int, int]:
+        if text is None:
+            return 0, _NONE
+        data = text.encode()
+        offset = len(self._slab)
+        self._slab += data
+        return offset, len(data)
+
+    def _text(self, offset: int, length: int) -> str | None:
+        if length == _NONE:
+            return None
+        return self._slab[offset : offset + length].decode()
+
+    def _texts(self, row: int) -> tuple[str, str | None]:
+        title = self._text(self._title_off[row], self._title_len[row])
+        return title, self._text(self._desc_off[row], self._desc_len[row])
+
+    def _materialize(self, row: int) -> TodoInDB:
+        title, description = self._texts(row)
+        # données validées à l'écriture: pas de seconde validation pydantic
+        return TodoInDB.model_construct(
+            id=self._ids[row],
+            title=title,
+            description=description,
+            completed=self._status[row] == _DONE,
+            created_at=_EPOCH + timedelta(microseconds=self._created[row]),
+            version=self._versions[row],
+            owner=self._owners[self._owner[row]],
+        )
+
+    def _projector(self, fields: tuple[str, ...]) -> Callable[[int], TodoRow]:
+        """Function reading only the columns of `fields` from a row."""
+        readers: dict[str, Callable[[int], object]] = {
+            "id": lambda row: self._ids[row],
+            "title": lambda row: self._text(self._title_off[row], self._title_len[row]),
+            "description": lambda row: self._text(
+                self._desc_off[row], self._desc_len[row]
+            ),
+            "completed": lambda row: self._status[row] == _DONE,
+            "created_at": lambda row: _EPOCH
+            + timedelta(microseconds=self._created[row]),
+            "version": lambda row: self._versions[row],
+            "owner": lambda row: self._owners[self._owner[row]],
+        }
+        columns = [(name, readers[name]) for name in fields]
+        return lambda row: {name: read(row) for name, read in columns}
+
+    def _maybe_compact(self) -> None:
+        if self._dead_rows * 2 > len(self._ids) or self._dead_bytes * 2 > len(
+            self._slab
+        ):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Rewrite every column without deleted rows nor unreachable text."""
+        live = [row for row, status in enumerate(self._status) if status != _DELETED]
+        slab = bytearray()
+        title_off, desc_off = array("q"), array("q")
+        for row in live:
+            title_off.append(len(slab))
+            slab += self._slab[
+                self._title_off[row] : self._title_off[row] + self._title_len[row]
+            ]
+            desc_off.append(len(slab))
+            if self._desc_len[row] > 0:
+                start = self._desc_off[row]
+                slab += self._slab[start : start + self._desc_len[row]]
+        self._ids = array("q", (self._ids[row] for row in live))
+        self._status = bytearray(self._status[row] for row in live)
+        self._versions = array("I", (self._versions[row] for row in live))
+        self._created = array("q", (self._created[row] for row in live))
+        self._title_len = array("i", (self._title_len[row] for row in live))
+        self._desc_len = array("i", (self._desc_len[row] for row in live))
+        self._owner = array("I", (self._owner[row] for row in live))
+        self._title_off, self._desc_off, self._slab = title_off, desc_off, slab
+        self._dead_rows = 0
+        self._dead_bytes = 0
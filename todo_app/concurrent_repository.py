@@ -0,0 +1,112 @@
+"""Repository en mémoire thread-safe, pour un service multi-threadé.
+
+Les écritures sur un même todo sont sérialisées par un verrou choisi parmi
+`stripes` verrous (verrouillage strié par id): deux écritures sur des todos
+différents ne se bloquent presque jamais. Une mise à jour est optimiste: la
+nouvelle version est construite hors verrou, qui n'est pris que pour vérifier
+que le todo n'a pas changé et l'échanger (compare-and-swap). Les lectures par id
+ne prennent aucun verrou; les listes ne prennent que le verrou des index, tenu
+le temps de lire une page d'ids.
+"""
+
+from __future__ import annotations
+
+import threading
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING
+
+from .models import TodoInDB, TodoQuery, TodoStats, TodoUpdate, projector
+from .repository import InMemoryTodoRepository, check_version, updated_todo
+
+if TYPE_CHECKING:
+    from .models import TodoPage
+
+
+class ConcurrentTodoRepository(InMemoryTodoRepository):
+    """Thread-safe in-memory repository with lock striping.
+
+    - allocation d'ids atomique (`_id_lock`), avec des dates de création qui
+      ne reculent pas quand l'id avance;
+    - `update` par compare-and-swap sous le verrou strié du todo (recommencé si
+      un autre écrivain est passé entre la lecture et l'échange), `delete` sous
+      ce même verrou;
+    - index secondaires, compteurs de `stats` et révision protégés par
+      `_index_lock`,
+      jamais tenu pendant un `model_copy` ou une validation pydantic.
+    """
+
+    def __init__(self, stripes: int = 64, first_id: int = 1, id_step: int = 1) -> None:
+        super().__init__(first_id, id_step)
+        self._id_lock = threading.Lock()
+        self._last_created = datetime.min.replace(tzinfo=UTC)
+        self._index_lock = threading.Lock()
+        self._stripes = [threading.Lock() for _ in range(stripes)]
+
+    def _stripe(self, todo_id: int) -> threading.Lock:
+        return self._stripes[todo_id % len(self._stripes)]
+
+    def list(self, query: TodoQuery | None = None) -> TodoPage:
+        with self._index_lock:
+            page = self._page_ids(query or TodoQuery())
+        # un todo supprimé entre-temps est simplement omis de la page
+        data = self._data
+        todos = [todo for todo_id in page if (todo := data.get(todo_id)) is not None]
+        if query is not None and query.fields is not None:
+            return list(map(projector(query.fields), todos))
+        return todos
+
+    def search(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        with self._index_lock:
+            return super().search(text, query)
+
+    def stats(self) -> TodoStats:
+        # copie cohérente sous le verrou, TodoStats construit hors verrou
+        with self._index_lock:
+            counter = self._stats.copy()
+        return counter.snapshot()
+
+    def update(
+        self, todo_id: int, payload: TodoUpdate, expected_version: int | None = None
+    ) -> TodoInDB | None:
+        while True:
+            todo = self._data.get(todo_id)
+            if todo is None:
+                return None
+            check_version(todo_id, todo.version, expected_version)
+            # model_copy hors verrou: la section critique se réduit à l'échange
+            updated = updated_todo(todo, payload)
+            with self._stripe(todo_id):
+                if self._data.get(todo_id) is todo:
+                    self._replace(todo, updated)
+                    return updated
+
+    def delete(self, todo_id: int, expected_version: int | None = None) -> bool:
+        with self._stripe(todo_id):
+            return super().delete(todo_id, expected_version)
+
+    def _allocate(self, created_at: datetime) -> tuple[int, datetime]:
+        with self._id_lock:
+            todo_id = self._next_id
+            self._next_id += self._id_step
+            # date lue avant le verrou: un thread plus lent ne doit pas donner à
+            # un id plus grand une date antérieure (les dates suivent les ids)
+            created_at = self._last_created = max(created_at, self._last_created)
+        return todo_id, created_at
+
+    def _insert(self, todo: TodoInDB) -> None:
+        with self._id_lock:
+            self._next_id = max(self._next_id, todo.id + self._id_step)
+        self._data[todo.id] = todo
+        self._index_add(todo)
+
+    def _index_add(self, todo: TodoInDB) -> None:
+        with self._index_lock:
+            super()._index_add(todo)
+
+    def _index_remove(self, todo: TodoInDB) -> None:
+        with self._index_lock:
+            super()._index_remove(todo)
+
+    def _index_replace(self, old: TodoInDB, new: TodoInDB) -> None:
+        with self._index_lock:
+            super()._index_replace(old, new)
@@ -3,7 +3,10 @@
 Permet de lire les variables d'environnement et d'avoir des valeurs par défaut sûres.
 """
 
-from pydantic import AnyHttpUrl
+from functools import lru_cache
+from typing import Literal
+
+from pydantic import AnyHttpUrl, field_validator
 from pydantic_settings import BaseSettings
 
 
@@ -15,9 +18,94 @@ class Settings(BaseSettings):
 
     app_env: str = "production"
     api_host: AnyHttpUrl = "http://localhost:8000"
+    # client HTTP de l'interface: délai maximal d'une requête (s), nouvelles
+    # tentatives des lectures, durée (s) pendant laquelle la liste est servie
+    # depuis le cache avant d'être revalidée par son ETag
+    api_timeout: float = 5.0
+    api_retries: int = 2
+    api_cache_ttl: float = 2.0
     secret_key: str
 
+    # stockage: "memory" (par processus, volatile), "concurrent" (mémoire,
+    # thread-safe), "columnar" (mémoire, compact), "durable" (mémoire + journal
+    # sur disque), "sqlite" (durable, multi-workers), "remote" (processus
+    # store partagé par les workers, joint par une socket Unix) ou "sharded"
+    # (mémoire, thread-safe, partitionné par propriétaire)
+    storage_backend: Literal[
+        "memory", "concurrent", "columnar", "durable", "sqlite", "remote", "sharded"
+    ] = "memory"
+    sqlite_path: str = "todos.db"
+    # backend "remote": socket du store, et backend utilisé par le processus
+    # store lui-même (python -m todo_app.store_server)
+    store_socket: str = "todo-store.sock"
+    store_backend: Literal["memory", "columnar", "durable", "sqlite"] = "memory"
+    memory_lock_stripes: int = 64
+    # backend "sharded": nombre de partitions (une par groupe de propriétaires)
+    shard_count: int = 8
+    # backend "durable": répertoire du journal et des snapshots, délai maximal
+    # avant fsync d'une écriture, écritures entre deux snapshots
+    journal_dir: str = "data"
+    journal_flush_ms: float = 5.0
+    journal_snapshot_every: int = 100_000
+    # threads dédiés aux backends bloquants (le store en mémoire n'en utilise pas)
+    repository_workers: int = 8
+    # nombre de réponses GET /todos sérialisées gardées en cache (0: désactivé)
+    list_cache_size: int = 256
+    # événements gardés pour GET /todos/changes (reprise après une coupure)
+    change_feed_size: int = 10_000
+    # GET /metrics (format Prometheus): compteurs et durées des requêtes, du
+    # service et du repository; désactivé, rien n'est mesuré
+    metrics_enabled: bool = False
+    # réponses d'un seul todo (POST /todos, PATCH /todos/{id}) sérialisées
+    # directement en bytes, sans re-validation par response_model (les listes
+    # et les routes bulk le sont toujours)
+    fast_responses: bool = False
+    # compression des réponses selon Accept-Encoding, par ordre de préférence
+    # ([] la désactive; zstd demande le paquet `zstandard`), taille minimale
+    # d'un corps compressé (octets) et niveaux
+    compression_encodings: list[Literal["zstd", "gzip"]] = ["zstd", "gzip"]
+    compression_min_size: int = 1024
+    gzip_level: int = 6
+    zstd_level: int = 3
+    # profilage (GET /debug/profiles): PROFILING_ENABLED profile chaque requête
+    # avec cProfile et garde celles qui durent plus de PROFILING_THRESHOLD_MS;
+    # avec PROFILING_TOKEN, une requête portant l'en-tête X-Profile-Token est
+    # profilée et gardée quelle que soit sa durée. GET /debug/profiles exige
+    # toujours cet en-tête (sans PROFILING_TOKEN, les profils ne sont pas
+    # lisibles). Profils gardés: les PROFILING_BUFFER_SIZE derniers
+    profiling_enabled: bool = False
+    profiling_threshold_ms: float = 250.0
+    profiling_token: str | None = None
+    profiling_buffer_size: int = 50
+
+    # logs: niveau, format "text" ou "json", écriture dans un thread dédié
+    # (le thread de la requête ne fait jamais d'I/O) et proportion gardée par
+    # niveau, dans ]0, 1], ex. LOG_SAMPLING='{"INFO": 0.1}'
+    log_level: str = "INFO"
+    log_format: Literal["text", "json"] = "text"
+    log_async: bool = True
+    log_sampling: dict[str, float] = {}
+
     model_config = {"env_file": ".env", "env_file_encoding": "utf-8"}
 
+    @field_validator("log_sampling")
+    @classmethod
+    def _sampling_rates(cls, rates: dict[str, float]) -> dict[str, float]:
+        # 0 ne garderait rien (LOG_LEVEL le fait), > 1 n'a pas de sens
+        invalid = {level: rate for level, rate in rates.items() if not 0 < rate <= 1}
+        if invalid:
+            raise ValueError(f"Sampling rates must be in (0, 1]: {invalid}")
+        return rates
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the settings, read from the environment on first use."""
+    return Settings()
+
 
-settings = Settings()
+def __getattr__(name: str) -> Settings:
+    # `settings` reste importable mais n'est plus construit à l'import du module
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
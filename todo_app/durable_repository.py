@@ -0,0 +1,244 @@
+"""Store en mémoire rendu durable par un journal d'opérations et des snapshots.
+
+Les lectures et écritures gardent la vitesse de `InMemoryTodoRepository`: chaque
+écriture ajoute en plus une trame au journal (`OperationLog`), écrit et fsyncé
+par lots en arrière-plan. Au démarrage, l'état est reconstruit à partir du
+dernier snapshot puis des segments de journal qui le suivent.
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import struct
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from pydantic import TypeAdapter, ValidationError
+
+from .journal import (
+    SNAPSHOT_NAME,
+    OperationLog,
+    list_segments,
+    read_frames,
+    segment_path,
+    write_snapshot,
+)
+from .models import TodoInDB
+from .repository import InMemoryTodoRepository
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+
+logger = logging.getLogger(__name__)
+
+# types de trame: todo complet (création ou mise à jour), suppression, en-tête
+_PUT, _DELETE, _HEADER = b"P", b"D", b"H"
+_ID = struct.Struct("<q")
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+
+# un todo est journalisé comme un tableau JSON compact, created_at en
+# microsecondes UTC: (dé)sérialisé en Rust par pydantic-core, sans dict. Les
+# trames écrites avant l'ajout de `version` (5 éléments) ou de `owner` (6
+# éléments) restent lisibles.
+_record_adapter = TypeAdapter(
+    tuple[int, str, str | None, bool, int, int, str | None]
+    | tuple[int, str, str | None, bool, int, int]
+    | tuple[int, str, str | None, bool, int]
+)
+
+
+def _encode_todo(todo: TodoInDB) -> bytes:
+    micros = (todo.created_at - _EPOCH) // _MICROSECOND
+    return _PUT + _record_adapter.dump_json(
+        (
+            todo.id,
+            todo.title,
+            todo.description,
+            todo.completed,
+            micros,
+            todo.version,
+            todo.owner,
+        )
+    )
+
+
+def _decode_todo(body: bytes) -> TodoInDB:
+    todo_id, title, description, completed, micros, *extra = (
+        _record_adapter.validate_json(body)
+    )
+    return TodoInDB(
+        id=todo_id,
+        title=title,
+        description=description,
+        completed=completed,
+        created_at=_EPOCH + timedelta(microseconds=micros),
+        version=extra[0] if extra else 1,
+        owner=extra[1] if len(extra) > 1 else None,
+    )
+
+
+class DurableTodoRepository(InMemoryTodoRepository):
+    """In-memory repository persisted by a write-ahead log and snapshots.
+
+    Le journal enregistre l'état complet du todo après chaque écriture (et non
+    l'opération): rejouer deux fois une trame donne le même résultat, ce qui
+    rend la reprise sûre même si un crash survient pendant un snapshot.
+
+    Un snapshot est pris toutes les `snapshot_every` écritures: le journal passe
+    à un nouveau segment (ouvert par son flusher), une copie des todos est écrite
+    dans un thread d'arrière-plan, puis les segments couverts par le snapshot
+    sont supprimés. L'écriture qui déclenche le snapshot ne fait aucune I/O.
+
+    Une trame intègre mais illisible (todo invalide) est signalée et ignorée
+    au rejeu, comptée dans `skipped_frames`: elle ne doit pas empêcher le store
+    de redémarrer.
+
+    Comme `InMemoryTodoRepository`, ce repository n'est pas thread-safe.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        *,
+        flush_interval: float = 0.005,
+        snapshot_every: int = 100_000,
+    ) -> None:
+        super().__init__()
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.snapshot_every = snapshot_every
+        self._log: OperationLog | None = None  # None pendant le rejeu: pas de trame
+        self._writes_since_snapshot = 0
+        self._snapshot_thread: threading.Thread | None = None
+        self.skipped_frames = 0
+        last_segment = self._recover()
+        # nouveau segment: on n'écrit jamais à la suite d'une trame tronquée
+        self._log = OperationLog(
+            self.directory, last_segment + 1, flush_interval=flush_interval
+        )
+
+    def delete(self, todo_id: int, expected_version: int | None = None) -> bool:
+        deleted = super().delete(todo_id, expected_version)
+        if deleted and self._log is not None:
+            self._record(_DELETE + _ID.pack(todo_id))
+        return deleted
+
+    def sync(self) -> None:
+        """Block until every write made so far is on disk."""
+        self._log.sync()
+
+    def snapshot(self, *, wait: bool = False) -> None:
+        """Write a snapshot of the current state (in the background by default)."""
+        if self._snapshot_thread is not None and self._snapshot_thread.is_alive():
+            if wait:
+                self._snapshot_thread.join()
+            return
+        # les todos sont immuables (update fait un model_copy): une copie de la
+        # liste suffit pour écrire un état cohérent pendant que le store évolue
+        todos = list(self._data.values())
+        header = {"next_id": self._next_id, "segment": self._log.rotate()}
+        self._writes_since_snapshot = 0
+        self._snapshot_thread = threading.Thread(
+            target=self._write_snapshot,
+            args=(header, todos),
+            name="todo-snapshot",
+            daemon=True,
+        )
+        self._snapshot_thread.start()
+        if wait:
+            self._snapshot_thread.join()
+
+    def close(self) -> None:
+        """Finish any running snapshot and flush the log."""
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        self._log.close()
+
+    def _insert(self, todo: TodoInDB) -> None:
+        super()._insert(todo)
+        if self._log is not None:
+            self._record(_encode_todo(todo))
+
+    def _replace(self, old: TodoInDB, new: TodoInDB) -> None:
+        super()._replace(old, new)
+        if self._log is not None:
+            self._record(_encode_todo(new))
+
+    def _record(self, payload: bytes) -> None:
+        self._log.append(payload)
+        self._writes_since_snapshot += 1
+        if self._writes_since_snapshot >= self.snapshot_every:
+            self.snapshot()
+
+    def _write_snapshot(self, header: dict[str, int], todos: list[TodoInDB]) -> None:
+        # le flusher a fermé les segments couverts et ouvert le nouveau
+        self._log.sync()
+
+        def frames() -> Iterator[bytes]:
+            yield _HEADER + json.dumps(header).encode()
+            for todo in todos:
+                yield _encode_todo(todo)
+
+        write_snapshot(self.directory, frames())
+        for number in list_segments(self.directory):
+            if number < header["segment"]:
+                segment_path(self.directory, number).unlink(missing_ok=True)
+
+    def _recover(self) -> int:
+        """Load the snapshot, replay the log tail; return the last segment number."""
+        # chargement en masse d'objets sans cycles: le GC cyclique ne ferait que
+        # reparcourir des millions de todos vivants
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._replay()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _replay(self) -> int:
+        first_segment = 0
+        snapshot = self.directory / SNAPSHOT_NAME
+        if snapshot.exists():
+            for position, payload in enumerate(read_frames(snapshot)):
+                if payload[:1] == _HEADER:
+                    header = json.loads(payload[1:])
+                    self._next_id = header["next_id"]
+                    first_segment = header["segment"]
+                else:
+                    self._apply(payload, snapshot, position)
+        segments = list_segments(self.directory)
+        for number in segments:
+            if number >= first_segment:
+                path = segment_path(self.directory, number)
+                for position, payload in enumerate(read_frames(path)):
+                    self._apply(payload, path, position)
+        return max(segments, default=first_segment)
+
+    def _apply(self, payload: bytes, path: Path, position: int) -> None:
+        kind, body = payload[:1], payload[1:]
+        try:
+            if kind == _DELETE:
+                self.delete(_ID.unpack(body)[0])
+                return
+            todo = _decode_todo(body)
+        except (ValidationError, struct.error) as exc:
+            self.skipped_frames += 1
+            logger.error(
+                "Skipping invalid frame %d of %s (%s)",
+                position,
+                path.name,
+                type(exc).__name__,
+            )
+            return
+        old = self._data.get(todo.id)
+        if old is None:
+            self._insert(todo)
+        else:
+            self._replace(old, todo)
@@ -0,0 +1,278 @@
+"""Négociation du format (JSON / MessagePack) et compression des réponses.
+
+- format: `Accept: application/msgpack` demande du MessagePack aux endpoints
+  des todos, qui acceptent aussi un corps `Content-Type: application/msgpack`.
+  Les dates y sont des timestamps MessagePack (extension -1), pas des chaînes;
+- compression: les corps d'au moins `min_size` octets sont compressés en zstd
+  ou gzip selon `Accept-Encoding`, avec le niveau configuré. Les listes mettent
+  en cache leur corps déjà compressé; `CompressionMiddleware` compresse les
+  autres réponses, y compris les flux (export NDJSON), bloc par bloc.
+
+`msgpack` et `zstandard` sont optionnels (extra `wire` du paquet): sans
+eux, les réponses restent en JSON et zstd n'est pas proposé. Ils ne sont
+importés qu'au premier usage.
+"""
+
+from __future__ import annotations
+
+import functools
+import importlib
+import zlib
+from dataclasses import dataclass, field
+from datetime import date
+from typing import TYPE_CHECKING, Any, Protocol
+
+from starlette.datastructures import Headers, MutableHeaders
+
+if TYPE_CHECKING:
+    from types import ModuleType
+
+    from pydantic import TypeAdapter
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+# ordre de préférence du serveur quand le client accepte plusieurs codages
+ENCODINGS = ("zstd", "gzip")
+
+# types compressibles (les flux SSE ne le sont pas: chaque événement doit
+# partir tout de suite)
+_COMPRESSIBLE = (
+    JSON_MEDIA_TYPE,
+    MSGPACK_MEDIA_TYPE,
+    "application/x-ndjson",
+    "text/plain",
+    "text/html",
+)
+
+
+@functools.cache
+def _optional(name: str) -> ModuleType | None:
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+
+def msgpack_module() -> ModuleType | None:
+    """The `msgpack` module, or None if it is not installed."""
+    return _optional("msgpack")
+
+
+def zstd_module() -> ModuleType | None:
+    """The `zstandard` module, or None if it is not installed."""
+    return _optional("zstandard")
+
+
+def parse_quality(header: str) -> dict[str, float]:
+    """`Accept` / `Accept-Encoding` values and their weight (`q`, 1 by default)."""
+    weights: dict[str, float] = {}
+    for item in header.split(","):
+        value, *params = (part.strip() for part in item.split(";"))
+        if not value:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, raw = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(raw)
+                except ValueError:
+                    weight = 0.0
+        weights[value.lower()] = max(weight, weights.get(value.lower(), 0.0))
+    return weights
+
+
+def negotiate_media_type(accept: str | None) -> str:
+    """`MSGPACK_MEDIA_TYPE` if the client prefers it (and it is installed).
+
+    JSON reste le choix par défaut (pas d'en-tête, `*/*`, égalité de poids):
+    MessagePack doit être demandé explicitement.
+    """
+    if not accept or msgpack_module() is None:
+        return JSON_MEDIA_TYPE
+    weights = parse_quality(accept)
+
+    def rank(media_type: str) -> tuple[float, bool]:
+        if media_type in weights:
+            return weights[media_type], True
+        wildcard = weights.get("application/*", weights.get("*/*", 0.0))
+        return wildcard, False
+
+    if rank(MSGPACK_MEDIA_TYPE) > rank(JSON_MEDIA_TYPE):
+        return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+
+def _encode_default(value: Any) -> Any:
+    # les datetime (UTC) sont des timestamps; il reste les dates (clés de stats)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+
+def pack(adapter: TypeAdapter, value: Any) -> bytes:
+    """`value` serialized in MessagePack through its pydantic `adapter`."""
+    return msgpack_module().packb(
+        adapter.dump_python(value), datetime=True, default=_encode_default
+    )
+
+
+def unpack(body: bytes) -> Any:
+    """Decode a MessagePack body (timestamps become aware datetimes)."""
+    return msgpack_module().unpackb(body, timestamp=3)
+
+
+class _StreamCompressor(Protocol):
+    def compress(self, data: bytes) -> bytes: ...
+
+    def finish(self) -> bytes: ...
+
+
+class _Gzip:
+    def __init__(self, level: int) -> None:
+        # wbits=31: en-tête et somme de contrôle gzip
+        self._zlib = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        # Z_SYNC_FLUSH: chaque bloc est décodable dès sa réception
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._zlib.flush()
+
+
+class _Zstd:
+    def __init__(self, level: int) -> None:
+        zstd = zstd_module()
+        self._flush_block = zstd.COMPRESSOBJ_FLUSH_BLOCK
+        self._zstd = zstd.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._zstd.compress(data) + self._zstd.flush(self._flush_block)
+
+    def finish(self) -> bytes:
+        return self._zstd.flush()
+
+
+@dataclass
+class CompressionOptions:
+    """Response compression settings of an application (`app.state`).
+
+    Réglées par `app_settings` depuis la configuration, comme les métriques; une
+    liste `encodings` vide désactive la compression.
+    """
+
+    encodings: tuple[str, ...] = ENCODINGS
+    min_size: int = 1024
+    levels: dict[str, int] = field(default_factory=lambda: {"gzip": 6, "zstd": 3})
+
+    def available(self) -> tuple[str, ...]:
+        return tuple(
+            encoding
+            for encoding in self.encodings
+            if encoding != "zstd" or zstd_module() is not None
+        )
+
+    def choose(self, accept_encoding: str | None) -> str | None:
+        """Best encoding accepted by the client (None: send the body as is)."""
+        if not accept_encoding:
+            return None
+        weights = parse_quality(accept_encoding)
+        best, best_weight = None, 0.0
+        for encoding in self.available():
+            weight = weights.get(encoding, weights.get("*", 0.0))
+            if weight > best_weight:
+                best, best_weight = encoding, weight
+        return best
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "gzip":
+            # mtime=0: mêmes octets pour un même corps (cache, ETag)
+            return zlib.compress(body, self.levels["gzip"], wbits=31)
+        return zstd_module().ZstdCompressor(level=self.levels["zstd"]).compress(body)
+
+    def compressor(self, encoding: str) -> _StreamCompressor:
+        if encoding == "gzip":
+            return _Gzip(self.levels["gzip"])
+        return _Zstd(self.levels["zstd"])
+
+
+def _compressible(content_type: str | None) -> bool:
+    if content_type is None:
+        return False
+    return content_type.split(";")[0].strip().lower() in _COMPRESSIBLE
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing response bodies per `Accept-Encoding`.
+
+    Une réponse déjà codée (`Content-Encoding`, ex. une liste servie depuis le
+    cache), d'un type non compressible ou d'un seul bloc plus petit que
+    `min_size` passe telle quelle. Un flux est compressé bloc par bloc. L'`ETag`
+    n'est pas modifié (comme `GZipMiddleware` de Starlette): il identifie la
+    version du contenu, pas ses octets compressés.
+    """
+
+    def __init__(self, app: ASGIApp, options: CompressionOptions) -> None:
+        self.app = app
+        self.options = options
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = self.options.choose(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _StreamCompressor | None = None
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, compressor, passthrough
+            if passthrough or message["type"] not in (
+                "http.response.start",
+                "http.response.body",
+            ):
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                # en attente du premier bloc: sa taille décide de la compression
+                start = message
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                headers = MutableHeaders(raw=start["headers"])
+                if (
+                    "content-encoding" in headers
+                    or not _compressible(headers.get("content-type"))
+                    or (not more_body and len(body) < self.options.min_size)
+                ):
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if more_body:
+                    del headers["Content-Length"]
+                    compressor = self.options.compressor(encoding)
+                    body = compressor.compress(body)
+                else:
+                    body = self.options.compress(body, encoding)
+                    headers["Content-Length"] = str(len(body))
+                await send(start)
+                start = None
+                await send({**message, "body": body})
+                return
+            if compressor is not None:
+                body = compressor.compress(body)
+                if not more_body:
+                    body += compressor.finish()
+            await send({**message, "body": body})
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,84 @@
+"""Flux des modifications (créations, mises à jour, suppressions) des todos.
+
+Chaque écriture passant par `AsyncTodoService` publie un `ChangeEvent` numéroté.
+Les derniers événements sont gardés dans un tampon circulaire: un client qui
+connaît le numéro du dernier événement reçu (jeton de reprise) récupère ce qu'il
+a manqué, puis attend les suivants. Si le jeton est sorti du tampon, ou s'il est
+inconnu (serveur redémarré), le client doit recharger la liste complète.
+
+Le flux est propre au processus: avec plusieurs workers, chacun ne voit que les
+écritures qu'il a lui-même traitées.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+from collections import deque
+from typing import TYPE_CHECKING
+
+from .models import ChangeEvent
+
+if TYPE_CHECKING:
+    from typing import Literal
+
+    from .models import TodoInDB
+
+
+class StaleResumeToken(Exception):
+    """The events following a resume token are no longer available."""
+
+
+class ChangeFeed:
+    """Bounded, numbered log of recent changes with async subscribers.
+
+    Les abonnés n'ont pas de file dédiée: ils relisent le tampon à partir de leur
+    jeton. Un abonné lent ne ralentit donc jamais les écritures; s'il prend plus
+    de `capacity` événements de retard, il reçoit `StaleResumeToken`.
+    """
+
+    def __init__(self, capacity: int = 10_000) -> None:
+        self._events: deque[ChangeEvent] = deque(maxlen=capacity)
+        self._last_seq = 0
+        # une future par abonné en attente, créée sur sa propre boucle
+        self._waiters: set[asyncio.Future[None]] = set()
+
+    @property
+    def last_seq(self) -> int:
+        """Number of the latest event (0 before the first write)."""
+        return self._last_seq
+
+    def publish(
+        self,
+        kind: Literal["created", "updated", "deleted"],
+        todo_id: int,
+        todo: TodoInDB | None = None,
+    ) -> ChangeEvent:
+        self._last_seq += 1
+        event = ChangeEvent(seq=self._last_seq, type=kind, id=todo_id, todo=todo)
+        self._events.append(event)
+        waiters, self._waiters = self._waiters, set()
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+        return event
+
+    def since(self, seq: int) -> list[ChangeEvent]:
+        """Events published after `seq`, oldest first."""
+        missing = self._last_seq - seq
+        if missing < 0 or missing > len(self._events):
+            raise StaleResumeToken(seq)
+        # accès par la fin: O(missing), quelle que soit la taille du tampon
+        return [self._events[index] for index in range(-missing, 0)]
+
+    async def wait(self, seq: int, timeout: float | None = None) -> list[ChangeEvent]:
+        """Events after `seq`, waiting up to `timeout` seconds if there are none."""
+        if seq == self._last_seq:
+            waiter = asyncio.get_running_loop().create_future()
+            self._waiters.add(waiter)
+            try:
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(waiter, timeout)
+            finally:
+                self._waiters.discard(waiter)
+        return self.since(seq)
@@ -0,0 +1,179 @@
+"""Journal d'opérations (write-ahead log) et snapshots pour le store en mémoire.
+
+Un enregistrement est une trame `longueur | crc32 | charge utile`: à la relecture,
+une trame incomplète ou corrompue (crash au milieu d'une écriture) marque la fin
+du journal. Le journal est découpé en segments numérotés; un snapshot indique à
+partir de quel segment rejouer, les segments plus anciens sont supprimés.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import zlib
+from typing import TYPE_CHECKING, BinaryIO
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from pathlib import Path
+
+_FRAME = struct.Struct("<II")  # longueur, crc32 de la charge utile
+_SEGMENT_GLOB = "wal-*.log"
+SNAPSHOT_NAME = "snapshot.bin"
+
+
+def segment_path(directory: Path, number: int) -> Path:
+    return directory / f"wal-{number:08d}.log"
+
+
+def list_segments(directory: Path) -> list[int]:
+    """Numbers of the log segments present in `directory`, in order."""
+    return sorted(int(path.stem[4:]) for path in directory.glob(_SEGMENT_GLOB))
+
+
+def encode(payload: bytes) -> bytes:
+    return _FRAME.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_frames(path: Path) -> Iterator[bytes]:
+    """Yield the payloads of `path`, stopping at the first torn or corrupt frame."""
+    with path.open("rb", buffering=1 << 20) as file:
+        while len(header := file.read(_FRAME.size)) == _FRAME.size:
+            length, crc = _FRAME.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return
+            yield payload
+
+
+def _fsync_directory(directory: Path) -> None:
+    # rend durable la création / le renommage d'un fichier (POSIX)
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(directory: Path, frames: Iterable[bytes]) -> None:
+    """Atomically replace the snapshot: temp file, fsync, then rename."""
+    tmp = directory / (SNAPSHOT_NAME + ".tmp")
+    with tmp.open("wb") as file:
+        for payload in frames:
+            file.write(encode(payload))
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp, directory / SNAPSHOT_NAME)
+    _fsync_directory(directory)
+
+
+class OperationLog:
+    """Append-only log with group commit.
+
+    `append` ne fait que copier la trame dans un tampon: un thread d'arrière-plan
+    écrit et fsync tout ce qui s'est accumulé toutes les `flush_interval`
+    secondes, soit un seul fsync pour toutes les écritures de l'intervalle. Une
+    écriture est donc durable au plus tard `flush_interval` secondes après son
+    retour; `sync()` attend qu'elle le soit. Le changement de segment
+    (`rotate`) est fait par ce même thread: l'appelant ne fait aucune I/O.
+    """
+
+    def __init__(
+        self, directory: Path, segment: int, *, flush_interval: float = 0.005
+    ) -> None:
+        self.directory = directory
+        self.segment = segment  # segment des prochaines trames
+        self.flush_interval = flush_interval
+        self._file: BinaryIO = segment_path(directory, segment).open("ab")
+        self._file_segment = segment  # segment ouvert par le flusher
+        _fsync_directory(directory)
+        self._buffer: list[bytes] = []
+        # trames des segments fermés par rotate(), pas encore écrites
+        self._sealed: list[list[bytes]] = []
+        self._appended = 0  # nombre de trames reçues
+        self._durable = 0  # nombre de trames écrites et fsyncées
+        self._closed = False
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()  # écriture du fichier / rotation
+        self._flusher = threading.Thread(
+            target=self._run, name="todo-journal", daemon=True
+        )
+        self._flusher.start()
+
+    def append(self, payload: bytes) -> int:
+        """Buffer one record; return its sequence number for `sync()`."""
+        frame = encode(payload)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("operation log is closed")
+            self._buffer.append(frame)
+            self._appended += 1
+            return self._appended
+
+    def sync(self, sequence: int | None = None) -> None:
+        """Block until record `sequence` (default: every record) is on disk."""
+        with self._cond:
+            target = self._appended if sequence is None else sequence
+            while self._durable < target:
+                self._cond.notify_all()  # réveille le flusher sans attendre
+                self._cond.wait()
+
+    def rotate(self) -> int:
+        """Continue in a new segment; return the new segment number.
+
+        Les trames en attente restent dans l'ancien segment: le flusher les
+        écrit, puis ouvre le nouveau segment (fsync compris) en arrière-plan.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("operation log is closed")
+            self._sealed.append(self._buffer)
+            self._buffer = []
+            self.segment += 1
+            self._cond.notify_all()
+            return self.segment
+
+    def close(self) -> None:
+        """Flush pending records and stop the background flusher."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        with self._io_lock:
+            self._flush_locked()
+            self._file.close()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and not self._buffer and not self._sealed:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            with self._io_lock:
+                self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        with self._cond:
+            sealed, self._sealed = self._sealed, []
+            frames, self._buffer = self._buffer, []
+            target = self._appended
+        for old in sealed:
+            self._write(old)
+            self._file.close()
+            self._file_segment += 1
+            self._file = segment_path(self.directory, self._file_segment).open("ab")
+            _fsync_directory(self.directory)
+        self._write(frames)
+        with self._cond:
+            self._durable = max(self._durable, target)
+            self._cond.notify_all()
+
+    def _write(self, frames: list[bytes]) -> None:
+        if frames:
+            self._file.write(b"".join(frames))
+            self._file.flush()
+            os.fsync(self._file.fileno())
@@ -2,9 +2,32 @@
 
 We use standard logging to be compatible with many environments; loguru can
 be added optionally in dev.
+
+`configure_logging` installe le mode asynchrone: le thread de la requête ne fait
+que déposer l'enregistrement dans une file (`QueueHandler`), un thread dédié
+(`QueueListener`) le formate et l'écrit. Les messages fréquents peuvent être
+échantillonnés par niveau avant même d'entrer dans la file.
 """
 
+from __future__ import annotations
+
+import atexit
+import itertools
+import json
 import logging
+import logging.handlers
+import math
+import queue
+import sys
+from datetime import UTC, datetime
+from typing import TYPE_CHECKING, TextIO
+
+if TYPE_CHECKING:
+    from .config import Settings
+
+_TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_listener: logging.handlers.QueueListener | None = None
 
 
 def get_logger(name: str) -> logging.Logger:
@@ -15,14 +38,104 @@ def get_logger(name: str) -> logging.Logger:
     logger = logging.getLogger(name)
     if not logger.handlers:
         handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
+        formatter = logging.Formatter(_TEXT_FORMAT)
         handler.setFormatter(formatter)
         logger.addHandler(handler)
         logger.setLevel(logging.INFO)
     return logger
 
 
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line (timestamp, level, logger, message)."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, UTC).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep a fraction of the records of the configured levels.
+
+    `rates` associe un niveau à la proportion gardée, dans ]0, 1]
+    (`{"INFO": 0.1}`: un message INFO sur dix, `0.75`: trois sur quatre).
+    L'échantillonnage est déterministe (un compteur par niveau): le n-ième
+    message est gardé quand ceil((n + 1) * rate) dépasse ceil(n * rate), soit
+    exactement `rate` des messages, sans tirage aléatoire sur le chemin chaud.
+    Les niveaux absents ne sont jamais filtrés.
+    """
+
+    def __init__(self, rates: dict[str, float]) -> None:
+        super().__init__()
+        invalid = {level: rate for level, rate in rates.items() if not 0 < rate <= 1}
+        if invalid:
+            raise ValueError(f"Sampling rates must be in (0, 1]: {invalid}")
+        self.rates = {
+            logging.getLevelName(level.upper()): rate for level, rate in rates.items()
+        }
+        self._counters = {level: itertools.count() for level in self.rates}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno)
+        if rate is None:
+            return True
+        # next() sur itertools.count est atomique sous le GIL
+        seen = next(self._counters[record.levelno])
+        return math.ceil((seen + 1) * rate) > math.ceil(seen * rate)
+
+
+def configure_logging(
+    settings: Settings, stream: TextIO | None = None
+) -> logging.handlers.QueueListener | None:
+    """Configure the `todo_app` logger from the settings.
+
+    Remplace les handlers existants. En mode asynchrone, renvoie le
+    `QueueListener` démarré (arrêté automatiquement à la sortie du processus).
+    """
+    global _listener
+    shutdown_logging()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    if settings.log_format == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter(_TEXT_FORMAT))
+
+    app_logger = logging.getLogger("todo_app")
+    for existing in list(app_logger.handlers):
+        app_logger.removeHandler(existing)
+    app_logger.setLevel(settings.log_level.upper())
+
+    if settings.log_async:
+        # file non bornée: un put ne bloque jamais le thread de la requête
+        queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+        _listener = logging.handlers.QueueListener(
+            queue_handler.queue, handler, respect_handler_level=True
+        )
+        _listener.start()
+        handler = queue_handler
+    if settings.log_sampling:
+        handler.addFilter(SamplingFilter(settings.log_sampling))
+    app_logger.addHandler(handler)
+    return _listener
+
+
+def shutdown_logging() -> None:
+    """Write the queued records and stop the listener thread, if any."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+# vide la file avant la sortie du processus
+atexit.register(shutdown_logging)
+
 # module-level logger
 logger = get_logger("todo_app")
@@ -0,0 +1,336 @@
+"""Métriques de l'API au format texte de Prometheus (sans dépendance externe).
+
+- `MetricsMiddleware` compte les requêtes HTTP et mesure leur durée par méthode,
+  route (le gabarit, ex. `/todos/{todo_id}`) et statut;
+- `instrument` chronomètre chaque méthode publique asynchrone d'un objet: le
+  service (`todo_service_duration_seconds`) et le repository
+  (`todo_repository_duration_seconds`);
+- les jauges (nombre de todos, position du flux de modifications, entrées du
+  cache de réponses) sont mises à jour au moment de la collecte.
+
+Tout est désactivé par défaut (METRICS_ENABLED). Désactivé, le middleware se
+limite à un test d'attribut et le service n'est pas instrumenté.
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable, Iterator
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+    from .service import AsyncTodoService
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# bornes (secondes) des histogrammes: de 50 µs pour le repository à 10 s
+DEFAULT_BUCKETS = (
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values, strict=True))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric(ABC):
+    """Common part of a metric family: name, help text and label names.
+
+    `labels(...)` renvoie la série d'une combinaison de labels, créée au premier
+    appel; on la garde (middleware, décorateur) pour ne payer la recherche qu'une
+    fois. Les observations sont faites sur la boucle d'événements, sans verrou.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = labels
+        self._series: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _new_series(self) -> Any:
+        """Empty series for a new label combination."""
+
+    def labels(self, *values: str) -> Any:
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(f"{self.name} expects labels {self.label_names}")
+            with self._lock:
+                series = self._series.setdefault(values, self._new_series())
+        return series
+
+    def samples(self) -> Iterator[str]:
+        for values, series in sorted(self._series.items()):
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}{labels} {_format_value(series.value)}"
+
+    def render(self) -> str:
+        header = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        return "\n".join([*header, *self.samples()])
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value: float = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonic counter, one value per label combination."""
+
+    kind = "counter"
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, set at collection time."""
+
+    kind = "gauge"
+
+    def _new_series(self) -> _Value:
+        return _Value()
+
+
+class _Buckets:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self.bounds = bounds
+        # une case par borne plus +Inf, non cumulées: une observation ne touche
+        # qu'une case, le cumul est calculé au rendu
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+
+class Histogram(_Metric):
+    """Cumulative histogram of observations (durations in seconds)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_series(self) -> _Buckets:
+        return _Buckets(self.buckets)
+
+    def samples(self) -> Iterator[str]:
+        names = (*self.label_names, "le")
+        bounds = [*map(_format_value, self.buckets), "+Inf"]
+        for values, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, list(series.counts), strict=True):
+                cumulative += count
+                labels = _format_labels(names, (*values, bound))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}_sum{labels} {_format_value(series.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class AppMetrics:
+    """Every metric exposed by the API on GET /metrics."""
+
+    def __init__(self, enabled: bool = False) -> None:
+        self.enabled = enabled
+        self.requests = Counter(
+            "todo_http_requests_total",
+            "HTTP requests by method, route and status.",
+            ("method", "route", "status"),
+        )
+        self.request_duration = Histogram(
+            "todo_http_request_duration_seconds",
+            "HTTP request duration by method and route.",
+            ("method", "route"),
+        )
+        self.service_duration = Histogram(
+            "todo_service_duration_seconds",
+            "TodoService method duration.",
+            ("method",),
+        )
+        self.repository_duration = Histogram(
+            "todo_repository_duration_seconds",
+            "Repository operation duration.",
+            ("operation",),
+        )
+        self.todos = Gauge("todo_store_todos", "Number of stored todos.")
+        self.change_seq = Gauge(
+            "todo_change_feed_last_seq", "Sequence number of the last change."
+        )
+        self.cache_entries = Gauge(
+            "todo_list_cache_entries", "Serialized responses in the list cache."
+        )
+
+    def families(self) -> list[_Metric]:
+        return [
+            self.requests,
+            self.request_duration,
+            self.service_duration,
+            self.repository_duration,
+            self.todos,
+            self.change_seq,
+            self.cache_entries,
+        ]
+
+    def instrument_service(self, service: AsyncTodoService) -> None:
+        """Time the service methods and the operations of its repository."""
+        instrument(service, self.service_duration)
+        instrument(service.repo, self.repository_duration)
+
+    async def collect(self, service: AsyncTodoService) -> None:
+        """Refresh the gauges from the service state."""
+        self.todos.labels().set(await service.repo.count())
+        self.change_seq.labels().set(service.changes.last_seq)
+        self.cache_entries.labels().set(len(service.list_cache))
+
+    def render(self) -> str:
+        return "\n".join(family.render() for family in self.families()) + "\n"
+
+
+def timed(
+    histogram: Histogram, label: str
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorator recording the duration of a coroutine function in `histogram`."""
+
+    series = histogram.labels(label)
+
+    def decorator(
+        func: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                series.observe(perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def instrument(target: object, histogram: Histogram) -> None:
+    """Replace each public coroutine method of `target` by a timed wrapper.
+
+    Les méthodes sont remplacées sur l'instance seulement: la classe et les
+    autres instances ne sont pas touchées. Sans effet si déjà instrumenté.
+    """
+    for name, member in inspect.getmembers(type(target)):
+        if name.startswith("_") or not inspect.iscoroutinefunction(member):
+            continue
+        if name in vars(target):
+            continue
+        setattr(target, name, timed(histogram, name)(getattr(target, name)))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware counting and timing HTTP requests.
+
+    La route est le gabarit de la route trouvée par le routeur (`<unmatched>`
+    pour un 404 de routage), pour ne pas créer une série par id de todo. Pour un
+    flux (SSE, export), la durée va jusqu'à la fin de l'envoi du corps.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: AppMetrics) -> None:
+        self.app = app
+        self.metrics = metrics
+        # (méthode, route, statut) -> (série du compteur, série de l'histogramme)
+        self._series: dict[tuple[str, str, int], tuple[_Value, _Buckets]] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - start
+            key = (
+                scope["method"],
+                getattr(scope.get("route"), "path", "<unmatched>"),
+                status,
+            )
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = (
+                    self.metrics.requests.labels(key[0], key[1], str(status)),
+                    self.metrics.request_duration.labels(key[0], key[1]),
+                )
+            series[0].inc()
+            series[1].observe(elapsed)
@@ -3,14 +3,23 @@
 Using Pydantic for validation and type-safety.
 """
 
-from datetime import datetime
+from collections.abc import Callable
+from datetime import UTC, date, datetime
+from functools import cache
+from typing import Any, Literal
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, field_validator
+from typing_extensions import TypedDict
+
+# propriétaire d'un todo (utilisateur, liste partagée...): l'API le prend de
+# l'en-tête X-Owner; None pour les todos sans propriétaire
+MAX_OWNER_LENGTH = 100
 
 
 class TodoCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=200)
     description: str | None = Field(None, max_length=2000)
+    owner: str | None = Field(None, min_length=1, max_length=MAX_OWNER_LENGTH)
 
 
 class TodoInDB(BaseModel):
@@ -19,9 +28,204 @@ class TodoInDB(BaseModel):
     description: str | None = None
     completed: bool = False
     created_at: datetime
+    # incrémentée à chaque mise à jour: sert d'ETag et de condition `If-Match`
+    version: int = 1
+    owner: str | None = None
+
+
+# Projection (`TodoQuery.fields`): les lectures renvoient alors des dicts ne
+# contenant que les champs demandés, dans l'ordre de TODO_FIELDS
+TODO_FIELDS: tuple[str, ...] = tuple(TodoInDB.model_fields)
+TodoRow = dict[str, Any]
+TodoPage = list[TodoInDB] | list[TodoRow]
+
+
+def projector(fields: tuple[str, ...]) -> Callable[[TodoInDB], TodoRow]:
+    """Function copying only `fields` of a todo into a dict."""
+    # une compréhension est plus rapide que attrgetter + zip (mesuré)
+    return lambda todo: {name: getattr(todo, name) for name in fields}
+
+
+@cache
+def row_adapter(fields: tuple[str, ...], many: bool = True) -> TypeAdapter:
+    """TypeAdapter of a list of rows (or of one row) restricted to `fields`.
+
+    Sérialise (et relit) les dicts d'une projection en Rust, avec les types de
+    `TodoInDB` (ex. `created_at` en ISO 8601). Un adapter par projection.
+    """
+    row = TypedDict(
+        "TodoRow", {name: TodoInDB.model_fields[name].annotation for name in fields}
+    )
+    return TypeAdapter(list[row] if many else row)
 
 
 class TodoUpdate(BaseModel):
+    """Champs modifiés par PATCH: seuls les champs envoyés sont appliqués.
+
+    `title` et `completed` peuvent être omis mais pas valoir null (seule la
+    description peut être effacée).
+    """
+
     title: str | None = Field(None, min_length=1, max_length=200)
     description: str | None = Field(None, max_length=2000)
     completed: bool | None = None
+
+    @field_validator("title", "completed")
+    @classmethod
+    def _not_null(cls, value: object) -> object:
+        # les valeurs par défaut ne sont pas validées: seul un null explicite
+        # arrive ici
+        if value is None:
+            raise ValueError("Field may be omitted but not null")
+        return value
+
+
+class TodoBulkUpdate(TodoUpdate):
+    """Élément de PATCH /todos/bulk: l'id du todo et les champs à modifier."""
+
+    id: int
+
+
+class BulkItemResult(BaseModel):
+    """Résultat d'un élément d'une opération bulk, dans l'ordre de la requête."""
+
+    index: int
+    status: int
+    todo: TodoInDB | None = None
+    detail: str | None = None
+
+
+class ChangeEvent(BaseModel):
+    """Modification publiée sur GET /todos/changes; `todo` est absent si supprimé."""
+
+    seq: int
+    type: Literal["created", "updated", "deleted"]
+    id: int
+    todo: TodoInDB | None = None
+
+
+class ImportLineError(BaseModel):
+    """Ligne rejetée par POST /todos/import (numérotée à partir de 1)."""
+
+    line: int
+    detail: str
+
+
+class ImportResult(BaseModel):
+    """Bilan d'un import NDJSON: seules les premières erreurs sont détaillées."""
+
+    created: int = 0
+    failed: int = 0
+    errors: list[ImportLineError] = []
+
+
+class TodoStats(BaseModel):
+    """Agrégats de GET /todos/stats; `created_per_day` par jour UTC de création."""
+
+    total: int = 0
+    completed: int = 0
+    open: int = 0
+    created_per_day: dict[date, int] = {}
+
+
+class ProfiledCall(BaseModel):
+    """Appels d'une méthode du service ou du repository pendant une requête."""
+
+    calls: int
+    total_ms: float
+
+
+class ProfiledFunction(BaseModel):
+    """Ligne du profil cProfile: temps propre (`self_ms`) et cumulé."""
+
+    function: str
+    calls: int
+    self_ms: float
+    cumulative_ms: float
+
+
+class ProfileSummary(BaseModel):
+    """Requête profilée, gardée par GET /debug/profiles.
+
+    `layers` répartit `duration_ms` entre l'API (routage, validation,
+    sérialisation, middlewares), le service et le repository, en temps propre.
+    `trigger` vaut `slow` (seuil dépassé) ou `header` (`X-Profile-Token`).
+    """
+
+    id: int
+    method: str
+    path: str
+    status: int
+    started_at: datetime
+    duration_ms: float
+    trigger: Literal["slow", "header"]
+    layers: dict[str, float]
+    profiled: bool
+
+
+class RequestProfile(ProfileSummary):
+    """Détail d'un profil: appels par méthode et fonctions les plus coûteuses.
+
+    `profiled` est faux (et `functions` vide) si cProfile n'a pas tourné pendant
+    la requête, parce qu'une autre requête était déjà profilée.
+    """
+
+    calls: dict[str, ProfiledCall]
+    functions: list[ProfiledFunction]
+
+
+class TodoQuery(BaseModel):
+    """Filtres et pagination par curseur (keyset) pour la liste des todos.
+
+    `after_id` est le curseur: seuls les todos d'id strictement supérieur sont
+    renvoyés, par id croissant. La fenêtre `created_after`/`created_before` est
+    semi-ouverte: [created_after, created_before). Avec `owner`, seuls les todos
+    de ce propriétaire sont renvoyés.
+
+    Avec `fields`, les repositories renvoient des `TodoRow` limités à ces
+    champs, sans construire les autres. `id` (le curseur) est toujours inclus;
+    demander tous les champs équivaut à `fields=None`.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    limit: int | None = Field(None, ge=1)
+    after_id: int | None = None
+    completed: bool | None = None
+    created_after: datetime | None = None
+    created_before: datetime | None = None
+    owner: str | None = None
+    fields: tuple[str, ...] | None = None
+
+    @field_validator("fields")
+    @classmethod
+    def _known_fields(cls, value: tuple[str, ...] | None) -> tuple[str, ...] | None:
+        if value is None:
+            return None
+        unknown = sorted(set(value) - set(TODO_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        requested = {"id", *value}
+        if len(requested) == len(TODO_FIELDS):
+            return None
+        return tuple(name for name in TODO_FIELDS if name in requested)
+
+    @field_validator("created_after", "created_before")
+    @classmethod
+    def _assume_utc(cls, value: datetime | None) -> datetime | None:
+        # created_at est toujours en UTC: une date naïve est interprétée en UTC
+        if value is not None and value.tzinfo is None:
+            return value.replace(tzinfo=UTC)
+        return value
+
+    def matches(self, todo: TodoInDB) -> bool:
+        """Return True if `todo` satisfies every filter (cursor and limit aside)."""
+        if self.completed is not None and todo.completed != self.completed:
+            return False
+        if self.owner is not None and todo.owner != self.owner:
+            return False
+        if self.created_after is not None and todo.created_at < self.created_after:
+            return False
+        return not (
+            self.created_before is not None and todo.created_at >= self.created_before
+        )
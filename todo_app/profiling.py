@@ -0,0 +1,308 @@
+"""Profilage des requêtes à la demande (GET /debug/profiles).
+
+- `ProfilingMiddleware` profile une requête avec cProfile quand le profilage
+  est activé (PROFILING_ENABLED: toutes les requêtes) ou demandé par l'en-tête
+  `X-Profile-Token` (valeur: PROFILING_TOKEN). Une requête plus lente que
+  PROFILING_THRESHOLD_MS, ou demandée par l'en-tête, est gardée dans un tampon
+  circulaire de PROFILING_BUFFER_SIZE profils, lisible seulement avec l'en-tête
+  `X-Profile-Token` (jamais sans PROFILING_TOKEN);
+- `instrument` chronomètre les méthodes publiques du service et du repository
+  pour la requête en cours (`contextvars`): la durée de la requête est répartie
+  entre l'API, le service et le repository, et par méthode.
+
+cProfile ne suit que le thread de la boucle d'événements: le travail d'un
+backend bloquant, fait dans un thread, n'apparaît que dans la répartition par
+couche. Un seul profil cProfile à la fois (les autres tâches de la boucle
+peuvent y apparaître): une requête concurrente n'a que sa répartition.
+
+Désactivé (par défaut), le middleware se limite à deux tests d'attribut et le
+service n'est pas instrumenté.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import functools
+import hmac
+import inspect
+import itertools
+import pstats
+from collections import deque
+from contextvars import ContextVar
+from datetime import UTC, datetime
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from .models import ProfiledCall, ProfiledFunction, RequestProfile
+
+if TYPE_CHECKING:
+    from collections.abc import Awaitable, Callable
+
+    from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+    from .service import AsyncTodoService
+
+TOKEN_HEADER = "X-Profile-Token"
+# identifiant du profil d'une requête demandée par l'en-tête, à relire sur
+# GET /debug/profiles/{id}
+ID_HEADER = "X-Profile-Id"
+# fonctions gardées par profil, par temps cumulé décroissant
+TOP_FUNCTIONS = 50
+
+
+class _Timings:
+    """Time spent in the service and the repository by the current request.
+
+    `depth` évite de compter deux fois un appel imbriqué dans la même couche;
+    `nested` est la part du repository appelée depuis le service.
+    """
+
+    __slots__ = ("calls", "depth", "layers", "nested")
+
+    def __init__(self) -> None:
+        self.layers = {"service": 0.0, "repository": 0.0}
+        self.depth = {"service": 0, "repository": 0}
+        self.calls: dict[str, list[float]] = {}
+        self.nested = 0.0
+
+    def add(self, layer: str, key: str, elapsed: float) -> None:
+        call = self.calls.setdefault(key, [0, 0.0])
+        call[0] += 1
+        call[1] += elapsed
+        if self.depth[layer]:
+            return
+        self.layers[layer] += elapsed
+        if layer == "repository" and self.depth["service"]:
+            self.nested += elapsed
+
+    def breakdown(self, duration: float) -> dict[str, float]:
+        """Self time (ms) of each layer; the API gets what the others did not."""
+        service = self.layers["service"] - self.nested
+        repository = self.layers["repository"]
+        api = duration - service - repository
+        return {
+            "api": round(max(api, 0.0) * 1000, 3),
+            "service": round(service * 1000, 3),
+            "repository": round(repository * 1000, 3),
+        }
+
+
+_current: ContextVar[_Timings | None] = ContextVar("profiling_timings", default=None)
+
+
+def profiled(
+    layer: str, name: str
+) -> Callable[[Callable[..., Awaitable[Any]]], Callable[..., Awaitable[Any]]]:
+    """Decorator adding a coroutine's duration to the current request's timings."""
+
+    key = f"{layer}.{name}"
+
+    def decorator(
+        func: Callable[..., Awaitable[Any]],
+    ) -> Callable[..., Awaitable[Any]]:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            timings = _current.get()
+            if timings is None:
+                return await func(*args, **kwargs)
+            timings.depth[layer] += 1
+            start = perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                timings.depth[layer] -= 1
+                timings.add(layer, key, perf_counter() - start)
+
+        wrapper.__profiled__ = True
+        return wrapper
+
+    return decorator
+
+
+def instrument(target: object, layer: str) -> None:
+    """Replace each public coroutine method of `target` by a profiled wrapper.
+
+    Comme `metrics.instrument`, sur l'instance seulement; une méthode déjà
+    chronométrée par les métriques est enveloppée à son tour. Sans effet si
+    déjà instrumenté.
+    """
+    for name, member in inspect.getmembers(type(target)):
+        if name.startswith("_") or not inspect.iscoroutinefunction(member):
+            continue
+        method = getattr(target, name)
+        if getattr(method, "__profiled__", False):
+            continue
+        setattr(target, name, profiled(layer, name)(method))
+
+
+def _top_functions(profile: cProfile.Profile) -> list[ProfiledFunction]:
+    stats = pstats.Stats(profile).stats
+    rows = sorted(stats.items(), key=lambda item: item[1][3], reverse=True)
+    return [
+        ProfiledFunction(
+            function=pstats.func_std_string(func),
+            calls=calls,
+            self_ms=round(self_time * 1000, 3),
+            cumulative_ms=round(cumulative * 1000, 3),
+        )
+        for func, (_, calls, self_time, cumulative, _) in rows[:TOP_FUNCTIONS]
+    ]
+
+
+class Profiler:
+    """Profiling settings and captured profiles of an application (`app.state`).
+
+    Réglé par `app_settings` depuis la configuration, comme les métriques.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = False,
+        threshold_ms: float = 250.0,
+        token: str | None = None,
+        buffer_size: int = 50,
+    ) -> None:
+        self.configure(enabled, threshold_ms, token, buffer_size)
+        self._ids = itertools.count(1)
+        # un seul cProfile actif à la fois (un par processus depuis Python 3.12)
+        self._busy = False
+
+    def configure(
+        self, enabled: bool, threshold_ms: float, token: str | None, buffer_size: int
+    ) -> None:
+        self.enabled = enabled
+        self.threshold = threshold_ms / 1000
+        self.token = token or None
+        self.profiles: deque[RequestProfile] = deque(maxlen=buffer_size)
+
+    @property
+    def active(self) -> bool:
+        """Whether any request may be profiled (enabled, or a token is set)."""
+        return self.enabled or self.token is not None
+
+    def authorized(self, token: str | None) -> bool:
+        """Whether `token` is the configured profiling token."""
+        if self.token is None or token is None:
+            return False
+        return hmac.compare_digest(token.encode(), self.token.encode())
+
+    def instrument_service(self, service: AsyncTodoService) -> None:
+        """Time the service methods and the operations of its repository."""
+        instrument(service, "service")
+        instrument(service.repo, "repository")
+
+    def next_id(self) -> int:
+        return next(self._ids)
+
+    def start(self) -> cProfile.Profile | None:
+        """A running cProfile profiler, or None if one is already running."""
+        if self._busy:
+            return None
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12+: un autre outil de profilage est déjà actif
+            return None
+        self._busy = True
+        return profile
+
+    def stop(self, profile: cProfile.Profile | None) -> None:
+        if profile is not None:
+            profile.disable()
+            self._busy = False
+
+    def capture(
+        self,
+        profile_id: int,
+        scope: Scope,
+        status: int,
+        started_at: datetime,
+        duration: float,
+        trigger: str,
+        timings: _Timings,
+        profile: cProfile.Profile | None,
+    ) -> RequestProfile:
+        captured = RequestProfile(
+            id=profile_id,
+            method=scope["method"],
+            path=scope["path"],
+            status=status,
+            started_at=started_at,
+            duration_ms=round(duration * 1000, 3),
+            trigger=trigger,
+            layers=timings.breakdown(duration),
+            profiled=profile is not None,
+            calls={
+                key: ProfiledCall(calls=calls, total_ms=round(total * 1000, 3))
+                for key, (calls, total) in timings.calls.items()
+            },
+            functions=[] if profile is None else _top_functions(profile),
+        )
+        self.profiles.append(captured)
+        return captured
+
+    def get(self, profile_id: int) -> RequestProfile | None:
+        for captured in self.profiles:
+            if captured.id == profile_id:
+                return captured
+        return None
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware profiling requests and keeping the slow ones.
+
+    Ajouté en dernier (middleware externe): la durée inclut les métriques et
+    la compression. Les requêtes de /debug/ ne sont jamais profilées.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: Profiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        profiler = self.profiler
+        if scope["type"] != "http" or not profiler.active:
+            await self.app(scope, receive, send)
+            return
+        forced = profiler.authorized(Headers(scope=scope).get(TOKEN_HEADER))
+        if not (forced or profiler.enabled) or scope["path"].startswith("/debug/"):
+            await self.app(scope, receive, send)
+            return
+
+        # id connu avant la réponse pour l'en-tête X-Profile-Id
+        profile_id = profiler.next_id() if forced else 0
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if forced:
+                    MutableHeaders(scope=message)[ID_HEADER] = str(profile_id)
+            await send(message)
+
+        timings = _Timings()
+        reset = _current.set(timings)
+        started_at = datetime.now(UTC)
+        profile = profiler.start()
+        start = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = perf_counter() - start
+            profiler.stop(profile)
+            _current.reset(reset)
+            if forced or duration >= profiler.threshold:
+                profiler.capture(
+                    profile_id or profiler.next_id(),
+                    scope,
+                    status,
+                    started_at,
+                    duration,
+                    "header" if forced else "slow",
+                    timings,
+                    profile,
+                )
@@ -0,0 +1,231 @@
+"""Repository distant: un processus store partagé, joint par une socket Unix.
+
+Avec `uvicorn --workers N`, chaque worker a son propre store en mémoire: les
+données divergent. Le backend `remote` garde un seul store dans un processus
+dédié (`python -m todo_app.store_server`) et les workers y accèdent par une
+socket Unix. Le store exécute les opérations une par une, comme Redis: pas de
+verrou, et chaque worker ne fait que le travail HTTP (parsing, validation,
+sérialisation), qui se répartit sur les cœurs.
+
+Protocole: des trames `longueur (uint32) | charge utile`. Une requête est un
+code d'opération (un octet, index dans `OPERATIONS`) suivi des arguments en
+JSON compact; une réponse est un statut (un octet, `OK` ou `ERROR`) suivi du
+résultat en JSON. Le JSON est produit et relu en Rust par pydantic-core avec des
+`TypeAdapter` précalculés par opération.
+"""
+
+from __future__ import annotations
+
+import json
+import socket
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from pydantic import TypeAdapter
+
+from .models import (
+    TodoCreate,
+    TodoInDB,
+    TodoQuery,
+    TodoStats,
+    TodoUpdate,
+    row_adapter,
+)
+from .repository import VersionConflictError
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .models import TodoPage
+
+HEADER = struct.Struct("<I")
+OK, ERROR = 0, 1
+# taille maximale d'une trame: une liste complète de todos peut être grande
+MAX_FRAME = 1 << 30
+
+
+@dataclass(frozen=True)
+class Operation:
+    """A repository method, with the adapters for its arguments and result."""
+
+    name: str
+    args: TypeAdapter = field(repr=False)
+    result: TypeAdapter = field(repr=False)
+
+
+def _operation(name: str, args: Any, result: Any) -> Operation:
+    return Operation(name, TypeAdapter(args), TypeAdapter(result))
+
+
+# l'ordre définit les codes d'opération: n'ajouter qu'à la fin
+OPERATIONS = (
+    _operation("get", tuple[int], TodoInDB | None),
+    # avec `TodoQuery.fields`, le store n'envoie que les champs demandés
+    _operation("list", tuple[TodoQuery | None], list[TodoInDB] | list[dict[str, Any]]),
+    _operation(
+        "search",
+        tuple[str, TodoQuery | None],
+        list[TodoInDB] | list[dict[str, Any]],
+    ),
+    _operation("create", tuple[TodoCreate], TodoInDB),
+    _operation("create_many", tuple[list[TodoCreate]], list[TodoInDB]),
+    _operation("update", tuple[int, TodoUpdate, int | None], TodoInDB | None),
+    # `owner` ajouté ensuite: les requêtes sans lui restent acceptées
+    _operation(
+        "update_many",
+        tuple[list[tuple[int, TodoUpdate]], str | None]
+        | tuple[list[tuple[int, TodoUpdate]]],
+        list[TodoInDB | None],
+    ),
+    _operation("delete", tuple[int, int | None], bool),
+    _operation(
+        "delete_many", tuple[list[int], str | None] | tuple[list[int]], list[bool]
+    ),
+    _operation("revision", tuple[()], int),
+    _operation("count", tuple[()], int),
+    _operation("stats", tuple[()], TodoStats),
+)
+_CODES = {operation.name: code for code, operation in enumerate(OPERATIONS)}
+
+
+def _rows(query: TodoQuery | None) -> TypeAdapter | None:
+    # une projection est relue avec les types de ses champs (datetime...)
+    if query is None or query.fields is None:
+        return None
+    return row_adapter(query.fields)
+
+
+class StoreError(Exception):
+    """The store process failed to execute an operation."""
+
+
+def recv_exactly(sock: socket.socket, size: int) -> bytes:
+    """Read exactly `size` bytes; ConnectionError if the peer closed first."""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            raise ConnectionError("store connection closed")
+        received += count
+    return bytes(buffer)
+
+
+def encode_error(exc: Exception) -> bytes:
+    detail = {"type": type(exc).__name__, "detail": str(exc)}
+    if isinstance(exc, VersionConflictError):
+        # relevée telle quelle côté client: l'API en fait un 412
+        detail.update(todo_id=exc.todo_id, version=exc.version)
+    return bytes([ERROR]) + json.dumps(detail).encode()
+
+
+class RemoteTodoRepository:
+    """`TodoRepository` forwarding every call to the store process.
+
+    Thread-safe: une connexion par thread (pool `threading.local`), comme le
+    backend SQLite; les appels passent par le pool `REPOSITORY_WORKERS`. Une
+    connexion coupée est rouverte à l'appel suivant; l'appel en cours lève
+    `ConnectionError` (une écriture n'est jamais rejouée).
+    """
+
+    def __init__(self, path: str, *, timeout: float | None = 5.0) -> None:
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+        self._sockets: list[socket.socket] = []
+        self._lock = threading.Lock()
+
+    def _socket(self) -> socket.socket:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(self.path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+            with self._lock:
+                self._sockets.append(sock)
+        return sock
+
+    def _discard(self, sock: socket.socket) -> None:
+        self._local.sock = None
+        with self._lock:
+            if sock in self._sockets:
+                self._sockets.remove(sock)
+        sock.close()
+
+    def _call(self, name: str, *args: Any, result: TypeAdapter | None = None) -> Any:
+        """Run `name` in the store; `result` overrides the adapter of its result."""
+        code = _CODES[name]
+        operation = OPERATIONS[code]
+        request = bytes([code]) + operation.args.dump_json(args, exclude_unset=True)
+        sock = self._socket()
+        try:
+            sock.sendall(HEADER.pack(len(request)) + request)
+            (length,) = HEADER.unpack(recv_exactly(sock, HEADER.size))
+            response = recv_exactly(sock, length)
+        except OSError:
+            self._discard(sock)
+            raise
+        if response[0] != OK:
+            error = json.loads(response[1:])
+            if error["type"] == VersionConflictError.__name__:
+                raise VersionConflictError(error["todo_id"], error["version"])
+            raise StoreError(f"{name}: {error['type']}: {error['detail']}")
+        return (result or operation.result).validate_json(response[1:])
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._lock:
+            for sock in self._sockets:
+                sock.close()
+            self._sockets.clear()
+        self._local = threading.local()
+
+    def list(self, query: TodoQuery | None = None) -> TodoPage:
+        return self._call("list", query, result=_rows(query))
+
+    def search(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        return self._call("search", text, query, result=_rows(query))
+
+    def get(self, todo_id: int) -> TodoInDB | None:
+        return self._call("get", todo_id)
+
+    def create(self, payload: TodoCreate) -> TodoInDB:
+        return self._call("create", payload)
+
+    def create_many(self, payloads: Iterable[TodoCreate]) -> list[TodoInDB]:
+        return self._call("create_many", list(payloads))
+
+    def update(
+        self, todo_id: int, payload: TodoUpdate, expected_version: int | None = None
+    ) -> TodoInDB | None:
+        return self._call("update", todo_id, payload, expected_version)
+
+    def update_many(
+        self, changes: Iterable[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]:
+        return self._call("update_many", list(changes), owner)
+
+    def delete(self, todo_id: int, expected_version: int | None = None) -> bool:
+        return self._call("delete", todo_id, expected_version)
+
+    def delete_many(
+        self, todo_ids: Iterable[int], owner: str | None = None
+    ) -> list[bool]:
+        return self._call("delete_many", list(todo_ids), owner)
+
+    def revision(self) -> int:
+        return self._call("revision")
+
+    def count(self) -> int:
+        return self._call("count")
+
+    def stats(self) -> TodoStats:
+        return self._call("stats")
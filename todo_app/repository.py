@@ -4,47 +4,557 @@ For this pedagogical example we use an in-memory store. In production,
 remplacez par une base de données et adaptez les méthodes (SQLAlchemy/ORM).
 """
 
+from __future__ import annotations
+
+import asyncio
+import atexit
 from datetime import UTC, datetime
+from itertools import islice
+from typing import TYPE_CHECKING, Any, Protocol
+
+from .models import (
+    TodoCreate,
+    TodoInDB,
+    TodoQuery,
+    TodoStats,
+    TodoUpdate,
+    projector,
+)
+from .search import InvertedIndex
+from .sortedlist import SortedList
+from .stats import StatsCounter
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+    from concurrent.futures import Executor
+
+    from .config import Settings
+    from .models import TodoPage
+
+
+class VersionConflictError(Exception):
+    """The todo is no longer at the version expected by a conditional write."""
+
+    def __init__(self, todo_id: int, version: int) -> None:
+        super().__init__(f"Todo {todo_id} is at version {version}")
+        self.todo_id = todo_id
+        self.version = version
+
+
+def check_version(todo_id: int, version: int, expected: int | None) -> None:
+    """Raise `VersionConflictError` unless `expected` is None or `version`."""
+    if expected is not None and expected != version:
+        raise VersionConflictError(todo_id, version)
+
+
+class TodoRepository(Protocol):
+    """Interface commune à tous les repositories (utilisée par `TodoService`).
+
+    `update` et `delete` acceptent une version attendue (`expected_version`):
+    l'écriture n'a lieu que si le todo est toujours à cette version, sinon
+    `VersionConflictError` est levée. La comparaison et l'écriture sont
+    atomiques (compare-and-swap). Une mise à jour incrémente `version`.
+
+    `update_many` et `delete_many` acceptent un propriétaire (`owner`): les
+    todos d'un autre propriétaire sont laissés intacts (None / False), comme
+    s'ils n'existaient pas. Le contrôle est fait par le repository, dans la
+    même opération que l'écriture.
+    """
+
+    def list(self, query: TodoQuery | None = None) -> TodoPage: ...
+
+    def create(self, payload: TodoCreate) -> TodoInDB: ...
+
+    def get(self, todo_id: int) -> TodoInDB | None: ...
+
+    def update(
+        self, todo_id: int, payload: TodoUpdate, expected_version: int | None = None
+    ) -> TodoInDB | None: ...
+
+    def delete(self, todo_id: int, expected_version: int | None = None) -> bool: ...
+
+    def create_many(self, payloads: Iterable[TodoCreate]) -> list[TodoInDB]: ...
+
+    def update_many(
+        self, changes: Iterable[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]: ...
+
+    def delete_many(
+        self, todo_ids: Iterable[int], owner: str | None = None
+    ) -> list[bool]: ...
+
+    def search(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        """Todos matching every word of `text` (prefixes), filtered by `query`."""
+        ...
+
+    def revision(self) -> int:
+        """Counter that changes on every write (cache key for serialized reads)."""
+        ...
+
+    def count(self) -> int:
+        """Number of stored todos."""
+        ...
+
+    def stats(self) -> TodoStats:
+        """Aggregate counts, maintained on every write (never a scan)."""
+        ...
+
+
+class AsyncTodoRepository(Protocol):
+    """Variante asynchrone de `TodoRepository` (utilisée par `AsyncTodoService`)."""
+
+    async def list(self, query: TodoQuery | None = None) -> TodoPage: ...
+
+    async def create(self, payload: TodoCreate) -> TodoInDB: ...
+
+    async def get(self, todo_id: int) -> TodoInDB | None: ...
+
+    async def update(
+        self, todo_id: int, payload: TodoUpdate, expected_version: int | None = None
+    ) -> TodoInDB | None: ...
+
+    async def delete(
+        self, todo_id: int, expected_version: int | None = None
+    ) -> bool: ...
+
+    async def create_many(self, payloads: Iterable[TodoCreate]) -> list[TodoInDB]: ...
+
+    async def update_many(
+        self, changes: Iterable[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]: ...
+
+    async def delete_many(
+        self, todo_ids: Iterable[int], owner: str | None = None
+    ) -> list[bool]: ...
+
+    async def search(self, text: str, query: TodoQuery | None = None) -> TodoPage: ...
+
+    async def revision(self) -> int: ...
+
+    async def count(self) -> int: ...
+
+    async def stats(self) -> TodoStats: ...
+
+    async def close(self) -> None:
+        """Release the backend (connections, journal, threads) at shutdown."""
+        ...
+
+
+class AsyncRepositoryAdapter:
+    """Expose a synchronous repository through `AsyncTodoRepository`.
+
+    Sans executor, les appels s'exécutent directement sur la boucle d'événements:
+    c'est le bon choix pour un store en mémoire dont les opérations durent quelques
+    microsecondes. Un backend bloquant (fichier, réseau) doit recevoir un executor
+    dédié pour ne jamais bloquer la boucle.
+    """
+
+    def __init__(self, repo: TodoRepository, executor: Executor | None = None) -> None:
+        self.repo = repo
+        self.executor = executor
+
+    async def _call(self, method: Callable[..., Any], *args: Any) -> Any:
+        if self.executor is None:
+            return method(*args)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, method, *args)
+
+    async def list(self, query: TodoQuery | None = None) -> TodoPage:
+        return await self._call(self.repo.list, query)
+
+    async def create(self, payload: TodoCreate) -> TodoInDB:
+        return await self._call(self.repo.create, payload)
+
+    async def get(self, todo_id: int) -> TodoInDB | None:
+        return await self._call(self.repo.get, todo_id)
+
+    async def update(
+        self, todo_id: int, payload: TodoUpdate, expected_version: int | None = None
+    ) -> TodoInDB | None:
+        return await self._call(self.repo.update, todo_id, payload, expected_version)
+
+    async def delete(self, todo_id: int, expected_version: int | None = None) -> bool:
+        return await self._call(self.repo.delete, todo_id, expected_version)
 
-from .models import TodoCreate, TodoInDB, TodoUpdate
+    async def create_many(self, payloads: Iterable[TodoCreate]) -> list[TodoInDB]:
+        return await self._call(self.repo.create_many, payloads)
+
+    async def update_many(
+        self, changes: Iterable[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]:
+        return await self._call(self.repo.update_many, changes, owner)
+
+    async def delete_many(
+        self, todo_ids: Iterable[int], owner: str | None = None
+    ) -> list[bool]:
+        return await self._call(self.repo.delete_many, todo_ids, owner)
+
+    async def search(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        return await self._call(self.repo.search, text, query)
+
+    async def revision(self) -> int:
+        return await self._call(self.repo.revision)
+
+    async def count(self) -> int:
+        return await self._call(self.repo.count)
+
+    async def stats(self) -> TodoStats:
+        return await self._call(self.repo.stats)
+
+    async def close(self) -> None:
+        # seuls les backends qui tiennent des ressources ont une méthode close
+        close = getattr(self.repo, "close", None)
+        if close is not None:
+            await self._call(close)
+        if self.executor is not None:
+            self.executor.shutdown()
 
 
 class InMemoryTodoRepository:
     """Simple thread-unsafe in-memory repository (for tests and demos).
 
     Methods are synchronous for clarity. If you use async database drivers,
-    adaptez en conséquence.
+    adaptez en conséquence. Pour un accès multi-threadé, utilisez
+    `ConcurrentTodoRepository` (STORAGE_BACKEND=concurrent).
+
+    Les index secondaires (partition par statut, ids par propriétaire, index
+    trié sur `created_at`, index inversé des textes pour `search`) et les
+    compteurs de `stats` sont maintenus à chaque écriture: une lecture coûte en
+    proportion du nombre de résultats, pas de la taille du store. Les index
+    triés sont des `SortedList`: une écriture n'en décale qu'un bloc.
+
+    Tant que `created_at` croît avec l'id (cas normal: les ids sont alloués
+    dans l'ordre de création), une fenêtre de dates est ramenée par bisection
+    à un intervalle d'ids. Sinon (horloge reculée, todo inséré avec un id
+    inférieur), la fenêtre est relue dans l'index des dates et triée par id.
+
+    Les ids sont alloués à partir de `first_id`, de `id_step` en `id_step`: une
+    partition de `ShardedTodoRepository` n'utilise que ses propres ids.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, first_id: int = 1, id_step: int = 1) -> None:
         self._data: dict[int, TodoInDB] = {}
-        self._next_id = 1
+        self._next_id = first_id
+        self._id_step = id_step
+        # ids triés (les ids sont croissants): sert de clé pour la pagination
+        self._ids = SortedList()
+        # partition completed / non completed, chaque liste triée par id
+        self._status_index = {False: SortedList(), True: SortedList()}
+        # propriétaire -> ids triés (les todos sans propriétaire n'y sont pas)
+        self._owner_index: dict[str, SortedList] = {}
+        # (created_at, id) triés pour les requêtes par intervalle en O(log n)
+        self._created_index = SortedList()
+        # created_at croissant avec l'id: une fenêtre de dates est un intervalle
+        # d'ids. Repasse à True seulement quand le store se vide
+        self._created_sorted = True
+        # mots de title/description -> ids
+        self._search_index = InvertedIndex()
+        # total, terminés et créations par jour, pour stats()
+        self._stats = StatsCounter()
+        # incrémenté après chaque écriture, une fois les index à jour
+        self._revision = 0
 
-    def list(self) -> list[TodoInDB]:
-        return list(self._data.values())
+    def list(self, query: TodoQuery | None = None) -> TodoPage:
+        if query is None:
+            return list(self._data.values())
+        data = self._data
+        if query.fields is not None:
+            # les todos sont déjà construits: seuls les champs demandés sont copiés
+            project = projector(query.fields)
+            return [project(data[todo_id]) for todo_id in self._page_ids(query)]
+        return [data[todo_id] for todo_id in self._page_ids(query)]
 
     def create(self, payload: TodoCreate) -> TodoInDB:
+        return self._create(payload, datetime.now(UTC))
+
+    def _create(self, payload: TodoCreate, created_at: datetime) -> TodoInDB:
+        todo_id, created_at = self._allocate(created_at)
         todo = TodoInDB(
-            id=self._next_id,
+            id=todo_id,
             title=payload.title,
             description=payload.description,
             completed=False,
-            created_at=datetime.now(UTC),
+            created_at=created_at,
+            owner=payload.owner,
         )
-        self._data[self._next_id] = todo
-        self._next_id += 1
+        self._insert(todo)
         return todo
 
     def get(self, todo_id: int) -> TodoInDB | None:
         return self._data.get(todo_id)
 
-    def update(self, todo_id: int, payload: TodoUpdate) -> TodoInDB | None:
+    def update(
+        self, todo_id: int, payload: TodoUpdate, expected_version: int | None = None
+    ) -> TodoInDB | None:
+        # pas d'await entre la lecture et l'écriture: atomique sur la boucle
         todo = self._data.get(todo_id)
         if not todo:
             return None
-        updated = todo.model_copy(update=payload.model_dump(exclude_unset=True))
-        self._data[todo_id] = updated
+        check_version(todo_id, todo.version, expected_version)
+        updated = updated_todo(todo, payload)
+        self._replace(todo, updated)
         return updated
 
-    def delete(self, todo_id: int) -> bool:
-        return self._data.pop(todo_id, None) is not None
+    def delete(self, todo_id: int, expected_version: int | None = None) -> bool:
+        todo = self._data.get(todo_id)
+        if todo is None:
+            return False
+        check_version(todo_id, todo.version, expected_version)
+        del self._data[todo_id]
+        self._index_remove(todo)
+        return True
+
+    def create_many(self, payloads: Iterable[TodoCreate]) -> list[TodoInDB]:
+        created_at = datetime.now(UTC)
+        return [self._create(payload, created_at) for payload in payloads]
+
+    def update_many(
+        self, changes: Iterable[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]:
+        return [
+            self.update(todo_id, payload) if self._owns(todo_id, owner) else None
+            for todo_id, payload in changes
+        ]
+
+    def delete_many(
+        self, todo_ids: Iterable[int], owner: str | None = None
+    ) -> list[bool]:
+        return [
+            self._owns(todo_id, owner) and self.delete(todo_id) for todo_id in todo_ids
+        ]
+
+    def search(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        query = query or TodoQuery()
+        results: list[TodoInDB] = []
+        for todo_id in self._search_index.search(text, query.after_id):
+            todo = self._data.get(todo_id)
+            if todo is None or not query.matches(todo):
+                continue
+            results.append(todo)
+            if query.limit is not None and len(results) >= query.limit:
+                break
+        if query.fields is not None:
+            return list(map(projector(query.fields), results))
+        return results
+
+    def revision(self) -> int:
+        return self._revision
+
+    def count(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> TodoStats:
+        return self._stats.snapshot()
+
+    def _allocate(self, created_at: datetime) -> tuple[int, datetime]:
+        """Id and creation date of a new todo."""
+        # l'id est réservé par _insert, qui avance _next_id
+        return self._next_id, created_at
+
+    def _owns(self, todo_id: int, owner: str | None) -> bool:
+        """Whether `owner` may write `todo_id` (anyone if None)."""
+        # le propriétaire d'un todo ne change jamais (TodoUpdate n'a pas de
+        # champ owner): le vérifier avant l'écriture ne laisse pas de course
+        if owner is None:
+            return True
+        todo = self._data.get(todo_id)
+        return todo is not None and todo.owner == owner
+
+    def _insert(self, todo: TodoInDB) -> None:
+        """Store a fully built todo and index it."""
+        self._data[todo.id] = todo
+        self._next_id = max(self._next_id, todo.id + self._id_step)
+        self._index_add(todo)
+
+    def _replace(self, old: TodoInDB, new: TodoInDB) -> None:
+        self._data[new.id] = new
+        self._index_replace(old, new)
+
+    def _index_replace(self, old: TodoInDB, new: TodoInDB) -> None:
+        if old.completed != new.completed:
+            self._status_index[old.completed].discard(old.id)
+            self._status_index[new.completed].add(new.id)
+            self._stats.set_completed(old.completed, new.completed)
+        self._search_index.replace(
+            new.id, (old.title, old.description), (new.title, new.description)
+        )
+        self._revision += 1
+
+    def _index_add(self, todo: TodoInDB) -> None:
+        created = self._created_index
+        key = (todo.created_at, todo.id)
+        if not created:
+            self._created_sorted = True
+        elif self._created_sorted:
+            # les dates suivent les ids tant que les voisins du todo dans
+            # l'ordre des dates l'encadrent aussi dans l'ordre des ids
+            previous = created.before(key)
+            following = next(created.irange(key), None)
+            if (previous is not None and previous[1] > todo.id) or (
+                following is not None and following[1] < todo.id
+            ):
+                self._created_sorted = False
+        # ids croissants: l'ajout se réduit à un append dans le cas courant
+        self._ids.add(todo.id)
+        self._status_index[todo.completed].add(todo.id)
+        if todo.owner is not None:
+            self._owner_index.setdefault(todo.owner, SortedList()).add(todo.id)
+        created.add(key)
+        self._search_index.add(todo.id, todo.title, todo.description)
+        self._stats.add(todo.created_at, todo.completed)
+        self._revision += 1
+
+    def _index_remove(self, todo: TodoInDB) -> None:
+        self._ids.discard(todo.id)
+        self._status_index[todo.completed].discard(todo.id)
+        if todo.owner is not None:
+            owned = self._owner_index[todo.owner]
+            owned.discard(todo.id)
+            if not owned:
+                del self._owner_index[todo.owner]
+        self._created_index.discard((todo.created_at, todo.id))
+        self._search_index.remove(todo.id, todo.title, todo.description)
+        self._stats.remove(todo.created_at, todo.completed)
+        self._revision += 1
+
+    def _page_ids(self, query: TodoQuery) -> list[int]:
+        """Ids of the requested page, read from the indexes."""
+        ids, exact, first, stop = self._candidate_ids(query)
+        if query.after_id is not None:
+            # ids entiers: "> after_id" est ">= after_id + 1"
+            first = max(first or 0, query.after_id + 1)
+        candidates = ids.irange(first, stop)
+        if exact:
+            # l'index couvre tous les filtres: simple tranche, sans vérification
+            return list(islice(candidates, query.limit))
+        page: list[int] = []
+        data = self._data
+        # on s'arrête dès que la page est pleine: pas de copie du store entier
+        for todo_id in candidates:
+            todo = data.get(todo_id)
+            if todo is None or not query.matches(todo):
+                continue
+            page.append(todo_id)
+            if query.limit is not None and len(page) >= query.limit:
+                break
+        return page
+
+    def _candidate_ids(
+        self, query: TodoQuery
+    ) -> tuple[SortedList, bool, int | None, int | None]:
+        """Pick the smallest sorted id list that can contain the results.
+
+        Renvoie aussi les bornes d'ids [first, stop) (None: sans borne) de la
+        fenêtre de dates. Le booléen indique si la liste, entre ces bornes,
+        satisfait déjà tous les filtres; sinon ils sont vérifiés ensuite par
+        `TodoQuery.matches`.
+        """
+        candidates = self._ids
+        exact = True
+        if query.owner is not None:
+            candidates = self._owner_index.get(query.owner, _EMPTY)
+            if query.completed is not None:
+                # deux filtres indexés: la plus courte des deux listes, vérifiée
+                candidates = min(
+                    candidates, self._status_index[query.completed], key=len
+                )
+                exact = False
+        elif query.completed is not None:
+            candidates = self._status_index[query.completed]
+        after, before = query.created_after, query.created_before
+        if after is None and before is None:
+            return candidates, exact, None, None
+        index = self._created_index
+        if self._created_sorted:
+            # dates dans l'ordre des ids: la fenêtre est un intervalle d'ids,
+            # trouvé par bisection (O(log n))
+            first = stop = None
+            if after is not None:
+                entry = next(index.irange((after,)), None)
+                if entry is None:
+                    return _EMPTY, True, None, None
+                first = entry[1]
+            if before is not None:
+                entry = next(index.irange((before,)), None)
+                stop = None if entry is None else entry[1]
+            return candidates, exact, first, stop
+        lo = 0 if after is None else index.bisect_left((after,))
+        hi = len(index) if before is None else index.bisect_left((before,))
+        if hi - lo < len(candidates):
+            # dates dans le désordre: la fenêtre est triée par id, en O(taille)
+            window = index.irange(
+                None if after is None else (after,),
+                None if before is None else (before,),
+            )
+            ids = SortedList(todo_id for _, todo_id in window)
+            return ids, query.completed is None and query.owner is None, None, None
+        return candidates, False, None, None
+
+
+# liste vide partagée, jamais modifiée
+_EMPTY = SortedList()
+
+
+def updated_todo(todo: TodoInDB, payload: TodoUpdate) -> TodoInDB:
+    """New (immutable) state of `todo` after `payload`, at the next version."""
+    changes = payload.model_dump(exclude_unset=True)
+    changes["version"] = todo.version + 1
+    return todo.model_copy(update=changes)
+
+
+# backends dont les appels peuvent bloquer (I/O): exécutés hors de l'event loop
+_BLOCKING_BACKENDS = frozenset({"sqlite", "remote"})
+
+
+def build_repository(settings: Settings) -> TodoRepository:
+    """Instantiate the storage backend selected by `settings.storage_backend`."""
+    if settings.storage_backend == "sqlite":
+        # import local: sqlite3 n'est chargé que si le backend est utilisé
+        from .sqlite_repository import SqliteTodoRepository
+
+        return SqliteTodoRepository(settings.sqlite_path)
+    if settings.storage_backend == "remote":
+        from .remote_repository import RemoteTodoRepository
+
+        return RemoteTodoRepository(settings.store_socket)
+    if settings.storage_backend == "concurrent":
+        from .concurrent_repository import ConcurrentTodoRepository
+
+        return ConcurrentTodoRepository(stripes=settings.memory_lock_stripes)
+    if settings.storage_backend == "sharded":
+        from .sharded_repository import ShardedTodoRepository
+
+        return ShardedTodoRepository(shards=settings.shard_count)
+    if settings.storage_backend == "columnar":
+        from .columnar_repository import ColumnarTodoRepository
+
+        return ColumnarTodoRepository()
+    if settings.storage_backend == "durable":
+        from .durable_repository import DurableTodoRepository
+
+        repo = DurableTodoRepository(
+            settings.journal_dir,
+            flush_interval=settings.journal_flush_ms / 1000,
+            snapshot_every=settings.journal_snapshot_every,
+        )
+        # vide le journal à l'arrêt du processus
+        atexit.register(repo.close)
+        return repo
+    return InMemoryTodoRepository()
+
+
+def build_async_repository(settings: Settings) -> AsyncTodoRepository:
+    """Wrap the configured backend for the async service.
+
+    Les stores en mémoire sont appelés directement; les backends bloquants passent
+    par un pool de threads dédié de `settings.repository_workers` threads.
+    """
+    repo = build_repository(settings)
+    if settings.storage_backend not in _BLOCKING_BACKENDS:
+        return AsyncRepositoryAdapter(repo)
+    from concurrent.futures import ThreadPoolExecutor
+
+    executor = ThreadPoolExecutor(
+        max_workers=settings.repository_workers, thread_name_prefix="todo-repo"
+    )
+    return AsyncRepositoryAdapter(repo, executor)
@@ -0,0 +1,173 @@
+"""Index inversé pour la recherche plein texte dans les stores en mémoire.
+
+Les textes sont découpés en mots, mis en minuscules et débarrassés de leurs
+accents ("Réunion" et "reunion" sont le même terme). Chaque terme pointe vers la
+liste triée des ids qui le contiennent (`array` d'entiers 64 bits: 8 octets par
+occurrence). Au-delà de `_LARGE` ids, la liste devient une `SortedList` à blocs
+d'`array`: retirer un id d'un terme très courant ne décale plus tout le tableau.
+Le vocabulaire (un terme par nombre des titres: autant de termes que de todos)
+est aussi une `SortedList`, où l'on retrouve par bisection tous les termes
+commençant par un préfixe.
+"""
+
+from __future__ import annotations
+
+import heapq
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import takewhile
+from typing import TYPE_CHECKING
+
+from .sortedlist import LOAD, SortedList
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+_WORD = re.compile(r"\w+")
+# taille à partir de laquelle une liste d'ids passe en blocs
+_LARGE = 2 * LOAD
+
+
+def normalize(text: str) -> str:
+    """Lowercase `text` and strip its accents."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text: str | None) -> list[str]:
+    """Normalized words of `text`, in order (with repetitions)."""
+    if not text:
+        return []
+    return _WORD.findall(normalize(text))
+
+
+class InvertedIndex:
+    """Term -> sorted ids, updated incrementally on every write.
+
+    Une recherche renvoie les ids (croissants) des documents qui contiennent,
+    pour chaque mot de la requête, au moins un terme commençant par ce mot.
+    Le parcours est paresseux: une page de résultats ne coûte que ce qu'il faut
+    pour la remplir.
+    """
+
+    def __init__(self) -> None:
+        self._postings: dict[str, array | SortedList] = {}
+        self._vocabulary = SortedList()
+
+    def __len__(self) -> int:
+        """Number of distinct terms."""
+        return len(self._postings)
+
+    def add(self, doc_id: int, *texts: str | None) -> None:
+        self._add_terms(doc_id, _terms(texts))
+
+    def remove(self, doc_id: int, *texts: str | None) -> None:
+        self._remove_terms(doc_id, _terms(texts))
+
+    def replace(
+        self, doc_id: int, old: tuple[str | None, ...], new: tuple[str | None, ...]
+    ) -> None:
+        """Re-index a document whose texts changed from `old` to `new`."""
+        if old != new:
+            # seuls les termes qui changent: "todo" reste dans sa liste
+            old_terms, new_terms = _terms(old), _terms(new)
+            self._remove_terms(doc_id, old_terms - new_terms)
+            self._add_terms(doc_id, new_terms - old_terms)
+
+    def _add_terms(self, doc_id: int, terms: Iterable[str]) -> None:
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                self._postings[term] = array("q", (doc_id,))
+                self._vocabulary.add(term)
+            elif isinstance(postings, SortedList):
+                if doc_id not in postings:
+                    postings.add(doc_id)
+            else:
+                if postings[-1] < doc_id:
+                    # cas courant: ids croissants, simple append
+                    postings.append(doc_id)
+                else:
+                    index = bisect_left(postings, doc_id)
+                    if index == len(postings) or postings[index] != doc_id:
+                        postings.insert(index, doc_id)
+                if len(postings) > _LARGE:
+                    self._postings[term] = SortedList(postings, typecode="q")
+
+    def _remove_terms(self, doc_id: int, terms: Iterable[str]) -> None:
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            if isinstance(postings, SortedList):
+                postings.discard(doc_id)
+            else:
+                index = bisect_left(postings, doc_id)
+                if index < len(postings) and postings[index] == doc_id:
+                    del postings[index]
+            if not postings:
+                del self._postings[term]
+                self._vocabulary.discard(term)
+
+    def search(self, text: str, after_id: int | None = None) -> Iterator[int]:
+        """Yield, in increasing order, the ids matching every word of `text`."""
+        groups = [self._expand(word) for word in dict.fromkeys(tokenize(text))]
+        if not groups or not all(groups):
+            return
+        # on parcourt le mot le plus sélectif; les autres ne servent qu'à filtrer
+        groups.sort(key=lambda group: sum(map(len, group)))
+        driver, filters = groups[0], [_Membership(group) for group in groups[1:]]
+        start = 0 if after_id is None else after_id
+        # lecture paresseuse à partir du curseur, sans copier les listes
+        streams = [_after(postings, start) for postings in driver]
+        previous = None
+        for doc_id in streams[0] if len(streams) == 1 else heapq.merge(*streams):
+            if doc_id == previous:
+                continue  # même id via deux termes du préfixe
+            previous = doc_id
+            if all(doc_id in membership for membership in filters):
+                yield doc_id
+
+    def _expand(self, prefix: str) -> list[array | SortedList]:
+        """Posting lists of every term starting with `prefix`."""
+        terms = takewhile(
+            lambda term: term.startswith(prefix), self._vocabulary.irange(prefix)
+        )
+        return [self._postings[term] for term in terms]
+
+
+class _Membership:
+    """`id in group` for the posting lists matched by one query word."""
+
+    def __init__(self, group: list[array | SortedList]) -> None:
+        self.group = group
+        # beaucoup de termes pour ce préfixe: un set unique plutôt que n bisections
+        self.ids = set().union(*group) if len(group) > 8 else None
+
+    def __contains__(self, doc_id: int) -> bool:
+        if self.ids is not None:
+            return doc_id in self.ids
+        for postings in self.group:
+            if isinstance(postings, SortedList):
+                if doc_id in postings:
+                    return True
+                continue
+            index = bisect_left(postings, doc_id)
+            if index < len(postings) and postings[index] == doc_id:
+                return True
+        return False
+
+
+def _after(postings: array | SortedList, start: int) -> Iterator[int]:
+    """Ids of `postings` greater than `start`, lazily."""
+    if isinstance(postings, SortedList):
+        return postings.irange(start + 1)
+    return map(
+        postings.__getitem__, range(bisect_right(postings, start), len(postings))
+    )
+
+
+def _terms(texts: tuple[str | None, ...]) -> set[str]:
+    return {term for text in texts for term in tokenize(text)}
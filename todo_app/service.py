@@ -1,11 +1,25 @@
 """Service layer: logique métier.
 
 La séparation "service/repository" rend le code testable et maintenable.
+
+Les écritures par id acceptent un propriétaire (`owner`): un todo d'un autre
+propriétaire est traité comme absent, pour ne pas révéler son existence.
 """
 
+from collections.abc import Sequence
+
+from .cache import ResponseCache
+from .events import ChangeFeed
 from .logger import logger
-from .models import TodoCreate, TodoInDB, TodoUpdate
-from .repository import InMemoryTodoRepository
+from .models import (
+    TodoCreate,
+    TodoInDB,
+    TodoPage,
+    TodoQuery,
+    TodoStats,
+    TodoUpdate,
+)
+from .repository import AsyncTodoRepository, TodoRepository
 
 
 class TodoService:
@@ -14,27 +28,216 @@ class TodoService:
     Gère la logique applicative et utilise un repository (dépendance).
     """
 
-    def __init__(self, repo: InMemoryTodoRepository) -> None:
+    def __init__(self, repo: TodoRepository) -> None:
         self.repo = repo
 
-    def list_todos(self) -> list[TodoInDB]:
+    def list_todos(self, query: TodoQuery | None = None) -> TodoPage:
         logger.info("Listing todos")
-        return self.repo.list()
+        return self.repo.list(query)
+
+    def search_todos(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        logger.info("Searching todos: %s", text)
+        return self.repo.search(text, query)
+
+    def get_todo(self, todo_id: int, owner: str | None = None) -> TodoInDB:
+        """Return a todo; `ValueError` if absent (or owned by another than `owner`)."""
+        logger.info("Reading todo %s", todo_id)
+        todo = self.repo.get(todo_id)
+        if todo is None or (owner is not None and todo.owner != owner):
+            raise ValueError("Todo not found")
+        return todo
+
+    def get_stats(self) -> TodoStats:
+        logger.info("Reading todo stats")
+        return self.repo.stats()
 
     def create_todo(self, payload: TodoCreate) -> TodoInDB:
         logger.info("Creating todo: %s", payload.title)
         return self.repo.create(payload)
 
-    def update_todo(self, todo_id: int, payload: TodoUpdate) -> TodoInDB:
+    def update_todo(
+        self,
+        todo_id: int,
+        payload: TodoUpdate,
+        expected_version: int | None = None,
+        owner: str | None = None,
+    ) -> TodoInDB:
+        """Update a todo; with `expected_version`, only if it is still current.
+
+        Lève `ValueError` si le todo n'existe pas (ou appartient à un autre que
+        `owner`) et `VersionConflictError` s'il a changé de version.
+        """
+        logger.info("Updating todo %s", todo_id)
+        updated = (
+            self.repo.update(todo_id, payload, expected_version)
+            if self._owns(todo_id, owner)
+            else None
+        )
+        if updated is None:
+            logger.warning("Todo %s not found", todo_id)
+            raise ValueError("Todo not found")
+        return updated
+
+    def delete_todo(
+        self,
+        todo_id: int,
+        expected_version: int | None = None,
+        owner: str | None = None,
+    ) -> None:
+        logger.info("Deleting todo %s", todo_id)
+        if not (
+            self._owns(todo_id, owner) and self.repo.delete(todo_id, expected_version)
+        ):
+            logger.warning("Todo %s not found", todo_id)
+            raise ValueError("Todo not found")
+
+    def create_todos(self, payloads: Sequence[TodoCreate]) -> list[TodoInDB]:
+        logger.info("Creating %d todos", len(payloads))
+        return self.repo.create_many(payloads)
+
+    def update_todos(
+        self, changes: Sequence[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]:
+        """Apply a batch of updates; missing todos yield None (no exception)."""
+        logger.info("Updating %d todos", len(changes))
+        return self.repo.update_many(changes, owner)
+
+    def delete_todos(
+        self, todo_ids: Sequence[int], owner: str | None = None
+    ) -> list[bool]:
+        """Delete a batch of todos; False marks the ids that were not found."""
+        logger.info("Deleting %d todos", len(todo_ids))
+        return self.repo.delete_many(todo_ids, owner)
+
+    def _owns(self, todo_id: int, owner: str | None) -> bool:
+        """Whether the todo may be written by `owner` (anyone if None)."""
+        if owner is None:
+            return True
+        todo = self.repo.get(todo_id)
+        return todo is not None and todo.owner == owner
+
+
+class AsyncTodoService:
+    """Async variant of `TodoService`, used by the API endpoints.
+
+    Les endpoints `async def` s'exécutent sur la boucle d'événements au lieu
+    d'occuper un thread du threadpool de Starlette.
+
+    `list_cache` garde les réponses sérialisées de la liste; il est vidé à chaque
+    écriture passant par ce service. Chaque écriture est aussi publiée sur
+    `changes`, le flux des modifications suivi par GET /todos/changes.
+    """
+
+    def __init__(
+        self,
+        repo: AsyncTodoRepository,
+        list_cache: ResponseCache | None = None,
+        changes: ChangeFeed | None = None,
+    ) -> None:
+        self.repo = repo
+        self.list_cache = ResponseCache() if list_cache is None else list_cache
+        self.changes = ChangeFeed() if changes is None else changes
+
+    async def revision(self) -> int:
+        return await self.repo.revision()
+
+    async def list_todos(self, query: TodoQuery | None = None) -> TodoPage:
+        logger.info("Listing todos")
+        return await self.repo.list(query)
+
+    async def search_todos(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        logger.info("Searching todos: %s", text)
+        return await self.repo.search(text, query)
+
+    async def get_todo(self, todo_id: int, owner: str | None = None) -> TodoInDB:
+        logger.info("Reading todo %s", todo_id)
+        todo = await self.repo.get(todo_id)
+        if todo is None or (owner is not None and todo.owner != owner):
+            raise ValueError("Todo not found")
+        return todo
+
+    async def get_stats(self) -> TodoStats:
+        """Counters kept up to date by the repository: no scan of the todos."""
+        logger.info("Reading todo stats")
+        return await self.repo.stats()
+
+    async def create_todo(self, payload: TodoCreate) -> TodoInDB:
+        logger.info("Creating todo: %s", payload.title)
+        todo = await self.repo.create(payload)
+        self.list_cache.clear()
+        self.changes.publish("created", todo.id, todo)
+        return todo
+
+    async def update_todo(
+        self,
+        todo_id: int,
+        payload: TodoUpdate,
+        expected_version: int | None = None,
+        owner: str | None = None,
+    ) -> TodoInDB:
         logger.info("Updating todo %s", todo_id)
-        updated = self.repo.update(todo_id, payload)
+        updated = (
+            await self.repo.update(todo_id, payload, expected_version)
+            if await self._owns(todo_id, owner)
+            else None
+        )
         if updated is None:
             logger.warning("Todo %s not found", todo_id)
             raise ValueError("Todo not found")
+        self.list_cache.clear()
+        self.changes.publish("updated", todo_id, updated)
         return updated
 
-    def delete_todo(self, todo_id: int) -> None:
+    async def delete_todo(
+        self,
+        todo_id: int,
+        expected_version: int | None = None,
+        owner: str | None = None,
+    ) -> None:
         logger.info("Deleting todo %s", todo_id)
-        if not self.repo.delete(todo_id):
+        if not (
+            await self._owns(todo_id, owner)
+            and await self.repo.delete(todo_id, expected_version)
+        ):
             logger.warning("Todo %s not found", todo_id)
             raise ValueError("Todo not found")
+        self.list_cache.clear()
+        self.changes.publish("deleted", todo_id)
+
+    async def create_todos(self, payloads: Sequence[TodoCreate]) -> list[TodoInDB]:
+        logger.info("Creating %d todos", len(payloads))
+        todos = await self.repo.create_many(payloads)
+        self.list_cache.clear()
+        for todo in todos:
+            self.changes.publish("created", todo.id, todo)
+        return todos
+
+    async def update_todos(
+        self, changes: Sequence[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]:
+        logger.info("Updating %d todos", len(changes))
+        # contrôle du propriétaire fait par le repository, avec l'écriture
+        updated = await self.repo.update_many(changes, owner)
+        self.list_cache.clear()
+        for todo in updated:
+            if todo is not None:
+                self.changes.publish("updated", todo.id, todo)
+        return updated
+
+    async def delete_todos(
+        self, todo_ids: Sequence[int], owner: str | None = None
+    ) -> list[bool]:
+        logger.info("Deleting %d todos", len(todo_ids))
+        deleted = await self.repo.delete_many(todo_ids, owner)
+        self.list_cache.clear()
+        for todo_id, found in zip(todo_ids, deleted, strict=True):
+            if found:
+                self.changes.publish("deleted", todo_id)
+        return deleted
+
+    async def _owns(self, todo_id: int, owner: str | None) -> bool:
+        """Whether the todo may be written by `owner` (anyone if None)."""
+        if owner is None:
+            return True
+        todo = await self.repo.get(todo_id)
+        return todo is not None and todo.owner == owner
@@ -0,0 +1,161 @@
+"""Liste triée par blocs, pour les index des stores en mémoire.
+
+Une liste Python triée retrouve une valeur en O(log n), mais une insertion ou
+une suppression ailleurs qu'à la fin décale tous les éléments suivants: à un
+million d'ids, chaque passage d'un todo d'une partition de statut à l'autre
+déplaçait plusieurs mégaoctets. `SortedList` découpe les valeurs en blocs triés
+d'au plus `2 * load` éléments: une écriture ne décale qu'un bloc, et l'ajout en
+fin de liste (ids croissants, cas courant) reste un simple `append`.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left, insort
+from itertools import chain, islice
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+# taille visée d'un bloc: un bloc est coupé en deux au-delà de 2 * LOAD
+LOAD = 1000
+
+
+class SortedList:
+    """Sorted values in blocks: O(log n) lookups, writes that move one block.
+
+    `_maxes[i]` est le plus grand élément de `_blocks[i]`; aucun bloc n'est
+    vide. Les valeurs doivent être comparables entre elles (ids, tuples). Avec
+    `typecode`, les blocs sont des `array` (8 octets par id avec "q") plutôt
+    que des listes d'objets Python.
+    """
+
+    __slots__ = ("_blocks", "_len", "_load", "_maxes", "_typecode")
+
+    def __init__(
+        self, values: Iterable[Any] = (), load: int = LOAD, typecode: str | None = None
+    ) -> None:
+        ordered = sorted(values)
+        self._load = load
+        self._typecode = typecode
+        self._blocks = [
+            self._block(ordered[start : start + load])
+            for start in range(0, len(ordered), load)
+        ]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(ordered)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __iter__(self) -> Iterator[Any]:
+        return chain.from_iterable(self._blocks)
+
+    def __contains__(self, value: Any) -> bool:
+        index = bisect_left(self._maxes, value)
+        if index == len(self._maxes):
+            return False
+        block = self._blocks[index]
+        return block[bisect_left(block, value)] == value
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("SortedList index out of range")
+        for block in self._blocks:
+            if index < len(block):
+                return block[index]
+            index -= len(block)
+        raise AssertionError  # pragma: no cover
+
+    def __eq__(self, other: object) -> bool:
+        # comparable à une liste: les tests comparent les index à des listes
+        if isinstance(other, SortedList | list | tuple):
+            return len(self) == len(other) and list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"SortedList({list(self)!r})"
+
+    def add(self, value: Any) -> None:
+        maxes = self._maxes
+        if not maxes:
+            self._blocks.append(self._block([value]))
+            maxes.append(value)
+        elif value >= maxes[-1]:
+            # cas courant (ids croissants): ajout en fin du dernier bloc
+            self._blocks[-1].append(value)
+            maxes[-1] = value
+            self._split(len(maxes) - 1)
+        else:
+            index = bisect_left(maxes, value)
+            insort(self._blocks[index], value)
+            self._split(index)
+        self._len += 1
+
+    def discard(self, value: Any) -> None:
+        """Remove `value` if present (O(log n) + one block)."""
+        maxes = self._maxes
+        index = bisect_left(maxes, value)
+        if index == len(maxes):
+            return
+        block = self._blocks[index]
+        position = bisect_left(block, value)
+        if block[position] != value:
+            return
+        del block[position]
+        self._len -= 1
+        if not block:
+            del self._blocks[index]
+            del maxes[index]
+        elif position == len(block):
+            maxes[index] = block[-1]
+
+    def before(self, value: Any) -> Any:
+        """Last element < `value`, or None (O(log n))."""
+        maxes = self._maxes
+        index = bisect_left(maxes, value)
+        if index < len(maxes):
+            block = self._blocks[index]
+            position = bisect_left(block, value)
+            if position:
+                return block[position - 1]
+        return maxes[index - 1] if index else None
+
+    def bisect_left(self, value: Any) -> int:
+        """Position of the first element >= `value` (O(number of blocks))."""
+        index = bisect_left(self._maxes, value)
+        before = sum(map(len, islice(self._blocks, index)))
+        if index == len(self._maxes):
+            return before
+        return before + bisect_left(self._blocks[index], value)
+
+    def irange(self, lo: Any = None, hi: Any = None) -> Iterator[Any]:
+        """Elements `x` with lo <= x < hi, in order (None: unbounded), lazily."""
+        blocks, maxes = self._blocks, self._maxes
+        index = position = 0
+        if lo is not None:
+            index = bisect_left(maxes, lo)
+            if index == len(maxes):
+                return
+            position = bisect_left(blocks[index], lo)
+        for block in islice(blocks, index, None):
+            if hi is not None and block[-1] >= hi:
+                yield from islice(block, position, bisect_left(block, hi))
+                return
+            yield from islice(block, position, None)
+            position = 0
+
+    def _block(self, values: list[Any]) -> Any:
+        return values if self._typecode is None else array(self._typecode, values)
+
+    def _split(self, index: int) -> None:
+        block = self._blocks[index]
+        if len(block) > 2 * self._load:
+            half = len(block) // 2
+            self._blocks[index : index + 1] = [block[:half], block[half:]]
+            self._maxes.insert(index, block[half - 1])
@@ -0,0 +1,467 @@
+"""Repository SQLite: stockage durable, partageable entre plusieurs workers.
+
+Même interface que `InMemoryTodoRepository`. La base est en mode WAL (les
+lecteurs ne bloquent pas l'écrivain), chaque thread a sa propre connexion et
+les requêtes SQL sont des constantes réutilisées via le cache de statements
+préparés de `sqlite3`. Des triggers tiennent à jour la révision, l'index plein
+texte et les compteurs lus par `stats` et `count`, qui ne parcourent jamais la
+table.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING
+
+from .models import TodoCreate, TodoInDB, TodoQuery, TodoStats, TodoUpdate
+from .repository import VersionConflictError
+from .search import tokenize
+from .stats import build_stats
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+
+    from .models import TodoPage
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+_MICROSECOND = timedelta(microseconds=1)
+_EPOCH_DAY = _EPOCH.date().toordinal()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    description TEXT,
+    completed INTEGER NOT NULL DEFAULT 0,
+    created_at INTEGER NOT NULL,
+    version INTEGER NOT NULL DEFAULT 1,
+    owner TEXT
+);
+CREATE INDEX IF NOT EXISTS todos_completed_id ON todos (completed, id);
+CREATE INDEX IF NOT EXISTS todos_created_at ON todos (created_at, id);
+CREATE INDEX IF NOT EXISTS todos_owner_id ON todos (owner, id);
+
+-- révision partagée entre workers: incrémentée dans la transaction d'écriture
+CREATE TABLE IF NOT EXISTS todo_meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+INSERT OR IGNORE INTO todo_meta (key, value) VALUES ('revision', 0);
+CREATE TRIGGER IF NOT EXISTS todos_revision_insert AFTER INSERT ON todos BEGIN
+    UPDATE todo_meta SET value = value + 1 WHERE key = 'revision';
+END;
+CREATE TRIGGER IF NOT EXISTS todos_revision_update AFTER UPDATE ON todos BEGIN
+    UPDATE todo_meta SET value = value + 1 WHERE key = 'revision';
+END;
+CREATE TRIGGER IF NOT EXISTS todos_revision_delete AFTER DELETE ON todos BEGIN
+    UPDATE todo_meta SET value = value + 1 WHERE key = 'revision';
+END;
+
+-- compteurs de stats(): total, terminés et créations par jour (created_at en
+-- jours UTC depuis 1970), modifiés dans la transaction de chaque écriture
+INSERT OR IGNORE INTO todo_meta (key, value) VALUES ('total', 0), ('completed', 0);
+CREATE TABLE IF NOT EXISTS todo_days (
+    day INTEGER PRIMARY KEY,
+    created INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS todos_stats_insert AFTER INSERT ON todos BEGIN
+    UPDATE todo_meta SET value = value + 1 WHERE key = 'total';
+    UPDATE todo_meta SET value = value + new.completed WHERE key = 'completed';
+    INSERT INTO todo_days (day, created) VALUES (new.created_at / 86400000000, 1)
+    ON CONFLICT (day) DO UPDATE SET created = created + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS todos_stats_update AFTER UPDATE OF completed ON todos
+WHEN old.completed != new.completed BEGIN
+    UPDATE todo_meta SET value = value + new.completed - old.completed
+    WHERE key = 'completed';
+END;
+CREATE TRIGGER IF NOT EXISTS todos_stats_delete AFTER DELETE ON todos BEGIN
+    UPDATE todo_meta SET value = value - 1 WHERE key = 'total';
+    UPDATE todo_meta SET value = value - old.completed WHERE key = 'completed';
+    UPDATE todo_days SET created = created - 1
+    WHERE day = old.created_at / 86400000000;
+    DELETE FROM todo_days WHERE day = old.created_at / 86400000000 AND created = 0;
+END;
+
+-- recherche plein texte: index FTS5 sans copie des textes (content=todos),
+-- mêmes règles que l'index en mémoire (minuscules, sans accents), avec des
+-- index de préfixes de 2 à 4 caractères pour les recherches "mot"*
+CREATE VIRTUAL TABLE IF NOT EXISTS todos_fts USING fts5(
+    title, description, content='todos', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+);
+CREATE TRIGGER IF NOT EXISTS todos_fts_insert AFTER INSERT ON todos BEGIN
+    INSERT INTO todos_fts (rowid, title, description)
+    VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_fts_update
+AFTER UPDATE OF title, description ON todos BEGIN
+    INSERT INTO todos_fts (todos_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO todos_fts (rowid, title, description)
+    VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS todos_fts_delete AFTER DELETE ON todos BEGIN
+    INSERT INTO todos_fts (todos_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+"""
+_FTS_SQL = "SELECT sql FROM sqlite_master WHERE name = 'todos_fts'"
+# index créé avec d'autres préfixes: recréé, puis reconstruit comme un nouveau
+_FTS_PREFIX = "prefix='2 3 4'"
+_DROP_FTS = "DROP TABLE todos_fts"
+# base créée avant les colonnes `version` / `owner`: ajoutées avec leur défaut
+_TODO_COLUMNS = "SELECT name FROM pragma_table_info('todos')"
+_ADD_VERSION = "ALTER TABLE todos ADD COLUMN version INTEGER NOT NULL DEFAULT 1"
+_ADD_OWNER = "ALTER TABLE todos ADD COLUMN owner TEXT"
+# base créée avant l'index: on indexe les todos existants une fois
+_FTS_REBUILD = "INSERT INTO todos_fts (todos_fts) VALUES ('rebuild')"
+# base créée avant les compteurs: on les calcule une fois (seul parcours complet)
+_HAS_STATS = "SELECT 1 FROM sqlite_master WHERE name = 'todo_days'"
+_STATS_REBUILD = """
+UPDATE todo_meta SET value = (SELECT COUNT(*) FROM todos) WHERE key = 'total';
+UPDATE todo_meta SET value = (SELECT COALESCE(SUM(completed), 0) FROM todos)
+WHERE key = 'completed';
+DELETE FROM todo_days;
+INSERT INTO todo_days (day, created)
+SELECT created_at / 86400000000, COUNT(*) FROM todos GROUP BY 1;
+"""
+
+_COLUMNS = (
+    "todos.id, todos.title, todos.description, todos.completed, todos.created_at,"
+    " todos.version, todos.owner"
+)
+_SELECT_ONE = f"SELECT {_COLUMNS} FROM todos WHERE id = ?"
+_INSERT = (
+    "INSERT INTO todos (title, description, completed, created_at, owner)"
+    " VALUES (?, ?, ?, ?, ?)"
+)
+_DELETE = "DELETE FROM todos WHERE id = ?"
+_DELETE_VERSION = "DELETE FROM todos WHERE id = ? AND version = ?"
+_DELETE_OWNER = "DELETE FROM todos WHERE id = ? AND owner = ?"
+_IS_OWNER = "SELECT 1 FROM todos WHERE id = ? AND owner = ?"
+_SELECT_VERSION = "SELECT version FROM todos WHERE id = ?"
+_REVISION = "SELECT value FROM todo_meta WHERE key = 'revision'"
+_COUNT = "SELECT value FROM todo_meta WHERE key = 'total'"
+_STATS_TOTALS = "SELECT key, value FROM todo_meta WHERE key IN ('total', 'completed')"
+_STATS_DAYS = "SELECT day, created FROM todo_days ORDER BY day"
+
+
+def _to_micros(value: datetime) -> int:
+    """created_at est stocké en microsecondes UTC: entier, compact et triable."""
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def _from_micros(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=value)
+
+
+# conversion des colonnes d'une projection (les autres sont lues telles quelles)
+_CONVERTERS = {"completed": bool, "created_at": _from_micros}
+
+
+def _row_to_todo(row: tuple) -> TodoInDB:
+    todo_id, title, description, completed, created_at, version, owner = row
+    return TodoInDB(
+        id=todo_id,
+        title=title,
+        description=description,
+        completed=bool(completed),
+        created_at=_EPOCH + timedelta(microseconds=created_at),
+        version=version,
+        owner=owner,
+    )
+
+
+def _statements(script: str) -> Iterator[str]:
+    """Split `script` into statements (executescript() would COMMIT first)."""
+    statement = ""
+    for line in script.splitlines(keepends=True):
+        statement += line
+        if sqlite3.complete_statement(statement):
+            yield statement
+            statement = ""
+
+
+class SqliteTodoRepository:
+    """Durable repository backed by a SQLite database file.
+
+    Thread-safe: une connexion par thread (pool `threading.local`). Les écritures
+    sont commitées une par une, sauf à l'intérieur de `batch()` qui les regroupe
+    dans une seule transaction.
+    """
+
+    def __init__(self, path: str, *, busy_timeout_ms: int = 5000) -> None:
+        self.path = path
+        self._busy_timeout_ms = busy_timeout_ms
+        self._local = threading.local()
+        self._connections: list[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        # vérification et migration dans une seule transaction d'écriture:
+        # plusieurs workers qui démarrent ensemble migrent la base une fois
+        with self._write() as conn:
+            self._migrate(conn)
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        fts = conn.execute(_FTS_SQL).fetchone()
+        has_fts = fts is not None and _FTS_PREFIX in fts[0]
+        if fts is not None and not has_fts:
+            conn.execute(_DROP_FTS)
+        has_stats = conn.execute(_HAS_STATS).fetchone() is not None
+        columns = {name for (name,) in conn.execute(_TODO_COLUMNS)}
+        if columns and "version" not in columns:
+            conn.execute(_ADD_VERSION)
+        if columns and "owner" not in columns:
+            conn.execute(_ADD_OWNER)
+        for statement in _statements(_SCHEMA):
+            conn.execute(statement)
+        if not has_fts:
+            conn.execute(_FTS_REBUILD)
+        if not has_stats:
+            for statement in _statements(_STATS_REBUILD):
+                conn.execute(statement)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: les transactions sont gérées explicitement
+            conn = sqlite3.connect(
+                self.path,
+                isolation_level=None,
+                check_same_thread=False,
+                cached_statements=256,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            # en WAL, NORMAL ne fsync qu'aux checkpoints: sûr et bien plus rapide
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self._busy_timeout_ms}")
+            self._local.conn = conn
+            self._local.depth = 0
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def _write(self) -> Iterator[sqlite3.Connection]:
+        conn = self._connection()
+        if self._local.depth:
+            # déjà dans une transaction ouverte par batch()
+            yield conn
+            return
+        conn.execute("BEGIN IMMEDIATE")
+        self._local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            self._local.depth = 0
+
+    @contextmanager
+    def _read(self) -> Iterator[sqlite3.Connection]:
+        """Run several SELECTs on the same snapshot of the database."""
+        conn = self._connection()
+        if self._local.depth:
+            yield conn
+            return
+        # transaction différée: en WAL, une seule vue cohérente, sans verrou
+        conn.execute("BEGIN")
+        try:
+            yield conn
+        finally:
+            conn.execute("COMMIT")
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """Group every write of the block in one transaction (one commit)."""
+        with self._write():
+            yield
+
+    def close(self) -> None:
+        """Close every pooled connection."""
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
+
+    def list(self, query: TodoQuery | None = None) -> TodoPage:
+        return self._select(query or TodoQuery())
+
+    def search(self, text: str, query: TodoQuery | None = None) -> TodoPage:
+        words = tokenize(text)
+        if not words:
+            return []
+        # chaque mot devient un préfixe FTS5 ("mot"*), combinés par AND
+        match = " ".join(f'"{word}"*' for word in dict.fromkeys(words))
+        # parcours de l'index FTS dans l'ordre des rowid: LIMIT arrête la lecture
+        # au lieu de trier toutes les correspondances
+        return self._select(
+            query or TodoQuery(),
+            source="todos_fts JOIN todos ON todos.id = todos_fts.rowid",
+            key="todos_fts.rowid",
+            clauses=["todos_fts MATCH ?"],
+            params=[match],
+        )
+
+    def _select(
+        self,
+        query: TodoQuery,
+        *,
+        source: str = "todos",
+        key: str = "todos.id",
+        clauses: Sequence[str] = (),
+        params: Sequence = (),
+    ) -> TodoPage:
+        clauses, params = list(clauses), list(params)
+        if query.after_id is not None:
+            clauses.append(f"{key} > ?")
+            params.append(query.after_id)
+        if query.completed is not None:
+            clauses.append("completed = ?")
+            params.append(int(query.completed))
+        if query.owner is not None:
+            clauses.append("owner = ?")
+            params.append(query.owner)
+        if query.created_after is not None:
+            clauses.append("created_at >= ?")
+            params.append(_to_micros(query.created_after))
+        if query.created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(_to_micros(query.created_before))
+        columns = (
+            _COLUMNS
+            if query.fields is None
+            # noms validés par TodoQuery (TODO_FIELDS), jamais pris tels quels
+            else ", ".join(f"todos.{name}" for name in query.fields)
+        )
+        sql = f"SELECT {columns} FROM {source}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY {key}"
+        if query.limit is not None:
+            sql += " LIMIT ?"
+            params.append(query.limit)
+        rows = self._connection().execute(sql, params).fetchall()
+        if query.fields is None:
+            return [_row_to_todo(row) for row in rows]
+        converters = [(name, _CONVERTERS.get(name)) for name in query.fields]
+        return [
+            {
+                name: value if convert is None else convert(value)
+                for (name, convert), value in zip(converters, row, strict=True)
+            }
+            for row in rows
+        ]
+
+    def create(self, payload: TodoCreate) -> TodoInDB:
+        return self.create_many([payload])[0]
+
+    def get(self, todo_id: int) -> TodoInDB | None:
+        row = self._connection().execute(_SELECT_ONE, (todo_id,)).fetchone()
+        return None if row is None else _row_to_todo(row)
+
+    def update(
+        self, todo_id: int, payload: TodoUpdate, expected_version: int | None = None
+    ) -> TodoInDB | None:
+        changes = payload.model_dump(exclude_unset=True)
+        if "completed" in changes:
+            changes["completed"] = int(changes["completed"])
+        # noms de colonnes issus du modèle TodoUpdate, jamais de l'utilisateur
+        assignments = "".join(f"{column} = ?, " for column in changes)
+        sql = f"UPDATE todos SET {assignments}version = version + 1 WHERE id = ?"
+        params = [*changes.values(), todo_id]
+        if expected_version is not None:
+            # compare-and-swap en une requête: la condition fait partie du UPDATE
+            sql += " AND version = ?"
+            params.append(expected_version)
+        with self._write() as conn:
+            updated = conn.execute(sql, params).rowcount > 0
+            row = conn.execute(_SELECT_ONE, (todo_id,)).fetchone()
+        if row is None:
+            return None
+        todo = _row_to_todo(row)
+        if not updated:
+            raise VersionConflictError(todo_id, todo.version)
+        return todo
+
+    def delete(self, todo_id: int, expected_version: int | None = None) -> bool:
+        with self._write() as conn:
+            if expected_version is None:
+                return conn.execute(_DELETE, (todo_id,)).rowcount > 0
+            if conn.execute(_DELETE_VERSION, (todo_id, expected_version)).rowcount:
+                return True
+            row = conn.execute(_SELECT_VERSION, (todo_id,)).fetchone()
+        if row is None:
+            return False
+        raise VersionConflictError(todo_id, row[0])
+
+    def create_many(self, payloads: Iterable[TodoCreate]) -> list[TodoInDB]:
+        created_at = datetime.now(UTC)
+        micros = _to_micros(created_at)
+        todos: list[TodoInDB] = []
+        with self._write() as conn:
+            for payload in payloads:
+                cursor = conn.execute(
+                    _INSERT,
+                    (payload.title, payload.description, 0, micros, payload.owner),
+                )
+                todos.append(
+                    TodoInDB(
+                        id=cursor.lastrowid,
+                        title=payload.title,
+                        description=payload.description,
+                        completed=False,
+                        created_at=created_at,
+                        owner=payload.owner,
+                    )
+                )
+        return todos
+
+    def update_many(
+        self, changes: Iterable[tuple[int, TodoUpdate]], owner: str | None = None
+    ) -> list[TodoInDB | None]:
+        # contrôle du propriétaire et écriture dans la même transaction
+        with self._write() as conn:
+            return [
+                (
+                    self.update(todo_id, payload)
+                    if owner is None
+                    or conn.execute(_IS_OWNER, (todo_id, owner)).fetchone()
+                    else None
+                )
+                for todo_id, payload in changes
+            ]
+
+    def delete_many(
+        self, todo_ids: Iterable[int], owner: str | None = None
+    ) -> list[bool]:
+        with self._write() as conn:
+            if owner is None:
+                return [
+                    conn.execute(_DELETE, (todo_id,)).rowcount > 0
+                    for todo_id in todo_ids
+                ]
+            return [
+                conn.execute(_DELETE_OWNER, (todo_id, owner)).rowcount > 0
+                for todo_id in todo_ids
+            ]
+
+    def revision(self) -> int:
+        return self._connection().execute(_REVISION).fetchone()[0]
+
+    def count(self) -> int:
+        return self._connection().execute(_COUNT).fetchone()[0]
+
+    def stats(self) -> TodoStats:
+        with self._read() as conn:
+            totals = dict(conn.execute(_STATS_TOTALS).fetchall())
+            days = conn.execute(_STATS_DAYS).fetchall()
+        return build_stats(
+            totals["total"],
+            totals["completed"],
+            {date.fromordinal(_EPOCH_DAY + day): created for day, created in days},
+        )
@@ -0,0 +1,82 @@
+"""Statistiques agrégées des todos, tenues à jour à chaque écriture.
+
+GET /todos/stats ne parcourt jamais le store: les repositories en mémoire
+mettent à jour un `StatsCounter` en O(1) à chaque création, mise à jour (quand
+`completed` change) et suppression; SQLite fait de même avec des triggers. Lire
+les statistiques coûte en proportion du nombre de jours, pas du nombre de todos.
+"""
+
+from __future__ import annotations
+
+from datetime import UTC, date, datetime
+
+from .models import TodoStats
+
+
+def build_stats(
+    total: int, completed: int, created_per_day: dict[date, int]
+) -> TodoStats:
+    """`TodoStats` from the counters; `created_per_day` in chronological order."""
+    # compteurs déjà valides: pas de validation pydantic
+    return TodoStats.model_construct(
+        total=total,
+        completed=completed,
+        open=total - completed,
+        created_per_day=created_per_day,
+    )
+
+
+class StatsCounter:
+    """Total, completed and per-day creation counts of a repository.
+
+    Le repository appelle `add`, `remove` et `set_completed` depuis ses
+    écritures, sous ses propres verrous s'il est multi-threadé.
+    """
+
+    def __init__(self) -> None:
+        self.total = 0
+        self.completed = 0
+        # jour UTC de created_at -> nombre de todos créés ce jour-là (jamais 0),
+        # dans l'ordre d'insertion: chronologique tant qu'aucun jour n'arrive
+        # avant le plus récent (horloge qui recule, rejeu), sinon trié à la lecture
+        self._created_per_day: dict[date, int] = {}
+        self._last_day: date | None = None
+        self._in_order = True
+
+    def add(self, created_at: datetime, completed: bool) -> None:
+        day = created_at.astimezone(UTC).date()
+        count = self._created_per_day.get(day, 0)
+        if not count and self._last_day is not None and day < self._last_day:
+            self._in_order = False
+        self._created_per_day[day] = count + 1
+        if self._last_day is None or day > self._last_day:
+            self._last_day = day
+        self.total += 1
+        self.completed += completed
+
+    def remove(self, created_at: datetime, completed: bool) -> None:
+        day = created_at.astimezone(UTC).date()
+        remaining = self._created_per_day[day] - 1
+        if remaining:
+            self._created_per_day[day] = remaining
+        else:
+            del self._created_per_day[day]
+        self.total -= 1
+        self.completed -= completed
+
+    def set_completed(self, old: bool, new: bool) -> None:
+        self.completed += new - old
+
+    def copy(self) -> StatsCounter:
+        """Independent copy, in O(days): to build the stats outside a lock."""
+        other = StatsCounter()
+        other.total, other.completed = self.total, self.completed
+        other._created_per_day = dict(self._created_per_day)
+        other._last_day, other._in_order = self._last_day, self._in_order
+        return other
+
+    def snapshot(self) -> TodoStats:
+        days = self._created_per_day
+        # dict(dict) copie la table sans rehacher les dates
+        ordered = dict(days) if self._in_order else dict(sorted(days.items()))
+        return build_stats(self.total, self.completed, ordered)
@@ -0,0 +1,107 @@
+"""Processus store partagé par les workers (backend `remote`).
+
+Usage:
+    STORE_BACKEND=durable python -m todo_app.store_server --socket /run/todo.sock
+    STORAGE_BACKEND=remote STORE_SOCKET=/run/todo.sock \\
+        uvicorn todo_app.api:app --workers 4
+
+Le serveur tourne sur une boucle asyncio: chaque connexion (un thread d'un
+worker) est servie par une coroutine, et les opérations du repository
+s'exécutent une à la fois sur la boucle. Le repository n'a donc pas besoin
+d'être thread-safe (`memory`, `columnar`, `durable` ou `sqlite`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+from typing import TYPE_CHECKING
+
+from .config import get_settings
+from .logger import configure_logging
+from .remote_repository import HEADER, MAX_FRAME, OK, OPERATIONS, encode_error
+from .repository import VersionConflictError, build_repository
+
+if TYPE_CHECKING:
+    from .repository import TodoRepository
+
+logger = logging.getLogger(__name__)
+
+
+def execute(repo: TodoRepository, request: bytes) -> bytes:
+    """Run one request frame against `repo` and return the response frame."""
+    try:
+        operation = OPERATIONS[request[0]]
+        args = operation.args.validate_json(request[1:])
+        result = getattr(repo, operation.name)(*args)
+        return bytes([OK]) + operation.result.dump_json(result)
+    except (IndexError, ValueError, VersionConflictError) as exc:
+        # requête mal formée (code inconnu, arguments invalides) ou refusée
+        return encode_error(exc)
+    except Exception as exc:
+        logger.exception("Store operation failed")
+        return encode_error(exc)
+
+
+async def handle(
+    repo: TodoRepository, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+) -> None:
+    """Serve the requests of one connection, in order, until it closes."""
+    try:
+        while True:
+            (length,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+            if not 0 < length <= MAX_FRAME:
+                logger.warning("Invalid store frame length: %d", length)
+                return
+            response = execute(repo, await reader.readexactly(length))
+            writer.write(HEADER.pack(len(response)) + response)
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+async def serve(repo: TodoRepository, path: str) -> asyncio.Server:
+    """Listen on the Unix socket `path` (replaced if it already exists)."""
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+    async def on_connect(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        await handle(repo, reader, writer)
+
+    server = await asyncio.start_unix_server(on_connect, path=path)
+    # la socket donne accès à toutes les données: propriétaire seulement
+    os.chmod(path, 0o600)
+    return server
+
+
+def main() -> None:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--socket", default=settings.store_socket)
+    args = parser.parse_args()
+    configure_logging(settings)
+    repo = build_repository(
+        settings.model_copy(update={"storage_backend": settings.store_backend})
+    )
+
+    async def run() -> None:
+        server = await serve(repo, args.socket)
+        logger.info("Store (%s) listening on %s", settings.store_backend, args.socket)
+        async with server:
+            await server.serve_forever()
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -8,33 +8,32 @@ from __future__ import annotations
 import os
 import sys
 
-import requests
 import streamlit as st
 
 # Ajouter le répertoire parent au path pour les imports
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from todo_app.config import settings
+from todo_app.client import TodoClient, sync_todos
+from todo_app.config import get_settings
 from todo_app.logger import logger
 
-API_BASE = settings.api_host
 
-
-def get_todos():
-    resp = requests.get(f"{API_BASE}/todos")
-    resp.raise_for_status()
-    return resp.json()
-
-
-def create_todo(title: str, description: str | None):
-    payload = {"title": title, "description": description}
-    resp = requests.post(f"{API_BASE}/todos", json=payload)
-    resp.raise_for_status()
-    return resp.json()
+@st.cache_resource
+def get_client() -> TodoClient:
+    """One pooled client for every session and rerun of the app."""
+    # configuration lue au premier rendu, pas à l'import du module
+    settings = get_settings()
+    return TodoClient(
+        str(settings.api_host),
+        timeout=settings.api_timeout,
+        retries=settings.api_retries,
+        cache_ttl=settings.api_cache_ttl,
+    )
 
 
 def main() -> None:
     st.title("Todo List — Best Practices Demo")
+    client = get_client()
 
     with st.form("create"):
         title = st.text_input("Titre")
@@ -42,14 +41,14 @@ def main() -> None:
         submitted = st.form_submit_button("Créer")
         if submitted and title:
             try:
-                create_todo(title, description)
+                client.create_todo(title, description)
                 st.success("Todo créé")
             except Exception as exc:  # pragma: no cover - surface errors to user
                 logger.exception("Erreur lors de la création de todo")
                 st.error(f"Impossible de créer le todo: {exc}")
 
     try:
-        todos = get_todos()
+        todos = sync_todos(client, st.session_state)
     except Exception:
         st.error("Impossible de récupérer les todos — vérifiez que l'API tourne")
         logger.exception("Erreur récup todos")